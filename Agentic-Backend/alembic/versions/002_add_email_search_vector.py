@@ -0,0 +1,43 @@
+"""Add weighted full-text search vector to emails
+
+Revision ID: 002_add_email_search_vector
+Revises: 001_add_user_table
+Create Date: 2025-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '002_add_email_search_vector'
+down_revision: Union[str, None] = '001_add_user_table'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Stored generated column: Postgres recomputes it whenever sync inserts or
+    # updates an email, so the index never lags behind the data
+    op.execute("""
+        ALTER TABLE emails ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(subject, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(sender_name, '') || ' ' ||
+                coalesce(sender_email, '') || ' ' || translate(coalesce(sender_email, ''), '@.', '  ')), 'B') ||
+            setweight(to_tsvector('english', left(coalesce(body_text, ''), 100000)), 'C')
+        ) STORED
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS idx_emails_search_vector ON emails USING gin (search_vector)")
+
+    # Superseded by the combined vector; no query used these expression indexes
+    op.execute("DROP INDEX IF EXISTS idx_emails_subject_gin")
+    op.execute("DROP INDEX IF EXISTS idx_emails_body_gin")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_emails_search_vector")
+    op.execute("ALTER TABLE emails DROP COLUMN IF EXISTS search_vector")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_emails_subject_gin ON emails USING gin (to_tsvector('english', subject))")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_emails_body_gin ON emails USING gin (to_tsvector('english', body_text))")
@@ -85,6 +85,14 @@ CREATE TABLE emails (
     tasks_generated BOOLEAN DEFAULT false,
     last_processed_at TIMESTAMP WITH TIME ZONE,
 
+    -- Full-text search: subject (A), sender (B), body (C), maintained by Postgres
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(subject, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(sender_name, '') || ' ' ||
+            coalesce(sender_email, '') || ' ' || translate(coalesce(sender_email, ''), '@.', '  ')), 'B') ||
+        setweight(to_tsvector('english', left(coalesce(body_text, ''), 100000)), 'C')
+    ) STORED,
+
     -- Metadata
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
@@ -216,8 +224,7 @@ CREATE INDEX idx_emails_account_id ON emails(account_id);
 CREATE INDEX idx_emails_sent_at ON emails(sent_at DESC);
 CREATE INDEX idx_emails_received_at ON emails(received_at DESC);
 CREATE INDEX idx_emails_sender_email ON emails(sender_email);
-CREATE INDEX idx_emails_subject_gin ON emails USING gin(to_tsvector('english', subject));
-CREATE INDEX idx_emails_body_gin ON emails USING gin(to_tsvector('english', body_text));
+CREATE INDEX idx_emails_search_vector ON emails USING gin(search_vector);
 CREATE INDEX idx_emails_category ON emails(category);
 CREATE INDEX idx_emails_importance ON emails(importance_score DESC);
 CREATE INDEX idx_emails_flags ON emails(is_read, is_flagged, is_important);
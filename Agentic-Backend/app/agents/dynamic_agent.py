@@ -7,6 +7,7 @@ from datetime import datetime
 
 from app.agents.base import BaseAgent
 from app.schemas.agent_schema import AgentSchema
+from app.schemas.validator_compiler import CompiledAgentValidators, schema_validator_cache
 from app.agents.processing.pipeline import ProcessingPipeline
 from app.services.ollama_client import OllamaClient
 from app.services.log_service import LogService
@@ -35,7 +36,8 @@ class DynamicAgent(BaseAgent):
         schema: AgentSchema,
         tools: Dict[str, Any],
         ollama_client: Optional[OllamaClient] = None,
-        log_service: Optional[LogService] = None
+        log_service: Optional[LogService] = None,
+        validators: Optional[CompiledAgentValidators] = None
     ):
         super().__init__(
             agent_id=agent_id,
@@ -48,6 +50,7 @@ class DynamicAgent(BaseAgent):
         )
         
         self.schema = schema
+        self.validators = validators or schema_validator_cache.get(schema)
         self.tools = tools
         self.pipeline = ProcessingPipeline.from_schema(
             schema.processing_pipeline,
@@ -130,29 +133,8 @@ class DynamicAgent(BaseAgent):
         Raises:
             DynamicAgentError: If validation fails
         """
-        validated_input = {}
-        errors = []
-        
-        # Check required fields
-        for field_name, field_def in self.schema.input_schema.items():
-            if field_def.required and field_name not in input_data:
-                errors.append(f"Required field '{field_name}' is missing")
-            elif field_name in input_data:
-                # Validate field value
-                value = input_data[field_name]
-                validation_error = self._validate_field_value(field_name, value, field_def)
-                if validation_error:
-                    errors.append(validation_error)
-                else:
-                    validated_input[field_name] = value
-            elif field_def.default is not None:
-                validated_input[field_name] = field_def.default
-        
-        # Include additional fields not in schema (for flexibility)
-        for field_name, value in input_data.items():
-            if field_name not in self.schema.input_schema:
-                validated_input[field_name] = value
-        
+        validated_input, errors = self.validators.input.validate(input_data)
+
         if errors:
             raise DynamicAgentError(f"Input validation failed: {'; '.join(errors)}")
         
@@ -171,93 +153,15 @@ class DynamicAgent(BaseAgent):
         Raises:
             DynamicAgentError: If validation fails
         """
-        validated_output = {}
-        errors = []
-        
-        # Check required output fields
-        for field_name, field_def in self.schema.output_schema.items():
-            if field_def.required and field_name not in output_data:
-                errors.append(f"Required output field '{field_name}' is missing")
-            elif field_name in output_data:
-                # Validate field value
-                value = output_data[field_name]
-                validation_error = self._validate_field_value(field_name, value, field_def)
-                if validation_error:
-                    errors.append(validation_error)
-                else:
-                    validated_output[field_name] = value
-            elif field_def.default is not None:
-                validated_output[field_name] = field_def.default
-        
-        # Include additional fields not in schema
-        for field_name, value in output_data.items():
-            if field_name not in self.schema.output_schema:
-                validated_output[field_name] = value
-        
+        validated_output, errors = self.validators.output.validate(
+            output_data, missing_message="Required output field '{}' is missing"
+        )
+
         if errors:
             raise DynamicAgentError(f"Output validation failed: {'; '.join(errors)}")
         
         return validated_output
     
-    def _validate_field_value(self, field_name: str, value: Any, field_def) -> Optional[str]:
-        """
-        Validate a field value against its definition.
-        
-        Args:
-            field_name: Name of the field
-            value: Value to validate
-            field_def: Field definition from schema
-            
-        Returns:
-            Error message if validation fails, None if valid
-        """
-        from app.schemas.agent_schema import FieldType
-        
-        try:
-            # Type validation
-            if field_def.type == FieldType.STRING:
-                if not isinstance(value, str):
-                    return f"Field '{field_name}' must be a string"
-                if field_def.max_length and len(value) > field_def.max_length:
-                    return f"Field '{field_name}' exceeds maximum length of {field_def.max_length}"
-                if field_def.min_length and len(value) < field_def.min_length:
-                    return f"Field '{field_name}' is below minimum length of {field_def.min_length}"
-                if field_def.pattern:
-                    import re
-                    if not re.match(field_def.pattern, value):
-                        return f"Field '{field_name}' does not match required pattern"
-            
-            elif field_def.type == FieldType.INTEGER:
-                if not isinstance(value, int):
-                    return f"Field '{field_name}' must be an integer"
-                if field_def.range:
-                    if value < field_def.range[0] or value > field_def.range[1]:
-                        return f"Field '{field_name}' must be between {field_def.range[0]} and {field_def.range[1]}"
-            
-            elif field_def.type == FieldType.FLOAT:
-                if not isinstance(value, (int, float)):
-                    return f"Field '{field_name}' must be a number"
-                if field_def.range:
-                    if value < field_def.range[0] or value > field_def.range[1]:
-                        return f"Field '{field_name}' must be between {field_def.range[0]} and {field_def.range[1]}"
-            
-            elif field_def.type == FieldType.BOOLEAN:
-                if not isinstance(value, bool):
-                    return f"Field '{field_name}' must be a boolean"
-            
-            elif field_def.type == FieldType.ARRAY:
-                if not isinstance(value, list):
-                    return f"Field '{field_name}' must be an array"
-            
-            elif field_def.type == FieldType.ENUM:
-                if field_def.values and value not in field_def.values:
-                    return f"Field '{field_name}' must be one of: {', '.join(field_def.values)}"
-            
-            return None
-            
-        except Exception as e:
-            return f"Validation error for field '{field_name}': {str(e)}"
-    
     async def _store_results(self, results: Dict[str, Any]) -> None:
         """
         Store results in dynamic tables based on data models.
@@ -12,6 +12,7 @@ from app.services.schema_manager import SchemaManager
 from app.agents.tools.registry import ToolRegistry
 from app.db.models.agent_type import AgentType
 from app.schemas.agent_schema import AgentSchema, ToolDefinition
+from app.schemas.validator_compiler import CompiledAgentValidators, schema_validator_cache
 from app.services.ollama_client import OllamaClient
 from app.services.log_service import LogService
 from app.utils.logging import get_logger
@@ -75,9 +76,10 @@ class AgentFactory:
             
             # Parse the schema
             agent_schema = AgentSchema(**agent_type_record.schema_definition)
+            validators = schema_validator_cache.get(agent_schema, agent_type_record.schema_hash)
             
             # Validate and merge configuration
-            merged_config = await self._validate_and_merge_config(agent_schema, config or {})
+            merged_config = await self._validate_and_merge_config(agent_schema, config or {}, validators)
             
             # Load required tools
             tools = await self._load_tools(agent_schema.tools, merged_config)
@@ -92,7 +94,8 @@ class AgentFactory:
                 schema=agent_schema,
                 tools=tools,
                 ollama_client=self.ollama_client,
-                log_service=self.log_service
+                log_service=self.log_service,
+                validators=validators
             )
             
             logger.info(f"Created dynamic agent: {name} (type: {agent_type}, id: {agent_id})")
@@ -127,8 +130,10 @@ class AgentFactory:
             AgentConfigurationError: If configuration is invalid
         """
         try:
+            validators = schema_validator_cache.get(schema)
+
             # Validate and merge configuration
-            merged_config = await self._validate_and_merge_config(schema, config or {})
+            merged_config = await self._validate_and_merge_config(schema, config or {}, validators)
             
             # Load required tools
             tools = await self._load_tools(schema.tools, merged_config)
@@ -143,7 +148,8 @@ class AgentFactory:
                 schema=schema,
                 tools=tools,
                 ollama_client=self.ollama_client,
-                log_service=self.log_service
+                log_service=self.log_service,
+                validators=validators
             )
             
             logger.info(f"Created dynamic agent from schema: {name} (id: {agent_id})")
@@ -156,7 +162,8 @@ class AgentFactory:
     async def _validate_and_merge_config(
         self,
         schema: AgentSchema,
-        user_config: Dict[str, Any]
+        user_config: Dict[str, Any],
+        validators: Optional[CompiledAgentValidators] = None
     ) -> Dict[str, Any]:
         """
         Validate user configuration against schema and merge with defaults.
@@ -164,6 +171,7 @@ class AgentFactory:
         Args:
             schema: The agent schema
             user_config: User-provided configuration
+            validators: Compiled validators for the schema (looked up if omitted)
             
         Returns:
             Merged and validated configuration
@@ -171,32 +179,24 @@ class AgentFactory:
         Raises:
             AgentConfigurationError: If configuration is invalid
         """
-        merged_config = {}
+        input_validator = (validators or schema_validator_cache.get(schema)).input
         errors = []
         
         # Start with schema defaults
-        for field_name, field_def in schema.input_schema.items():
-            if field_def.default is not None:
-                merged_config[field_name] = field_def.default
+        merged_config = dict(input_validator.defaults)
         
         # Apply user configuration
         for key, value in user_config.items():
-            if key in schema.input_schema:
-                field_def = schema.input_schema[key]
-                
-                # Validate the value against field definition
-                validation_error = self._validate_field_value(key, value, field_def)
-                if validation_error:
-                    errors.append(validation_error)
-                else:
-                    merged_config[key] = value
+            # Validate the value against field definition (additional config not in schema is allowed)
+            validation_error = input_validator.validate_field(key, value)
+            if validation_error:
+                errors.append(validation_error)
             else:
-                # Allow additional config not in schema (for flexibility)
                 merged_config[key] = value
         
         # Check required fields
-        for field_name, field_def in schema.input_schema.items():
-            if field_def.required and field_name not in merged_config:
+        for field_name in input_validator.required:
+            if field_name not in merged_config:
                 errors.append(f"Required field '{field_name}' is missing")
         
         # Add resource limits from schema
@@ -221,65 +221,6 @@ class AgentFactory:
         
         return merged_config
     
-    def _validate_field_value(self, field_name: str, value: Any, field_def) -> Optional[str]:
-        """
-        Validate a field value against its definition.
-        
-        Args:
-            field_name: Name of the field
-            value: Value to validate
-            field_def: Field definition from schema
-            
-        Returns:
-            Error message if validation fails, None if valid
-        """
-        from app.schemas.agent_schema import FieldType
-        
-        try:
-            # Type validation
-            if field_def.type == FieldType.STRING:
-                if not isinstance(value, str):
-                    return f"Field '{field_name}' must be a string"
-                if field_def.max_length and len(value) > field_def.max_length:
-                    return f"Field '{field_name}' exceeds maximum length of {field_def.max_length}"
-                if field_def.min_length and len(value) < field_def.min_length:
-                    return f"Field '{field_name}' is below minimum length of {field_def.min_length}"
-                if field_def.pattern:
-                    import re
-                    if not re.match(field_def.pattern, value):
-                        return f"Field '{field_name}' does not match required pattern"
-            
-            elif field_def.type == FieldType.INTEGER:
-                if not isinstance(value, int):
-                    return f"Field '{field_name}' must be an integer"
-                if field_def.range:
-                    if value < field_def.range[0] or value > field_def.range[1]:
-                        return f"Field '{field_name}' must be between {field_def.range[0]} and {field_def.range[1]}"
-            
-            elif field_def.type == FieldType.FLOAT:
-                if not isinstance(value, (int, float)):
-                    return f"Field '{field_name}' must be a number"
-                if field_def.range:
-                    if value < field_def.range[0] or value > field_def.range[1]:
-                        return f"Field '{field_name}' must be between {field_def.range[0]} and {field_def.range[1]}"
-            
-            elif field_def.type == FieldType.BOOLEAN:
-                if not isinstance(value, bool):
-                    return f"Field '{field_name}' must be a boolean"
-            
-            elif field_def.type == FieldType.ARRAY:
-                if not isinstance(value, list):
-                    return f"Field '{field_name}' must be an array"
-            
-            elif field_def.type == FieldType.ENUM:
-                if field_def.values and value not in field_def.values:
-                    return f"Field '{field_name}' must be one of: {', '.join(field_def.values)}"
-            
-            return None
-            
-        except Exception as e:
-            return f"Validation error for field '{field_name}': {str(e)}"
-    
     async def _load_tools(
         self,
         tool_definitions: Dict[str, ToolDefinition],
@@ -1,54 +1,144 @@
 import time
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
 from app.utils.logging import get_logger
 from app.utils.metrics import MetricsCollector
+from app.utils.tracing import tracer, parse_traceparent, SpanKind
 
 logger = get_logger("middleware")
 
+UNMATCHED_ROUTE = "unmatched"
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log requests and collect metrics."""
-    
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
-        # Log request
-        logger.info(
-            f"Request: {request.method} {request.url.path}",
-            extra={
-                "method": request.method,
-                "path": request.url.path,
-                "query_params": str(request.query_params),
-                "client_ip": request.client.host if request.client else None,
-            }
-        )
-        
-        # Process request
-        response: Response = await call_next(request)
-        
-        # Calculate duration
-        duration = time.time() - start_time
-        
-        # Log response
-        logger.info(
-            f"Response: {response.status_code} - {duration:.3f}s",
-            extra={
-                "method": request.method,
-                "path": request.url.path,
-                "status_code": response.status_code,
-                "duration": duration,
-            }
+
+def get_route_template(scope: Scope) -> str:
+    """
+    Return the route template the router matched for this request.
+
+    The router stores the matched route in the scope, so this is only
+    meaningful after the downstream app has run. Requests that matched no
+    route share a single label to keep metric cardinality bounded.
+    """
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def get_header(scope: Scope, name: bytes) -> Optional[str]:
+    """Return the first value of a (lower-case) header from the raw ASGI scope headers."""
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _content_length(value) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+class LoggingMiddleware:
+    """
+    Middleware to log requests and collect metrics.
+
+    Implemented as plain ASGI so responses (including streaming and SSE)
+    pass straight through; only the http.response.start message is
+    inspected for the status code and Content-Length. Metrics are labelled
+    by route template rather than raw path. Successful fast requests are
+    logged at DEBUG; server errors and requests slower than
+    API_SLOW_REQUEST_THRESHOLD_SECONDS are logged at WARNING. When tracing
+    is enabled each request runs in a server span (continuing an incoming
+    traceparent) and the response carries an X-Trace-Id header.
+    """
+
+    def __init__(self, app: ASGIApp, slow_request_threshold: Optional[float] = None):
+        self.app = app
+        self.slow_request_threshold = (
+            slow_request_threshold if slow_request_threshold is not None
+            else getattr(settings, 'api_slow_request_threshold_seconds', 2.0)
         )
-        
-        # Collect metrics
-        MetricsCollector.increment_api_requests(
-            method=request.method,
-            endpoint=request.url.path,
-            status_code=response.status_code
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        method = scope["method"]
+        status_code = 500
+        response_size = None
+
+        remote = parse_traceparent(get_header(scope, b"traceparent")) if tracer.enabled else None
+        trace_id, parent_span_id, sampled = remote if remote else (None, None, None)
+        span_scope = tracer.start_span(
+            f"{method} request",
+            kind=SpanKind.SERVER,
+            trace_id=trace_id,
+            parent_span_id=parent_span_id,
+            sampled=sampled
         )
-        
-        return response
+        span = span_scope.__enter__()
+        trace_header = (b"x-trace-id", span.trace_id.encode("latin-1")) if tracer.enabled else None
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for key, value in message.get("headers", ()):
+                    if key == b"content-length":
+                        response_size = _content_length(value)
+                        break
+                if trace_header is not None:
+                    message["headers"] = list(message.get("headers", ())) + [trace_header]
+            await send(message)
+
+        MetricsCollector.track_api_request_in_progress(method, 1)
+        error: Optional[BaseException] = None
+        try:
+            # Process request
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            MetricsCollector.track_api_request_in_progress(method, -1)
+
+            # Calculate duration
+            duration = time.perf_counter() - start_time
+            route = get_route_template(scope)
+
+            # Collect metrics
+            MetricsCollector.record_api_request(
+                method=method,
+                route=route,
+                status_code=status_code,
+                duration=duration,
+                request_size=_content_length(get_header(scope, b"content-length")),
+                response_size=response_size
+            )
+
+            if span.sampled:
+                span.name = f"{method} {route}"
+                span.set_attributes({
+                    "http.method": method,
+                    "http.route": route,
+                    "http.target": scope["path"],
+                    "http.status_code": status_code
+                })
+                if status_code >= 500:
+                    span.set_error(f"HTTP {status_code}")
+            span_scope.__exit__(type(error) if error else None, error, None)
+
+            # Log response
+            if status_code >= 500 or duration >= self.slow_request_threshold:
+                logger.warning(f"{method} {scope['path']} ({route}) -> {status_code} in {duration:.3f}s")
+            else:
+                logger.debug(f"{method} {scope['path']} -> {status_code} in {duration:.3f}s")
 
 
 class CORSMiddleware:
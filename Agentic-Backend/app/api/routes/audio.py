@@ -10,12 +10,14 @@ This module provides REST API endpoints for audio AI processing including:
 - Batch processing with resource management
 """
 
+import json
 from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 
-from app.services.audio_ai_service import audio_ai_service, AudioAIResult
+from app.services.audio_ai_service import audio_ai_service, AudioAIResult, AUDIO_OPERATIONS
 from app.services.model_capability_service import model_capability_service
 from app.api.dependencies import get_db_session, verify_api_key
 from app.utils.logging import get_logger
@@ -318,6 +320,71 @@ async def analyze_music(
         )
 
 
+@router.post("/analyze/stream")
+async def analyze_audio_stream(
+    file: UploadFile = File(...),
+    operations: str = Query("transcription", description="Comma-separated: transcription, speakers, emotion, classification, music"),
+    language: str = Query("en", description="Language code for transcription"),
+    num_speakers: Optional[int] = Query(None, description="Expected number of speakers"),
+    model_name: Optional[str] = Query(None, description="Specific model to use"),
+    current_user: Dict = Depends(verify_api_key)
+):
+    """
+    Analyze audio segment by segment, streaming results as Server-Sent Events.
+
+    The recording is decoded and split into speech segments once; each
+    ``segment`` event carries one segment's timestamps and results for every
+    requested operation. A final ``complete`` event carries the stitched
+    results.
+    """
+    audio_data = await file.read()
+
+    if not audio_data:
+        raise HTTPException(
+            status_code=400,
+            detail="Empty audio file provided"
+        )
+
+    if not await audio_ai_service.validate_audio_format(audio_data):
+        raise HTTPException(
+            status_code=400,
+            detail="Unsupported audio format. Supported: MP3, WAV, FLAC, AAC, OGG, WebM, M4A"
+        )
+
+    requested = [op.strip() for op in operations.split(",") if op.strip()]
+    unknown = [op for op in requested if op not in AUDIO_OPERATIONS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown operations: {unknown}. Supported: {', '.join(AUDIO_OPERATIONS)}"
+        )
+
+    async def generate_stream():
+        events = []
+        try:
+            async for event in audio_ai_service.stream_audio_analysis(
+                audio_data, requested, model_name=model_name, language=language, num_speakers=num_speakers
+            ):
+                events.append(event)
+                yield f"data: {json.dumps({'type': 'segment', **event})}\n\n"
+
+            results = audio_ai_service.stitch_segment_results(events, requested, language)
+            yield f"data: {json.dumps({'type': 'complete', 'filename': file.filename, 'segments': len(events), 'results': results})}\n\n"
+
+        except Exception as e:
+            logger.error(f"Streaming audio analysis failed: {e}")
+            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+
+    return StreamingResponse(
+        generate_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        }
+    )
+
+
 # ============================================================================
 # Model Management Endpoints
 # ============================================================================
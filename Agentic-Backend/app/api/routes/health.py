@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import Response
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from app.config import settings
 from app.utils.metrics import registry
@@ -22,10 +22,10 @@ async def health_check():
     }
 
 
-@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(verify_api_key)])
+@router.get("/metrics", response_class=Response, dependencies=[Depends(verify_api_key)])
 async def metrics():
-    """Prometheus metrics endpoint."""
-    return generate_latest(registry)
+    """Prometheus metrics endpoint (text exposition format of the application registry)."""
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
 
 
 @router.get("/ready", summary="Readiness Check")
@@ -46,6 +46,7 @@ class WebhookSubscriptionCreate(BaseModel):
     events: List[str] = Field(..., description="List of events to subscribe to")
     headers: Dict[str, str] = Field(default_factory=dict, description="Custom headers for webhook requests")
     filters: Dict[str, Any] = Field(default_factory=dict, description="Event filters")
+    batch_size: Optional[int] = Field(None, ge=1, le=500, description="Events per delivery request; batches are sent as {\"events\": [...]}")
 
 
 class WebhookSubscriptionResponse(BaseModel):
@@ -68,6 +69,7 @@ class QueueItemCreate(BaseModel):
     data: Dict[str, Any] = Field(..., description="Queue item data")
     max_retries: int = Field(3, description="Maximum retry attempts")
     callback_url: Optional[str] = Field(None, description="Callback URL for completion notification")
+    deadline: Optional[datetime] = Field(None, description="Process-by time; earlier deadlines run first within a priority, expired items are dead-lettered")
 
 
 class QueueItemResponse(BaseModel):
@@ -195,7 +197,8 @@ async def subscribe_webhook(
             "url": subscription.url,
             "events": subscription.events,
             "headers": subscription.headers,
-            "filters": subscription.filters
+            "filters": subscription.filters,
+            **({"batch_size": subscription.batch_size} if subscription.batch_size else {})
         })
 
         return {
@@ -332,7 +335,8 @@ async def enqueue_item(
     Add an item to a processing queue
 
     This endpoint allows queuing items for asynchronous processing with priority support.
-    Items are processed in priority order (CRITICAL > HIGH > NORMAL > LOW).
+    Items are processed in priority order (CRITICAL > HIGH > NORMAL > LOW), and by
+    earliest deadline within a priority.
     """
     try:
         item_id = await integration_layer_service.queue_manager.enqueue_item(
@@ -341,7 +345,8 @@ async def enqueue_item(
                 "type": item.type,
                 "data": item.data,
                 "max_retries": item.max_retries,
-                "callback_url": item.callback_url
+                "callback_url": item.callback_url,
+                "deadline": item.deadline
             },
             item.priority
         )
@@ -412,7 +417,7 @@ async def list_queues(
     """List all processing queues and their statistics"""
     try:
         queue_stats = {}
-        for queue_name in integration_layer_service.processing_queues.keys():
+        for queue_name in await integration_layer_service.queue_manager.list_queues():
             queue_stats[queue_name] = await integration_layer_service.queue_manager.get_queue_stats(queue_name)
 
         return {
@@ -607,7 +612,7 @@ async def get_integration_layer_stats():
 
         # Get queue stats
         queue_stats = {}
-        for queue_name in integration_layer_service.processing_queues.keys():
+        for queue_name in await integration_layer_service.queue_manager.list_queues():
             queue_stats[queue_name] = await integration_layer_service.queue_manager.get_queue_stats(queue_name)
 
         # Get backend stats
@@ -691,15 +696,18 @@ async def trigger_webhook_event(
 async def list_queue_items(
     queue_name: str,
     limit: int = Query(50, ge=1, le=200, description="Maximum number of items to return"),
+    dead_letter: bool = Query(False, description="List dead-lettered items instead of pending ones"),
     current_user: Dict = Depends(get_current_user)
 ):
-    """List items in a processing queue (admin use)"""
+    """List items in a processing queue or its dead-letter set (admin use)"""
     try:
-        queue = integration_layer_service.processing_queues.get(queue_name, [])
+        queue_manager = integration_layer_service.queue_manager
+        queue_items = await queue_manager.list_items(queue_name, limit, dead_letter=dead_letter)
+        stats = await queue_manager.get_queue_stats(queue_name)
 
         # Convert to response format
         items = []
-        for item in queue[:limit]:
+        for item in queue_items:
             items.append({
                 "id": item.id,
                 "type": item.type,
@@ -707,7 +715,9 @@ async def list_queue_items(
                 "created_at": item.created_at.isoformat(),
                 "retry_count": item.retry_count,
                 "max_retries": item.max_retries,
-                "callback_url": item.callback_url
+                "processing_deadline": item.processing_deadline.isoformat() if item.processing_deadline else None,
+                "callback_url": item.callback_url,
+                "last_error": item.last_error
             })
 
         return {
@@ -715,7 +725,7 @@ async def list_queue_items(
             "data": {
                 "queue_name": queue_name,
                 "items": items,
-                "total": len(queue),
+                "total": stats.get("dead_letter" if dead_letter else "total_items", len(items)),
                 "returned": len(items)
             }
         }
@@ -733,23 +743,11 @@ async def remove_queue_item(
 ):
     """Remove an item from a processing queue (admin use)"""
     try:
-        queue = integration_layer_service.processing_queues.get(queue_name, [])
+        removed_item = await integration_layer_service.queue_manager.remove_item(queue_name, item_id)
 
-        # Find and remove item
-        item_index = None
-        for i, item in enumerate(queue):
-            if item.id == item_id:
-                item_index = i
-                break
-
-        if item_index is None:
+        if removed_item is None:
             raise HTTPException(status_code=404, detail=f"Queue item not found: {item_id}")
 
-        removed_item = queue.pop(item_index)
-
-        # Remove from Redis
-        await integration_layer_service.queue_manager._remove_queue_item(queue_name, item_id)
-
         return {
             "status": "success",
             "message": "Queue item removed successfully",
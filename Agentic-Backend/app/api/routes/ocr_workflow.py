@@ -294,18 +294,18 @@ async def process_ocr_workflow(
                 detail="Batch not found"
             )
 
-        # Get image paths for processing
+        # Get image paths for processing. The whole batch is passed in page
+        # order; the task skips pages already completed and redoes the rest,
+        # including pages that failed or timed out on an earlier run.
         images_result = await db.execute(
-            select(OCRImage.file_path).where(
-                and_(
-                    OCRImage.batch_id == batch_uuid,
-                    OCRImage.status == "pending"
-                )
+            select(OCRImage.file_path, OCRImage.status).where(
+                OCRImage.batch_id == batch_uuid
             ).order_by(OCRImage.processing_order)
         )
-        image_paths = [row[0] for row in images_result.fetchall()]
+        image_rows = images_result.fetchall()
+        image_paths = [row[0] for row in image_rows]
 
-        if not image_paths:
+        if all(row[1] == "completed" for row in image_rows):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="No images to process"
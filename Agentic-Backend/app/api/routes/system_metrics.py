@@ -1,6 +1,6 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, List
-from app.services.system_metrics_service import system_metrics_service
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Any, List, Optional
+from app.services.system_metrics_service import system_metrics_service, HISTORY_FIELDS
 
 router = APIRouter()
 
@@ -18,6 +18,7 @@ async def get_system_metrics() -> Dict[str, Any]:
     - GPU: utilization, memory, temperature (Fahrenheit), clocks, power (for NVIDIA GPUs)
 
     This endpoint is useful for monitoring system performance and resource utilization.
+    Values come from the most recent background sample, so the response is immediate.
     """
     try:
         return system_metrics_service.get_all_metrics()
@@ -28,6 +29,37 @@ async def get_system_metrics() -> Dict[str, Any]:
         )
 
 
+@router.get("/system/metrics/history", summary="Get System Metrics History")
+async def get_system_metrics_history(
+    window_seconds: float = Query(3600, gt=0, description="How far back to look, in seconds"),
+    max_points: int = Query(360, ge=1, le=5000, description="Downsample to at most this many points per series"),
+    fields: Optional[str] = Query(None, description="Comma-separated series names (defaults to all)")
+) -> Dict[str, Any]:
+    """
+    Get sampled system metrics history from the in-memory ring buffer.
+
+    Samples are bucket-averaged so each series has at most max_points values.
+    Available series: CPU (total/user/system/iowait), memory, swap, disk usage and
+    throughput, network throughput, load averages and aggregated GPU metrics.
+    """
+    selected = [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+    if selected:
+        unknown = [name for name in selected if name not in HISTORY_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(HISTORY_FIELDS)}"
+            )
+
+    try:
+        return system_metrics_service.get_history(window_seconds=window_seconds, max_points=max_points, fields=selected)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to retrieve system metrics history: {str(e)}"
+        )
+
+
 @router.get("/system/metrics/cpu", summary="Get CPU Metrics")
 async def get_cpu_metrics() -> Dict[str, Any]:
     """Get CPU utilization and performance metrics."""
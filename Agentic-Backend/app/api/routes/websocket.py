@@ -6,6 +6,8 @@ import asyncio
 from app.utils.logging import get_logger
 from app.utils.metrics import MetricsCollector
 from app.utils.auth import verify_token
+from app.services.log_fanout_service import log_fanout_service
+from app.services.workflow_progress_service import workflow_progress_relay
 from app.db.models.user import User
 from sqlalchemy import select
 from app.services.chat_service import ChatService
@@ -64,6 +66,8 @@ class ConnectionManager:
             del self.active_connections[connection_id]
         if connection_id in self.connection_users:
             del self.connection_users[connection_id]
+        log_fanout_service.unsubscribe(connection_id)
+        workflow_progress_relay.unsubscribe(connection_id)
         MetricsCollector.increment_websocket_connections("logs", -1)
         logger.info(f"WebSocket disconnected: {connection_id}")
     
@@ -114,140 +118,44 @@ class ConnectionManager:
     def subscribe_to_logs(self, connection_id: str, filters: dict):
         """Subscribe connection to log updates with filters."""
         self.log_subscriptions[connection_id] = filters
+        if connection_id in self.active_connections:
+            log_fanout_service.subscribe(
+                connection_id,
+                self.active_connections[connection_id],
+                self.connection_users.get(connection_id),
+                filters
+            )
         logger.info(f"Connection {connection_id} subscribed to logs with filters: {filters}")
     
     def unsubscribe_from_logs(self, connection_id: str):
         """Unsubscribe connection from log updates."""
         if connection_id in self.log_subscriptions:
             del self.log_subscriptions[connection_id]
+        log_fanout_service.unsubscribe(connection_id)
         logger.info(f"Connection {connection_id} unsubscribed from logs")
 
-    async def broadcast_log(self, log_data: Dict[str, Any], user_id: Optional[int] = None, scope: str = "user"):
-        """Broadcast log to appropriate WebSocket subscribers based on permissions and scope."""
+    async def broadcast_log(
+        self,
+        log_data: Dict[str, Any],
+        user_id: Optional[int] = None,
+        scope: str = "user",
+        require_filter_keys: bool = False
+    ):
+        """
+        Broadcast log to this worker's WebSocket subscribers based on permissions and scope.
+
+        Delivery is queued per connection by the log fan-out service, so a slow
+        client never blocks the caller or other subscribers. Logs published to
+        the Redis log stream reach every worker through the fan-out consumer;
+        this method is for logs that were not published there.
+        """
         try:
-            # Filter subscribers based on user permissions and scope
-            eligible_connections = []
-
-            for connection_id, filters in self.log_subscriptions.items():
-                # Check if this connection should receive this log
-                should_receive = False
-
-                # System scope logs - only admins can see these
-                if scope == "admin":
-                    # Check if connection user is an admin/superuser
-                    if connection_id in self.connection_users:
-                        connection_user = self.connection_users[connection_id]
-                        if connection_user.is_superuser:
-                            should_receive = True
-
-                # User scope logs - user can see their own logs, admins can see all user logs
-                elif scope == "user":
-                    # If log has user_id, only that user (or admins) should see it
-                    if user_id and connection_id in self.connection_users:
-                        connection_user = self.connection_users[connection_id]
-                        # User can see their own logs, or admins can see all logs
-                        if connection_user.id == user_id or connection_user.is_superuser:
-                            should_receive = True
-                    else:
-                        # Logs without user_id are general system logs - visible to all authenticated users
-                        if connection_id in self.connection_users:
-                            should_receive = True
-
-                # System logs - visible to all connected users
-                else:
-                    should_receive = True
-
-                # Apply additional filters
-                if should_receive and self._matches_log_filters(log_data, filters):
-                    eligible_connections.append(connection_id)
-
-            # Broadcast to eligible connections
-            if eligible_connections:
-                message = {
-                    "type": "log",
-                    "data": log_data,
-                    "timestamp": log_data.get("timestamp"),
-                    "scope": scope
-                }
-
-                disconnected = set()
-                for connection_id in eligible_connections:
-                    if connection_id in self.active_connections:
-                        websocket = self.active_connections[connection_id]
-                        try:
-                            await websocket.send_text(json.dumps(message))
-                        except Exception as e:
-                            logger.error(f"Failed to broadcast log to {connection_id}: {e}")
-                            disconnected.add(connection_id)
-
-                # Clean up disconnected clients
-                for connection_id in disconnected:
-                    self.disconnect(connection_id)
-
-                logger.debug(f"Broadcasted log to {len(eligible_connections) - len(disconnected)} connections")
-
+            queued = log_fanout_service.dispatch(log_data, user_id, scope, require_filter_keys=require_filter_keys)
+            if queued:
+                logger.debug(f"Queued log for {queued} connections")
         except Exception as e:
             logger.error(f"Failed to broadcast log: {e}")
 
-    def _matches_log_filters(self, log_data: Dict[str, Any], filters: Dict[str, Any]) -> bool:
-        """Check if log data matches WebSocket subscription filters."""
-        if not filters:
-            return True
-
-        for key, value in filters.items():
-            # Skip special filter keys
-            if key in ["admin_mode"]:
-                continue
-
-            if key not in log_data:
-                continue
-
-            if isinstance(value, list):
-                if log_data[key] not in value:
-                    return False
-            elif log_data[key] != str(value):
-                return False
-
-        return True
-
-    async def broadcast_workflow_update(self, message: Dict[str, Any], user_id: str, workflow_id: Optional[str] = None):
-        """Broadcast workflow update to appropriate WebSocket subscribers."""
-        try:
-            eligible_connections = []
-
-            for connection_id, user in self.connection_users.items():
-                # Check if this user should receive workflow updates
-                if user.username == user_id:
-                    # Broadcast to all user connections (including OCR progress connections)
-                    eligible_connections.append(connection_id)
-
-            # Broadcast to eligible connections
-            if eligible_connections:
-                websocket_message = {
-                    "type": "ocr_workflow_status",
-                    "data": message,
-                    "timestamp": message.get("timestamp") or datetime.utcnow().isoformat()
-                }
-
-                disconnected = set()
-                for connection_id in eligible_connections:
-                    if connection_id in self.active_connections:
-                        websocket = self.active_connections[connection_id]
-                        try:
-                            await websocket.send_text(json.dumps(websocket_message))
-                        except Exception as e:
-                            logger.error(f"Failed to broadcast workflow update to {connection_id}: {e}")
-                            disconnected.add(connection_id)
-
-                # Clean up disconnected clients
-                for connection_id in disconnected:
-                    self.disconnect(connection_id)
-
-                logger.debug(f"Broadcasted workflow update to {len(eligible_connections) - len(disconnected)} connections")
-
-        except Exception as e:
-            logger.error(f"Failed to broadcast workflow update: {e}")
-
 
 manager = ConnectionManager()
 
@@ -569,6 +477,7 @@ async def websocket_ocr_progress(
         return
 
     await manager.connect(websocket, connection_id, user)
+    workflow_progress_relay.subscribe(connection_id, websocket, user, workflow_id)
 
     try:
         # Send welcome message
@@ -656,6 +565,7 @@ async def websocket_ocr_progress(
                             workflow_uuid = UUID(wf_id)
                             workflow = await db.get(OCRWorkflow, workflow_uuid)
                             if workflow and workflow.user_id == user.username:
+                                workflow_progress_relay.subscribe(connection_id, websocket, user, str(workflow.id))
                                 await manager.send_personal_message({
                                     "type": "workflow_subscribed",
                                     "workflow_id": str(workflow.id),
@@ -720,6 +630,7 @@ async def websocket_email_progress(
         return
 
     await manager.connect(websocket, connection_id, user)
+    workflow_progress_relay.subscribe(connection_id, websocket, user, workflow_id)
 
     try:
         # Send welcome message
@@ -774,11 +685,17 @@ async def websocket_email_progress(
                             workflow_uuid = UUID(wf_id)
                             workflow = await db.get(EmailWorkflow, workflow_uuid)
                             if workflow:
+                                workflow_progress_relay.subscribe(connection_id, websocket, user, str(workflow.id))
                                 await manager.send_personal_message({
                                     "type": "workflow_subscribed",
                                     "workflow_id": str(workflow.id),
                                     "status": workflow.status.value
                                 }, connection_id)
+
+                                # Catch up on progress published before this subscription
+                                snapshot = await workflow_progress_relay.get_snapshot(str(workflow.id))
+                                if snapshot:
+                                    await manager.send_personal_message(snapshot, connection_id)
                             else:
                                 await manager.send_personal_message({
                                     "type": "error",
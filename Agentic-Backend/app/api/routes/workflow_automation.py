@@ -522,6 +522,33 @@ async def cancel_workflow_execution(
         raise HTTPException(status_code=500, detail=f"Failed to cancel workflow execution: {str(e)}")
 
 
+@router.post("/executions/{execution_id}/resume", response_model=Dict[str, Any])
+async def resume_workflow_execution(
+    execution_id: str,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Resume an interrupted workflow execution from its checkpoint, skipping steps that already completed"""
+    try:
+        resumed = await workflow_automation_service.resume_workflow_execution(execution_id)
+
+        if not resumed:
+            raise HTTPException(status_code=409, detail=f"Workflow execution is still running: {execution_id}")
+
+        return {
+            "status": "success",
+            "message": "Workflow execution resumed",
+            "data": {"execution_id": execution_id}
+        }
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to resume workflow execution {execution_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to resume workflow execution: {str(e)}")
+
+
 # ============================================================================
 # Workflow Schedule Management Endpoints
 # ============================================================================
@@ -1,12 +1,13 @@
 """
 Security middleware for agent execution sandboxing.
 """
+import json
 import re
 import time
 from typing import Dict, Any, Optional
+from urllib.parse import parse_qsl
 from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.services.security_service import SecurityService
 from app.schemas.agent_schema import AgentSchema
@@ -59,13 +60,51 @@ class MockSecurityService:
 logger = get_logger("security_middleware")
 
 
-class AgentSecurityMiddleware(BaseHTTPMiddleware):
+# Routes that execute agents; everything else takes the fast path
+AGENT_EXECUTION_PATHS = (
+    "/api/v1/agents/",
+    "/api/v1/tasks/",
+    "/api/v1/agent-builder/"
+)
+AGENT_EXECUTION_METHODS = frozenset({"POST", "PUT", "PATCH"})
+
+SUSPICIOUS_PATTERNS = (
+    r'\.\./',  # Directory traversal
+    r'<script',  # XSS attempts
+    r'union\s+select',  # SQL injection
+)
+SUSPICIOUS_PATTERN_RE = re.compile("|".join(f"(?:{pattern})" for pattern in SUSPICIOUS_PATTERNS), re.IGNORECASE)
+
+# Proxy headers that must not be repeated
+SINGLE_VALUE_PROXY_HEADERS = frozenset({b"x-forwarded-for", b"x-real-ip"})
+
+
+async def _send_json(send: Send, status_code: int, content: Dict[str, Any]):
+    """Send a complete JSON response directly over ASGI."""
+    body = json.dumps(content).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1"))
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AgentSecurityMiddleware:
     """
     Middleware for enforcing agent execution security policies.
+
+    Plain ASGI: requests that are not agent executions (anything other than
+    POST/PUT/PATCH under the agent/task/agent-builder routes) are passed
+    straight through without building a Request or touching the security
+    service.
     """
 
-    def __init__(self, app, security_service: Optional[SecurityService] = None):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, security_service: Optional[SecurityService] = None):
+        self.app = app
         try:
             self.security_service = security_service or SecurityService()
         except Exception as e:
@@ -73,71 +112,74 @@ class AgentSecurityMiddleware(BaseHTTPMiddleware):
             # Create a mock security service that doesn't crash
             self.security_service = MockSecurityService()
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """
         Process request through security middleware.
         """
+        if scope["type"] != "http" or not self._is_agent_execution_request(scope):
+            await self.app(scope, receive, send)
+            return
+
         start_time = time.time()
+        request = Request(scope)
 
         # Extract agent information from request
         agent_id = self._extract_agent_id(request)
         agent_type = self._extract_agent_type(request)
+        sandbox_initialized = False
+        response_started = False
+
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
 
         try:
-            # Initialize agent sandbox if this is an agent execution request
-            if self._is_agent_execution_request(request):
-                if agent_id and agent_type:
-                    # Try to initialize sandbox
-                    sandbox_initialized = await self.security_service.initialize_agent_sandbox(
-                        agent_id, agent_type, None  # Schema will be validated separately
-                    )
-
-                    if not sandbox_initialized:
-                        logger.warning(f"Failed to initialize sandbox for agent {agent_id}")
-                        return JSONResponse(
-                            status_code=429,
-                            content={
-                                "error": "Resource limit exceeded",
-                                "message": "Unable to initialize agent execution environment"
-                            }
-                        )
-
-                    # Store agent context in request state
-                    request.state.agent_id = agent_id
-                    request.state.agent_type = agent_type
-                    request.state.sandbox_initialized = True
+            # Initialize agent sandbox for this agent execution request
+            if agent_id and agent_type:
+                # Try to initialize sandbox
+                sandbox_initialized = await self.security_service.initialize_agent_sandbox(
+                    agent_id, agent_type, None  # Schema will be validated separately
+                )
+
+                if not sandbox_initialized:
+                    logger.warning(f"Failed to initialize sandbox for agent {agent_id}")
+                    await _send_json(send, 429, {
+                        "error": "Resource limit exceeded",
+                        "message": "Unable to initialize agent execution environment"
+                    })
+                    return
+
+                # Store agent context in request state
+                request.state.agent_id = agent_id
+                request.state.agent_type = agent_type
+                request.state.sandbox_initialized = True
 
             # Process the request
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
 
             # Monitor execution if sandbox was initialized
-            if hasattr(request.state, 'sandbox_initialized') and request.state.sandbox_initialized:
+            if sandbox_initialized:
                 execution_time = time.time() - start_time
                 await self._monitor_execution(request, execution_time)
 
-            return response
-
         except Exception as e:
             logger.error(f"Security middleware error: {e}")
 
-            # Cleanup sandbox on error
-            if hasattr(request.state, 'sandbox_initialized') and request.state.sandbox_initialized:
-                if agent_id:
-                    await self.security_service.cleanup_agent_sandbox(agent_id)
+            # Once the response has started it can no longer be replaced
+            if response_started:
+                raise
 
             # Return appropriate error response
-            return JSONResponse(
-                status_code=500,
-                content={
-                    "error": "Security processing error",
-                    "message": "An error occurred during security validation"
-                }
-            )
+            await _send_json(send, 500, {
+                "error": "Security processing error",
+                "message": "An error occurred during security validation"
+            })
         finally:
             # Cleanup sandbox after request completion
-            if hasattr(request.state, 'sandbox_initialized') and request.state.sandbox_initialized:
-                if agent_id:
-                    await self.security_service.cleanup_agent_sandbox(agent_id)
+            if sandbox_initialized and agent_id:
+                await self.security_service.cleanup_agent_sandbox(agent_id)
 
     def _extract_agent_id(self, request: Request) -> Optional[str]:
         """Extract agent ID from request."""
@@ -175,16 +217,12 @@ class AgentSecurityMiddleware(BaseHTTPMiddleware):
 
         return agent_type
 
-    def _is_agent_execution_request(self, request: Request) -> bool:
-        """Determine if this is an agent execution request."""
-        execution_paths = [
-            "/api/v1/agents/",
-            "/api/v1/tasks/",
-            "/api/v1/agent-builder/"
-        ]
-
-        return any(path in request.url.path for path in execution_paths) and \
-               request.method in ["POST", "PUT", "PATCH"]
+    def _is_agent_execution_request(self, scope: Scope) -> bool:
+        """Determine if this is an agent execution request (cheap; runs for every request)."""
+        if scope["method"] not in AGENT_EXECUTION_METHODS:
+            return False
+        path = scope["path"]
+        return any(prefix in path for prefix in AGENT_EXECUTION_PATHS)
 
     async def _monitor_execution(self, request: Request, execution_time: float):
         """Monitor agent execution for security violations."""
@@ -209,90 +247,79 @@ class AgentSecurityMiddleware(BaseHTTPMiddleware):
             logger.error(f"Execution monitoring error: {e}")
 
 
-class RequestValidationMiddleware(BaseHTTPMiddleware):
+class RequestValidationMiddleware:
     """
     Middleware for validating incoming requests against security policies.
+
+    Plain ASGI: validation works on the raw scope (path, query string and
+    header list) with a single precompiled pattern, and rejected requests
+    get a 400 JSON response without reaching the application.
     """
 
-    def __init__(self, app, security_service: Optional[SecurityService] = None):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, security_service: Optional[SecurityService] = None):
+        self.app = app
         self.security_service = security_service or SecurityService()
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """
         Validate incoming request.
         """
-        try:
-            # Validate request size
-            if hasattr(request, 'body'):
-                # This is a simplified check - in production you'd stream and check size
-                pass
+        if scope["type"] != "http" or "/api/v1/security/" in scope["path"]:
+            # Skip validation for security endpoints since they may have proxy headers
+            await self.app(scope, receive, send)
+            return
 
+        try:
             # Validate request headers
-            await self._validate_request_headers(request)
+            self._validate_request_headers(scope)
 
             # Check for suspicious patterns
-            await self._check_request_patterns(request)
+            self._check_request_patterns(scope)
 
-            # Process request
-            response = await call_next(request)
-            return response
-
-        except HTTPException:
-            raise
+        except HTTPException as e:
+            await _send_json(send, e.status_code, {"detail": e.detail})
+            return
         except Exception as e:
             logger.error(f"Request validation error: {e}")
-            return JSONResponse(
-                status_code=400,
-                content={
-                    "error": "Request validation failed",
-                    "message": "Invalid request format or content"
-                }
-            )
-
-    async def _validate_request_headers(self, request: Request):
-        """Validate request headers for security."""
-        # Skip header validation for security endpoints since they may have proxy headers
-        if "/api/v1/security/" in request.url.path:
+            await _send_json(send, 400, {
+                "error": "Request validation failed",
+                "message": "Invalid request format or content"
+            })
             return
 
-        # Check for required security headers in production
-        suspicious_headers = [
-            header for header in request.headers.keys()
-            if header.lower() in ['x-forwarded-for', 'x-real-ip'] and len(request.headers.getlist(header)) > 1
-        ]
+        # Process request
+        await self.app(scope, receive, send)
+
+    def _validate_request_headers(self, scope: Scope):
+        """Validate request headers for security."""
+        seen = set()
+        suspicious_headers = set()
+        for key, _ in scope.get("headers", ()):
+            key = key.lower()
+            if key in SINGLE_VALUE_PROXY_HEADERS:
+                if key in seen:
+                    suspicious_headers.add(key.decode("latin-1"))
+                seen.add(key)
 
         if suspicious_headers:
-            logger.warning(f"Suspicious headers detected: {suspicious_headers}")
+            logger.warning(f"Suspicious headers detected: {sorted(suspicious_headers)}")
             raise HTTPException(status_code=400, detail="Invalid request headers")
 
-    async def _check_request_patterns(self, request: Request):
+    def _check_request_patterns(self, scope: Scope):
         """Check request for suspicious patterns."""
-        # Skip pattern validation for security endpoints
-        if "/api/v1/security/" in request.url.path:
-            return
-
-        # This is a simplified implementation
-        # In production, you'd implement more sophisticated pattern detection
-
-        suspicious_patterns = [
-            r'\.\./',  # Directory traversal
-            r'<script',  # XSS attempts
-            r'union\s+select',  # SQL injection
-        ]
-
         # Check URL for suspicious patterns
-        url_str = str(request.url)
-        for pattern in suspicious_patterns:
-            if re.search(pattern, url_str, re.IGNORECASE):
-                logger.warning(f"Suspicious pattern detected in URL: {pattern}")
-                raise HTTPException(status_code=400, detail="Invalid request")
-
-        # Check query parameters
-        for param, value in request.query_params.items():
-            for pattern in suspicious_patterns:
-                if re.search(pattern, value, re.IGNORECASE):
-                    logger.warning(f"Suspicious pattern detected in query param {param}: {pattern}")
+        query_string = scope.get("query_string", b"").decode("latin-1")
+        match = SUSPICIOUS_PATTERN_RE.search(scope.get("root_path", "") + scope["path"] + "?" + query_string)
+        if match:
+            logger.warning(f"Suspicious pattern detected in URL: {match.group(0)!r}")
+            raise HTTPException(status_code=400, detail="Invalid request")
+
+        # Check decoded query parameters (catches percent-encoded payloads)
+        if query_string:
+            for param, value in parse_qsl(query_string, keep_blank_values=True):
+                match = SUSPICIOUS_PATTERN_RE.search(value)
+                if match:
+                    logger.warning(f"Suspicious pattern detected in query param {param}: {match.group(0)!r}")
                     raise HTTPException(status_code=400, detail="Invalid request parameters")
 
 
@@ -1,5 +1,6 @@
 from celery import Celery
 from app.config import settings
+from app.utils.tracing import setup_tracing
 
 # Create Celery app
 celery_app = Celery(
@@ -63,5 +64,8 @@ celery_app.conf.beat_schedule = {
     },
 }
 
+# Propagate trace context to workers and trace task execution (no-op unless TRACING_ENABLED)
+setup_tracing()
+
 if __name__ == "__main__":
     celery_app.start()
\ No newline at end of file
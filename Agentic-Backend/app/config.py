@@ -50,6 +50,10 @@ class Settings(BaseSettings):
     # Redis Streams
     log_stream_name: str = Field(default="agent_logs", env="LOG_STREAM_NAME")
     log_stream_max_len: int = Field(default=10000, env="LOG_STREAM_MAX_LEN")
+    log_fanout_queue_size: int = Field(default=1000, env="LOG_FANOUT_QUEUE_SIZE")  # per WebSocket connection
+    log_fanout_send_timeout_seconds: float = Field(default=5.0, env="LOG_FANOUT_SEND_TIMEOUT_SECONDS")
+    log_fanout_read_count: int = Field(default=100, env="LOG_FANOUT_READ_COUNT")
+    log_fanout_stale_group_seconds: int = Field(default=600, env="LOG_FANOUT_STALE_GROUP_SECONDS")
 
     # Phase 1 New Services Configuration
 
@@ -67,6 +71,13 @@ class Settings(BaseSettings):
     http_client_max_connections_per_host: int = Field(default=30, env="HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST")
     http_client_ssl_verify: bool = Field(default=True, env="HTTP_CLIENT_SSL_VERIFY")
     http_client_allowed_domains: str = Field(default="", env="HTTP_CLIENT_ALLOWED_DOMAINS")  # Comma-separated list
+    http_client_stream_chunk_size: int = Field(default=65536, env="HTTP_CLIENT_STREAM_CHUNK_SIZE")  # bytes
+    http_client_stream_max_bytes: int = Field(default=50 * 1024 * 1024, env="HTTP_CLIENT_STREAM_MAX_BYTES")
+    http_client_request_log_memory_size: int = Field(default=1000, env="HTTP_CLIENT_REQUEST_LOG_MEMORY_SIZE")
+    http_client_request_log_queue_size: int = Field(default=10000, env="HTTP_CLIENT_REQUEST_LOG_QUEUE_SIZE")
+    http_client_request_log_batch_size: int = Field(default=100, env="HTTP_CLIENT_REQUEST_LOG_BATCH_SIZE")
+    http_client_request_log_flush_interval: float = Field(default=2.0, env="HTTP_CLIENT_REQUEST_LOG_FLUSH_INTERVAL")  # seconds
+    http_client_request_log_success_sample_rate: float = Field(default=1.0, env="HTTP_CLIENT_REQUEST_LOG_SUCCESS_SAMPLE_RATE")  # 0.0-1.0
 
     # Model Selection Configuration
     model_selection_cache_ttl: int = Field(default=300, env="MODEL_SELECTION_CACHE_TTL")  # seconds
@@ -97,6 +108,8 @@ class Settings(BaseSettings):
     web_connector_max_redirects: int = Field(default=5, env="WEB_CONNECTOR_MAX_REDIRECTS")
     web_connector_respect_robots_txt: bool = Field(default=True, env="WEB_CONNECTOR_RESPECT_ROBOTS_TXT")
     web_connector_scraping_delay: float = Field(default=1.0, env="WEB_CONNECTOR_SCRAPING_DELAY")
+    web_connector_max_page_bytes: int = Field(default=5 * 1024 * 1024, env="WEB_CONNECTOR_MAX_PAGE_BYTES")
+    web_connector_max_feed_bytes: int = Field(default=20 * 1024 * 1024, env="WEB_CONNECTOR_MAX_FEED_BYTES")
 
     # Social Media Connector Configuration
     social_connector_rate_limit_buffer: float = Field(default=0.1, env="SOCIAL_CONNECTOR_RATE_LIMIT_BUFFER")
@@ -115,6 +128,52 @@ class Settings(BaseSettings):
     email_workflow_max_retries: int = Field(default=3, env="EMAIL_WORKFLOW_MAX_RETRIES")
     email_workflow_retry_delay: float = Field(default=1.0, env="EMAIL_WORKFLOW_RETRY_DELAY")  # seconds
 
+    # Integration Queue Configuration
+    integration_queue_worker_concurrency: int = Field(default=4, env="INTEGRATION_QUEUE_WORKER_CONCURRENCY")  # per queue, per process
+    integration_queue_dequeue_batch_size: int = Field(default=10, env="INTEGRATION_QUEUE_DEQUEUE_BATCH_SIZE")
+    integration_queue_visibility_timeout_seconds: int = Field(default=300, env="INTEGRATION_QUEUE_VISIBILITY_TIMEOUT_SECONDS")
+    integration_queue_poll_interval_seconds: float = Field(default=0.5, env="INTEGRATION_QUEUE_POLL_INTERVAL_SECONDS")  # only while idle
+    integration_queue_maintenance_interval_seconds: float = Field(default=5.0, env="INTEGRATION_QUEUE_MAINTENANCE_INTERVAL_SECONDS")
+    integration_queue_default_deadline_seconds: int = Field(default=3600, env="INTEGRATION_QUEUE_DEFAULT_DEADLINE_SECONDS")
+    integration_queue_dead_letter_retention_seconds: int = Field(default=86400, env="INTEGRATION_QUEUE_DEAD_LETTER_RETENTION_SECONDS")
+
+    # API Gateway Rate Limit Configuration
+    api_gateway_key_rate_limit_per_minute: int = Field(default=600, env="API_GATEWAY_KEY_RATE_LIMIT_PER_MINUTE")  # across all endpoints, 0 disables
+    api_gateway_key_burst_limit: int = Field(default=0, env="API_GATEWAY_KEY_BURST_LIMIT")  # 0 = same as the per-minute rate
+
+    # Load Balancer Configuration
+    load_balancer_strategy: str = Field(default="p2c", env="LOAD_BALANCER_STRATEGY")  # p2c or least_outstanding
+    load_balancer_ewma_alpha: float = Field(default=0.3, env="LOAD_BALANCER_EWMA_ALPHA")
+    load_balancer_ejection_consecutive_failures: int = Field(default=5, env="LOAD_BALANCER_EJECTION_CONSECUTIVE_FAILURES")  # 0 disables ejection
+    load_balancer_base_ejection_seconds: float = Field(default=30.0, env="LOAD_BALANCER_BASE_EJECTION_SECONDS")
+    load_balancer_max_ejection_percent: float = Field(default=50.0, env="LOAD_BALANCER_MAX_EJECTION_PERCENT")
+    load_balancer_slow_start_seconds: float = Field(default=30.0, env="LOAD_BALANCER_SLOW_START_SECONDS")
+    load_balancer_health_check_interval_seconds: float = Field(default=30.0, env="LOAD_BALANCER_HEALTH_CHECK_INTERVAL_SECONDS")
+
+    # Webhook Delivery Configuration
+    webhook_delivery_workers: int = Field(default=8, env="WEBHOOK_DELIVERY_WORKERS")
+    webhook_endpoint_concurrency: int = Field(default=4, env="WEBHOOK_ENDPOINT_CONCURRENCY")  # concurrent requests per host
+    webhook_default_batch_size: int = Field(default=1, env="WEBHOOK_DEFAULT_BATCH_SIZE")  # 1 = one event per request
+    webhook_max_attempts: int = Field(default=8, env="WEBHOOK_MAX_ATTEMPTS")
+    webhook_retry_base_seconds: float = Field(default=1.0, env="WEBHOOK_RETRY_BASE_SECONDS")
+    webhook_retry_max_seconds: float = Field(default=600.0, env="WEBHOOK_RETRY_MAX_SECONDS")
+    webhook_deactivate_after_failures: int = Field(default=5, env="WEBHOOK_DEACTIVATE_AFTER_FAILURES")  # consecutive failed requests
+    webhook_event_ttl_seconds: int = Field(default=259200, env="WEBHOOK_EVENT_TTL_SECONDS")
+    webhook_request_timeout_seconds: int = Field(default=30, env="WEBHOOK_REQUEST_TIMEOUT_SECONDS")
+    webhook_stats_flush_interval_seconds: float = Field(default=10.0, env="WEBHOOK_STATS_FLUSH_INTERVAL_SECONDS")
+    webhook_poll_interval_seconds: float = Field(default=1.0, env="WEBHOOK_POLL_INTERVAL_SECONDS")  # only while idle
+
+    # Workflow Progress Configuration
+    workflow_progress_channel: str = Field(default="workflow_progress", env="WORKFLOW_PROGRESS_CHANNEL")
+    workflow_progress_max_updates_per_second: float = Field(default=4.0, env="WORKFLOW_PROGRESS_MAX_UPDATES_PER_SECOND")  # per workflow
+    workflow_progress_snapshot_ttl_seconds: int = Field(default=3600, env="WORKFLOW_PROGRESS_SNAPSHOT_TTL_SECONDS")
+
+    # Workflow Automation Configuration
+    workflow_step_concurrency_ai: int = Field(default=2, env="WORKFLOW_STEP_CONCURRENCY_AI")  # per process, across workflows; 0 = unlimited
+    workflow_step_concurrency_http: int = Field(default=16, env="WORKFLOW_STEP_CONCURRENCY_HTTP")
+    workflow_step_concurrency_db: int = Field(default=8, env="WORKFLOW_STEP_CONCURRENCY_DB")
+    workflow_checkpoint_ttl_seconds: int = Field(default=86400, env="WORKFLOW_CHECKPOINT_TTL_SECONDS")
+
     # File System Connector Configuration
     filesystem_connector_recursive_scan: bool = Field(default=True, env="FILESYSTEM_CONNECTOR_RECURSIVE_SCAN")
     filesystem_connector_follow_symlinks: bool = Field(default=False, env="FILESYSTEM_CONNECTOR_FOLLOW_SYMLINKS")
@@ -164,6 +223,10 @@ class Settings(BaseSettings):
     semantic_quality_scoring_enabled: bool = Field(default=True, env="SEMANTIC_QUALITY_SCORING_ENABLED")
     semantic_usage_tracking_enabled: bool = Field(default=True, env="SEMANTIC_USAGE_TRACKING_ENABLED")
 
+    # Knowledge Graph Configuration
+    knowledge_graph_ingest_enabled: bool = Field(default=False, env="KNOWLEDGE_GRAPH_INGEST_ENABLED")  # extract entities from KB items and new emails
+    knowledge_graph_max_hops: int = Field(default=3, env="KNOWLEDGE_GRAPH_MAX_HOPS")
+
     # X API Configuration (formerly Twitter) - OAuth 2.0 + Playwright
     x_bearer_token: Optional[str] = Field(default=None, env="X_BEARER_TOKEN")
     x_api_key: Optional[str] = Field(default=None, env="X_API_KEY")
@@ -180,6 +243,60 @@ class Settings(BaseSettings):
     x_thread_max_tweets: int = Field(default=50, env="X_THREAD_MAX_TWEETS")
     x_use_playwright: bool = Field(default=True, env="X_USE_PLAYWRIGHT")  # Default to Playwright
 
+    # OCR Batch Processing Configuration
+    ocr_max_concurrency: int = Field(default=2, env="OCR_MAX_CONCURRENCY")  # parallel requests to the OCR model
+    ocr_max_image_dimension: int = Field(default=2048, env="OCR_MAX_IMAGE_DIMENSION")  # longest side in pixels
+    ocr_max_upload_bytes: int = Field(default=4 * 1024 * 1024, env="OCR_MAX_UPLOAD_BYTES")
+    ocr_request_timeout: int = Field(default=1800, env="OCR_REQUEST_TIMEOUT")  # seconds
+    ocr_progress_flush_pages: int = Field(default=5, env="OCR_PROGRESS_FLUSH_PAGES")
+    ocr_progress_flush_seconds: float = Field(default=10.0, env="OCR_PROGRESS_FLUSH_SECONDS")
+
+    # Vision AI Configuration
+    vision_max_image_dimension: int = Field(default=1344, env="VISION_MAX_IMAGE_DIMENSION")  # longest side sent to the model
+    vision_max_upload_bytes: int = Field(default=1024 * 1024, env="VISION_MAX_UPLOAD_BYTES")  # larger originals are re-encoded
+    vision_jpeg_quality: int = Field(default=85, env="VISION_JPEG_QUALITY")
+    vision_cache_enabled: bool = Field(default=True, env="VISION_CACHE_ENABLED")
+    vision_cache_max_entries: int = Field(default=1024, env="VISION_CACHE_MAX_ENTRIES")
+    vision_cache_ttl_seconds: int = Field(default=86400, env="VISION_CACHE_TTL_SECONDS")
+    vision_cache_max_distance: int = Field(default=6, env="VISION_CACHE_MAX_DISTANCE")  # dHash bits (of 256) for near-duplicates
+    vision_cache_min_hash_bits: int = Field(default=32, env="VISION_CACHE_MIN_HASH_BITS")  # Sparser hashes match exact content only
+    vision_cache_max_color_delta: int = Field(default=24, env="VISION_CACHE_MAX_COLOR_DELTA")  # Per-channel 0-255 for near-duplicates
+
+    # Audio AI Configuration
+    audio_segment_max_seconds: float = Field(default=30.0, env="AUDIO_SEGMENT_MAX_SECONDS")  # longest segment sent to the model
+    audio_segment_overlap_seconds: float = Field(default=1.0, env="AUDIO_SEGMENT_OVERLAP_SECONDS")  # overlap when splitting long speech
+    audio_segment_concurrency: int = Field(default=2, env="AUDIO_SEGMENT_CONCURRENCY")  # segments in flight per recording
+    audio_vad_min_speech_ms: int = Field(default=250, env="AUDIO_VAD_MIN_SPEECH_MS")
+    audio_vad_max_silence_ms: int = Field(default=1000, env="AUDIO_VAD_MAX_SILENCE_MS")  # silence that ends a segment
+    audio_vad_padding_ms: int = Field(default=200, env="AUDIO_VAD_PADDING_MS")
+    audio_vad_threshold_db: float = Field(default=-50.0, env="AUDIO_VAD_THRESHOLD_DB")  # dBFS below which audio is silence
+
+    # LLM Benchmark Configuration
+    llm_benchmark_warmup_runs: int = Field(default=1, env="LLM_BENCHMARK_WARMUP_RUNS")
+    llm_benchmark_repetitions: int = Field(default=3, env="LLM_BENCHMARK_REPETITIONS")
+    llm_benchmark_concurrency_levels: str = Field(default="1,2,4,8", env="LLM_BENCHMARK_CONCURRENCY_LEVELS")  # comma-separated
+    llm_benchmark_results_dir: str = Field(default="/tmp/llm_benchmarks", env="LLM_BENCHMARK_RESULTS_DIR")
+    llm_benchmark_min_live_samples: int = Field(default=20, env="LLM_BENCHMARK_MIN_LIVE_SAMPLES")  # live requests before benchmark latency stops counting
+    llm_benchmark_max_age_hours: float = Field(default=168.0, env="LLM_BENCHMARK_MAX_AGE_HOURS")
+
+    # API Request Metrics Configuration
+    api_slow_request_threshold_seconds: float = Field(default=2.0, env="API_SLOW_REQUEST_THRESHOLD_SECONDS")
+
+    # Tracing Configuration
+    tracing_enabled: bool = Field(default=False, env="TRACING_ENABLED")
+    tracing_sample_rate: float = Field(default=0.05, env="TRACING_SAMPLE_RATE")  # fraction of root traces recorded
+    tracing_exporter: str = Field(default="log", env="TRACING_EXPORTER")  # "log" or "otlp"
+    tracing_otlp_endpoint: str = Field(default="http://localhost:4318/v1/traces", env="TRACING_OTLP_ENDPOINT")
+    tracing_service_name: str = Field(default="agentic-backend", env="TRACING_SERVICE_NAME")
+    tracing_export_batch_size: int = Field(default=256, env="TRACING_EXPORT_BATCH_SIZE")
+    tracing_export_interval_seconds: float = Field(default=5.0, env="TRACING_EXPORT_INTERVAL_SECONDS")
+    tracing_max_queue_size: int = Field(default=8192, env="TRACING_MAX_QUEUE_SIZE")
+    tracing_db_statement_max_length: int = Field(default=300, env="TRACING_DB_STATEMENT_MAX_LENGTH")
+
+    # System Metrics Configuration
+    system_metrics_sample_interval_seconds: float = Field(default=5.0, env="SYSTEM_METRICS_SAMPLE_INTERVAL_SECONDS")
+    system_metrics_history_size: int = Field(default=17280, env="SYSTEM_METRICS_HISTORY_SIZE")  # samples (24h at 5s)
+
     # Database Configuration for New Services
     db_model_performance_retention_days: int = Field(default=90, env="DB_MODEL_PERFORMANCE_RETENTION_DAYS")
     db_http_request_log_retention_days: int = Field(default=30, env="DB_HTTP_REQUEST_LOG_RETENTION_DAYS")
@@ -11,7 +11,7 @@ This module provides connectors for various API types including:
 import json
 import websockets
 import asyncio
-from typing import Dict, Any, List, Optional, Union, Callable, AsyncGenerator
+from typing import Dict, Any, List, Optional, Union, Callable, AsyncGenerator, AsyncIterator
 from datetime import datetime
 import hashlib
 
@@ -60,7 +60,41 @@ class RESTAPIConnector(ContentConnector):
         """Discover items from a single REST endpoint."""
         url = endpoint_config.get("url")
         method = endpoint_config.get("method", "GET")
-        headers = endpoint_config.get("headers", {})
+        params = endpoint_config.get("params", {})
+        data = endpoint_config.get("data", {})
+
+        if not url:
+            raise ValueError("Endpoint URL is required")
+
+        # Check cache
+        cache_key = hashlib.md5(f"{method}:{url}:{str(params)}:{str(data)}".encode()).hexdigest()
+        if cache_key in self.endpoint_cache:
+            cached_data = self.endpoint_cache[cache_key]
+            if (datetime.now() - cached_data["timestamp"]).seconds < self.cache_ttl:
+                return cached_data["items"]
+
+        items = [item async for item in self.iter_endpoint_items(endpoint_config)]
+
+        # Cache results
+        self.endpoint_cache[cache_key] = {
+            "items": items,
+            "timestamp": datetime.now()
+        }
+
+        return items
+
+    async def iter_endpoint_items(self, endpoint_config: Dict[str, Any]) -> AsyncIterator[ContentItem]:
+        """
+        Yield items from a single REST endpoint as they are decoded.
+
+        With ``stream_items`` set in the endpoint config, array elements at
+        ``items_path`` are decoded and yielded one at a time while the body
+        is still downloading; otherwise the body is parsed as a whole first.
+        Bypasses the endpoint cache.
+        """
+        url = endpoint_config.get("url")
+        method = endpoint_config.get("method", "GET")
+        headers = dict(endpoint_config.get("headers", {}))
         params = endpoint_config.get("params", {})
         data = endpoint_config.get("data", {})
         auth_config = endpoint_config.get("auth", {})
@@ -75,55 +109,38 @@ class RESTAPIConnector(ContentConnector):
             # Basic auth would be handled by the HTTP client
             pass
 
-        # Check cache
-        cache_key = hashlib.md5(f"{method}:{url}:{str(params)}:{str(data)}".encode()).hexdigest()
-        if cache_key in self.endpoint_cache:
-            cached_data = self.endpoint_cache[cache_key]
-            if (datetime.now() - cached_data["timestamp"]).seconds < self.cache_ttl:
-                return cached_data["items"]
-
         # Make API request
-        response = await self.http_client.request(
+        async with self.http_client.stream(
             method=method,
             url=url,
             headers=headers,
             params=params,
             json_data=data if method in ["POST", "PUT", "PATCH"] else None,
             timeout=30.0
-        )
-
-        if response.status_code != 200:
-            raise Exception(f"REST API error: HTTP {response.status_code}")
-
-        # Parse response
-        try:
-            response_data = response.json_data if response.json_data else json.loads(response.text)
-        except (json.JSONDecodeError, TypeError):
-            raise ValueError("API response is not valid JSON")
-
-        items = self._parse_rest_response(response_data, url, endpoint_config)
+        ) as response:
+            if response.status_code != 200:
+                raise Exception(f"REST API error: HTTP {response.status_code}")
+
+            if endpoint_config.get("stream_items"):
+                items_data = response.iter_json_items(endpoint_config.get("items_path", "data"))
+                async for item_data in items_data:
+                    item = self._build_rest_item(item_data, url, endpoint_config)
+                    if item is not None:
+                        yield item
+                return
 
-        # Cache results
-        self.endpoint_cache[cache_key] = {
-            "items": items,
-            "timestamp": datetime.now()
-        }
+            try:
+                response_data = json.loads(await response.read())
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                raise ValueError("API response is not valid JSON")
 
-        return items
+        for item in self._parse_rest_response(response_data, url, endpoint_config):
+            yield item
 
     def _parse_rest_response(self, data: Dict[str, Any], url: str, config: Dict[str, Any]) -> List[ContentItem]:
         """Parse REST API response into ContentItems."""
-        items = []
-
-        # Extract items from response based on configuration
-        items_path = config.get("items_path", "data")
-        id_field = config.get("id_field", "id")
-        title_field = config.get("title_field", "title")
-        content_field = config.get("content_field", "content")
-        url_field = config.get("url_field", "url")
-        timestamp_field = config.get("timestamp_field", "created_at")
-
         # Navigate to items in response
+        items_path = config.get("items_path", "data")
         items_data = data
         for path_part in items_path.split("."):
             if isinstance(items_data, dict) and path_part in items_data:
@@ -134,62 +151,68 @@ class RESTAPIConnector(ContentConnector):
         if not isinstance(items_data, list):
             items_data = [items_data] if items_data else []
 
-        for item_data in items_data:
-            if not isinstance(item_data, dict):
-                continue
+        items = (self._build_rest_item(item_data, url, config) for item_data in items_data)
+        return [item for item in items if item is not None]
 
-            try:
-                item_id = str(item_data.get(id_field, hashlib.md5(str(item_data).encode()).hexdigest()))
-                title = item_data.get(title_field, "")
-                content = item_data.get(content_field, "")
-                item_url = item_data.get(url_field)
+    def _build_rest_item(self, item_data: Any, url: str, config: Dict[str, Any]) -> Optional[ContentItem]:
+        """Convert one REST API item into a ContentItem (None if it is not an object)."""
+        if not isinstance(item_data, dict):
+            return None
 
-                # Parse timestamp
-                created_at = None
-                if timestamp_field in item_data:
+        id_field = config.get("id_field", "id")
+        title_field = config.get("title_field", "title")
+        content_field = config.get("content_field", "content")
+        url_field = config.get("url_field", "url")
+        timestamp_field = config.get("timestamp_field", "created_at")
+
+        try:
+            item_id = str(item_data.get(id_field, hashlib.md5(str(item_data).encode()).hexdigest()))
+            title = item_data.get(title_field, "")
+            content = item_data.get(content_field, "")
+            item_url = item_data.get(url_field)
+
+            # Parse timestamp
+            created_at = None
+            if timestamp_field in item_data:
+                try:
+                    # Try ISO format first
+                    created_at = datetime.fromisoformat(item_data[timestamp_field].replace('Z', '+00:00'))
+                except (ValueError, TypeError):
+                    # Try unix timestamp
                     try:
-                        # Try ISO format first
-                        created_at = datetime.fromisoformat(item_data[timestamp_field].replace('Z', '+00:00'))
+                        created_at = datetime.fromtimestamp(float(item_data[timestamp_field]))
                     except (ValueError, TypeError):
-                        # Try unix timestamp
-                        try:
-                            created_at = datetime.fromtimestamp(float(item_data[timestamp_field]))
-                        except (ValueError, TypeError):
-                            pass
-
-                # Determine content type
-                content_type = ContentType.TEXT
-                if isinstance(content, dict):
-                    content_type = ContentType.STRUCTURED
-                elif item_url and any(ext in item_url.lower() for ext in ['.jpg', '.png', '.gif']):
-                    content_type = ContentType.IMAGE
-
-                item = ContentItem(
-                    id=f"rest_{item_id}",
-                    source=f"rest:{url}",
-                    connector_type=ConnectorType.API,
-                    content_type=content_type,
-                    title=title,
-                    description=str(content)[:500] + "..." if len(str(content)) > 500 else str(content),
-                    url=item_url,
-                    metadata={
-                        "platform": "rest_api",
-                        "endpoint": url,
-                        "raw_data": item_data,
-                        "content_type_detected": content_type.value,
-                        "api_response": True
-                    },
-                    last_modified=created_at,
-                    tags=["rest", "api", "http"]
-                )
-
-                items.append(item)
-
-            except Exception as e:
-                self.logger.error(f"Failed to parse REST API item: {e}")
-                continue
+                        pass
+
+            # Determine content type
+            content_type = ContentType.TEXT
+            if isinstance(content, dict):
+                content_type = ContentType.STRUCTURED
+            elif item_url and any(ext in item_url.lower() for ext in ['.jpg', '.png', '.gif']):
+                content_type = ContentType.IMAGE
+
+            return ContentItem(
+                id=f"rest_{item_id}",
+                source=f"rest:{url}",
+                connector_type=ConnectorType.API,
+                content_type=content_type,
+                title=title,
+                description=str(content)[:500] + "..." if len(str(content)) > 500 else str(content),
+                url=item_url,
+                metadata={
+                    "platform": "rest_api",
+                    "endpoint": url,
+                    "raw_data": item_data,
+                    "content_type_detected": content_type.value,
+                    "api_response": True
+                },
+                last_modified=created_at,
+                tags=["rest", "api", "http"]
+            )
 
-        return items
+        except Exception as e:
+            self.logger.error(f"Failed to parse REST API item: {e}")
+            return None
 
     async def fetch(self, content_ref: Union[str, ContentItem]) -> ContentData:
         """Fetch content from REST API."""
@@ -12,11 +12,16 @@ import os
 import json
 import hashlib
 import mimetypes
+import sqlite3
+import fnmatch
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, Iterator, AsyncIterator, Tuple
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
 import asyncio
 
+from app.config import settings
 from app.connectors.base import (
     ContentConnector,
     ContentItem,
@@ -32,20 +37,141 @@ from app.utils.logging import get_logger
 logger = get_logger("filesystem_connector")
 
 
+@dataclass
+class FileManifestEntry:
+    """Stat signature of a file as recorded by a previous scan."""
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+    content_hash: Optional[str] = None
+
+    def same_stat(self, other: "FileManifestEntry") -> bool:
+        """Check whether two entries have an identical stat signature."""
+        return (
+            self.size == other.size
+            and self.mtime_ns == other.mtime_ns
+            and self.inode == other.inode
+        )
+
+
+@dataclass
+class FileChange:
+    """A file that was added, modified or deleted since the last scan."""
+    change_type: str  # "added", "modified" or "deleted"
+    entry: FileManifestEntry
+
+
+class FileManifest:
+    """
+    SQLite-backed manifest of the files seen by previous scans.
+
+    Rows are grouped by parent directory so a rescan only loads the
+    entries of the directory it is currently visiting, keeping memory
+    bounded by the largest directory rather than by the whole tree.
+    Connections are opened per operation because scans run in worker
+    threads.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            dir TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            inode INTEGER NOT NULL,
+            content_hash TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_files_dir ON files(dir);
+    """
+
+    def __init__(self, manifest_path: str):
+        self.manifest_path = manifest_path
+        os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+        with self.connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection that commits and closes on exit."""
+        conn = sqlite3.connect(self.manifest_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def entries_for_dir(self, conn: sqlite3.Connection, directory: str) -> Dict[str, FileManifestEntry]:
+        """Load the recorded entries of a single directory."""
+        rows = conn.execute(
+            "SELECT path, size, mtime_ns, inode, content_hash FROM files WHERE dir = ?",
+            (directory,)
+        )
+        return {row[0]: FileManifestEntry(*row) for row in rows}
+
+    def known_dirs(self, conn: sqlite3.Connection) -> set:
+        """Return every directory that has recorded entries."""
+        return {row[0] for row in conn.execute("SELECT DISTINCT dir FROM files")}
+
+    def apply(self, upserts: List[FileManifestEntry], deletes: List[str]):
+        """Record upserted entries and drop deleted paths in one transaction."""
+        if not upserts and not deletes:
+            return
+
+        with self.connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO files (path, dir, size, mtime_ns, inode, content_hash)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    size = excluded.size,
+                    mtime_ns = excluded.mtime_ns,
+                    inode = excluded.inode,
+                    content_hash = excluded.content_hash
+                """,
+                [
+                    (e.path, os.path.dirname(e.path), e.size, e.mtime_ns, e.inode, e.content_hash)
+                    for e in upserts
+                ]
+            )
+            conn.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in deletes])
+
+
+def hash_file(filepath: str) -> str:
+    """Compute the SHA-256 of a file using chunked reads."""
+    with open(filepath, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
 class LocalFileSystemConnector(ContentConnector):
     """Connector for local file systems."""
 
+    READ_CHUNK_SIZE = 1024 * 1024
+
     def __init__(self, config: ConnectorConfig):
         super().__init__(config)
         self.file_cache: Dict[str, Dict[str, Any]] = {}
         self.cache_ttl = 300  # 5 minutes
+        self._scan_locks: Dict[str, asyncio.Lock] = {}
 
     async def discover(self, source_config: Dict[str, Any]) -> List[ContentItem]:
-        """Discover files from local file system."""
+        """
+        Discover files from local file system.
+
+        With ``incremental`` enabled, a persisted manifest of
+        (path, size, mtime, inode, content hash) is compared against a
+        stat pass of the tree and only new, modified and deleted files are
+        returned; each item carries ``change_type`` in its metadata.
+        """
         directory = source_config.get("directory", ".")
         recursive = source_config.get("recursive", True)
         file_patterns = source_config.get("file_patterns", ["*"])
         limit = source_config.get("limit", 100)
+        follow_symlinks = source_config.get(
+            "follow_symlinks", settings.filesystem_connector_follow_symlinks
+        )
 
         if not os.path.exists(directory):
             raise ValueError(f"Directory does not exist: {directory}")
@@ -53,39 +179,268 @@ class LocalFileSystemConnector(ContentConnector):
         if not os.path.isdir(directory):
             raise ValueError(f"Path is not a directory: {directory}")
 
-        # Discover files
-        files = []
-        if recursive:
-            for root, dirs, filenames in os.walk(directory):
-                for filename in filenames:
-                    filepath = os.path.join(root, filename)
-                    if self._matches_patterns(filepath, file_patterns):
-                        files.append(filepath)
-                        if len(files) >= limit:
-                            break
-                if len(files) >= limit:
-                    break
-        else:
-            for filename in os.listdir(directory):
-                filepath = os.path.join(directory, filename)
-                if os.path.isfile(filepath) and self._matches_patterns(filepath, file_patterns):
-                    files.append(filepath)
-                    if len(files) >= limit:
-                        break
-
-        # Convert to ContentItems
+        if source_config.get("incremental", False):
+            manifest_path = source_config.get("manifest_path") or self._default_manifest_path(
+                directory, recursive, file_patterns
+            )
+            lock = self._scan_locks.setdefault(manifest_path, asyncio.Lock())
+            async with lock:
+                return await asyncio.to_thread(
+                    self._discover_incremental,
+                    directory,
+                    recursive,
+                    file_patterns,
+                    follow_symlinks,
+                    limit,
+                    manifest_path,
+                    source_config.get("content_hash", True)
+                )
+
+        return await asyncio.to_thread(
+            self._discover_full, directory, recursive, file_patterns, follow_symlinks, limit
+        )
+
+    def _discover_full(
+        self,
+        directory: str,
+        recursive: bool,
+        file_patterns: List[str],
+        follow_symlinks: bool,
+        limit: int
+    ) -> List[ContentItem]:
+        """Return the first ``limit`` matching files. Runs in a worker thread."""
         items = []
-        for filepath in files:
-            try:
-                item = await self._create_file_item(filepath, directory)
+        for _, files in self._iter_directories(directory, recursive, file_patterns, follow_symlinks):
+            for filepath, stat in files:
+                item = self._build_file_item(filepath, directory, stat)
                 if item:
                     items.append(item)
-            except Exception as e:
-                self.logger.error(f"Failed to process file {filepath}: {e}")
+                    if len(items) >= limit:
+                        return items
+        return items
+
+    def _discover_incremental(
+        self,
+        directory: str,
+        recursive: bool,
+        file_patterns: List[str],
+        follow_symlinks: bool,
+        limit: int,
+        manifest_path: str,
+        compute_hash: bool
+    ) -> List[ContentItem]:
+        """Diff the tree against the manifest. Runs in a worker thread."""
+        manifest = FileManifest(manifest_path)
+        changes, refreshed = self._scan_changes(
+            directory, recursive, file_patterns, follow_symlinks, manifest, limit, compute_hash
+        )
+
+        # Only changes handed back to the caller are recorded; anything past
+        # the limit is reported again by the next scan.
+        emitted = changes[:limit]
+        manifest.apply(
+            refreshed + [c.entry for c in emitted if c.change_type != "deleted"],
+            [c.entry.path for c in emitted if c.change_type == "deleted"]
+        )
+
+        items = []
+        for change in emitted:
+            if change.change_type == "deleted":
+                items.append(self._build_deleted_item(change.entry, directory))
                 continue
 
+            item = self._build_file_item(change.entry.path, directory)
+            if item:
+                item.metadata.update({
+                    "change_type": change.change_type,
+                    "content_hash": change.entry.content_hash,
+                    "inode": change.entry.inode,
+                    "mtime_ns": change.entry.mtime_ns
+                })
+                items.append(item)
+
         return items
 
+    def _scan_changes(
+        self,
+        directory: str,
+        recursive: bool,
+        file_patterns: List[str],
+        follow_symlinks: bool,
+        manifest: FileManifest,
+        limit: int,
+        compute_hash: bool
+    ) -> Tuple[List[FileChange], List[FileManifestEntry]]:
+        """
+        Compare a stat pass of the tree with the manifest.
+
+        Unchanged files cost one stat and no reads. Files whose stat
+        signature changed are hashed (when enabled); if the hash matches
+        the recorded one the file is only refreshed, not reported.
+
+        Returns:
+            Tuple of (changes, refreshed entries with unchanged content)
+        """
+        changes: List[FileChange] = []
+        refreshed: List[FileManifestEntry] = []
+        visited_dirs = set()
+        # Paths that could not be read this scan; they (and, for directories,
+        # everything below them) are left as recorded rather than deleted
+        skipped: List[str] = []
+        complete = True
+
+        with manifest.connect() as conn:
+            for current_dir, files in self._iter_directories(
+                directory, recursive, file_patterns, follow_symlinks, skipped
+            ):
+                # The limit is checked per directory so that deletions are only
+                # derived from directories that were listed completely.
+                if len(changes) >= limit:
+                    complete = False
+                    break
+
+                visited_dirs.add(current_dir)
+                known = manifest.entries_for_dir(conn, current_dir)
+
+                for filepath, stat in files:
+                    current = FileManifestEntry(
+                        path=filepath,
+                        size=stat.st_size,
+                        mtime_ns=stat.st_mtime_ns,
+                        inode=stat.st_ino
+                    )
+                    previous = known.pop(filepath, None)
+                    if previous and previous.same_stat(current):
+                        continue
+
+                    if compute_hash:
+                        try:
+                            current.content_hash = hash_file(filepath)
+                        except OSError as e:
+                            self.logger.warning(f"Failed to hash file {filepath}: {e}")
+                            continue
+                        if previous and previous.content_hash == current.content_hash:
+                            refreshed.append(current)
+                            continue
+
+                    changes.append(FileChange("added" if previous is None else "modified", current))
+
+                unreadable = set(skipped)
+                changes.extend(
+                    FileChange("deleted", gone) for path, gone in known.items() if path not in unreadable
+                )
+
+            if complete:
+                for vanished_dir in manifest.known_dirs(conn) - visited_dirs:
+                    if any(vanished_dir == path or vanished_dir.startswith(path + os.sep) for path in skipped):
+                        continue
+                    changes.extend(
+                        FileChange("deleted", gone)
+                        for gone in manifest.entries_for_dir(conn, vanished_dir).values()
+                    )
+
+        return changes, refreshed
+
+    def _iter_directories(
+        self,
+        directory: str,
+        recursive: bool,
+        file_patterns: List[str],
+        follow_symlinks: bool,
+        skipped: Optional[List[str]] = None
+    ) -> Iterator[Tuple[str, List[Tuple[str, os.stat_result]]]]:
+        """
+        Walk the tree with ``os.scandir``, one directory at a time.
+
+        When following symlinks, each directory (by device and inode) is
+        listed once, so symlink loops and aliases do not recurse forever.
+
+        Args:
+            skipped: Collects unreadable directories and files, if given
+
+        Yields:
+            Tuples of (directory path, [(file path, stat result), ...]).
+            Unreadable directories are skipped.
+        """
+        stack = [os.path.normpath(directory)]
+        visited = set()
+        while stack:
+            current_dir = stack.pop()
+            files = []
+            subdirs = []
+            try:
+                if follow_symlinks:
+                    dir_stat = os.stat(current_dir)
+                    key = (dir_stat.st_dev, dir_stat.st_ino)
+                    if key in visited:
+                        self.logger.debug(f"Skipping already listed directory {current_dir}")
+                        continue
+                    visited.add(key)
+
+                with os.scandir(current_dir) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=follow_symlinks):
+                                subdirs.append(entry.path)
+                            elif entry.is_file():
+                                if self._matches_patterns(entry.name, file_patterns):
+                                    files.append((entry.path, entry.stat()))
+                        except OSError as e:
+                            self.logger.warning(f"Failed to stat {entry.path}: {e}")
+                            if skipped is not None:
+                                skipped.append(entry.path)
+            except OSError as e:
+                self.logger.error(f"Failed to scan directory {current_dir}: {e}")
+                if skipped is not None:
+                    skipped.append(current_dir)
+                continue
+
+            files.sort()
+            yield current_dir, files
+
+            if recursive:
+                stack.extend(sorted(subdirs, reverse=True))
+
+    def _default_manifest_path(self, directory: str, recursive: bool, file_patterns: List[str]) -> str:
+        """Derive a manifest location unique to a directory and scan options."""
+        scan_key = f"{os.path.abspath(directory)}|{recursive}|{','.join(sorted(file_patterns))}"
+        digest = hashlib.md5(scan_key.encode()).hexdigest()
+        return os.path.join(settings.cache_dir, "filesystem_manifests", f"{self.name}_{digest}.sqlite")
+
+    async def watch(self, source_config: Dict[str, Any]) -> AsyncIterator[List[ContentItem]]:
+        """
+        Watch a directory and yield batches of changed files.
+
+        Uses inotify through ``watchfiles`` when it is installed and falls
+        back to polling every ``poll_interval`` seconds otherwise. Each batch
+        comes from an incremental discover, so the manifest stays the single
+        source of truth for what has already been emitted.
+        """
+        source_config = {**source_config, "incremental": True}
+        directory = source_config.get("directory", ".")
+
+        items = await self.discover(source_config)
+        if items:
+            yield items
+
+        try:
+            from watchfiles import awatch
+        except ImportError:
+            awatch = None
+
+        if awatch is not None:
+            async for _ in awatch(directory, recursive=source_config.get("recursive", True)):
+                items = await self.discover(source_config)
+                if items:
+                    yield items
+        else:
+            poll_interval = source_config.get("poll_interval", 30)
+            while True:
+                await asyncio.sleep(poll_interval)
+                items = await self.discover(source_config)
+                if items:
+                    yield items
+
     def _matches_patterns(self, filepath: str, patterns: List[str]) -> bool:
         """Check if file matches any of the patterns."""
         filename = os.path.basename(filepath)
@@ -100,7 +455,6 @@ class LocalFileSystemConnector(ContentConnector):
                     return True
             elif "*" in pattern:
                 # Wildcard pattern
-                import fnmatch
                 if fnmatch.fnmatch(filename, pattern):
                     return True
             else:
@@ -112,8 +466,18 @@ class LocalFileSystemConnector(ContentConnector):
 
     async def _create_file_item(self, filepath: str, base_directory: str) -> Optional[ContentItem]:
         """Create ContentItem from file path."""
+        return await asyncio.to_thread(self._build_file_item, filepath, base_directory)
+
+    def _build_file_item(
+        self,
+        filepath: str,
+        base_directory: str,
+        stat: Optional[os.stat_result] = None
+    ) -> Optional[ContentItem]:
+        """Create ContentItem from file path, reusing a stat result if given."""
         try:
-            stat = os.stat(filepath)
+            if stat is None:
+                stat = os.stat(filepath)
             file_size = stat.st_size
             modified_time = datetime.fromtimestamp(stat.st_mtime)
 
@@ -174,6 +538,31 @@ class LocalFileSystemConnector(ContentConnector):
             self.logger.error(f"Failed to create file item for {filepath}: {e}")
             return None
 
+    def _build_deleted_item(self, entry: FileManifestEntry, base_directory: str) -> ContentItem:
+        """Create a tombstone ContentItem for a file removed since the last scan."""
+        mime_type, _ = mimetypes.guess_type(entry.path)
+        rel_path = os.path.relpath(entry.path, base_directory)
+        return ContentItem(
+            id=hashlib.md5(entry.path.encode()).hexdigest(),
+            source=f"filesystem:{base_directory}",
+            connector_type=ConnectorType.FILE_SYSTEM,
+            content_type=self._determine_content_type(entry.path, mime_type),
+            title=os.path.basename(entry.path),
+            description=f"Deleted file: {rel_path}",
+            url=f"file://{entry.path}",
+            metadata={
+                "platform": "filesystem",
+                "filepath": entry.path,
+                "relative_path": rel_path,
+                "filename": os.path.basename(entry.path),
+                "directory": os.path.dirname(entry.path),
+                "change_type": "deleted",
+                "content_hash": entry.content_hash
+            },
+            size_bytes=entry.size,
+            tags=["filesystem", "file", "deleted"]
+        )
+
     def _determine_content_type(self, filepath: str, mime_type: str) -> ContentType:
         """Determine content type from file path and MIME type."""
         # Check by MIME type first
@@ -207,7 +596,10 @@ class LocalFileSystemConnector(ContentConnector):
         return ContentType.UNKNOWN
 
     async def fetch(self, content_ref: Union[str, ContentItem]) -> ContentData:
-        """Fetch file content."""
+        """
+        Fetch file content. Reads happen in worker threads; files above
+        ``content_max_file_size_mb`` are read chunk by chunk via ``iter_chunks``.
+        """
         if isinstance(content_ref, str):
             filepath = content_ref
         else:
@@ -220,8 +612,19 @@ class LocalFileSystemConnector(ContentConnector):
 
         # Read file content
         try:
-            with open(filepath, 'rb') as f:
-                raw_data = f.read()
+            file_size = os.path.getsize(filepath)
+            if file_size > settings.content_max_file_size_mb * 1024 * 1024:
+                self.logger.warning(
+                    f"Fetching {filepath} ({file_size} bytes, above the "
+                    f"{settings.content_max_file_size_mb}MB limit) in chunks; "
+                    f"use iter_chunks to avoid holding it in memory"
+                )
+                buffer = bytearray()
+                async for chunk in self.iter_chunks(filepath):
+                    buffer += chunk
+                raw_data = bytes(buffer)
+            else:
+                raw_data = await asyncio.to_thread(self._read_file, filepath)
 
             # Try to decode text content
             text_content = None
@@ -235,7 +638,7 @@ class LocalFileSystemConnector(ContentConnector):
                     pass
             elif mime_type == "application/json":
                 try:
-                    structured_data = json.loads(raw_data.decode('utf-8'))
+                    structured_data = json.loads(raw_data)
                     text_content = json.dumps(structured_data, indent=2)
                 except (UnicodeDecodeError, json.JSONDecodeError):
                     pass
@@ -258,6 +661,41 @@ class LocalFileSystemConnector(ContentConnector):
         except Exception as e:
             raise Exception(f"Failed to read file {filepath}: {e}")
 
+    def _read_file(self, filepath: str) -> bytes:
+        """Read a whole file in one call."""
+        with open(filepath, 'rb') as f:
+            return f.read()
+
+    async def iter_chunks(
+        self,
+        content_ref: Union[str, ContentItem],
+        chunk_size: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream a file in fixed-size chunks without loading it into memory.
+
+        Args:
+            content_ref: File path or ContentItem
+            chunk_size: Bytes per chunk (defaults to READ_CHUNK_SIZE)
+
+        Yields:
+            Successive chunks of the file
+        """
+        filepath = content_ref if isinstance(content_ref, str) else content_ref.metadata.get("filepath")
+        if not filepath or not os.path.exists(filepath):
+            raise ValueError(f"File not found: {filepath}")
+
+        chunk_size = chunk_size or self.READ_CHUNK_SIZE
+        f = await asyncio.to_thread(open, filepath, 'rb')
+        try:
+            while True:
+                chunk = await asyncio.to_thread(f.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            f.close()
+
     async def validate(self, content: Union[ContentData, bytes]) -> ValidationResult:
         """Validate file content."""
         if isinstance(content, ContentData):
@@ -336,13 +774,13 @@ class LocalFileSystemConnector(ContentConnector):
         capabilities = super().get_capabilities()
         capabilities.update({
             "supported_content_types": ["text", "image", "audio", "video", "document", "structured"],
-            "supported_operations": ["directory_scan", "file_read", "pattern_matching"],
-            "features": ["recursive_scanning", "file_filtering", "metadata_extraction"],
+            "supported_operations": ["directory_scan", "file_read", "pattern_matching", "chunked_read", "watch"],
+            "features": ["recursive_scanning", "file_filtering", "metadata_extraction", "incremental_scanning"],
             "authentication_methods": ["none"],
             "rate_limiting": False,
             "retry_support": False,
             "batch_operations": True,
-            "real_time_updates": False
+            "real_time_updates": True
         })
         return capabilities
 
@@ -12,7 +12,7 @@ import asyncio
 import json
 import re
 import xml.etree.ElementTree as ET
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, AsyncIterator
 from datetime import datetime
 from urllib.parse import urlparse, urljoin
 import hashlib
@@ -27,10 +27,70 @@ from app.connectors.base import (
     ContentType,
     ValidationStatus
 )
+from app.config import settings
 from app.utils.logging import get_logger
 
 logger = get_logger("web_connector")
 
+HEAD_END_PATTERN = re.compile(r'</head\s*>', re.IGNORECASE)
+
+
+class FeedStreamParser:
+    """
+    Incremental RSS/Atom parser built on ``XMLPullParser``.
+
+    Each ``<item>``/``<entry>`` is converted to a ContentItem as soon as its
+    closing tag arrives and is then cleared, so the parsed tree never holds
+    more than one entry at a time.
+    """
+
+    ATOM_FEED = "{http://www.w3.org/2005/Atom}feed"
+    ATOM_ENTRY = "{http://www.w3.org/2005/Atom}entry"
+
+    def __init__(self, connector: "RSSFeedConnector", feed_url: str):
+        self.connector = connector
+        self.feed_url = feed_url
+        self.feed_type: Optional[str] = None
+        self.items: List[ContentItem] = []
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+
+    def feed(self, data: Union[str, bytes]):
+        """Feed the next chunk of the document."""
+        try:
+            self._parser.feed(data)
+        except ET.ParseError:
+            raise ValueError("Invalid XML feed format")
+        self._drain()
+
+    def close(self) -> List[ContentItem]:
+        """Finish parsing and return the items found."""
+        try:
+            self._parser.close()
+        except ET.ParseError:
+            raise ValueError("Invalid XML feed format")
+        self._drain()
+        return self.items
+
+    def _drain(self):
+        """Convert completed entries into ContentItems."""
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                # The root element decides the feed type
+                if self.feed_type is None:
+                    self.feed_type = "atom" if elem.tag == self.ATOM_FEED else "rss"
+                continue
+
+            if self.feed_type == "atom" and elem.tag == self.ATOM_ENTRY:
+                item = self.connector._parse_atom_entry(elem, self.feed_url)
+            elif self.feed_type == "rss" and elem.tag == "item":
+                item = self.connector._parse_rss_item(elem, self.feed_url)
+            else:
+                continue
+
+            if item:
+                self.items.append(item)
+            elem.clear()
+
 
 class RSSFeedConnector(ContentConnector):
     """Connector for RSS/Atom feeds."""
@@ -67,20 +127,21 @@ class RSSFeedConnector(ContentConnector):
             if (datetime.now() - cached_data["timestamp"]).seconds < self.cache_ttl:
                 return cached_data["items"]
 
-        # Fetch feed
-        response = await self.http_client.request(
+        # Stream the feed through an incremental parser
+        async with self.http_client.stream(
             method="GET",
             url=feed_url,
             headers={"User-Agent": "Agentic-Backend/1.0"},
-            timeout=30.0
-        )
-
-        if response.status_code != 200:
-            raise Exception(f"Failed to fetch feed: HTTP {response.status_code}")
+            timeout=30.0,
+            max_bytes=config.get("max_feed_bytes", settings.web_connector_max_feed_bytes)
+        ) as response:
+            if response.status_code != 200:
+                raise Exception(f"Failed to fetch feed: HTTP {response.status_code}")
 
-        # Parse feed
-        feed_content = response.text
-        items = self._parse_feed(feed_content, feed_url)
+            parser = FeedStreamParser(self, feed_url)
+            async for chunk in response.iter_bytes():
+                parser.feed(chunk)
+            items = parser.close()
 
         # Cache results
         self.feed_cache[cache_key] = {
@@ -90,32 +151,11 @@ class RSSFeedConnector(ContentConnector):
 
         return items
 
-    def _parse_feed(self, content: str, feed_url: str) -> List[ContentItem]:
-        """Parse RSS/Atom feed content."""
-        try:
-            root = ET.fromstring(content)
-        except ET.ParseError:
-            raise ValueError("Invalid XML feed format")
-
-        items = []
-
-        # Detect feed type
-        if root.tag == "{http://www.w3.org/2005/Atom}feed":
-            # Atom feed
-            entries = root.findall(".//{http://www.w3.org/2005/Atom}entry")
-            for entry in entries:
-                item = self._parse_atom_entry(entry, feed_url)
-                if item:
-                    items.append(item)
-        else:
-            # RSS feed
-            rss_items = root.findall(".//item")
-            for rss_item in rss_items:
-                item = self._parse_rss_item(rss_item, feed_url)
-                if item:
-                    items.append(item)
-
-        return items
+    def _parse_feed(self, content: Union[str, bytes], feed_url: str) -> List[ContentItem]:
+        """Parse RSS/Atom feed content that is already in memory."""
+        parser = FeedStreamParser(self, feed_url)
+        parser.feed(content)
+        return parser.close()
 
     def _parse_atom_entry(self, entry, feed_url: str) -> Optional[ContentItem]:
         """Parse an Atom entry."""
@@ -128,7 +168,7 @@ class RSSFeedConnector(ContentConnector):
             updated_elem = entry.find(".//{http://www.w3.org/2005/Atom}updated")
             link_elem = entry.find(".//{http://www.w3.org/2005/Atom}link[@rel='alternate']")
 
-            if not id_elem or not title_elem:
+            if id_elem is None or title_elem is None:
                 return None
 
             item_id = id_elem.text
@@ -181,7 +221,7 @@ class RSSFeedConnector(ContentConnector):
             link_elem = item.find("link")
             pub_date_elem = item.find("pubDate")
 
-            if not title_elem:
+            if title_elem is None:
                 return None
 
             # Use GUID as ID, fallback to link or title hash
@@ -380,23 +420,49 @@ class WebScrapingConnector(ContentConnector):
             if (datetime.now() - cached_data["timestamp"]).seconds < self.cache_ttl:
                 return cached_data["items"]
 
-        # Fetch page
-        response = await self.http_client.request(
+        # Stream the page; title and meta description live in <head>, so
+        # stop reading once it closes instead of downloading the whole body.
+        html_parts = []
+        head_complete = False
+        async with self.http_client.stream(
             method="GET",
             url=url,
             headers={
                 "User-Agent": "Mozilla/5.0 (compatible; Agentic-Backend/1.0)",
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
             },
-            timeout=30.0
-        )
-
-        if response.status_code != 200:
-            raise Exception(f"Failed to fetch page: HTTP {response.status_code}")
+            timeout=30.0,
+            max_bytes=config.get("max_page_bytes", settings.web_connector_max_page_bytes)
+        ) as response:
+            if response.status_code != 200:
+                raise Exception(f"Failed to fetch page: HTTP {response.status_code}")
+
+            tail = ""
+            async for text in response.iter_text():
+                html_parts.append(text)
+                window = tail + text
+                if HEAD_END_PATTERN.search(window):
+                    head_complete = True
+                    break
+                tail = window[-16:]
+            bytes_read = response.bytes_read
+            declared_length = next(
+                (value for name, value in response.headers.items() if name.lower() == "content-length"),
+                None
+            )
 
         # Parse HTML content
-        html_content = response.text
+        html_content = "".join(html_parts)
         items = self._parse_html_content(html_content, url, selectors)
+        for item in items:
+            item.metadata["head_only"] = head_complete
+            if head_complete:
+                # Only a prefix was read, so its length says nothing about the page
+                item.metadata.pop("content_length", None)
+                item.metadata["bytes_read"] = bytes_read
+                item.size_bytes = int(declared_length) if declared_length and declared_length.isdigit() else None
+            else:
+                item.size_bytes = bytes_read
 
         # Cache results
         self.page_cache[cache_key] = {
@@ -621,25 +687,31 @@ class APIEndpointConnector(ContentConnector):
                 return cached_data["items"]
 
         # Make API request
-        response = await self.http_client.request(
+        async with self.http_client.stream(
             method=method,
             url=url,
             headers=headers,
             params=params,
             json_data=data if method in ["POST", "PUT", "PATCH"] else None,
-            timeout=30.0
-        )
-
-        if response.status_code != 200:
-            raise Exception(f"API request failed: HTTP {response.status_code}")
-
-        # Parse response
-        try:
-            response_data = response.json_data if response.json_data else json.loads(response.text)
-        except (json.JSONDecodeError, TypeError):
-            raise ValueError("API response is not valid JSON")
-
-        items = self._parse_api_response(response_data, url, endpoint_config)
+            timeout=30.0,
+            max_bytes=endpoint_config.get("max_bytes")
+        ) as response:
+            if response.status_code != 200:
+                raise Exception(f"API request failed: HTTP {response.status_code}")
+
+            if endpoint_config.get("stream_items"):
+                # Large array responses: decode and convert one element at a time
+                items = [
+                    item
+                    async for item in self._iter_streamed_items(response, url, endpoint_config)
+                ]
+            else:
+                # Parse response
+                try:
+                    response_data = json.loads(await response.read())
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    raise ValueError("API response is not valid JSON")
+                items = self._parse_api_response(response_data, url, endpoint_config)
 
         # Cache results
         self.endpoint_cache[cache_key] = {
@@ -649,18 +721,15 @@ class APIEndpointConnector(ContentConnector):
 
         return items
 
-    def _parse_api_response(self, data: Dict[str, Any], url: str, config: Dict[str, Any]) -> List[ContentItem]:
-        """Parse API response data into ContentItems."""
-        items = []
+    async def _iter_streamed_items(self, response, url: str, config: Dict[str, Any]) -> AsyncIterator[ContentItem]:
+        """Yield ContentItems as array elements are decoded from a streamed response."""
+        async for item_data in response.iter_json_items(config.get("items_path", "data")):
+            item = self._build_api_item(item_data, url, config)
+            if item is not None:
+                yield item
 
-        # Extract items from response based on configuration
-        items_path = config.get("items_path", "data")
-        id_field = config.get("id_field", "id")
-        title_field = config.get("title_field", "title")
-        content_field = config.get("content_field", "content")
-        url_field = config.get("url_field", "url")
-
-        # Navigate to items in response
+    def _extract_items_data(self, data: Any, items_path: str) -> List[Any]:
+        """Navigate to the items list in a decoded response."""
         items_data = data
         for path_part in items_path.split("."):
             if isinstance(items_data, dict) and path_part in items_data:
@@ -671,46 +740,61 @@ class APIEndpointConnector(ContentConnector):
         if not isinstance(items_data, list):
             items_data = [items_data] if items_data else []
 
-        for item_data in items_data:
-            if not isinstance(item_data, dict):
-                continue
+        return items_data
 
-            try:
-                item_id = str(item_data.get(id_field, hashlib.md5(str(item_data).encode()).hexdigest()))
-                title = item_data.get(title_field, "")
-                content = item_data.get(content_field, "")
-                item_url = item_data.get(url_field)
-
-                # Determine content type
-                content_type = ContentType.TEXT
-                if isinstance(content, dict):
-                    content_type = ContentType.STRUCTURED
-                elif item_url and any(ext in item_url.lower() for ext in ['.jpg', '.png', '.gif']):
-                    content_type = ContentType.IMAGE
-
-                item = ContentItem(
-                    id=item_id,
-                    source=url,
-                    connector_type=ConnectorType.WEB,
-                    content_type=content_type,
-                    title=title,
-                    description=str(content)[:500] + "..." if len(str(content)) > 500 else str(content),
-                    url=item_url,
-                    metadata={
-                        "api_endpoint": url,
-                        "raw_data": item_data,
-                        "content_type_detected": content_type.value
-                    },
-                    tags=["api", "rest", "json"]
-                )
+    def _parse_api_response(self, data: Dict[str, Any], url: str, config: Dict[str, Any]) -> List[ContentItem]:
+        """Parse API response data into ContentItems."""
+        # Extract items from response based on configuration
+        items_data = self._extract_items_data(data, config.get("items_path", "data"))
+        return self._build_api_items(items_data, url, config)
 
-                items.append(item)
+    def _build_api_items(self, items_data: List[Any], url: str, config: Dict[str, Any]) -> List[ContentItem]:
+        """Convert raw API items into ContentItems."""
+        items = (self._build_api_item(item_data, url, config) for item_data in items_data)
+        return [item for item in items if item is not None]
 
-            except Exception as e:
-                self.logger.error(f"Failed to parse API item: {e}")
-                continue
+    def _build_api_item(self, item_data: Any, url: str, config: Dict[str, Any]) -> Optional[ContentItem]:
+        """Convert one raw API item into a ContentItem (None if it is not an object)."""
+        if not isinstance(item_data, dict):
+            return None
 
-        return items
+        id_field = config.get("id_field", "id")
+        title_field = config.get("title_field", "title")
+        content_field = config.get("content_field", "content")
+        url_field = config.get("url_field", "url")
+
+        try:
+            item_id = str(item_data.get(id_field, hashlib.md5(str(item_data).encode()).hexdigest()))
+            title = item_data.get(title_field, "")
+            content = item_data.get(content_field, "")
+            item_url = item_data.get(url_field)
+
+            # Determine content type
+            content_type = ContentType.TEXT
+            if isinstance(content, dict):
+                content_type = ContentType.STRUCTURED
+            elif item_url and any(ext in item_url.lower() for ext in ['.jpg', '.png', '.gif']):
+                content_type = ContentType.IMAGE
+
+            return ContentItem(
+                id=item_id,
+                source=url,
+                connector_type=ConnectorType.WEB,
+                content_type=content_type,
+                title=title,
+                description=str(content)[:500] + "..." if len(str(content)) > 500 else str(content),
+                url=item_url,
+                metadata={
+                    "api_endpoint": url,
+                    "raw_data": item_data,
+                    "content_type_detected": content_type.value
+                },
+                tags=["api", "rest", "json"]
+            )
+
+        except Exception as e:
+            self.logger.error(f"Failed to parse API item: {e}")
+            return None
 
     async def fetch(self, content_ref: Union[str, ContentItem]) -> ContentData:
         """Fetch content data from API."""
@@ -7,6 +7,7 @@ import asyncio
 import logging
 from typing import AsyncIterator, Optional
 from app.config import settings
+from app.utils.tracing import instrument_sqlalchemy
 
 logger = logging.getLogger(__name__)
 
@@ -72,6 +73,7 @@ def create_optimized_async_engine():
 
 # Create the optimized engine
 engine = create_optimized_async_engine()
+instrument_sqlalchemy(engine.sync_engine)
 
 # Session configuration for SQLAlchemy 1.4
 from sqlalchemy.orm import sessionmaker as sync_sessionmaker
@@ -146,6 +148,7 @@ sync_engine = create_engine(
     pool_pre_ping=True,
     echo=settings.debug,
 )
+instrument_sqlalchemy(sync_engine)
 
 # Synchronous session factory
 sync_session_factory = sessionmaker(
@@ -68,6 +68,12 @@ from .email import (
     EmailSyncHistory
 )
 from .embedding_task import EmbeddingTask, EmbeddingTaskStatus
+from .knowledge_graph import (
+    KnowledgeGraphEntity,
+    KnowledgeGraphAlias,
+    KnowledgeGraphRelationship,
+    KnowledgeGraphMention
+)
 from .ocr_workflow import (
     OCRWorkflow,
     OCRBatch,
@@ -153,6 +159,10 @@ __all__ = [
     "EmailTask",
     "EmailSyncHistory",
     "EmbeddingTask",
+    "KnowledgeGraphEntity",
+    "KnowledgeGraphAlias",
+    "KnowledgeGraphRelationship",
+    "KnowledgeGraphMention",
     "OCRWorkflow",
     "OCRBatch",
     "OCRImage",
@@ -10,9 +10,9 @@ This module defines SQLAlchemy models for the email sync system including:
 - Email sync history (audit trail)
 """
 
-from sqlalchemy import Column, String, Text, Integer, BigInteger, Float, Boolean, TIMESTAMP, ForeignKey, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, Integer, BigInteger, Float, Boolean, TIMESTAMP, ForeignKey, UniqueConstraint, Computed, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from pgvector.sqlalchemy import Vector
 
@@ -20,6 +20,21 @@ from app.db.database import Base
 import uuid
 
 
+# Text search configuration used for the stored email search vector; keyword
+# queries must parse with the same configuration to match its lexemes.
+EMAIL_SEARCH_CONFIG = "english"
+
+# Weighted full-text document: subject (A), sender (B), body (C). The sender
+# address is also indexed split on '@' and '.' so "acme" finds a@acme.com.
+# The body is truncated so a huge message can't exceed the tsvector size limit.
+EMAIL_SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{EMAIL_SEARCH_CONFIG}', coalesce(subject, '')), 'A') || "
+    f"setweight(to_tsvector('{EMAIL_SEARCH_CONFIG}', coalesce(sender_name, '') || ' ' || "
+    f"coalesce(sender_email, '') || ' ' || translate(coalesce(sender_email, ''), '@.', '  ')), 'B') || "
+    f"setweight(to_tsvector('{EMAIL_SEARCH_CONFIG}', left(coalesce(body_text, ''), 100000)), 'C')"
+)
+
+
 class EmailAccount(Base):
     """User email account configuration for synchronization."""
 
@@ -167,6 +182,10 @@ class Email(Base):
     tasks_generated = Column(Boolean, default=False)
     last_processed_at = Column(TIMESTAMP(timezone=True))
 
+    # Full-text search (generated by Postgres on every insert/update, so sync
+    # keeps it current; deferred so loading an email doesn't fetch it)
+    search_vector = deferred(Column(TSVECTOR, Computed(EMAIL_SEARCH_VECTOR_SQL, persisted=True)))
+
     # Metadata
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -181,6 +200,7 @@ class Email(Base):
     # Constraints
     __table_args__ = (
         UniqueConstraint("account_id", "message_id", name="uq_account_message"),
+        Index("idx_emails_search_vector", "search_vector", postgresql_using="gin"),
     )
 
 
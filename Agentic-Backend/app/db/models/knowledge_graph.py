@@ -0,0 +1,80 @@
+"""
+Knowledge graph models.
+
+This module defines the persistent knowledge graph shared by all content
+sources (knowledge base items, emails, ...):
+- Entities (canonical nodes, deduplicated by normalized text)
+- Entity aliases (normalized surface forms resolving to an entity)
+- Relationships (typed edges, merged across extractions)
+- Entity mentions (which source item an entity was extracted from)
+"""
+
+from sqlalchemy import Column, String, Text, Integer, Float, TIMESTAMP, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+import uuid
+
+
+class KnowledgeGraphEntity(Base):
+    """A canonical entity node in the knowledge graph."""
+    __tablename__ = "knowledge_graph_entities"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    text = Column(Text, nullable=False)  # Canonical surface form
+    normalized_text = Column(Text, nullable=False, unique=True)
+    entity_type = Column(String(50), nullable=False, index=True)
+    confidence = Column(Float, default=0.0)
+    mention_count = Column(Integer, default=0)
+    entity_metadata = Column(JSONB, default=dict)
+
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class KnowledgeGraphAlias(Base):
+    """A normalized surface form that resolves to an entity."""
+    __tablename__ = "knowledge_graph_aliases"
+
+    normalized_alias = Column(Text, primary_key=True)
+    entity_id = Column(UUID(as_uuid=True), ForeignKey("knowledge_graph_entities.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+
+class KnowledgeGraphRelationship(Base):
+    """A typed edge between two entities, merged across extractions."""
+    __tablename__ = "knowledge_graph_relationships"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    source_entity_id = Column(UUID(as_uuid=True), ForeignKey("knowledge_graph_entities.id", ondelete="CASCADE"), nullable=False)
+    target_entity_id = Column(UUID(as_uuid=True), ForeignKey("knowledge_graph_entities.id", ondelete="CASCADE"), nullable=False)
+    relationship_type = Column(String(100), nullable=False)
+    confidence = Column(Float, default=0.0)  # Highest confidence seen
+    evidence_count = Column(Integer, default=1)  # Number of extractions that produced this edge
+    context = Column(Text, nullable=True)
+
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("source_entity_id", "target_entity_id", "relationship_type", name="uq_kg_relationship"),
+        Index("ix_kg_relationships_target", "target_entity_id"),
+        Index("ix_kg_relationships_type", "relationship_type"),
+    )
+
+
+class KnowledgeGraphMention(Base):
+    """Records that an entity was extracted from a source item."""
+    __tablename__ = "knowledge_graph_mentions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    entity_id = Column(UUID(as_uuid=True), ForeignKey("knowledge_graph_entities.id", ondelete="CASCADE"), nullable=False)
+    source_type = Column(String(50), nullable=False)  # 'knowledge_base_item', 'email', ...
+    source_id = Column(String(255), nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("entity_id", "source_type", "source_id", name="uq_kg_mention"),
+        Index("ix_kg_mentions_source", "source_type", "source_id"),
+    )
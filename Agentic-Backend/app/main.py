@@ -76,6 +76,14 @@ async def lifespan(app: FastAPI):
         await pubsub_service.connect()
         logger.info("Redis PubSub service connected successfully")
 
+        # Deliver logs from the Redis log stream to this worker's WebSocket subscribers
+        from app.services.log_fanout_service import log_fanout_service
+        await log_fanout_service.start(pubsub_service.redis)
+
+        # Relay Celery workflow progress to this worker's WebSocket subscribers
+        from app.services.workflow_progress_service import workflow_progress_relay
+        await workflow_progress_relay.start(pubsub_service.redis)
+
         # Initialize AI/ML services for email processing
         logger.info("Initializing AI/ML services...")
 
@@ -87,6 +95,14 @@ async def lifespan(app: FastAPI):
         await semantic_processing_service.initialize()
         logger.info("Semantic processing service initialized")
 
+        # Install Redis/Celery tracing instrumentation (no-op unless TRACING_ENABLED)
+        from app.utils.tracing import setup_tracing
+        setup_tracing()
+
+        # Start background system metrics sampling
+        from app.services.system_metrics_service import system_metrics_service
+        await system_metrics_service.start()
+
         # Store engine reference in app state for access
         app.state.db_engine = engine
         app.state.pubsub_service = pubsub_service
@@ -102,6 +118,29 @@ async def lifespan(app: FastAPI):
         logger.info("Shutting down application...")
         
         try:
+            # Flush queued outbound HTTP request logs before the engine goes away
+            from app.services.agentic_http_client import agentic_http_client
+            await agentic_http_client.request_log_sink.close()
+
+            # Close the media downloader's pooled HTTP session
+            from app.services.media_download_service import media_download_service
+            await media_download_service.close()
+
+            # Stop background system metrics sampling
+            from app.services.system_metrics_service import system_metrics_service
+            await system_metrics_service.stop()
+
+            # Export buffered trace spans
+            from app.utils.tracing import tracer
+            await asyncio.to_thread(tracer.shutdown)
+
+            # Stop WebSocket log fan-out before Redis goes away
+            from app.services.log_fanout_service import log_fanout_service
+            await log_fanout_service.stop()
+
+            from app.services.workflow_progress_service import workflow_progress_relay
+            await workflow_progress_relay.stop()
+
             # Disconnect Redis PubSub service
             if hasattr(app.state, 'pubsub_service'):
                 await app.state.pubsub_service.disconnect()
@@ -0,0 +1,359 @@
+"""
+Compiled validators for dynamic agent schemas.
+
+``compile_agent_validators`` turns an ``AgentSchema``'s input, output and
+data model definitions into validation closures built once per schema:
+regex patterns are pre-compiled, per-type checks come from a dispatch table
+with their limits and error messages bound in advance, and fields that have
+nothing to check are skipped entirely. Array ``items`` naming a field type
+or a data model, and ``json`` fields whose ``constraints.model`` names a data
+model, are validated with the nested validators.
+
+Compiled validators are cached by schema hash in ``schema_validator_cache``;
+``SchemaManager`` invalidates an agent type's entries when a version is
+registered or deprecated.
+"""
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from app.schemas.agent_schema import AgentSchema, FieldDefinition, FieldType
+
+# Returns an error message, or None if the value is valid
+FieldValidator = Callable[[Any], Optional[str]]
+
+
+def schema_hash(schema_dict: Dict[str, Any]) -> str:
+    """SHA-256 of the normalized schema JSON (the hash stored on AgentType)."""
+    normalized_json = json.dumps(schema_dict, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(normalized_json.encode('utf-8')).hexdigest()
+
+
+def _range_check(field_name: str, field_def: FieldDefinition) -> Optional[Callable[[Any], Optional[str]]]:
+    if not field_def.range:
+        return None
+    low, high = field_def.range
+    message = f"Field '{field_name}' must be between {low} and {high}"
+
+    def check(value):
+        if value < low or value > high:
+            return message
+        return None
+    return check
+
+
+def _build_string(field_name: str, field_def: FieldDefinition, models) -> Optional[FieldValidator]:
+    max_length = field_def.max_length
+    min_length = field_def.min_length
+    pattern = re.compile(field_def.pattern) if field_def.pattern else None
+    type_message = f"Field '{field_name}' must be a string"
+    max_message = f"Field '{field_name}' exceeds maximum length of {max_length}"
+    min_message = f"Field '{field_name}' is below minimum length of {min_length}"
+    pattern_message = f"Field '{field_name}' does not match required pattern"
+
+    def validate(value):
+        if not isinstance(value, str):
+            return type_message
+        if max_length and len(value) > max_length:
+            return max_message
+        if min_length and len(value) < min_length:
+            return min_message
+        if pattern is not None and not pattern.match(value):
+            return pattern_message
+        return None
+    return validate
+
+
+def _build_numeric(types: tuple, type_message: str):
+    def build(field_name: str, field_def: FieldDefinition, models) -> Optional[FieldValidator]:
+        message = type_message.format(field_name=field_name)
+        range_check = _range_check(field_name, field_def)
+
+        if range_check is None:
+            def validate(value):
+                return None if isinstance(value, types) else message
+        else:
+            def validate(value):
+                if not isinstance(value, types):
+                    return message
+                return range_check(value)
+        return validate
+    return build
+
+
+def _build_boolean(field_name: str, field_def: FieldDefinition, models) -> Optional[FieldValidator]:
+    message = f"Field '{field_name}' must be a boolean"
+
+    def validate(value):
+        return None if isinstance(value, bool) else message
+    return validate
+
+
+def _build_enum(field_name: str, field_def: FieldDefinition, models) -> Optional[FieldValidator]:
+    if not field_def.values:
+        return None
+    values = list(field_def.values)
+    try:
+        allowed = frozenset(values)
+    except TypeError:
+        allowed = values
+    message = f"Field '{field_name}' must be one of: {', '.join(values)}"
+
+    def validate(value):
+        try:
+            return None if value in allowed else message
+        except TypeError:  # unhashable value
+            return None if value in values else message
+    return validate
+
+
+def _model_validator(field_name: str, model_name: str, models) -> FieldValidator:
+    object_message = f"Field '{field_name}' must be an object matching '{model_name}'"
+
+    def validate(value):
+        # Looked up at call time so models may reference each other
+        model = models.get(model_name)
+        if model is None:
+            return None
+        if not isinstance(value, dict):
+            return object_message
+        _, errors = model.validate(value)
+        if errors:
+            return f"Field '{field_name}' is invalid: {'; '.join(errors)}"
+        return None
+    return validate
+
+
+def _build_array(field_name: str, field_def: FieldDefinition, models) -> Optional[FieldValidator]:
+    message = f"Field '{field_name}' must be an array"
+    item_validator = None
+
+    if field_def.items:
+        if field_def.items in models:
+            item_validator = _model_validator(f"{field_name}[]", field_def.items, models)
+        elif field_def.items in FieldType._value2member_map_:
+            item_validator = compile_field_validator(
+                f"{field_name}[]", FieldDefinition(type=FieldType(field_def.items)), models
+            )
+
+    if item_validator is None:
+        def validate(value):
+            return None if isinstance(value, list) else message
+    else:
+        def validate(value):
+            if not isinstance(value, list):
+                return message
+            for index, item in enumerate(value):
+                error = item_validator(item)
+                if error:
+                    return f"{error} (item {index})"
+            return None
+    return validate
+
+
+def _build_json(field_name: str, field_def: FieldDefinition, models) -> Optional[FieldValidator]:
+    model_name = (field_def.constraints or {}).get("model")
+    if model_name and model_name in models:
+        return _model_validator(field_name, model_name, models)
+    return None
+
+
+# Field type -> validator builder; types without an entry accept any value
+_TYPE_BUILDERS = {
+    FieldType.STRING: _build_string,
+    FieldType.INTEGER: _build_numeric((int,), "Field '{field_name}' must be an integer"),
+    FieldType.FLOAT: _build_numeric((int, float), "Field '{field_name}' must be a number"),
+    FieldType.BOOLEAN: _build_boolean,
+    FieldType.ARRAY: _build_array,
+    FieldType.ENUM: _build_enum,
+    FieldType.JSON: _build_json,
+}
+
+
+def compile_field_validator(
+    field_name: str,
+    field_def: FieldDefinition,
+    models: Optional[Dict[str, "CompiledSchemaValidator"]] = None
+) -> Optional[FieldValidator]:
+    """
+    Compile a single field definition.
+
+    Returns:
+        A validator returning an error message or None, or None if the field accepts any value
+    """
+    builder = _TYPE_BUILDERS.get(field_def.type)
+    if builder is None:
+        return None
+    return builder(field_name, field_def, models if models is not None else {})
+
+
+class CompiledSchemaValidator:
+    """Pre-compiled validator for one set of field definitions."""
+
+    __slots__ = ("fields", "validators", "required", "defaults")
+
+    def __init__(
+        self,
+        fields: Dict[str, FieldDefinition],
+        models: Optional[Dict[str, "CompiledSchemaValidator"]] = None
+    ):
+        self.fields = fields
+        self.validators: Dict[str, FieldValidator] = {}
+        for field_name, field_def in fields.items():
+            validator = compile_field_validator(field_name, field_def, models)
+            if validator is not None:
+                self.validators[field_name] = validator
+        self.required: Tuple[str, ...] = tuple(name for name, field_def in fields.items() if field_def.required)
+        self.defaults: Dict[str, Any] = {
+            name: field_def.default for name, field_def in fields.items() if field_def.default is not None
+        }
+
+    def validate_field(self, field_name: str, value: Any) -> Optional[str]:
+        """Validate one value; fields not in the schema are always valid."""
+        validator = self.validators.get(field_name)
+        if validator is None:
+            return None
+        try:
+            return validator(value)
+        except Exception as e:
+            return f"Validation error for field '{field_name}': {str(e)}"
+
+    def validate(
+        self,
+        data: Dict[str, Any],
+        missing_message: str = "Required field '{}' is missing"
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Validate a payload against the schema.
+
+        Schema fields come first (falling back to defaults), followed by any
+        fields the schema does not define, which pass through unchanged.
+
+        Returns:
+            (validated data, error messages)
+        """
+        validated: Dict[str, Any] = {}
+        errors: List[str] = []
+        validators = self.validators
+        present = 0
+
+        for field_name, field_def in self.fields.items():
+            if field_name in data:
+                present += 1
+                value = data[field_name]
+                validator = validators.get(field_name)
+                if validator is not None:
+                    try:
+                        error = validator(value)
+                    except Exception as e:
+                        error = f"Validation error for field '{field_name}': {str(e)}"
+                    if error:
+                        errors.append(error)
+                        continue
+                validated[field_name] = value
+            elif field_def.required:
+                errors.append(missing_message.format(field_name))
+            elif field_name in self.defaults:
+                validated[field_name] = self.defaults[field_name]
+
+        if present < len(data):
+            for field_name, value in data.items():
+                if field_name not in self.fields:
+                    validated[field_name] = value
+
+        return validated, errors
+
+
+@dataclass
+class CompiledAgentValidators:
+    """All compiled validators for one agent schema."""
+    schema_hash: str
+    agent_type: str
+    version: str
+    input: CompiledSchemaValidator
+    output: CompiledSchemaValidator
+    models: Dict[str, CompiledSchemaValidator]
+
+
+def compile_agent_validators(schema: AgentSchema, hash_value: Optional[str] = None) -> CompiledAgentValidators:
+    """Compile the input, output and data model validators of an agent schema."""
+    # Names are registered up front so models can reference models compiled after them
+    models: Dict[str, CompiledSchemaValidator] = dict.fromkeys(schema.data_models)
+    for model_name, model_def in schema.data_models.items():
+        models[model_name] = CompiledSchemaValidator(model_def.fields, models)
+
+    return CompiledAgentValidators(
+        schema_hash=hash_value or schema_hash(schema.model_dump(mode="json")),
+        agent_type=schema.agent_type,
+        version=schema.metadata.version,
+        input=CompiledSchemaValidator(schema.input_schema, models),
+        output=CompiledSchemaValidator(schema.output_schema, models),
+        models=models
+    )
+
+
+class SchemaValidatorCache:
+    """LRU cache of compiled agent validators keyed by schema hash."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CompiledAgentValidators]" = OrderedDict()
+        self._hashes_by_type: Dict[str, Set[str]] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, schema: AgentSchema, hash_value: Optional[str] = None) -> CompiledAgentValidators:
+        """
+        Compiled validators for a schema, compiling on first use.
+
+        Args:
+            schema: The agent schema
+            hash_value: Schema hash if already known (e.g. AgentType.schema_hash)
+        """
+        hash_value = hash_value or schema_hash(schema.model_dump(mode="json"))
+        with self._lock:
+            entry = self._entries.get(hash_value)
+            if entry is not None:
+                self._entries.move_to_end(hash_value)
+                self.hits += 1
+                return entry
+
+        entry = compile_agent_validators(schema, hash_value)
+        with self._lock:
+            self.misses += 1
+            self._entries[hash_value] = entry
+            self._hashes_by_type.setdefault(entry.agent_type, set()).add(hash_value)
+            while len(self._entries) > self.max_entries:
+                evicted_hash, evicted = self._entries.popitem(last=False)
+                self._forget(evicted.agent_type, evicted_hash)
+        return entry
+
+    def _forget(self, agent_type: str, hash_value: str):
+        hashes = self._hashes_by_type.get(agent_type)
+        if hashes is not None:
+            hashes.discard(hash_value)
+            if not hashes:
+                del self._hashes_by_type[agent_type]
+
+    def invalidate(self, agent_type: str):
+        """Drop every compiled version of an agent type."""
+        with self._lock:
+            for hash_value in self._hashes_by_type.pop(agent_type, set()):
+                self._entries.pop(hash_value, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hashes_by_type.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Global instance
+schema_validator_cache = SchemaValidatorCache()
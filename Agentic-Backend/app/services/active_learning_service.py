@@ -19,6 +19,8 @@ from pathlib import Path
 from collections import defaultdict
 import math
 
+import numpy as np
+
 from app.config import settings
 from app.services.ollama_client import ollama_client
 from app.utils.logging import get_logger
@@ -113,6 +115,12 @@ class ActiveLearningService:
         self.default_model = getattr(settings, 'active_learning_default_model', 'llama2:13b')
         self.processing_timeout = getattr(settings, 'active_learning_timeout_seconds', 120)
 
+        # Embedding-based diversity / clustering
+        self.projection_dim = getattr(settings, 'active_learning_projection_dim', 128)
+        self.projection_min_candidates = getattr(settings, 'active_learning_projection_min_candidates', 10000)
+        self.kmeans_batch_size = getattr(settings, 'active_learning_kmeans_batch_size', 1024)
+        self.kmeans_iterations = getattr(settings, 'active_learning_kmeans_iterations', 50)
+
         # Active learning strategies
         self.strategies = {
             "uncertainty_sampling": self._uncertainty_sampling,
@@ -295,7 +303,7 @@ class ActiveLearningService:
         """Select samples that best represent the overall dataset."""
         try:
             # Cluster content and select representatives
-            clusters = await self._cluster_content(candidate_content, **kwargs)
+            clusters = await self._cluster_content(candidate_content, sample_size=sample_size, **kwargs)
 
             # Select representative from each cluster
             representatives = []
@@ -329,50 +337,215 @@ class ActiveLearningService:
         sample_size: int = 10,
         **kwargs
     ) -> List[LearningSample]:
-        """Select diverse samples to maximize coverage."""
-        try:
-            selected_samples = []
-            remaining_candidates = candidate_content.copy()
-
-            # Select first sample randomly
-            if remaining_candidates:
-                first_sample = random.choice(remaining_candidates)
-                selected_samples.append(LearningSample(
-                    content_id=first_sample.get('content_id', 'sample_0'),
-                    content_data=first_sample,
-                    selection_reason="Initial diverse sample"
-                ))
-                remaining_candidates.remove(first_sample)
-
-            # Select subsequent samples to maximize diversity
-            while len(selected_samples) < sample_size and remaining_candidates:
-                best_candidate = None
-                best_diversity_score = -1
-
-                for candidate in remaining_candidates:
-                    diversity_score = await self._calculate_diversity_score(
-                        candidate, selected_samples, **kwargs
-                    )
-
-                    if diversity_score > best_diversity_score:
-                        best_diversity_score = diversity_score
-                        best_candidate = candidate
+        """
+        Select diverse samples to maximize coverage.
 
-                if best_candidate:
+        Uses k-center greedy (farthest-point) selection over candidate
+        embeddings when they are available, otherwise a Jaccard-based
+        greedy selection over the candidates' text.
+        """
+        try:
+            embedded = self._embedding_matrix(candidate_content)
+            if embedded is not None:
+                indices, matrix = embedded
+                matrix = self._project_embeddings(matrix, **kwargs)
+                selected = self._k_center_greedy(matrix, sample_size, seed=kwargs.get('random_seed'))
+
+                selected_samples = []
+                for rank, (row, distance) in enumerate(selected):
+                    content = candidate_content[indices[row]]
                     selected_samples.append(LearningSample(
-                        content_id=best_candidate.get('content_id', f'sample_{len(selected_samples)}'),
-                        content_data=best_candidate,
-                        diversity_score=best_diversity_score,
-                        selection_reason="Maximum diversity from existing samples"
+                        content_id=content.get('content_id', f'sample_{rank}'),
+                        content_data=content,
+                        diversity_score=None if rank == 0 else distance,
+                        selection_reason="Initial diverse sample" if rank == 0 else "Maximum diversity from existing samples"
                     ))
-                    remaining_candidates.remove(best_candidate)
+                return selected_samples
 
-            return selected_samples
+            return self._text_diversity_sampling(candidate_content, sample_size, **kwargs)
 
         except Exception as e:
             logger.error(f"Diversity sampling failed: {e}")
             return []
 
+    def _text_diversity_sampling(
+        self,
+        candidate_content: List[Dict[str, Any]],
+        sample_size: int,
+        **kwargs
+    ) -> List[LearningSample]:
+        """Greedy diversity selection on word-set similarity, for content without embeddings."""
+        if not candidate_content:
+            return []
+
+        rng = random.Random(kwargs.get('random_seed'))
+        word_sets = [set(self._extract_content_text(c).lower().split()) for c in candidate_content]
+        remaining = set(range(len(candidate_content)))
+        # Running sum of similarities to the selected samples, so each round
+        # only compares candidates against the newest selection.
+        similarity_sums = [0.0] * len(candidate_content)
+
+        first = rng.randrange(len(candidate_content))
+        selected_samples = [LearningSample(
+            content_id=candidate_content[first].get('content_id', 'sample_0'),
+            content_data=candidate_content[first],
+            selection_reason="Initial diverse sample"
+        )]
+        remaining.discard(first)
+        last = first
+
+        while len(selected_samples) < sample_size and remaining:
+            last_words = word_sets[last]
+            best_candidate, best_diversity_score = None, -1.0
+            for i in remaining:
+                similarity_sums[i] += self._jaccard(word_sets[i], last_words)
+                diversity_score = 1.0 - similarity_sums[i] / len(selected_samples)
+                if diversity_score > best_diversity_score:
+                    best_candidate, best_diversity_score = i, diversity_score
+
+            content = candidate_content[best_candidate]
+            selected_samples.append(LearningSample(
+                content_id=content.get('content_id', f'sample_{len(selected_samples)}'),
+                content_data=content,
+                diversity_score=best_diversity_score,
+                selection_reason="Maximum diversity from existing samples"
+            ))
+            remaining.discard(best_candidate)
+            last = best_candidate
+
+        return selected_samples
+
+    def _embedding_matrix(
+        self,
+        content_list: List[Dict[str, Any]]
+    ) -> Optional[Tuple[List[int], np.ndarray]]:
+        """
+        Stack the candidates' ``embedding`` vectors into a unit-normalized matrix.
+
+        Candidates without an embedding (or with a dimension differing from
+        the most common one) are left out.
+
+        Returns:
+            Tuple of (content indices, float32 matrix), or None when no
+            candidate has an embedding
+        """
+        dims = defaultdict(int)
+        for content in content_list:
+            embedding = content.get('embedding')
+            if embedding is not None and len(embedding):
+                dims[len(embedding)] += 1
+        if not dims:
+            return None
+
+        dim = max(dims, key=dims.get)
+        indices = [
+            i for i, content in enumerate(content_list)
+            if content.get('embedding') is not None and len(content['embedding']) == dim
+        ]
+        if len(indices) < len(content_list):
+            logger.debug(f"{len(content_list) - len(indices)} candidates have no usable embedding and were skipped")
+
+        matrix = np.asarray([content_list[i]['embedding'] for i in indices], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return indices, matrix / norms
+
+    def _project_embeddings(self, matrix: np.ndarray, **kwargs) -> np.ndarray:
+        """
+        Reduce dimensionality of large candidate sets with a random projection.
+
+        Distances are approximately preserved (Johnson-Lindenstrauss), and
+        every selection round becomes proportionally cheaper.
+        """
+        rows, dim = matrix.shape
+        if rows < self.projection_min_candidates or dim <= self.projection_dim:
+            return matrix
+
+        rng = np.random.default_rng(kwargs.get('random_seed'))
+        projection = rng.standard_normal((dim, self.projection_dim)).astype(np.float32)
+        projected = matrix @ projection
+        norms = np.linalg.norm(projected, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return projected / norms
+
+    def _k_center_greedy(
+        self,
+        matrix: np.ndarray,
+        sample_size: int,
+        seed: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Farthest-point selection over unit-normalized rows.
+
+        Keeps each row's cosine distance to its nearest selected center and
+        updates it with one matrix-vector product per selection.
+
+        Returns:
+            List of (row, cosine distance to the nearest earlier selection)
+        """
+        rows = matrix.shape[0]
+        if rows == 0 or sample_size <= 0:
+            return []
+
+        first = random.Random(seed).randrange(rows)
+        selected = [(first, 1.0)]
+        min_distance = 1.0 - matrix @ matrix[first]
+        min_distance[first] = -np.inf
+
+        while len(selected) < min(sample_size, rows):
+            row = int(np.argmax(min_distance))
+            selected.append((row, float(min_distance[row])))
+            np.minimum(min_distance, 1.0 - matrix @ matrix[row], out=min_distance)
+            min_distance[row] = -np.inf
+
+        return selected
+
+    def _mini_batch_kmeans(
+        self,
+        matrix: np.ndarray,
+        num_clusters: int,
+        seed: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Mini-batch k-means on unit-normalized rows.
+
+        Centers are seeded with k-center greedy on a sample and refined with
+        per-center learning rates (Sculley, 2010).
+
+        Returns:
+            Tuple of (labels per row, cosine distance of each row to its center)
+        """
+        rows = matrix.shape[0]
+        num_clusters = max(1, min(num_clusters, rows))
+        rng = np.random.default_rng(seed)
+
+        seed_rows = rng.choice(rows, size=min(rows, max(self.kmeans_batch_size, num_clusters)), replace=False)
+        centers = matrix[[seed_rows[r] for r, _ in self._k_center_greedy(matrix[seed_rows], num_clusters, seed)]].copy()
+        counts = np.zeros(num_clusters, dtype=np.float32)
+
+        batch_size = min(rows, self.kmeans_batch_size)
+        for _ in range(self.kmeans_iterations):
+            batch = matrix[rng.choice(rows, size=batch_size, replace=False)]
+            labels = np.argmax(batch @ centers.T, axis=1)
+            for cluster in np.unique(labels):
+                members = batch[labels == cluster]
+                counts[cluster] += len(members)
+                rate = len(members) / counts[cluster]
+                centers[cluster] += rate * (members.mean(axis=0) - centers[cluster])
+
+        norms = np.linalg.norm(centers, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centers /= norms
+
+        labels = np.empty(rows, dtype=np.int64)
+        distances = np.empty(rows, dtype=np.float32)
+        for start in range(0, rows, 8192):
+            similarity = matrix[start:start + 8192] @ centers.T
+            labels[start:start + 8192] = np.argmax(similarity, axis=1)
+            distances[start:start + 8192] = 1.0 - similarity.max(axis=1)
+
+        return labels, distances
+
     async def _adaptive_sampling(
         self,
         candidate_content: List[Dict[str, Any]],
@@ -497,8 +670,25 @@ class ActiveLearningService:
         content_list: List[Dict[str, Any]],
         **kwargs
     ) -> Dict[str, List[Dict[str, Any]]]:
-        """Cluster content for representative sampling."""
+        """
+        Cluster content for representative sampling.
+
+        With embeddings, runs mini-batch k-means (``num_clusters``, defaulting
+        to the sample size) and orders each cluster by closeness to its
+        center; otherwise groups by content type and length.
+        """
         try:
+            embedded = self._embedding_matrix(content_list)
+            if embedded is not None:
+                indices, matrix = embedded
+                num_clusters = kwargs.get('num_clusters', kwargs.get('sample_size', 10))
+                labels, distances = self._mini_batch_kmeans(matrix, num_clusters, seed=kwargs.get('random_seed'))
+
+                clusters = defaultdict(list)
+                for row in np.argsort(distances, kind="stable"):
+                    clusters[f"cluster_{labels[row]}"].append(content_list[indices[row]])
+                return dict(clusters)
+
             # Simple clustering based on content type and length
             clusters = defaultdict(list)
 
@@ -534,12 +724,16 @@ class ActiveLearningService:
             if not cluster_content:
                 return []
 
-            # Sort by some representative metric (e.g., length, complexity)
-            sorted_content = sorted(
-                cluster_content,
-                key=lambda x: len(self._extract_content_text(x).split()),
-                reverse=True  # Prefer longer/more complex content
-            )
+            if all(content.get('embedding') is not None for content in cluster_content):
+                # Embedding clusters are already ordered by distance to their center
+                sorted_content = cluster_content
+            else:
+                # Sort by some representative metric (e.g., length, complexity)
+                sorted_content = sorted(
+                    cluster_content,
+                    key=lambda x: len(self._extract_content_text(x).split()),
+                    reverse=True  # Prefer longer/more complex content
+                )
 
             representatives = []
             for i, content in enumerate(sorted_content[:num_representatives]):
@@ -589,20 +783,19 @@ class ActiveLearningService:
         """Calculate simple text similarity."""
         try:
             # Jaccard similarity on words
-            words1 = set(text1.lower().split())
-            words2 = set(text2.lower().split())
-
-            if not words1 or not words2:
-                return 0.0
-
-            intersection = words1 & words2
-            union = words1 | words2
-
-            return len(intersection) / len(union)
+            return self._jaccard(set(text1.lower().split()), set(text2.lower().split()))
 
         except Exception:
             return 0.0
 
+    @staticmethod
+    def _jaccard(words1: set, words2: set) -> float:
+        """Jaccard similarity of two word sets."""
+        if not words1 or not words2:
+            return 0.0
+
+        return len(words1 & words2) / len(words1 | words2)
+
     def _extract_content_text(self, content: Dict[str, Any]) -> str:
         """Extract text content for analysis."""
         text_parts = []
@@ -6,11 +6,15 @@ with circuit breakers, rate limiting, comprehensive observability, and intellige
 """
 
 import asyncio
+import codecs
 import json
+import random
 import time
+from collections import deque
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union, Callable, AsyncGenerator
+from typing import Any, Dict, List, Optional, Union, Callable, AsyncGenerator, AsyncIterator, Deque
 from urllib.parse import urlparse, urljoin
 import aiohttp
 import hashlib
@@ -18,7 +22,7 @@ from enum import Enum
 
 from app.config import settings
 from app.utils.logging import get_logger
-from app.db.database import get_db
+from app.db.database import get_db, get_session_context
 from app.db.models.http_request_log import HttpRequestLog
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -91,6 +95,122 @@ class HttpResponse:
     timestamp: Optional[datetime] = None
 
 
+class ResponseTooLargeError(Exception):
+    """Raised when a streamed response body exceeds its size cap."""
+    pass
+
+
+class HttpStreamResponse:
+    """
+    HTTP response whose body is consumed incrementally.
+
+    Obtained from ``AgenticHttpClient.stream``. The body can be read once,
+    either as raw chunks or as incrementally decoded text; ``max_bytes`` is
+    enforced while reading so peak memory stays bounded by the chunk size.
+    """
+
+    def __init__(
+        self,
+        response: aiohttp.ClientResponse,
+        request_id: str,
+        max_bytes: Optional[int],
+        chunk_size: int
+    ):
+        self.status_code = response.status
+        self.headers = dict(response.headers)
+        self.request_id = request_id
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+        self._response = response
+
+    @property
+    def encoding(self) -> str:
+        """Charset declared by the response, defaulting to UTF-8."""
+        charset = self._response.charset or "utf-8"
+        try:
+            codecs.lookup(charset)
+        except LookupError:
+            charset = "utf-8"
+        return charset
+
+    async def iter_bytes(self) -> AsyncIterator[bytes]:
+        """Yield raw body chunks, raising ResponseTooLargeError past ``max_bytes``."""
+        async for chunk in self._response.content.iter_chunked(self.chunk_size):
+            self.bytes_read += len(chunk)
+            if self.max_bytes and self.bytes_read > self.max_bytes:
+                raise ResponseTooLargeError(
+                    f"Response body exceeded {self.max_bytes} bytes"
+                )
+            yield chunk
+
+    async def iter_text(self) -> AsyncIterator[str]:
+        """Yield decoded text; multi-byte characters split across chunks are handled."""
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        async for chunk in self.iter_bytes():
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    async def read(self) -> bytes:
+        """Read the remaining body into memory (still subject to ``max_bytes``)."""
+        return b"".join([chunk async for chunk in self.iter_bytes()])
+
+    async def iter_json_items(self, items_path: str) -> AsyncIterator[Any]:
+        """
+        Yield the elements of the JSON array at ``items_path`` (dotted keys) one by one.
+
+        Uses ijson when it is installed, so only one element is decoded at a
+        time; otherwise the (size-capped) body is buffered and parsed. A
+        value at ``items_path`` that is not an array is yielded on its own.
+
+        Raises:
+            ValueError: If the body is not valid JSON
+        """
+        try:
+            import ijson
+        except ImportError:
+            ijson = None
+
+        if ijson is None:
+            try:
+                data = json.loads(await self.read())
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                raise ValueError("Response is not valid JSON")
+            for path_part in items_path.split("."):
+                if isinstance(data, dict) and path_part in data:
+                    data = data[path_part]
+                else:
+                    break
+            if not isinstance(data, list):
+                data = [data] if data else []
+            for item in data:
+                yield item
+            return
+
+        chunks = self.iter_bytes()
+
+        class _ChunkReader:
+            """Async file-like adapter over the response chunks for ijson."""
+            async def read(self, size: int = -1) -> bytes:
+                if size == 0:
+                    # ijson probes the return type with read(0)
+                    return b""
+                try:
+                    return await chunks.__anext__()
+                except StopAsyncIteration:
+                    return b""
+
+        try:
+            async for item in ijson.items(_ChunkReader(), f"{items_path}.item"):
+                yield item
+        except ijson.JSONError:
+            raise ValueError("Response is not valid JSON")
+
+
 @dataclass
 class DownloadResult:
     """Result of a streaming download operation."""
@@ -228,6 +348,155 @@ class RateLimiter:
         self._record_request()
 
 
+class RequestLogSink:
+    """
+    Non-blocking sink for outbound request logs.
+
+    Keeps a bounded in-memory ring buffer of recent requests and hands
+    ``HttpRequestLog`` rows to a background task that writes them in batches,
+    so the request path never waits on a database commit. Successful
+    requests can be sampled; failures and retried requests are always kept.
+    If the queue is full, new rows are dropped and counted rather than
+    applying back-pressure to callers.
+
+    Each event loop gets its own writer. When a loop shuts down (every
+    ``asyncio.run`` in a Celery task) the cancelled writer writes what is
+    still queued, and rows left behind by a loop that went away without
+    cancelling its tasks move over to the next loop's queue.
+    """
+
+    def __init__(
+        self,
+        memory_size: int = 1000,
+        queue_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 2.0,
+        success_sample_rate: float = 1.0
+    ):
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=memory_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.success_sample_rate = success_sample_rate
+
+        self._queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.persisted_count = 0
+        self.sampled_out_count = 0
+        self.dropped_count = 0
+        self.failed_write_count = 0
+
+    def _should_persist(self, entry: HttpRequestLog) -> bool:
+        """Apply success sampling; failures and retries are always persisted."""
+        if not entry.is_success or entry.retry_count:
+            return True
+        if self.success_sample_rate >= 1.0:
+            return True
+        return random.random() < self.success_sample_rate
+
+    def _ensure_writer(self):
+        """Start the writer on the running loop (restarting it if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._writer_task is None or self._writer_task.done():
+            leftover = []
+            if self._queue is not None:
+                while not self._queue.empty():
+                    leftover.append(self._queue.get_nowait())
+
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self._queue_size)
+            for entry in leftover:
+                self._queue.put_nowait(entry)
+            self._writer_task = loop.create_task(self._writer())
+
+    def record(self, summary: Dict[str, Any], entry: HttpRequestLog):
+        """Record a request in memory and enqueue it for persistence. Never blocks."""
+        self.recent.append(summary)
+
+        if not self._should_persist(entry):
+            self.sampled_out_count += 1
+            return
+
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.dropped_count += 1
+
+    async def _writer(self):
+        """Drain the queue in batches of up to ``batch_size`` rows per commit."""
+        queue = self._queue
+        batch: List[HttpRequestLog] = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+                    except asyncio.TimeoutError:
+                        break
+
+                await self._write_batch(batch)
+                for _ in batch:
+                    queue.task_done()
+                batch = []
+        except asyncio.CancelledError:
+            # The loop is shutting down: write the batch in hand and the rest
+            # of the queue rather than lose them with the loop
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+                queue.task_done()
+            if batch:
+                await self._write_batch(batch)
+            raise
+
+    async def _write_batch(self, batch: List[HttpRequestLog]):
+        """Persist a batch of log rows in a single commit."""
+        try:
+            async with get_session_context() as session:
+                session.add_all(batch)
+                await session.commit()
+            self.persisted_count += len(batch)
+            logger.debug(f"Persisted {len(batch)} HTTP request logs")
+        except Exception as e:
+            self.failed_write_count += len(batch)
+            logger.warning(f"Failed to persist {len(batch)} HTTP request logs: {e}")
+
+    async def flush(self):
+        """Wait until every queued row has been written."""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def close(self):
+        """Flush pending rows and stop the writer."""
+        await self.flush()
+        if self._writer_task:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get sink throughput and loss counters."""
+        return {
+            "in_memory": len(self.recent),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "persisted": self.persisted_count,
+            "sampled_out": self.sampled_out_count,
+            "dropped": self.dropped_count,
+            "failed_writes": self.failed_write_count,
+            "success_sample_rate": self.success_sample_rate
+        }
+
+
 class AgenticHttpClient:
     """Modern HTTP client with agentic capabilities for resilient web interactions."""
 
@@ -256,7 +525,14 @@ class AgenticHttpClient:
 
         # Request tracking
         self.request_count = 0
-        self.request_log = []
+        self.request_log_sink = RequestLogSink(
+            memory_size=settings.http_client_request_log_memory_size,
+            queue_size=settings.http_client_request_log_queue_size,
+            batch_size=settings.http_client_request_log_batch_size,
+            flush_interval=settings.http_client_request_log_flush_interval,
+            success_sample_rate=settings.http_client_request_log_success_sample_rate
+        )
+        self.request_log = self.request_log_sink.recent
 
     async def __aenter__(self):
         await self.connect()
@@ -397,16 +673,22 @@ class AgenticHttpClient:
         try:
             logger.debug(f"[{request_id}] {method} {url}")
 
-            # Prepare request data
+            # Prepare request data, encoding once so the logged size is the sent size
             request_kwargs = {"headers": headers}
+            request_body_size = None
 
             if data is not None:
                 if isinstance(data, dict):
-                    request_kwargs["json"] = data
+                    body = json.dumps(data).encode('utf-8')
+                    if not any(key.lower() == 'content-type' for key in headers):
+                        request_kwargs["headers"] = {**headers, "Content-Type": "application/json"}
                 elif isinstance(data, str):
-                    request_kwargs["data"] = data.encode('utf-8')
+                    body = data.encode('utf-8')
                 else:
-                    request_kwargs["data"] = data
+                    body = data
+                request_kwargs["data"] = body
+                if isinstance(body, (bytes, bytearray, memoryview)):
+                    request_body_size = len(body)
 
             # Make request
             async with self.session.request(method, url, **request_kwargs) as response:
@@ -439,7 +721,7 @@ class AgenticHttpClient:
                 )
 
                 # Log request with method and URL
-                await self._log_request(http_response, method, url, headers, data)
+                self._log_request(http_response, method, url, headers, request_body_size)
 
                 logger.debug(f"[{request_id}] {response.status} in {duration:.2f}s")
                 return http_response
@@ -465,18 +747,18 @@ class AgenticHttpClient:
 
         return rate_info if rate_info else None
 
-    async def _log_request(self, response: HttpResponse, method: str, url: str, headers: Dict[str, str], data: Any):
-        """Log request for monitoring and persist to database."""
+    def _log_request(
+        self,
+        response: HttpResponse,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        request_body_size: Optional[int],
+        response_body_size: Optional[int] = None
+    ):
+        """Record the request in memory and queue it for batched persistence."""
         self.request_count += 1
 
-        # Prepare request data for database
-        request_body_size = None
-        if data is not None:
-            if isinstance(data, (str, bytes)):
-                request_body_size = len(data)
-            elif isinstance(data, dict):
-                request_body_size = len(json.dumps(data).encode('utf-8'))
-
         # Extract user agent from headers
         user_agent = headers.get('User-Agent') or headers.get('user-agent')
 
@@ -484,7 +766,9 @@ class AgenticHttpClient:
         has_sensitive_data = any(key.lower() in ['password', 'token', 'secret', 'key', 'auth']
                                for key in headers.keys())
 
-        # Create database log entry
+        if response_body_size is None:
+            response_body_size = len(response.content)
+
         db_log_entry = HttpRequestLog(
             request_id=response.request_id,
             method=method,
@@ -494,7 +778,7 @@ class AgenticHttpClient:
             user_agent=user_agent,
             status_code=response.status_code,
             response_headers=response.headers,
-            response_body_size=len(response.content),
+            response_body_size=response_body_size,
             response_time_ms=response.request_duration * 1000,
             retry_count=response.retry_count,
             circuit_breaker_state=self.circuit_breaker.state.value if hasattr(self.circuit_breaker, 'state') else None,
@@ -506,30 +790,18 @@ class AgenticHttpClient:
             completed_at=response.timestamp
         )
 
-        # Persist to database
-        try:
-            async for session in get_db():
-                session.add(db_log_entry)
-                await session.commit()
-                logger.debug(f"Persisted HTTP request log: {response.request_id}")
-                break
-        except Exception as e:
-            logger.warning(f"Failed to persist HTTP request log: {e}")
-
-        # Keep in-memory log for backward compatibility
-        self.request_log.append({
-            "request_id": response.request_id,
-            "timestamp": response.timestamp.isoformat() if response.timestamp else datetime.now().isoformat(),
-            "method": method,
-            "url": url,
-            "status_code": response.status_code,
-            "duration": response.request_duration,
-            "size": len(response.content)
-        })
-
-        # Keep only last 1000 requests in memory
-        if len(self.request_log) > 1000:
-            self.request_log = self.request_log[-1000:]
+        self.request_log_sink.record(
+            {
+                "request_id": response.request_id,
+                "timestamp": response.timestamp.isoformat() if response.timestamp else datetime.now().isoformat(),
+                "method": method,
+                "url": url,
+                "status_code": response.status_code,
+                "duration": response.request_duration,
+                "size": response_body_size
+            },
+            db_log_entry
+        )
 
     async def request(
         self,
@@ -571,6 +843,134 @@ class AgenticHttpClient:
             method, full_url, request_headers, request_data, effective_retry_config
         )
 
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Any] = None,
+        json_data: Optional[Dict] = None,
+        auth: Optional[AuthConfig] = None,
+        timeout: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        retry_config: Optional[RetryConfig] = None
+    ) -> AsyncIterator[HttpStreamResponse]:
+        """
+        Make an HTTP request and expose the body as a stream.
+
+        Rate limiting and the circuit breaker apply as for ``request``.
+        Connection errors, timeouts and retryable statuses (429, 5xx) are
+        retried with backoff until the response is handed to the caller;
+        nothing is retried once the body is being read, since a partly
+        consumed body cannot be replayed. Request bodies that are not bytes
+        (e.g. async iterators) are sent once. A declared Content-Length above
+        ``max_bytes`` fails before any of the body is read.
+
+        Usage:
+            async with agentic_http_client.stream("GET", url, max_bytes=...) as response:
+                async for chunk in response.iter_bytes():
+                    ...
+        """
+        if not self.session:
+            await self.connect()
+
+        full_url = self._build_url(url)
+        request_headers = self._apply_auth(headers.copy() if headers else {}, auth)
+        request_kwargs: Dict[str, Any] = {"headers": request_headers}
+        request_body_size = None
+
+        if params:
+            request_kwargs["params"] = params
+        if timeout is not None:
+            request_kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+
+        if json_data is not None:
+            body = json.dumps(json_data).encode('utf-8')
+            request_headers["Content-Type"] = "application/json"
+        elif isinstance(data, dict):
+            body = json.dumps(data).encode('utf-8')
+            request_headers.setdefault("Content-Type", "application/json")
+        elif isinstance(data, str):
+            body = data.encode('utf-8')
+        else:
+            body = data
+        if body is not None:
+            request_kwargs["data"] = body
+            if isinstance(body, (bytes, bytearray, memoryview)):
+                request_body_size = len(body)
+
+        max_bytes = max_bytes if max_bytes is not None else settings.http_client_stream_max_bytes
+        chunk_size = chunk_size or settings.http_client_stream_chunk_size
+
+        retry_config = retry_config or self.default_retry_config
+        replayable = body is None or isinstance(body, (bytes, bytearray, memoryview))
+        max_attempts = retry_config.max_attempts if replayable else 0
+
+        start_time = time.time()
+        request_id = hashlib.md5(f"{method}{full_url}{start_time}".encode()).hexdigest()[:8]
+        logger.debug(f"[{request_id}] {method} {full_url} (streaming)")
+
+        async def open_response():
+            return await self.session.request(method, full_url, **request_kwargs)
+
+        for attempt in range(max_attempts + 1):
+            if self.rate_limiter:
+                await self.rate_limiter.wait_if_needed()
+
+            delay = min(retry_config.initial_delay * (retry_config.backoff_factor ** attempt), retry_config.max_delay)
+            try:
+                response = await self.circuit_breaker.call(open_response)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= max_attempts:
+                    raise
+                logger.warning(f"[{request_id}] Stream attempt {attempt + 1} failed, retrying in {delay}s: {e}")
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status in retry_config.retry_on_status_codes and attempt < max_attempts:
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = min(max(delay, float(retry_after)), retry_config.max_delay)
+                response.release()
+                logger.warning(f"[{request_id}] Stream attempt {attempt + 1} got {response.status}, retrying in {delay}s")
+                await asyncio.sleep(delay)
+                continue
+            break
+
+        stream_response = HttpStreamResponse(response, request_id, max_bytes, chunk_size)
+
+        try:
+            if max_bytes and response.content_length and response.content_length > max_bytes:
+                raise ResponseTooLargeError(
+                    f"Declared Content-Length {response.content_length} exceeds {max_bytes} bytes"
+                )
+            yield stream_response
+        finally:
+            response.release()
+            duration = time.time() - start_time
+            self._log_request(
+                HttpResponse(
+                    status_code=stream_response.status_code,
+                    headers=stream_response.headers,
+                    content=b"",
+                    text="",
+                    request_duration=duration,
+                    rate_limit_info=self._extract_rate_limit_info(response.headers),
+                    request_id=request_id,
+                    timestamp=datetime.now(),
+                    retry_count=attempt
+                ),
+                method,
+                full_url,
+                request_headers,
+                request_body_size,
+                response_body_size=stream_response.bytes_read
+            )
+            logger.debug(f"[{request_id}] {stream_response.status_code} streamed {stream_response.bytes_read} bytes in {duration:.2f}s")
+
     async def get(
         self,
         url: str,
@@ -683,6 +1083,7 @@ class AgenticHttpClient:
         return {
             "total_requests": self.request_count,
             "recent_requests": len(self.request_log),
+            "request_log_sink": self.request_log_sink.get_stats(),
             "circuit_breaker_state": getattr(self.circuit_breaker, 'state', CircuitBreakerState.CLOSED).value,
             "rate_limiter_active": self.rate_limiter is not None,
             "session_active": self.session is not None
@@ -690,7 +1091,9 @@ class AgenticHttpClient:
 
     def get_request_log(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get recent request log."""
-        return self.request_log[-limit:]
+        if limit <= 0:
+            return []
+        return list(self.request_log)[-limit:]
 
     async def cleanup_old_logs(self, retention_days: int = 14):
         """Clean up HTTP request logs older than retention period."""
@@ -12,18 +12,36 @@ This service provides comprehensive audio AI capabilities including:
 
 import asyncio
 import base64
+import binascii
 import json
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, AsyncIterator, Iterable, Tuple
 from datetime import datetime
 from pathlib import Path
 import aiofiles
 
+from app.config import settings
 from app.services.ollama_client import ollama_client
 from app.services.model_capability_service import model_capability_service, ModelCapability
+from app.services.audio_segmentation import (
+    AudioDecodeError, AudioSegment, format_timestamp, iter_audio_segments, stitch_transcripts
+)
 from app.utils.logging import get_logger
 
 logger = get_logger("audio_ai_service")
 
+# Operations that only need the speech in a recording; any other operation
+# is run on fixed windows covering the whole recording
+SPEECH_OPERATIONS = frozenset({"transcription", "speakers", "emotion"})
+
+# Operation -> (model capability, max tokens per segment, confidence)
+AUDIO_OPERATIONS = {
+    "transcription": (ModelCapability.AUDIO_TRANSCRIPTION, 1000, 0.8),
+    "speakers": (ModelCapability.AUDIO_ANALYSIS, 800, 0.7),
+    "emotion": (ModelCapability.AUDIO_ANALYSIS, 600, 0.75),
+    "classification": (ModelCapability.AUDIO_ANALYSIS, 500, 0.8),
+    "music": (ModelCapability.AUDIO_ANALYSIS, 700, 0.75),
+}
+
 
 class AudioAIError(Exception):
     """Custom exception for audio AI operations."""
@@ -64,6 +82,17 @@ class AudioAIService:
         self.semaphore = asyncio.Semaphore(self.max_concurrent_tasks)
         self.supported_formats = ['mp3', 'wav', 'flac', 'aac', 'ogg', 'webm', 'm4a']
 
+        # Segments analyzed in parallel per recording (model calls are still bounded by semaphore)
+        self.segment_concurrency = getattr(settings, 'audio_segment_concurrency', 2)
+        self.segmentation_options = {
+            "max_segment_seconds": getattr(settings, 'audio_segment_max_seconds', 30.0),
+            "overlap_seconds": getattr(settings, 'audio_segment_overlap_seconds', 1.0),
+            "min_speech_ms": getattr(settings, 'audio_vad_min_speech_ms', 250),
+            "max_silence_ms": getattr(settings, 'audio_vad_max_silence_ms', 1000),
+            "padding_ms": getattr(settings, 'audio_vad_padding_ms', 200),
+            "threshold_db": getattr(settings, 'audio_vad_threshold_db', -50.0),
+        }
+
         # Emotion categories for analysis
         self.emotion_categories = [
             "happy", "sad", "angry", "fearful", "surprised", "disgusted",
@@ -86,338 +115,499 @@ class AudioAIService:
             self.logger.error(f"Failed to initialize Audio AI Service: {e}")
             raise
 
-    async def transcribe_audio(
+    # ------------------------------------------------------------------
+    # Segmented pipeline
+    # ------------------------------------------------------------------
+
+    def _operation_prompt(
         self,
-        audio_data: Union[bytes, str],
+        operation: str,
         language: str = "en",
-        model_name: Optional[str] = None,
-        include_timestamps: bool = False
-    ) -> AudioAIResult:
-        """
-        Transcribe audio to text (speech-to-text).
+        include_timestamps: bool = False,
+        num_speakers: Optional[int] = None
+    ) -> str:
+        """Prompt sent with each segment for an operation."""
+        if operation == "transcription":
+            return f"""
+                Transcribe the following audio to text. The audio is in {language} language.
+                Provide a complete, accurate transcription of all speech in the audio.
+                {"Include timestamps for different speakers if there are multiple speakers." if include_timestamps else ""}
+                Format the transcription clearly and legibly.
+                """
 
-        Args:
-            audio_data: Audio data as bytes or base64 string
-            language: Language code (e.g., 'en', 'es', 'fr')
-            model_name: Specific model to use (optional)
-            include_timestamps: Whether to include timestamps
+        if operation == "speakers":
+            return f"""
+                Analyze this audio and identify the speakers.
+                {f"There are approximately {num_speakers} speakers." if num_speakers else ""}
+                For each speaker, provide:
+                - Speaker ID (Speaker 1, Speaker 2, etc.)
+                - Approximate speaking time
+                - Gender (if detectable)
+                - Age group (if detectable)
+                - Speech characteristics
 
-        Returns:
-            AudioAIResult with transcription
-        """
-        async with self.semaphore:  # Limit concurrent tasks
-            result = AudioAIResult()
-            start_time = datetime.now()
+                Format the analysis clearly.
+                """
 
-            try:
-                # Get audio-capable model
-                if not model_name:
-                    model_name = await model_capability_service.get_best_model_for_task(
-                        ModelCapability.AUDIO_TRANSCRIPTION
-                    )
+        if operation == "emotion":
+            emotions_list = ", ".join(self.emotion_categories)
+            return f"""
+                Analyze the emotions and sentiment in this audio.
+                Consider tone of voice, speech patterns, and vocal characteristics.
 
-                if not model_name:
-                    raise AudioAIError("No audio-capable models available")
+                Possible emotions: {emotions_list}
 
-                result.model_used = model_name
+                Provide:
+                - Primary emotion detected
+                - Secondary emotions (if any)
+                - Confidence levels for each emotion
+                - Overall sentiment (positive, negative, neutral)
+                - Reasoning for your analysis
 
-                # Convert audio to base64 if needed
-                if isinstance(audio_data, bytes):
-                    audio_b64 = base64.b64encode(audio_data).decode('utf-8')
-                else:
-                    audio_b64 = audio_data
+                Be specific and provide evidence from the audio characteristics.
+                """
 
-                # Create transcription prompt
-                prompt = f"""
-                Transcribe the following audio to text. The audio is in {language} language.
-                Provide a complete, accurate transcription of all speech in the audio.
-                {"Include timestamps for different speakers if there are multiple speakers." if include_timestamps else ""}
-                Format the transcription clearly and legibly.
+        if operation == "classification":
+            categories_list = ", ".join(self.audio_categories)
+            return f"""
+                Classify this audio content.
+                Possible categories: {categories_list}
+
+                Provide:
+                - Primary content type
+                - Secondary content types (if applicable)
+                - Confidence level for classification
+                - Key characteristics that led to this classification
+                - Any notable features (music genre, speech topics, etc.)
+
+                Be specific about what you hear in the audio.
                 """
 
-                # For Ollama, we'll use the chat endpoint with audio data
-                # Note: This assumes the model supports audio input
-                messages = [
-                    {
-                        "role": "user",
-                        "content": prompt,
-                        "audio": audio_b64  # This may not be supported by all Ollama models
-                    }
-                ]
-
-                try:
-                    # Try with audio support first
-                    response = await ollama_client.chat(
-                        messages=messages,
-                        model=model_name,
-                        stream=False,
-                        options={
-                            "num_predict": 1000,
-                            "temperature": 0.1
-                        }
-                    )
-                except Exception:
-                    # Fallback: Try without audio data (model may not support it)
-                    self.logger.warning(f"Audio input not supported by {model_name}, trying text-only approach")
-                    messages[0].pop("audio", None)  # Remove audio data
-                    messages[0]["content"] = f"{prompt}\n\nNote: Audio transcription requested but model may not support direct audio input."
-
-                    response = await ollama_client.chat(
-                        messages=messages,
-                        model=model_name,
-                        stream=False,
-                        options={
-                            "num_predict": 1000,
-                            "temperature": 0.1
-                        }
-                    )
+        return """
+                Analyze this music audio and provide:
+                - Genre/style (jazz, rock, classical, electronic, etc.)
+                - Mood/emotion conveyed
+                - Tempo (slow, medium, fast)
+                - Instrumentation (what instruments you can identify)
+                - Key musical characteristics
+                - Notable features (vocals, lyrics, solo sections, etc.)
+                - Overall quality assessment
 
-                if response and 'message' in response:
-                    transcription = response['message'].get('content', '')
-                    result.result = {
-                        "transcription": transcription,
-                        "language": language,
-                        "has_content": len(transcription.strip()) > 0,
-                        "usage": response.get('usage', {}),
-                        "model": model_name
-                    }
-                    result.confidence = 0.8  # Default confidence for transcription
-                else:
-                    raise AudioAIError("Invalid response from audio model")
-
-                result.processing_time = (datetime.now() - start_time).total_seconds()
-                result.metadata = {
-                    "audio_size_bytes": len(audio_data) if isinstance(audio_data, bytes) else len(audio_b64),
-                    "language": language,
-                    "include_timestamps": include_timestamps,
-                    "audio_supported": "audio" in str(messages[0])  # Check if audio was actually used
-                }
+                Provide detailed analysis of the musical elements.
+                """
 
-                self.logger.info(f"Audio transcription completed in {result.processing_time:.2f}s using {model_name}")
-                return result
+    @staticmethod
+    def _audio_bytes(audio_data: Union[bytes, bytearray, memoryview, str]) -> bytes:
+        if isinstance(audio_data, bytes):
+            return audio_data
+        if isinstance(audio_data, (bytearray, memoryview)):
+            return bytes(audio_data)
+        # Accept data URIs and base64 wrapped across lines
+        if audio_data.startswith('data:'):
+            audio_data = audio_data.partition(',')[2]
+        audio_data = ''.join(audio_data.split())
+        try:
+            return base64.b64decode(audio_data, validate=True)
+        except (binascii.Error, ValueError) as e:
+            raise AudioAIError(f"Audio data is not valid base64: {e}")
+
+    async def _resolve_model(self, operation: str, model_name: Optional[str]) -> str:
+        if not model_name:
+            model_name = await model_capability_service.get_best_model_for_task(AUDIO_OPERATIONS[operation][0])
+        if not model_name:
+            raise AudioAIError("No audio-capable models available")
+        return model_name
+
+    async def _iter_segments(self, audio: bytes, speech_only: bool = True) -> AsyncIterator[AudioSegment]:
+        """
+        Segments of the recording to analyze.
 
-            except Exception as e:
-                result.success = False
-                result.error_message = str(e)
-                result.processing_time = (datetime.now() - start_time).total_seconds()
-                self.logger.error(f"Audio transcription failed: {e}")
-                return result
+        With ``speech_only`` these are the VAD's speech segments; if it finds
+        no speech (music, ambient noise, silence) the recording is windowed
+        instead, as it is without ``speech_only``. Audio that cannot be
+        decoded is sent whole.
+        """
+        produced = False
+        try:
+            if speech_only:
+                async for segment in iter_audio_segments(audio, **self.segmentation_options):
+                    produced = True
+                    yield segment
+                if not produced:
+                    self.logger.info("No speech detected in audio, analyzing the whole recording")
+
+            if not produced:
+                async for segment in iter_audio_segments(audio, vad=False, **self.segmentation_options):
+                    produced = True
+                    yield segment
+        except AudioDecodeError as e:
+            if produced:
+                raise
+            self.logger.warning(f"Could not decode audio for segmentation, sending it whole: {e}")
+            yield AudioSegment(index=0, start_seconds=0.0, end_seconds=None, data=audio)
+
+    async def _chat_with_audio(
+        self,
+        prompt: str,
+        audio_b64: str,
+        model_name: str,
+        num_predict: int
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Send a prompt with audio, falling back to text-only if the model rejects audio input.
 
-    async def identify_speaker(
+        Returns:
+            Tuple of (response, whether audio was sent)
+        """
+        messages = [{"role": "user", "content": prompt, "audio": audio_b64}]
+        options = {"num_predict": num_predict, "temperature": 0.1}
+        async with self.semaphore:  # Limit concurrent model calls
+            try:
+                return await ollama_client.chat(messages=messages, model=model_name, stream=False, options=options), True
+            except Exception:
+                self.logger.warning(f"Audio input not supported by {model_name}, trying text-only approach")
+                messages[0].pop("audio", None)
+                return await ollama_client.chat(messages=messages, model=model_name, stream=False, options=options), False
+
+    async def _analyze_segment(self, segment: AudioSegment, operation: str, model_name: str, prompt: str) -> Dict[str, Any]:
+        response, audio_supported = await self._chat_with_audio(
+            prompt, segment.b64, model_name, AUDIO_OPERATIONS[operation][1]
+        )
+        if not response or 'message' not in response:
+            raise AudioAIError("Invalid response from audio model")
+        return {
+            "text": response['message'].get('content', ''),
+            "usage": response.get('usage', {}),
+            "audio_supported": audio_supported
+        }
+
+    async def stream_audio_analysis(
         self,
         audio_data: Union[bytes, str],
+        operations: Iterable[str] = ("transcription",),
+        model_name: Optional[str] = None,
+        language: str = "en",
         num_speakers: Optional[int] = None,
-        model_name: Optional[str] = None
-    ) -> AudioAIResult:
+        include_timestamps: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
         """
-        Identify speakers in audio.
+        Analyze audio segment by segment, yielding each segment's results as they complete.
+
+        The recording is decoded once and split into speech segments when
+        every operation is about speech, otherwise into fixed windows covering
+        all of it; every requested operation runs on the same segments. At most
+        ``segment_concurrency`` segments are decoded ahead of the model, so
+        memory use does not grow with the recording length.
 
         Args:
             audio_data: Audio data as bytes or base64 string
+            operations: Any of transcription, speakers, emotion, classification, music
+            model_name: Specific model to use for every operation (optional)
+            language: Language code for transcription
             num_speakers: Expected number of speakers (optional)
-            model_name: Specific model to use (optional)
+            include_timestamps: Ask for speaker timestamps in transcriptions
 
-        Returns:
-            AudioAIResult with speaker identification
+        Yields:
+            Dicts with ``segment``, ``start_seconds``, ``end_seconds`` and per-operation
+            ``results`` (``text``, ``usage``, ``audio_supported``, or ``error``), in
+            completion order
         """
-        async with self.semaphore:
-            result = AudioAIResult()
-            start_time = datetime.now()
-
-            try:
-                # Get audio-capable model
-                if not model_name:
-                    model_name = await model_capability_service.get_best_model_for_task(
-                        ModelCapability.AUDIO_ANALYSIS
-                    )
-
-                if not model_name:
-                    raise AudioAIError("No audio-capable models available")
-
-                result.model_used = model_name
-
-                # Convert audio to base64 if needed
-                if isinstance(audio_data, bytes):
-                    audio_b64: str = base64.b64encode(audio_data).decode('utf-8')
-                elif isinstance(audio_data, (bytearray, memoryview)):
-                    audio_b64: str = base64.b64encode(bytes(audio_data)).decode('utf-8')
-                else:
-                    audio_b64: str = str(audio_data)
+        operations = list(dict.fromkeys(operations))
+        unknown = [operation for operation in operations if operation not in AUDIO_OPERATIONS]
+        if unknown or not operations:
+            raise AudioAIError(f"Unknown audio operations: {unknown}. Supported: {list(AUDIO_OPERATIONS)}")
+
+        audio = self._audio_bytes(audio_data)
+        models = {operation: await self._resolve_model(operation, model_name) for operation in operations}
+        prompts = {
+            operation: self._operation_prompt(operation, language, include_timestamps, num_speakers)
+            for operation in operations
+        }
 
-                # Create speaker identification prompt
-                prompt = f"""
-                Analyze this audio and identify the speakers.
-                {"There are approximately {num_speakers} speakers." if num_speakers else ""}
-                For each speaker, provide:
-                - Speaker ID (Speaker 1, Speaker 2, etc.)
-                - Approximate speaking time
-                - Gender (if detectable)
-                - Age group (if detectable)
-                - Speech characteristics
+        speech_only = all(operation in SPEECH_OPERATIONS for operation in operations)
+        worker_count = max(1, self.segment_concurrency)
+        segments: asyncio.Queue = asyncio.Queue(maxsize=worker_count)
+        events: asyncio.Queue = asyncio.Queue()
+        producer_errors: List[Exception] = []
 
-                Format the analysis clearly.
-                """
+        async def produce():
+            try:
+                async for segment in self._iter_segments(audio, speech_only=speech_only):
+                    await segments.put(segment)
+            except Exception as e:
+                producer_errors.append(e)
+            for _ in range(worker_count):
+                await segments.put(None)
 
-                messages = [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-
-                # Try with audio if supported, fallback to text-only
-                try:
-                    messages[0]["audio"] = audio_b64
-                    response = await ollama_client.chat(
-                        messages=messages,
-                        model=model_name,
-                        stream=False,
-                        options={"num_predict": 800, "temperature": 0.1}
-                    )
-                except Exception:
-                    messages[0].pop("audio", None)
-                    response = await ollama_client.chat(
-                        messages=messages,
-                        model=model_name,
-                        stream=False,
-                        options={"num_predict": 800, "temperature": 0.1}
+        async def work():
+            try:
+                while True:
+                    segment = await segments.get()
+                    if segment is None:
+                        return
+                    outcomes = await asyncio.gather(
+                        *(self._analyze_segment(segment, op, models[op], prompts[op]) for op in operations),
+                        return_exceptions=True
                     )
-
-                if response and 'message' in response:
-                    analysis = response['message'].get('content', '')
-                    result.result = {
-                        "speaker_analysis": analysis,
-                        "speakers_identified": self._parse_speaker_count(analysis),
-                        "usage": response.get('usage', {}),
-                        "model": model_name
-                    }
-                    result.confidence = 0.7
+                    await events.put({
+                        "segment": segment.index,
+                        "start_seconds": round(segment.start_seconds, 3),
+                        "end_seconds": round(segment.end_seconds, 3) if segment.end_seconds is not None else None,
+                        "results": {
+                            op: {"error": str(outcome)} if isinstance(outcome, BaseException) else outcome
+                            for op, outcome in zip(operations, outcomes)
+                        },
+                        "models": models
+                    })
+            finally:
+                await events.put(None)
+
+        tasks = [asyncio.create_task(produce())] + [asyncio.create_task(work()) for _ in range(worker_count)]
+        try:
+            finished = 0
+            while finished < worker_count:
+                event = await events.get()
+                if event is None:
+                    finished += 1
                 else:
-                    raise AudioAIError("Invalid response from audio model")
+                    yield event
+            if producer_errors:
+                raise producer_errors[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _stitch_operation(
+        self,
+        operation: str,
+        events: List[Dict[str, Any]],
+        model_name: str,
+        language: str
+    ) -> Dict[str, Any]:
+        """Combine one operation's per-segment results into a single result."""
+        parts = []
+        usage: Dict[str, Any] = {}
+        errors = []
+        for event in events:
+            outcome = event["results"][operation]
+            if "error" in outcome:
+                errors.append(f"segment {event['segment']}: {outcome['error']}")
+                continue
+            parts.append((event["start_seconds"], event["end_seconds"], outcome["text"].strip()))
+            for key, value in (outcome.get("usage") or {}).items():
+                if isinstance(value, (int, float)):
+                    usage[key] = usage.get(key, 0) + value
+
+        if errors and not parts:
+            raise AudioAIError(f"{operation} failed for every segment: {'; '.join(errors[:3])}")
+
+        segments = [{"start_seconds": start, "end_seconds": end, "text": text} for start, end, text in parts]
+        if len(parts) == 1:
+            combined = parts[0][2]
+        else:
+            combined = "\n\n".join(
+                f"[{format_timestamp(start)} - {format_timestamp(end or start)}] {text}" for start, end, text in parts
+            )
+
+        if operation == "transcription":
+            transcription = stitch_transcripts(
+                (start, end if end is not None else start, text) for start, end, text in parts
+            )
+            stitched = {
+                "transcription": transcription,
+                "language": language,
+                "has_content": len(transcription.strip()) > 0
+            }
+        elif operation == "speakers":
+            stitched = {
+                "speaker_analysis": combined,
+                "speakers_identified": max((self._parse_speaker_count(text) for _, _, text in parts), default=0)
+            }
+        elif operation == "emotion":
+            stitched = {"emotion_analysis": combined, "detected_emotions": self._parse_emotions(combined)}
+        elif operation == "classification":
+            stitched = {"classification": combined, "detected_categories": self._parse_categories(combined)}
+        else:
+            stitched = {"music_analysis": combined, "detected_genres": self._parse_music_genres(combined)}
 
-                result.processing_time = (datetime.now() - start_time).total_seconds()
-                result.metadata = {
-                    "audio_size_bytes": len(audio_data) if isinstance(audio_data, bytes) else len(audio_b64),
-                    "expected_speakers": num_speakers
-                }
+        stitched.update({"segments": segments, "usage": usage, "model": model_name})
+        if errors:
+            stitched["segment_errors"] = errors
+        return stitched
 
-                return result
+    def stitch_segment_results(
+        self,
+        events: List[Dict[str, Any]],
+        operations: Iterable[str],
+        language: str = "en",
+        models: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Stitch events from ``stream_audio_analysis`` into one result per operation.
 
-            except Exception as e:
-                result.success = False
-                result.error_message = str(e)
-                result.processing_time = (datetime.now() - start_time).total_seconds()
-                self.logger.error(f"Speaker identification failed: {e}")
-                return result
+        Args:
+            events: Segment events, in any order
+            operations: Operations to stitch
+            language: Transcription language
+            models: Model used per operation (defaults to the events' models)
+        """
+        events = sorted(events, key=lambda event: event["segment"])
+        models = models or (events[0]["models"] if events else {})
+        return {
+            operation: self._stitch_operation(operation, events, models.get(operation, ""), language)
+            for operation in operations
+        }
 
-    async def analyze_emotion(
+    async def process_audio(
         self,
         audio_data: Union[bytes, str],
-        model_name: Optional[str] = None
+        operations: Iterable[str] = ("transcription",),
+        model_name: Optional[str] = None,
+        language: str = "en",
+        num_speakers: Optional[int] = None,
+        include_timestamps: bool = False
     ) -> AudioAIResult:
         """
-        Analyze emotions in audio.
+        Run several analyses over one recording, sharing its decoded segments.
 
         Args:
             audio_data: Audio data as bytes or base64 string
-            model_name: Specific model to use (optional)
+            operations: Any of transcription, speakers, emotion, classification, music
+            model_name: Specific model to use for every operation (optional)
+            language: Language code for transcription
+            num_speakers: Expected number of speakers (optional)
+            include_timestamps: Ask for speaker timestamps in transcriptions
 
         Returns:
-            AudioAIResult with emotion analysis
+            AudioAIResult whose result maps each operation to its stitched result
         """
-        async with self.semaphore:
-            result = AudioAIResult()
-            start_time = datetime.now()
+        result = AudioAIResult()
+        start_time = datetime.now()
+        operations = list(dict.fromkeys(operations))
 
-            try:
-                # Get audio-capable model
-                if not model_name:
-                    model_name = await model_capability_service.get_best_model_for_task(
-                        ModelCapability.AUDIO_ANALYSIS
-                    )
+        try:
+            events = []
+            async for event in self.stream_audio_analysis(
+                audio_data, operations, model_name, language, num_speakers, include_timestamps
+            ):
+                events.append(event)
+            events.sort(key=lambda event: event["segment"])
+
+            models = events[0]["models"] if events else {
+                operation: await self._resolve_model(operation, model_name) for operation in operations
+            }
+            result.model_used = ", ".join(dict.fromkeys(models.values()))
+            result.result = self.stitch_segment_results(events, operations, language, models)
+            result.confidence = min(AUDIO_OPERATIONS[operation][2] for operation in operations)
+
+            segmented = not events or events[0]["end_seconds"] is not None
+            result.processing_time = (datetime.now() - start_time).total_seconds()
+            result.metadata = {
+                "audio_size_bytes": len(audio_data),
+                "segmented": segmented,
+                "segments": len(events),
+                "speech_seconds": round(sum(e["end_seconds"] - e["start_seconds"] for e in events), 2) if segmented else None,
+                "audio_supported": any(
+                    outcome.get("audio_supported") for event in events for outcome in event["results"].values()
+                )
+            }
 
-                if not model_name:
-                    raise AudioAIError("No audio-capable models available")
+            self.logger.info(
+                f"Audio {', '.join(operations)} completed in {result.processing_time:.2f}s "
+                f"over {len(events)} segments using {result.model_used}"
+            )
+            return result
 
-                result.model_used = model_name
+        except Exception as e:
+            result.success = False
+            result.error_message = str(e)
+            result.processing_time = (datetime.now() - start_time).total_seconds()
+            self.logger.error(f"Audio {', '.join(operations)} failed: {e}")
+            return result
 
-                # Convert audio to base64 if needed
-                if isinstance(audio_data, bytes):
-                    audio_b64: str = base64.b64encode(audio_data).decode('utf-8')
-                elif isinstance(audio_data, (bytearray, memoryview)):
-                    audio_b64: str = base64.b64encode(bytes(audio_data)).decode('utf-8')
-                else:
-                    audio_b64: str = str(audio_data)
+    async def _run_operation(
+        self,
+        operation: str,
+        audio_data: Union[bytes, str],
+        model_name: Optional[str],
+        metadata: Dict[str, Any],
+        **options
+    ) -> AudioAIResult:
+        result = await self.process_audio(audio_data, [operation], model_name, **options)
+        if result.success:
+            result.result = result.result[operation]
+            result.metadata.update(metadata)
+        return result
 
-                # Create emotion analysis prompt
-                emotions_list = ", ".join(self.emotion_categories)
-                prompt = f"""
-                Analyze the emotions and sentiment in this audio.
-                Consider tone of voice, speech patterns, and vocal characteristics.
+    # ------------------------------------------------------------------
+    # Analyses
+    # ------------------------------------------------------------------
 
-                Possible emotions: {emotions_list}
+    async def transcribe_audio(
+        self,
+        audio_data: Union[bytes, str],
+        language: str = "en",
+        model_name: Optional[str] = None,
+        include_timestamps: bool = False
+    ) -> AudioAIResult:
+        """
+        Transcribe audio to text (speech-to-text).
 
-                Provide:
-                - Primary emotion detected
-                - Secondary emotions (if any)
-                - Confidence levels for each emotion
-                - Overall sentiment (positive, negative, neutral)
-                - Reasoning for your analysis
+        Args:
+            audio_data: Audio data as bytes or base64 string
+            language: Language code (e.g., 'en', 'es', 'fr')
+            model_name: Specific model to use (optional)
+            include_timestamps: Whether to include timestamps
 
-                Be specific and provide evidence from the audio characteristics.
-                """
+        Returns:
+            AudioAIResult with transcription
+        """
+        return await self._run_operation(
+            "transcription", audio_data, model_name,
+            {"language": language, "include_timestamps": include_timestamps},
+            language=language, include_timestamps=include_timestamps
+        )
 
-                messages = [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-
-                # Try with audio if supported
-                try:
-                    messages[0]["audio"] = audio_b64
-                    response = await ollama_client.chat(
-                        messages=messages,
-                        model=model_name,
-                        stream=False,
-                        options={"num_predict": 600, "temperature": 0.1}
-                    )
-                except Exception:
-                    messages[0].pop("audio", None)
-                    response = await ollama_client.chat(
-                        messages=messages,
-                        model=model_name,
-                        stream=False,
-                        options={"num_predict": 600, "temperature": 0.1}
-                    )
+    async def identify_speaker(
+        self,
+        audio_data: Union[bytes, str],
+        num_speakers: Optional[int] = None,
+        model_name: Optional[str] = None
+    ) -> AudioAIResult:
+        """
+        Identify speakers in audio.
 
-                if response and 'message' in response:
-                    analysis = response['message'].get('content', '')
-                    result.result = {
-                        "emotion_analysis": analysis,
-                        "detected_emotions": self._parse_emotions(analysis),
-                        "usage": response.get('usage', {}),
-                        "model": model_name
-                    }
-                    result.confidence = 0.75
-                else:
-                    raise AudioAIError("Invalid response from audio model")
+        Args:
+            audio_data: Audio data as bytes or base64 string
+            num_speakers: Expected number of speakers (optional)
+            model_name: Specific model to use (optional)
 
-                result.processing_time = (datetime.now() - start_time).total_seconds()
-                result.metadata = {
-                    "audio_size_bytes": len(audio_data) if isinstance(audio_data, bytes) else len(audio_b64),
-                    "emotion_categories": self.emotion_categories
-                }
+        Returns:
+            AudioAIResult with speaker identification
+        """
+        return await self._run_operation(
+            "speakers", audio_data, model_name, {"expected_speakers": num_speakers}, num_speakers=num_speakers
+        )
 
-                return result
+    async def analyze_emotion(
+        self,
+        audio_data: Union[bytes, str],
+        model_name: Optional[str] = None
+    ) -> AudioAIResult:
+        """
+        Analyze emotions in audio.
 
-            except Exception as e:
-                result.success = False
-                result.error_message = str(e)
-                result.processing_time = (datetime.now() - start_time).total_seconds()
-                self.logger.error(f"Emotion analysis failed: {e}")
-                return result
+        Args:
+            audio_data: Audio data as bytes or base64 string
+            model_name: Specific model to use (optional)
+
+        Returns:
+            AudioAIResult with emotion analysis
+        """
+        return await self._run_operation(
+            "emotion", audio_data, model_name, {"emotion_categories": self.emotion_categories}
+        )
 
     async def classify_audio(
         self,
@@ -434,97 +624,9 @@ class AudioAIService:
         Returns:
             AudioAIResult with classification
         """
-        async with self.semaphore:
-            result = AudioAIResult()
-            start_time = datetime.now()
-
-            try:
-                # Get audio-capable model
-                if not model_name:
-                    model_name = await model_capability_service.get_best_model_for_task(
-                        ModelCapability.AUDIO_ANALYSIS
-                    )
-
-                if not model_name:
-                    raise AudioAIError("No audio-capable models available")
-
-                result.model_used = model_name
-
-                # Convert audio to base64 if needed
-                if isinstance(audio_data, bytes):
-                    audio_b64: str = base64.b64encode(audio_data).decode('utf-8')
-                elif isinstance(audio_data, (bytearray, memoryview)):
-                    audio_b64: str = base64.b64encode(bytes(audio_data)).decode('utf-8')
-                else:
-                    audio_b64: str = str(audio_data)
-
-                # Create classification prompt
-                categories_list = ", ".join(self.audio_categories)
-                prompt = f"""
-                Classify this audio content.
-                Possible categories: {categories_list}
-
-                Provide:
-                - Primary content type
-                - Secondary content types (if applicable)
-                - Confidence level for classification
-                - Key characteristics that led to this classification
-                - Any notable features (music genre, speech topics, etc.)
-
-                Be specific about what you hear in the audio.
-                """
-
-                messages = [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-
-                # Try with audio if supported
-                try:
-                    messages[0]["audio"] = audio_b64
-                    response = await ollama_client.chat(
-                        messages=messages,
-                        model=model_name,
-                        stream=False,
-                        options={"num_predict": 500, "temperature": 0.1}
-                    )
-                except Exception:
-                    messages[0].pop("audio", None)
-                    response = await ollama_client.chat(
-                        messages=messages,
-                        model=model_name,
-                        stream=False,
-                        options={"num_predict": 500, "temperature": 0.1}
-                    )
-
-                if response and 'message' in response:
-                    analysis = response['message'].get('content', '')
-                    result.result = {
-                        "classification": analysis,
-                        "detected_categories": self._parse_categories(analysis),
-                        "usage": response.get('usage', {}),
-                        "model": model_name
-                    }
-                    result.confidence = 0.8
-                else:
-                    raise AudioAIError("Invalid response from audio model")
-
-                result.processing_time = (datetime.now() - start_time).total_seconds()
-                result.metadata = {
-                    "audio_size_bytes": len(audio_data) if isinstance(audio_data, bytes) else len(audio_b64),
-                    "audio_categories": self.audio_categories
-                }
-
-                return result
-
-            except Exception as e:
-                result.success = False
-                result.error_message = str(e)
-                result.processing_time = (datetime.now() - start_time).total_seconds()
-                self.logger.error(f"Audio classification failed: {e}")
-                return result
+        return await self._run_operation(
+            "classification", audio_data, model_name, {"audio_categories": self.audio_categories}
+        )
 
     async def analyze_music(
         self,
@@ -541,95 +643,7 @@ class AudioAIService:
         Returns:
             AudioAIResult with music analysis
         """
-        async with self.semaphore:
-            result = AudioAIResult()
-            start_time = datetime.now()
-
-            try:
-                # Get audio-capable model
-                if not model_name:
-                    model_name = await model_capability_service.get_best_model_for_task(
-                        ModelCapability.AUDIO_ANALYSIS
-                    )
-
-                if not model_name:
-                    raise AudioAIError("No audio-capable models available")
-
-                result.model_used = model_name
-
-                # Convert audio to base64 if needed
-                if isinstance(audio_data, bytes):
-                    audio_b64: str = base64.b64encode(audio_data).decode('utf-8')
-                elif isinstance(audio_data, (bytearray, memoryview)):
-                    audio_b64: str = base64.b64encode(bytes(audio_data)).decode('utf-8')
-                else:
-                    audio_b64: str = str(audio_data)
-
-                # Create music analysis prompt
-                prompt = """
-                Analyze this music audio and provide:
-                - Genre/style (jazz, rock, classical, electronic, etc.)
-                - Mood/emotion conveyed
-                - Tempo (slow, medium, fast)
-                - Instrumentation (what instruments you can identify)
-                - Key musical characteristics
-                - Notable features (vocals, lyrics, solo sections, etc.)
-                - Overall quality assessment
-
-                Provide detailed analysis of the musical elements.
-                """
-
-                messages = [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-
-                # Try with audio if supported
-                try:
-                    messages[0]["audio"] = audio_b64
-                    response = await ollama_client.chat(
-                        messages=messages,
-                        model=model_name,
-                        stream=False,
-                        options={"num_predict": 700, "temperature": 0.1}
-                    )
-                except Exception:
-                    messages[0].pop("audio", None)
-                    response = await ollama_client.chat(
-                        messages=messages,
-                        model=model_name,
-                        stream=False,
-                        options={"num_predict": 700, "temperature": 0.1}
-                    )
-
-                if response and 'message' in response:
-                    analysis = response['message'].get('content', '')
-                    result.result = {
-                        "music_analysis": analysis,
-                        "detected_genres": self._parse_music_genres(analysis),
-                        "usage": response.get('usage', {}),
-                        "model": model_name
-                    }
-                    result.confidence = 0.75
-                else:
-                    raise AudioAIError("Invalid response from audio model")
-
-                result.processing_time = (datetime.now() - start_time).total_seconds()
-                result.metadata = {
-                    "audio_size_bytes": len(audio_data) if isinstance(audio_data, bytes) else len(audio_b64),
-                    "analysis_type": "music"
-                }
-
-                return result
-
-            except Exception as e:
-                result.success = False
-                result.error_message = str(e)
-                result.processing_time = (datetime.now() - start_time).total_seconds()
-                self.logger.error(f"Music analysis failed: {e}")
-                return result
+        return await self._run_operation("music", audio_data, model_name, {"analysis_type": "music"})
 
     def _parse_speaker_count(self, analysis: str) -> int:
         """Parse number of speakers from analysis text."""
@@ -746,6 +760,8 @@ class AudioAIService:
                 "status": "healthy",
                 "supported_models": len(models),
                 "max_concurrent_tasks": self.max_concurrent_tasks,
+                "segment_concurrency": self.segment_concurrency,
+                "segmentation": self.segmentation_options,
                 "supported_formats": self.supported_formats,
                 "emotion_categories": len(self.emotion_categories),
                 "audio_categories": len(self.audio_categories),
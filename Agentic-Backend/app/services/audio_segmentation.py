@@ -0,0 +1,465 @@
+"""
+Streaming audio decoding and speech segmentation for the audio AI service.
+
+Audio is decoded once into mono 16-bit PCM, in chunks:
+
+- WAV (PCM) is read with the standard library ``wave`` module, downmixed to
+  mono and kept at its native sample rate.
+- Everything else is piped through ``ffmpeg`` (if installed), which outputs
+  16 kHz mono PCM.
+
+``SpeechSegmenter`` runs an energy-based voice activity detector over the
+PCM stream: frames louder than an adaptive noise floor start a region once
+they have lasted ``min_speech_ms``, and a region ends after ``max_silence_ms``
+of quiet. Regions are padded, and regions longer than ``max_segment_seconds``
+are split into windows that overlap by ``overlap_seconds`` so no words are
+cut in half. Only the segment being built is buffered, so memory use is
+bounded by the segment length, not the recording length.
+
+``FixedWindowSegmenter`` skips voice activity detection and cuts the whole
+recording into overlapping windows of ``max_segment_seconds``, for analyses
+that need the non-speech audio too (music, ambient sound).
+
+Each segment is emitted as a self-contained WAV with its start/end time in
+the recording; ``stitch_transcripts`` joins per-segment transcripts, dropping
+the words repeated in the overlaps.
+"""
+
+import asyncio
+import base64
+import io
+import re
+import shutil
+import wave
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.utils.logging import get_logger
+
+logger = get_logger("audio_segmentation")
+
+FFMPEG_SAMPLE_RATE = 16000
+DECODE_CHUNK_SECONDS = 1.0
+_FFMPEG_WRITE_CHUNK = 64 * 1024
+
+
+class AudioDecodeError(Exception):
+    """The audio could not be decoded into PCM."""
+    pass
+
+
+@dataclass
+class AudioSegment:
+    """A stretch of audio to send to the model on its own."""
+    index: int
+    start_seconds: float
+    end_seconds: Optional[float]  # None when the recording could not be decoded
+    data: bytes
+    _b64: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        if self.end_seconds is None:
+            return None
+        return self.end_seconds - self.start_seconds
+
+    @property
+    def b64(self) -> str:
+        """Base64 encoding of ``data``, computed once and shared by every analysis."""
+        if self._b64 is None:
+            self._b64 = base64.b64encode(self.data).decode('utf-8')
+        return self._b64
+
+
+def _wav_bytes(pcm: bytes, sample_rate: int) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def _to_mono_int16(frames: bytes, channels: int, sample_width: int) -> bytes:
+    """Convert interleaved PCM of any width to mono signed 16-bit."""
+    if sample_width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.int16) - 128) << 8
+    elif sample_width == 2:
+        samples = np.frombuffer(frames, dtype="<i2")
+    elif sample_width == 3:
+        # Keep the two most significant bytes of each little-endian sample
+        samples = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)[:, 1:].copy().view("<i2").ravel()
+    elif sample_width == 4:
+        samples = (np.frombuffer(frames, dtype="<i4") >> 16).astype(np.int16)
+    else:
+        raise AudioDecodeError(f"Unsupported WAV sample width: {sample_width}")
+
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels]
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples.astype("<i2", copy=False).tobytes()
+
+
+def is_wav(audio_data: bytes) -> bool:
+    return audio_data[:4] == b'RIFF' and audio_data[8:12] == b'WAVE'
+
+
+async def _decode_wav(audio_data: bytes) -> AsyncIterator[Tuple[int, bytes]]:
+    with wave.open(io.BytesIO(audio_data), "rb") as wav:
+        sample_rate = wav.getframerate()
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        frames_per_chunk = max(1, int(sample_rate * DECODE_CHUNK_SECONDS))
+        while True:
+            frames = wav.readframes(frames_per_chunk)
+            if not frames:
+                return
+            yield sample_rate, _to_mono_int16(frames, channels, sample_width)
+            await asyncio.sleep(0)
+
+
+async def _decode_ffmpeg(audio_data: bytes, ffmpeg: str) -> AsyncIterator[Tuple[int, bytes]]:
+    process = await asyncio.create_subprocess_exec(
+        ffmpeg, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-ar", str(FFMPEG_SAMPLE_RATE), "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+
+    async def feed():
+        view = memoryview(audio_data)
+        try:
+            for start in range(0, len(view), _FFMPEG_WRITE_CHUNK):
+                process.stdin.write(view[start:start + _FFMPEG_WRITE_CHUNK])
+                await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # ffmpeg gave up; its exit status says why
+        finally:
+            process.stdin.close()
+
+    feeder = asyncio.create_task(feed())
+    chunk_bytes = int(FFMPEG_SAMPLE_RATE * DECODE_CHUNK_SECONDS) * 2
+    produced = False
+    try:
+        while True:
+            chunk = await process.stdout.read(chunk_bytes)
+            if not chunk:
+                break
+            produced = True
+            yield FFMPEG_SAMPLE_RATE, chunk
+
+        await feeder
+        stderr = await process.stderr.read()
+        if await process.wait() != 0 and not produced:
+            raise AudioDecodeError(f"ffmpeg could not decode audio: {stderr.decode(errors='replace').strip()}")
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        feeder.cancel()
+
+
+async def decode_pcm(audio_data: bytes) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    Decode audio into chunks of mono 16-bit PCM.
+
+    Yields:
+        (sample_rate, pcm chunk) tuples
+
+    Raises:
+        AudioDecodeError: If no decoder can handle the audio
+    """
+    if is_wav(audio_data):
+        try:
+            async for chunk in _decode_wav(audio_data):
+                yield chunk
+            return
+        except wave.Error as e:
+            # e.g. float or compressed WAV; ffmpeg may still manage
+            logger.debug(f"wave module cannot read this file: {e}")
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise AudioDecodeError("ffmpeg is not installed and the audio is not PCM WAV")
+
+    async for chunk in _decode_ffmpeg(audio_data, ffmpeg):
+        yield chunk
+
+
+class SpeechSegmenter:
+    """Energy-based voice activity detection over a stream of mono 16-bit PCM."""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        max_segment_seconds: float = 30.0,
+        overlap_seconds: float = 1.0,
+        frame_ms: int = 30,
+        min_speech_ms: int = 250,
+        max_silence_ms: int = 1000,
+        padding_ms: int = 200,
+        threshold_db: float = -50.0,
+        noise_margin_db: float = 10.0,
+        max_noise_db: float = -35.0
+    ):
+        self.sample_rate = sample_rate
+        self.frame = max(1, sample_rate * frame_ms // 1000)
+        self.max_segment = int(max_segment_seconds * sample_rate)
+        self.overlap = min(int(overlap_seconds * sample_rate), self.max_segment // 2)
+        self.min_speech = sample_rate * min_speech_ms // 1000
+        self.max_silence = sample_rate * max_silence_ms // 1000
+        self.padding = sample_rate * padding_ms // 1000
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        # The noise floor follows quiet frames down immediately and creeps up
+        # slowly (1 dB/s) so a constant hum is eventually treated as silence.
+        # It is capped so continuous loud audio (music, unbroken speech) never
+        # falls below the detection threshold.
+        self.noise_rise_db = 1.0 * frame_ms / 1000
+        self.max_noise_db = max_noise_db
+
+        self._buffer = bytearray()
+        self._buffer_start = 0  # sample index of _buffer[0]
+        self._next_frame = 0  # sample index of the next frame to classify
+        self._noise_db: Optional[float] = None
+        self._run_start: Optional[int] = None  # start of a speech run not yet long enough
+        self._segment_start: Optional[int] = None
+        self._last_speech_end = 0
+        self._last_emitted_end = 0
+        self._index = 0
+        self.speech_samples = 0
+        self.total_samples = 0
+
+    def _frame_levels(self, count: int) -> np.ndarray:
+        offset = (self._next_frame - self._buffer_start) * 2
+        samples = np.frombuffer(self._buffer, dtype="<i2", count=count * self.frame, offset=offset)
+        frames = samples.reshape(count, self.frame).astype(np.float32)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        return 20 * np.log10(rms / 32768.0 + 1e-10)
+
+    def _emit(self, start: int, end: int) -> AudioSegment:
+        first = (start - self._buffer_start) * 2
+        last = (end - self._buffer_start) * 2
+        segment = AudioSegment(
+            index=self._index,
+            start_seconds=start / self.sample_rate,
+            end_seconds=end / self.sample_rate,
+            data=_wav_bytes(bytes(self._buffer[first:last]), self.sample_rate)
+        )
+        self._index += 1
+        self._last_emitted_end = end
+        self.speech_samples += end - start
+        return segment
+
+    def _trim(self):
+        if self._segment_start is not None:
+            keep_from = self._segment_start
+        elif self._run_start is not None:
+            keep_from = self._run_start - self.padding
+        else:
+            keep_from = self._next_frame - self.padding
+        drop = keep_from - self._buffer_start
+        # Trim in one-second steps rather than on every frame
+        if drop >= self.sample_rate:
+            del self._buffer[:drop * 2]
+            self._buffer_start = keep_from
+
+    def feed(self, pcm: bytes) -> List[AudioSegment]:
+        """Add PCM and return any segments that are now complete."""
+        self._buffer.extend(pcm)
+        self.total_samples += len(pcm) // 2
+        available = self._buffer_start + len(self._buffer) // 2 - self._next_frame
+        count = available // self.frame
+        if count <= 0:
+            return []
+
+        segments = []
+        for level in self._frame_levels(count):
+            start = self._next_frame
+            end = start + self.frame
+            self._next_frame = end
+
+            if self._noise_db is None or level < self._noise_db:
+                self._noise_db = float(level)
+            else:
+                self._noise_db = min(self._noise_db + self.noise_rise_db, self.max_noise_db)
+            speech = level >= max(self.threshold_db, self._noise_db + self.noise_margin_db)
+
+            if self._segment_start is None:
+                if not speech:
+                    self._run_start = None
+                    continue
+                if self._run_start is None:
+                    self._run_start = start
+                if end - self._run_start >= self.min_speech:
+                    self._segment_start = max(self._run_start - self.padding, self._last_emitted_end, self._buffer_start)
+                    self._last_speech_end = end
+                    self._run_start = None
+                continue
+
+            if speech:
+                self._last_speech_end = end
+            elif end - self._last_speech_end >= self.max_silence:
+                segments.append(self._emit(self._segment_start, min(self._last_speech_end + self.padding, end)))
+                self._segment_start = None
+                continue
+
+            if end - self._segment_start >= self.max_segment:
+                segments.append(self._emit(self._segment_start, end))
+                self._segment_start = end - self.overlap
+
+        self._trim()
+        return segments
+
+    def finish(self) -> List[AudioSegment]:
+        """Flush the segment in progress at the end of the stream."""
+        if self._segment_start is None:
+            return []
+        end = min(self._last_speech_end + self.padding, self._buffer_start + len(self._buffer) // 2)
+        self._segment_start, start = None, self._segment_start
+        if end <= start:
+            return []
+        return [self._emit(start, end)]
+
+
+class FixedWindowSegmenter:
+    """Cuts a stream of mono 16-bit PCM into overlapping fixed-length windows."""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        max_segment_seconds: float = 30.0,
+        overlap_seconds: float = 1.0,
+        **_vad_options
+    ):
+        self.sample_rate = sample_rate
+        self.max_segment = max(1, int(max_segment_seconds * sample_rate))
+        self.overlap = min(int(overlap_seconds * sample_rate), self.max_segment // 2)
+
+        self._buffer = bytearray()
+        self._buffer_start = 0  # sample index of _buffer[0]
+        self._index = 0
+        self.speech_samples = 0
+        self.total_samples = 0
+
+    def _emit(self, end: int) -> AudioSegment:
+        start = self._buffer_start
+        segment = AudioSegment(
+            index=self._index,
+            start_seconds=start / self.sample_rate,
+            end_seconds=end / self.sample_rate,
+            data=_wav_bytes(bytes(self._buffer[:(end - start) * 2]), self.sample_rate)
+        )
+        self._index += 1
+        self.speech_samples += end - start
+        # The next window starts ``overlap`` before this one ended
+        next_start = max(start, end - self.overlap)
+        del self._buffer[:(next_start - start) * 2]
+        self._buffer_start = next_start
+        return segment
+
+    def feed(self, pcm: bytes) -> List[AudioSegment]:
+        """Add PCM and return any windows that are now complete."""
+        self._buffer.extend(pcm)
+        self.total_samples += len(pcm) // 2
+        segments = []
+        while len(self._buffer) // 2 >= self.max_segment:
+            segments.append(self._emit(self._buffer_start + self.max_segment))
+        return segments
+
+    def finish(self) -> List[AudioSegment]:
+        """Flush the last, shorter window at the end of the stream."""
+        remaining = len(self._buffer) // 2
+        # After the first window the buffer opens with audio already sent as overlap
+        if remaining == 0 or (self._index and remaining <= self.overlap):
+            return []
+        return [self._emit(self._buffer_start + remaining)]
+
+
+async def iter_audio_segments(
+    audio_data: bytes,
+    max_segment_seconds: float = 30.0,
+    overlap_seconds: float = 1.0,
+    vad: bool = True,
+    **vad_options
+) -> AsyncIterator[AudioSegment]:
+    """
+    Decode audio and yield its segments in order.
+
+    Args:
+        audio_data: Encoded audio
+        max_segment_seconds: Longest segment to emit
+        overlap_seconds: Overlap between consecutive windows of one region
+        vad: Yield speech segments only; False windows the whole recording
+        **vad_options: SpeechSegmenter options
+
+    Raises:
+        AudioDecodeError: If the audio cannot be decoded
+    """
+    segmenter_class = SpeechSegmenter if vad else FixedWindowSegmenter
+    segmenter = None
+    async for sample_rate, pcm in decode_pcm(audio_data):
+        if segmenter is None:
+            segmenter = segmenter_class(
+                sample_rate,
+                max_segment_seconds=max_segment_seconds,
+                overlap_seconds=overlap_seconds,
+                **vad_options
+            )
+        for segment in segmenter.feed(pcm):
+            yield segment
+
+    if segmenter is not None:
+        for segment in segmenter.finish():
+            yield segment
+        logger.debug(
+            f"Segmented {segmenter.total_samples / segmenter.sample_rate:.1f}s of audio into "
+            f"{segmenter._index} segments ({segmenter.speech_samples / segmenter.sample_rate:.1f}s kept)"
+        )
+
+
+_WORD_NORMALIZE = re.compile(r"[^\w']+")
+
+
+def _normalize_word(word: str) -> str:
+    return _WORD_NORMALIZE.sub("", word.lower())
+
+
+def stitch_transcripts(parts: Iterable[Tuple[float, float, str]], max_overlap_words: int = 20) -> str:
+    """
+    Join consecutive segment transcripts.
+
+    Args:
+        parts: (start_seconds, end_seconds, text) per segment, in order
+
+    Where a segment overlaps the previous one, both transcribe the same words
+    at the boundary; the longest run of words that ends one transcript and
+    starts the next (ignoring case and punctuation) is kept only once.
+    """
+    words: List[str] = []
+    previous_end: Optional[float] = None
+    for start, end, text in parts:
+        new_words = text.split()
+        if not new_words:
+            continue
+        skip = 0
+        if previous_end is not None and start < previous_end:
+            limit = min(max_overlap_words, len(words), len(new_words))
+            tail = [_normalize_word(w) for w in words[len(words) - limit:]]
+            head = [_normalize_word(w) for w in new_words[:limit]]
+            for size in range(limit, 0, -1):
+                if tail[limit - size:] == head[:size]:
+                    skip = size
+                    break
+        words.extend(new_words[skip:])
+        previous_end = end
+    return " ".join(words)
+
+
+def format_timestamp(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
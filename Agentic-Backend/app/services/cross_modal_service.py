@@ -11,11 +11,16 @@ This service provides cross-modal AI capabilities including:
 """
 
 import asyncio
+import hashlib
 import json
+import re
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+
 from app.config import settings
 from app.services.ollama_client import ollama_client
 from app.services.vision_ai_service import vision_ai_service, VisionAIResult
@@ -81,6 +86,19 @@ class CrossModalService:
         self.default_audio_model = getattr(settings, 'cross_modal_default_audio_model', 'whisper-base')
         self.processing_timeout = getattr(settings, 'cross_modal_processing_timeout_seconds', 180)
 
+        # Two-stage search: embedding shortlist, then optional LLM rerank
+        self.embedding_model = getattr(settings, 'cross_modal_embedding_model', settings.default_embedding_model)
+        self.shortlist_size = getattr(settings, 'cross_modal_search_shortlist_size', 50)
+        self.rerank_batch_size = getattr(settings, 'cross_modal_rerank_batch_size', 25)
+        self.rerank_concurrency = getattr(settings, 'cross_modal_rerank_concurrency', 4)
+        self.embedding_concurrency = getattr(settings, 'cross_modal_embedding_concurrency', 8)
+        self.embedding_batch_size = getattr(settings, 'cross_modal_embedding_batch_size', 32)
+        self.cache_size = getattr(settings, 'cross_modal_search_cache_size', 10000)
+
+        # LRU caches keyed by content hash so edited items are re-scored
+        self._embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._relevance_cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+
     async def process_multi_modal_content(
         self,
         content_data: Dict[str, Any],
@@ -485,23 +503,53 @@ Provide only the numerical consistency score (0.0 to 1.0).
         """
         Perform cross-modal search across content items.
 
+        Items are first ranked by cosine similarity between the query
+        embedding and each item's embedding (taken from ``item['embedding']``
+        when present, otherwise computed from its text, caption and
+        transcription in batched embedding calls and cached). The top ``shortlist_size`` candidates are
+        then optionally reranked by the text model in batched prompts.
+
         Args:
             query: Search query
             content_items: List of content items with their processing results
-            **kwargs: Search options
+            **kwargs: Search options (threshold, max_results, shortlist_size,
+                rerank, rerank_batch_size, temperature)
 
         Returns:
             List of search results with relevance scores
         """
         try:
-            search_results = []
+            if not content_items:
+                return []
+
+            max_results = kwargs.get('max_results', 10)
+            shortlist_size = max(max_results, kwargs.get('shortlist_size', self.shortlist_size))
+
+            # Stage 1: vectorized embedding similarity
+            similarities = await self._embedding_similarities(query, content_items)
+            order = np.argsort(-similarities, kind="stable")[:shortlist_size]
+            shortlist = [(int(i), float(similarities[i])) for i in order]
+
+            # Stage 2: rerank the shortlist with the text model
+            rerank_scores: Dict[int, float] = {}
+            if kwargs.get('rerank', True):
+                rerank_scores = await self._rerank_candidates(
+                    query,
+                    [content_items[i] for i, _ in shortlist],
+                    **kwargs
+                )
 
-            for item in content_items:
-                relevance_score = await self._calculate_relevance(query, item, **kwargs)
+            search_results = []
+            for position, (index, similarity) in enumerate(shortlist):
+                item = content_items[index]
+                rerank_score = rerank_scores.get(position)
+                relevance_score = rerank_score if rerank_score is not None else max(0.0, similarity)
                 if relevance_score > kwargs.get('threshold', 0.1):
                     search_results.append({
                         "content_id": item.get('content_id'),
                         "relevance_score": relevance_score,
+                        "embedding_score": similarity,
+                        "rerank_score": rerank_score,
                         "matched_modalities": item.get('matched_modalities', []),
                         "excerpts": item.get('excerpts', [])
                     })
@@ -509,12 +557,229 @@ Provide only the numerical consistency score (0.0 to 1.0).
             # Sort by relevance
             search_results.sort(key=lambda x: x['relevance_score'], reverse=True)
 
-            return search_results[:kwargs.get('max_results', 10)]
+            return search_results[:max_results]
 
         except Exception as e:
             logger.error(f"Cross-modal search failed: {e}")
             return []
 
+    def _build_search_context(self, content_item: Dict[str, Any]) -> str:
+        """Build the textual representation of an item used for search."""
+        context_parts = []
+
+        if 'text' in content_item:
+            context_parts.append(f"Text: {content_item['text'][:300]}...")
+        if 'caption' in content_item:
+            context_parts.append(f"Visual: {content_item['caption']}")
+        if 'transcription' in content_item:
+            context_parts.append(f"Audio: {content_item['transcription'][:300]}...")
+
+        return chr(10).join(context_parts)
+
+    def _content_key(self, content_item: Dict[str, Any]) -> str:
+        """Cache key for an item, derived from the content that gets scored."""
+        context = self._build_search_context(content_item)
+        return hashlib.sha1(f"{content_item.get('content_id')}|{context}".encode()).hexdigest()
+
+    def _cache_put(self, cache: OrderedDict, key: Any, value: Any):
+        """Insert into an LRU cache, evicting the oldest entries."""
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    @staticmethod
+    def _unit_vector(embedding: Optional[List[float]]) -> Optional[np.ndarray]:
+        """Embedding as a unit-length float32 vector (None if empty or zero)."""
+        if not embedding:
+            return None
+
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    async def _embed_text(self, text: str) -> Optional[np.ndarray]:
+        """Embed text with the search embedding model, normalized to unit length."""
+        response = await ollama_client.embeddings(prompt=text, model=self.embedding_model)
+        return self._unit_vector(response.get('embedding') if response else None)
+
+    async def _embedding_similarities(
+        self,
+        query: str,
+        content_items: List[Dict[str, Any]]
+    ) -> np.ndarray:
+        """
+        Cosine similarity of every item to the query.
+
+        Items whose embedding is unavailable (or has a different dimension
+        than the query's) get a similarity of -1 so they sort last.
+        """
+        query_vector = await self._embed_text(query)
+        similarities = np.full(len(content_items), -1.0, dtype=np.float32)
+        if query_vector is None:
+            return similarities
+
+        vectors = await self._item_embeddings(content_items)
+        rows = [i for i, v in enumerate(vectors) if v is not None and v.shape == query_vector.shape]
+        if rows:
+            matrix = np.stack([vectors[i] for i in rows])
+            similarities[rows] = matrix @ query_vector
+
+        return similarities
+
+    async def _item_embeddings(self, content_items: List[Dict[str, Any]]) -> List[Optional[np.ndarray]]:
+        """Resolve item embeddings from the items, the cache, or the model."""
+        vectors: List[Optional[np.ndarray]] = [None] * len(content_items)
+        missing: List[Tuple[int, str, str]] = []
+
+        for i, item in enumerate(content_items):
+            stored = item.get('embedding')
+            if stored:
+                vectors[i] = self._unit_vector(stored)
+                continue
+
+            key = self._content_key(item)
+            cached = self._embedding_cache.get(key)
+            if cached is not None:
+                self._embedding_cache.move_to_end(key)
+                vectors[i] = cached
+                continue
+
+            context = self._build_search_context(item)
+            if context:
+                missing.append((i, key, context))
+
+        if missing:
+            # One batch embedding call per chunk instead of one call per item
+            semaphore = asyncio.Semaphore(self.embedding_concurrency)
+            chunks = [
+                missing[i:i + self.embedding_batch_size]
+                for i in range(0, len(missing), self.embedding_batch_size)
+            ]
+
+            async def embed_chunk(chunk: List[Tuple[int, str, str]]):
+                async with semaphore:
+                    try:
+                        embeddings = await ollama_client.embed(
+                            [context for _, _, context in chunk], model=self.embedding_model
+                        )
+                    except Exception as e:
+                        logger.warning(f"Embedding failed for {len(chunk)} search items: {e}")
+                        return
+                for (index, key, _), embedding in zip(chunk, embeddings):
+                    vector = self._unit_vector(embedding)
+                    if vector is not None:
+                        vectors[index] = vector
+                        self._cache_put(self._embedding_cache, key, vector)
+
+            await asyncio.gather(*(embed_chunk(chunk) for chunk in chunks))
+
+        return vectors
+
+    async def _rerank_candidates(
+        self,
+        query: str,
+        candidates: List[Dict[str, Any]],
+        **kwargs
+    ) -> Dict[int, float]:
+        """
+        Score shortlisted candidates with the text model.
+
+        Cached (query, item) scores are reused; the rest are scored in
+        batched prompts with at most ``rerank_concurrency`` prompts in
+        flight. Candidates a batch response fails to score fall back to
+        the single-item prompt.
+
+        Returns:
+            Mapping of candidate position to relevance score
+        """
+        scores: Dict[int, float] = {}
+        pending: List[Tuple[int, str]] = []
+
+        for position, item in enumerate(candidates):
+            key = (query, self._content_key(item))
+            cached = self._relevance_cache.get(key)
+            if cached is not None:
+                self._relevance_cache.move_to_end(key)
+                scores[position] = cached
+            else:
+                pending.append((position, key[1]))
+
+        if not pending:
+            return scores
+
+        batch_size = max(1, kwargs.get('rerank_batch_size', self.rerank_batch_size))
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        semaphore = asyncio.Semaphore(self.rerank_concurrency)
+
+        async def score_batch(batch: List[Tuple[int, str]]):
+            async with semaphore:
+                batch_scores = await self._score_batch(query, [candidates[p] for p, _ in batch], **kwargs)
+                for offset, (position, content_key) in enumerate(batch):
+                    score = batch_scores.get(offset)
+                    if score is None:
+                        score = await self._calculate_relevance(query, candidates[position], **kwargs)
+                    scores[position] = score
+                    self._cache_put(self._relevance_cache, (query, content_key), score)
+
+        await asyncio.gather(*(score_batch(batch) for batch in batches))
+        return scores
+
+    async def _score_batch(
+        self,
+        query: str,
+        items: List[Dict[str, Any]],
+        **kwargs
+    ) -> Dict[int, float]:
+        """Score several items against a query in a single prompt."""
+        try:
+            content_blocks = [
+                f"[{i}]\n{self._build_search_context(item)}"
+                for i, item in enumerate(items)
+            ]
+
+            rerank_prompt = f"""
+Query: {query}
+
+Content items:
+{(chr(10) * 2).join(content_blocks)}
+
+Rate how relevant each content item is to the query on a scale of 0.0 to 1.0.
+Consider semantic meaning, keywords, and cross-modal relationships.
+Respond with only a JSON object mapping each item number to its score, e.g. {{"0": 0.8, "1": 0.1}}.
+"""
+
+            response = await ollama_client.generate(
+                model=self.default_text_model,
+                prompt=rerank_prompt,
+                system="You are an expert at relevance assessment. Always respond with only JSON.",
+                options={
+                    "temperature": kwargs.get('temperature', 0.1),
+                    "num_predict": kwargs.get('max_tokens', 50) + 12 * len(items)
+                }
+            )
+
+            result_text = response.get('response', '').strip()
+            json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
+            if not json_match:
+                logger.warning(f"Could not extract batch relevance scores from: {result_text}")
+                return {}
+
+            raw_scores = json.loads(json_match.group(0))
+            scores = {}
+            for key, value in raw_scores.items():
+                try:
+                    index = int(key)
+                    if 0 <= index < len(items):
+                        scores[index] = max(0.0, min(1.0, float(value)))
+                except (TypeError, ValueError):
+                    continue
+            return scores
+
+        except Exception as e:
+            logger.error(f"Batch relevance scoring failed: {e}")
+            return {}
+
     async def _calculate_relevance(
         self,
         query: str,
@@ -523,21 +788,11 @@ Provide only the numerical consistency score (0.0 to 1.0).
     ) -> float:
         """Calculate relevance score for a content item against a query."""
         try:
-            # Build content context
-            context_parts = []
-
-            if 'text' in content_item:
-                context_parts.append(f"Text: {content_item['text'][:300]}...")
-            if 'caption' in content_item:
-                context_parts.append(f"Visual: {content_item['caption']}")
-            if 'transcription' in content_item:
-                context_parts.append(f"Audio: {content_item['transcription'][:300]}...")
-
             relevance_prompt = f"""
 Query: {query}
 
 Content:
-{chr(10).join(context_parts)}
+{self._build_search_context(content_item)}
 
 Rate how relevant this content is to the query on a scale of 0.0 to 1.0.
 Consider semantic meaning, keywords, and cross-modal relationships.
@@ -557,10 +812,9 @@ Provide only the numerical score.
             result_text = response.get('response', '').strip()
 
             # Extract numerical score
-            import re
             score_match = re.search(r'(\d+\.?\d*)', result_text)
             if score_match:
-                return float(score_match.group(1))
+                return max(0.0, min(1.0, float(score_match.group(1))))
             else:
                 return 0.0
 
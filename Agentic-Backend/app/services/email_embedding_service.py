@@ -24,6 +24,7 @@ from app.db.models.email import Email, EmailEmbedding, EmailAttachment
 from app.db.models.task import LogLevel
 from app.db.models.embedding_task import EmbeddingTask, EmbeddingTaskStatus
 from app.services.semantic_processing_service import semantic_processing_service
+from app.services.email_search_filters import EmailSearchFilters
 from app.services.unified_log_service import unified_log_service, WorkflowType, LogScope
 from app.utils.logging import get_logger
 
@@ -329,11 +330,16 @@ class EmailEmbeddingService:
         embedding_types: Optional[List[str]] = None,
         temporal_boost: float = 0.1,
         importance_boost: float = 0.2,
-        intent_filter: Optional[str] = None
+        intent_filter: Optional[str] = None,
+        filters: Optional[EmailSearchFilters] = None
     ) -> List[Tuple[Email, float]]:
         """
         Search for emails using advanced similarity with temporal ranking and importance weighting.
 
+        Filters are part of the vector query, and each email (or, with
+        ``filters.one_per_thread``, each thread) contributes only its closest
+        embedding, so every candidate row satisfies the filters and is distinct.
+
         Args:
             db: Database session
             query_text: Text to search for
@@ -344,6 +350,8 @@ class EmailEmbeddingService:
             temporal_boost: Boost factor for recent emails (0.0-1.0)
             importance_boost: Boost factor for important emails (0.0-1.0)
             intent_filter: Filter by intent ("urgent", "action", "info", etc.)
+            filters: Date, sender, category, attachment, folder and
+                one-per-thread constraints applied in the database
 
         Returns:
             List of (Email, advanced_score) tuples sorted by relevance
@@ -358,9 +366,13 @@ class EmailEmbeddingService:
             detected_intent = await self._detect_query_intent(query_text)
 
             # Build similarity search query with extended limit for advanced scoring
+            filters = filters or EmailSearchFilters()
+            distance = EmailEmbedding.embedding_vector.cosine_distance(query_embedding)
             embedding_filter = and_(
                 EmailEmbedding.email_id == Email.id,
-                Email.user_id == user_id
+                Email.user_id == user_id,
+                distance < (1 - similarity_threshold),
+                *filters.conditions()
             )
 
             if embedding_types:
@@ -375,22 +387,32 @@ class EmailEmbeddingService:
                 if intent_conditions is not None:
                     embedding_filter = and_(embedding_filter, intent_conditions)
 
+            # Closest embedding per email (or per thread): DISTINCT ON keeps the
+            # first row of each group, so order each group by distance
+            thread_key = filters.thread_key()
+            best_matches = select(
+                Email.id.label('email_id'),
+                distance.label('distance')
+            ).select_from(Email).join(EmailEmbedding).where(
+                embedding_filter
+            ).distinct(thread_key).order_by(
+                thread_key, distance
+            ).subquery()
+
             # Advanced similarity search with email metadata
             similarity_query = select(
                 Email,
-                EmailEmbedding.embedding_vector.cosine_distance(query_embedding).label('distance'),
+                best_matches.c.distance,
                 Email.importance_score,
                 Email.urgency_score,
                 Email.sent_at,
                 Email.is_important,
                 Email.is_flagged,
                 Email.category
-            ).join(EmailEmbedding).where(
-                embedding_filter
-            ).where(
-                EmailEmbedding.embedding_vector.cosine_distance(query_embedding) < (1 - similarity_threshold)
+            ).join(
+                best_matches, best_matches.c.email_id == Email.id
             ).order_by(
-                EmailEmbedding.embedding_vector.cosine_distance(query_embedding)
+                best_matches.c.distance
             ).limit(limit * 2)  # Get more results for advanced scoring
 
             result = await db.execute(similarity_query)
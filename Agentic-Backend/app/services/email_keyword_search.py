@@ -0,0 +1,198 @@
+"""
+Postgres full-text keyword search over emails.
+
+Queries the stored ``emails.search_vector`` column (subject weighted A, sender
+B, body C) through its GIN index. Query syntax follows web search engines via
+``websearch_to_tsquery``, with prefix terms added on top:
+
+- ``invoice acme``        both terms (stemmed, so "invoices" matches)
+- ``"tracking number"``   phrase, words adjacent and in order
+- ``invoice or receipt``  either term
+- ``-newsletter``         exclude a term
+- ``INV-2024*``           prefix match (``-term*`` excludes a prefix)
+
+Matches are ranked with ``ts_rank`` normalized to 0..1, and each result
+carries a ``ts_headline`` snippet with the matched words highlighted. The
+headline is only computed for the page being returned, since it re-parses
+the email body.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.db.models.email import Email, EMAIL_SEARCH_CONFIG
+from app.services.email_search_filters import EmailSearchFilters
+from app.utils.logging import get_logger
+
+logger = get_logger("email_keyword_search")
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+
+# Longest stretch of a body ts_headline parses for the snippet
+HEADLINE_MAX_CHARS = 20000
+
+# ts_rank normalization 32 scales a rank r to r / (r + 1), i.e. into 0..1
+RANK_NORMALIZATION = 32
+
+_QUERY_TOKEN = re.compile(r'-?"[^"]*"?|\S+')
+_PREFIX_TERM = re.compile(r'^(-?)(\w[\w.@-]*)\*$')
+_HIGHLIGHTED = re.compile(re.escape(HIGHLIGHT_START) + r'(.*?)' + re.escape(HIGHLIGHT_STOP))
+
+
+@dataclass
+class KeywordSearchHit:
+    """An email matching a keyword query."""
+    email: Email
+    rank: float
+    headline: str  # Body fragments with matches highlighted
+    subject_headline: str  # Full subject with matches highlighted
+    matched_terms: List[str] = field(default_factory=list)
+
+
+def _regconfig() -> ColumnElement:
+    return literal_column(f"'{EMAIL_SEARCH_CONFIG}'::regconfig")
+
+
+def build_tsquery(query_text: str, include_exclusions: bool = True) -> Optional[ColumnElement]:
+    """
+    Translate user query text into a tsquery expression.
+
+    Prefix terms (``word*``) become ``to_tsquery`` prefix lexemes; everything
+    else, including quoted phrases, ``or`` and ``-`` exclusions, is handed to
+    ``websearch_to_tsquery``. The two parts are ANDed.
+
+    Args:
+        query_text: User query
+        include_exclusions: Keep ``-term`` exclusions. Ranking uses the query
+            without them, since ts_rank scores any query containing a NOT as ~0.
+
+    Returns:
+        The tsquery expression, or None if the query has no searchable text
+    """
+    websearch_parts = []
+    prefix_parts = []
+    for token in _QUERY_TOKEN.findall(query_text or ""):
+        if not include_exclusions and token.startswith('-'):
+            continue
+        prefix = _PREFIX_TERM.match(token)
+        if prefix:
+            negate, term = prefix.groups()
+            prefix_parts.append(f"{'!' if negate else ''}'{term}':*")
+        else:
+            websearch_parts.append(token)
+
+    tsquery = None
+    if websearch_parts:
+        tsquery = func.websearch_to_tsquery(_regconfig(), " ".join(websearch_parts))
+    if prefix_parts:
+        prefix_query = func.to_tsquery(_regconfig(), " & ".join(prefix_parts))
+        tsquery = prefix_query if tsquery is None else tsquery.op('&&')(prefix_query)
+    return tsquery
+
+
+def highlighted_terms(headline: str) -> List[str]:
+    """Distinct words ts_headline highlighted, in order of appearance."""
+    terms = []
+    for term in _HIGHLIGHTED.findall(headline or ""):
+        term = term.lower()
+        if term not in terms:
+            terms.append(term)
+    return terms
+
+
+class EmailKeywordSearch:
+    """Ranked full-text search over a user's emails."""
+
+    def __init__(self):
+        self.logger = get_logger("email_keyword_search")
+        self.headline_options = (
+            f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, "
+            "MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter=\" ... \""
+        )
+        self.subject_headline_options = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, HighlightAll=true"
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query_text: str,
+        user_id: int,
+        limit: int = 20,
+        offset: int = 0,
+        filters: Optional[EmailSearchFilters] = None
+    ) -> List[KeywordSearchHit]:
+        """
+        Search a user's emails for keywords.
+
+        Args:
+            db: Database session
+            query_text: Keywords, "quoted phrases", prefix* terms, or/- operators
+            user_id: User whose emails to search
+            limit: Maximum number of results
+            offset: Number of ranked results to skip
+            filters: Date, sender, category, attachment, folder and
+                one-per-thread constraints applied in the query
+
+        Returns:
+            Hits ordered by descending rank
+        """
+        tsquery = build_tsquery(query_text)
+        if tsquery is None:
+            return []
+
+        filters = filters or EmailSearchFilters()
+        rank_tsquery = build_tsquery(query_text, include_exclusions=False)
+        if rank_tsquery is None:
+            rank_tsquery = tsquery
+        rank = func.ts_rank(Email.search_vector, rank_tsquery, RANK_NORMALIZATION)
+        matches = select(
+            Email.id.label('email_id'),
+            rank.label('rank')
+        ).where(
+            Email.user_id == user_id,
+            Email.search_vector.op('@@')(tsquery),
+            *filters.conditions()
+        )
+
+        if filters.one_per_thread:
+            # Best-ranked email of each thread
+            thread_key = filters.thread_key()
+            matches = matches.distinct(thread_key).order_by(thread_key, rank.desc())
+        matches = matches.subquery()
+
+        page = select(matches).order_by(
+            matches.c.rank.desc(), matches.c.email_id
+        ).offset(offset).limit(limit).subquery()
+
+        body = func.left(func.coalesce(Email.body_text, ''), HEADLINE_MAX_CHARS)
+        headline = func.ts_headline(_regconfig(), body, tsquery, self.headline_options)
+        subject_headline = func.ts_headline(
+            _regconfig(), func.coalesce(Email.subject, ''), tsquery, self.subject_headline_options
+        )
+
+        query = select(
+            Email, page.c.rank, headline.label('headline'), subject_headline.label('subject_headline')
+        ).join(
+            page, page.c.email_id == Email.id
+        ).order_by(page.c.rank.desc(), page.c.email_id)
+
+        result = await db.execute(query)
+        return [
+            KeywordSearchHit(
+                email=email,
+                rank=float(rank_value),
+                headline=headline_text or "",
+                subject_headline=subject_text or "",
+                matched_terms=highlighted_terms(f"{subject_text or ''} {headline_text or ''}")
+            )
+            for email, rank_value, headline_text, subject_text in result.all()
+        ]
+
+
+# Global instance
+email_keyword_search = EmailKeywordSearch()
@@ -0,0 +1,131 @@
+"""
+Email search filters that are applied inside the database query.
+
+Search paths used to fetch a multiple of the rows they needed and drop
+emails outside the date window, from the wrong sender or from an
+already-seen thread in Python, so a narrow filter or a chatty thread could
+leave a page short even though matching emails existed. ``EmailSearchFilters``
+holds those constraints and renders them as SQLAlchemy conditions, so every
+row a search returns is usable. One result per thread is handled by the
+search query itself (``DISTINCT ON`` the thread key), see ``thread_key``.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import String, cast, func, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.db.models.email import Email
+
+# Columns a date window may be applied to
+DATE_FIELDS = ("sent_at", "received_at")
+
+
+def _parse_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally."""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+@dataclass
+class EmailSearchFilters:
+    """Constraints on which emails a search may return."""
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    date_field: str = "sent_at"  # sent_at or received_at
+    sender: Optional[str] = None  # Substring of the sender address or name
+    categories: Optional[List[str]] = None
+    min_importance: Optional[float] = None
+    has_attachments: Optional[bool] = None
+    folder: Optional[str] = None  # Folder path prefix, e.g. "INBOX"
+    one_per_thread: bool = False
+
+    def __post_init__(self):
+        if self.date_field not in DATE_FIELDS:
+            raise ValueError(f"date_field must be one of {DATE_FIELDS}, got '{self.date_field}'")
+
+    @classmethod
+    def from_dict(cls, filters: Optional[Dict[str, Any]], **overrides) -> "EmailSearchFilters":
+        """
+        Build filters from the search API's filter dict.
+
+        Args:
+            filters: Dict with optional date_from/date_to (ISO 8601), sender,
+                categories, min_importance and has_attachments keys
+            **overrides: Field values to set directly (e.g. one_per_thread)
+
+        Returns:
+            EmailSearchFilters instance
+        """
+        filters = filters or {}
+        values: Dict[str, Any] = {}
+        if filters.get("date_from"):
+            values["date_from"] = _parse_datetime(filters["date_from"])
+        if filters.get("date_to"):
+            values["date_to"] = _parse_datetime(filters["date_to"])
+        if filters.get("sender"):
+            values["sender"] = filters["sender"]
+        if filters.get("categories"):
+            values["categories"] = list(filters["categories"])
+        if filters.get("min_importance") is not None:
+            values["min_importance"] = float(filters["min_importance"])
+        if filters.get("has_attachments") is not None:
+            values["has_attachments"] = bool(filters["has_attachments"])
+        if filters.get("folder"):
+            values["folder"] = filters["folder"]
+        values.update(overrides)
+        return cls(**values)
+
+    def conditions(self) -> List[ColumnElement]:
+        """SQLAlchemy WHERE conditions on ``Email`` for these filters."""
+        conditions: List[ColumnElement] = []
+        date_column = getattr(Email, self.date_field)
+
+        if self.date_from is not None:
+            conditions.append(date_column >= self.date_from)
+        if self.date_to is not None:
+            conditions.append(date_column <= self.date_to)
+
+        if self.sender:
+            pattern = f"%{_escape_like(self.sender)}%"
+            conditions.append(or_(
+                Email.sender_email.ilike(pattern, escape='\\'),
+                Email.sender_name.ilike(pattern, escape='\\')
+            ))
+
+        if self.categories:
+            conditions.append(func.lower(Email.category).in_([c.lower() for c in self.categories]))
+
+        if self.min_importance is not None:
+            conditions.append(Email.importance_score >= self.min_importance)
+
+        if self.has_attachments is not None:
+            if self.has_attachments:
+                conditions.append(Email.has_attachments.is_(True))
+            else:
+                # Column defaults to false but older rows may hold NULL
+                conditions.append(func.coalesce(Email.has_attachments, False).is_(False))
+
+        if self.folder:
+            conditions.append(Email.folder_path.like(f"{_escape_like(self.folder)}%", escape='\\'))
+
+        return conditions
+
+    def thread_key(self) -> ColumnElement:
+        """
+        Expression search queries ``DISTINCT ON`` to collapse duplicate rows.
+
+        Always collapses the several embeddings of one email; with
+        ``one_per_thread`` it collapses whole threads, treating an email
+        without a thread id as its own thread.
+        """
+        if self.one_per_thread:
+            return func.coalesce(Email.thread_id, cast(Email.id, String))
+        return Email.id
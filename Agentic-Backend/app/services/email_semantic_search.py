@@ -18,8 +18,12 @@ from dataclasses import dataclass, field
 from uuid import UUID
 
 from app.services.semantic_processing_service import semantic_processing_service
+from app.services.email_embedding_service import email_embedding_service
+from app.services.email_keyword_search import email_keyword_search
+from app.services.email_search_filters import EmailSearchFilters
 from app.services.email_analysis_service import EmailAnalysis
 from app.db.models.content import ContentItem, ContentEmbedding
+from app.db.models.email import Email
 from app.db.models.task import Task
 from app.utils.logging import get_logger
 
@@ -182,8 +186,12 @@ class EmailSemanticSearch:
                 keyword_results = await self._keyword_search(expanded_queries, query, db_session)
                 results = self._merge_hybrid_results(semantic_results, keyword_results)
 
-            # Apply filters
-            filtered_results = self._apply_filters(results, query.filters)
+            # Searches against the email tables apply the filters in SQL;
+            # only the content-item fallback needs them applied here
+            if self._email_user_id(query, db_session) is not None:
+                filtered_results = results
+            else:
+                filtered_results = self._apply_filters(results, query.filters)
 
             # Sort by relevance
             filtered_results.sort(key=lambda x: x.relevance_score, reverse=True)
@@ -233,6 +241,10 @@ class EmailSemanticSearch:
         db_session: Any = None
     ) -> List[EmailSearchResult]:
         """Perform semantic search using vector similarity."""
+        user_id = self._email_user_id(query, db_session)
+        if user_id is not None:
+            return await self._email_semantic_search(queries, query, user_id, db_session)
+
         try:
             # Generate embedding for the main query
             main_embedding = await self.semantic_service.generate_embedding(queries[0])
@@ -262,33 +274,83 @@ class EmailSemanticSearch:
             self.logger.error(f"Semantic search failed: {e}")
             return []
 
-    async def _keyword_search(
+    async def _email_semantic_search(
         self,
         queries: List[str],
         query: EmailSearchQuery,
-        db_session: Any = None
+        user_id: int,
+        db_session: Any
     ) -> List[EmailSearchResult]:
-        """Perform keyword-based search."""
+        """Vector search over the email tables with the query's filters pushed into SQL."""
         try:
-            # Build search terms from queries
-            search_terms = []
-            for q in queries:
-                # Extract keywords and phrases
-                terms = re.findall(r'\b\w+\b', q.lower())
-                search_terms.extend(terms)
+            similar_emails = await email_embedding_service.search_similar_emails(
+                db=db_session,
+                query_text=queries[0],
+                user_id=user_id,
+                limit=self.max_results,
+                similarity_threshold=self.min_relevance_threshold,
+                filters=EmailSearchFilters.from_dict(query.filters)
+            )
+            return [
+                self._email_to_result(email, score, queries, "semantic")
+                for email, score in similar_emails
+            ]
 
-            # Remove duplicates and common stop words
-            stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-            search_terms = list(set(term for term in search_terms if term not in stop_words and len(term) > 2))
+        except Exception as e:
+            self.logger.error(f"Semantic search failed: {e}")
+            return []
 
-            if not search_terms:
-                return []
+    def _email_user_id(self, query: EmailSearchQuery, db_session: Any) -> Optional[int]:
+        """User id for searching the email tables, or None to use the content-item path."""
+        if db_session is None:
+            return None
+        try:
+            return int(query.user_id)
+        except (TypeError, ValueError):
+            return None
 
-            # Search database for emails containing these terms
-            # This would be implemented with actual database queries
-            results = await self._database_keyword_search(search_terms, query, db_session)
+    def _email_to_result(
+        self,
+        email: Email,
+        relevance_score: float,
+        queries: List[str],
+        search_type: str
+    ) -> EmailSearchResult:
+        """Build a search result from an Email row."""
+        text = f"{email.subject or ''} {email.snippet or email.body_text or ''}".lower()
+        terms = {term for q in queries for term in re.findall(r'\b\w+\b', q.lower()) if len(term) > 2}
+
+        return EmailSearchResult(
+            content_item_id=str(email.id),
+            email_id=str(email.id),
+            subject=email.subject or "",
+            sender=email.sender_email or "",
+            content_preview=email.snippet or (email.body_text or "")[:200],
+            relevance_score=relevance_score,
+            importance_score=email.importance_score,
+            categories=[email.category] if email.category else [],
+            sent_date=email.sent_at or email.received_at or email.created_at,
+            has_attachments=bool(email.has_attachments),
+            thread_id=email.thread_id,
+            matched_terms=sorted(term for term in terms if term in text),
+            search_metadata={"search_type": search_type}
+        )
 
-            return results
+    async def _keyword_search(
+        self,
+        queries: List[str],
+        query: EmailSearchQuery,
+        db_session: Any = None
+    ) -> List[EmailSearchResult]:
+        """Perform keyword-based search using Postgres full-text search."""
+        user_id = self._email_user_id(query, db_session)
+        if user_id is None:
+            # Full-text search runs against the email tables only
+            return []
+
+        try:
+            # The original text keeps its phrase, prefix and exclusion syntax
+            return await self._database_keyword_search(query, user_id, db_session)
 
         except Exception as e:
             self.logger.error(f"Keyword search failed: {e}")
@@ -296,14 +358,27 @@ class EmailSemanticSearch:
 
     async def _database_keyword_search(
         self,
-        search_terms: List[str],
         query: EmailSearchQuery,
-        db_session: Any = None
+        user_id: int,
+        db_session: Any
     ) -> List[EmailSearchResult]:
-        """Search emails in database using keywords."""
-        # This is a placeholder - actual implementation would query the database
-        # for emails containing the search terms in subject, content, etc.
-        return []
+        """Search emails in database using the weighted full-text index."""
+        hits = await email_keyword_search.search(
+            db=db_session,
+            query_text=query.query_text,
+            user_id=user_id,
+            limit=self.max_results,
+            filters=EmailSearchFilters.from_dict(query.filters)
+        )
+
+        results = []
+        for hit in hits:
+            result = self._email_to_result(hit.email, hit.rank, [query.query_text], "keyword")
+            result.matched_terms = hit.matched_terms
+            result.search_metadata["highlight"] = hit.headline
+            result.search_metadata["subject_highlight"] = hit.subject_headline
+            results.append(result)
+        return results
 
     def _merge_hybrid_results(
         self,
@@ -326,6 +401,8 @@ class EmailSemanticSearch:
                 existing.relevance_score = min(1.0, existing.relevance_score + result.relevance_score * 0.3)
                 existing.matched_terms.extend(result.matched_terms)
                 existing.matched_terms = list(set(existing.matched_terms))
+                for key, value in result.search_metadata.items():
+                    existing.search_metadata.setdefault(key, value)
             else:
                 result_map[result.content_item_id] = result
 
@@ -493,7 +570,7 @@ class EmailSemanticSearch:
 
     def _get_date_range(self, date: datetime) -> str:
         """Get date range category for faceting."""
-        now = datetime.now()
+        now = datetime.now(date.tzinfo)
         diff_days = (now - date).days
 
         if diff_days <= 1:
@@ -26,6 +26,7 @@ from app.db.models.task import LogLevel
 from app.services.email_connectors import EmailConnectorFactory
 from app.services.email_connectors.base_connector import SyncType, EmailSyncResult, EmailMessage
 from app.services.email_embedding_service import email_embedding_service
+from app.services.relationship_extraction_service import relationship_extraction_service
 from app.services.unified_log_service import unified_log_service, WorkflowType, LogScope
 from app.utils.logging import get_logger
 from app.config import settings
@@ -847,6 +848,14 @@ class EmailSyncService:
             # Don't fail the sync if embedding generation fails
             self.logger.warning(f"Failed to generate embeddings for email {email.message_id}: {e}")
 
+        # Contribute the email to the shared knowledge graph (no-op unless enabled)
+        await relationship_extraction_service.ingest_content(
+            {"text": f"{email.subject or ''}\n\n{email.body_text or ''}"},
+            source_type="email",
+            source_id=str(email.id),
+            db=db
+        )
+
         return email
 
     async def _update_email_with_uid(
@@ -54,7 +54,8 @@ class SearchEmailsTool(EmailTool):
     @classmethod
     async def execute(cls, db: AsyncSession, user_id: int, **kwargs) -> Dict[str, Any]:
         from app.services.email_embedding_service import email_embedding_service
-        from datetime import datetime, timedelta
+        from app.services.email_search_filters import EmailSearchFilters
+        from datetime import datetime, timedelta, timezone
 
         query = kwargs.get("query")
         days_back = kwargs.get("days_back", 30)
@@ -71,79 +72,27 @@ class SearchEmailsTool(EmailTool):
         logger.info(f"Searching emails for user {user_id}: query='{query}', days_back={days_back}, max_results={max_results}")
 
         try:
-            # Calculate date range for filtering
-            end_date = datetime.now()
+            # Date window, folder and sender are applied in the vector query
+            end_date = datetime.now(timezone.utc)
             start_date = end_date - timedelta(days=days_back)
+            filters = EmailSearchFilters(
+                date_from=start_date,
+                date_to=end_date,
+                date_field="received_at",
+                sender=sender,
+                folder=folder if folder and folder != "all" else None
+            )
 
-            # Use semantic search with date filtering
             similar_emails = await email_embedding_service.search_similar_emails(
                 db=db,
                 query_text=query,
                 user_id=user_id,
                 limit=max_results,
                 similarity_threshold=0.3,
-                temporal_boost=0.2
+                temporal_boost=0.2,
+                filters=filters
             )
 
-            # Apply date filtering to results
-            filtered_emails = []
-            for email, score in similar_emails:
-                # Check if email has a received_at date and falls within range
-                if email.received_at:
-                    email_date = email.received_at
-                    # Handle timezone-naive datetimes
-                    if email_date.tzinfo is None:
-                        from datetime import timezone
-                        email_date = email_date.replace(tzinfo=timezone.utc)
-
-                    if start_date <= email_date <= end_date:
-                        filtered_emails.append((email, score))
-
-            # If we filtered out too many results, get more from the original search
-            if len(filtered_emails) < max_results and len(similar_emails) > len(filtered_emails):
-                additional_needed = max_results - len(filtered_emails)
-                # Get more results from the original search
-                more_emails = await email_embedding_service.search_similar_emails(
-                    db=db,
-                    query_text=query,
-                    user_id=user_id,
-                    limit=max_results * 2,  # Get more to filter
-                    similarity_threshold=0.3,
-                    temporal_boost=0.2
-                )
-
-                # Filter the additional results by date
-                for email, score in more_emails:
-                    if len(filtered_emails) >= max_results:
-                        break
-
-                    if email.received_at:
-                        email_date = email.received_at
-                        if email_date.tzinfo is None:
-                            from datetime import timezone
-                            email_date = email_date.replace(tzinfo=timezone.utc)
-
-                        if start_date <= email_date <= end_date:
-                            # Check if we already have this email
-                            if not any(existing_email.id == email.id for existing_email, _ in filtered_emails):
-                                filtered_emails.append((email, score))
-
-            similar_emails = filtered_emails
-
-            # Filter by folder if specified
-            if folder and folder != "all":
-                similar_emails = [
-                    (email, score) for email, score in similar_emails
-                    if email.folder_path and email.folder_path.startswith(folder)
-                ]
-
-            # Filter by sender if specified
-            if sender:
-                similar_emails = [
-                    (email, score) for email, score in similar_emails
-                    if sender.lower() in (email.sender_email or "").lower()
-                ]
-
             # Format results
             results = []
             for email, score in similar_emails:
@@ -23,6 +23,7 @@ from app.db.models.user import User
 from app.db.models.task import LogLevel
 from app.db.models.chat_session import UserChatPreferences
 from app.services.email_embedding_service import email_embedding_service
+from app.services.email_search_filters import EmailSearchFilters
 from app.services.semantic_processing_service import semantic_processing_service
 from app.services.ollama_client import ollama_client
 from app.services.unified_log_service import unified_log_service, WorkflowType, LogScope
@@ -554,40 +555,30 @@ class EnhancedEmailChatService:
                 except Exception as e:
                     self.logger.debug(f"Cache parsing failed: {e}")
 
-            # Use embedding service for semantic search with optimizations
+            # Semantic search with the date window and one-email-per-thread
+            # applied in the vector query, so every returned email is usable
+            from datetime import timezone
+            cutoff_date = datetime.now(timezone.utc) - timedelta(days=max_days_back)
             similar_emails = await email_embedding_service.search_similar_emails(
                 db=db,
                 query_text=query,
                 user_id=user_id,
-                limit=self.max_email_context * 2,  # Get more for better filtering
+                limit=self.max_email_context,
                 similarity_threshold=0.15,  # Much lower threshold for better recall
                 temporal_boost=0.2,
-                importance_boost=0.3
+                importance_boost=0.3,
+                filters=EmailSearchFilters(
+                    date_from=cutoff_date,
+                    date_field="received_at",
+                    one_per_thread=True
+                )
             )
 
-            # Filter by date range and optimize
-            from datetime import timezone
-            cutoff_date = datetime.now(timezone.utc) - timedelta(days=max_days_back)
             relevant_emails = []
-            seen_threads = set()  # Avoid duplicate thread emails
-
             for email, similarity_score in similar_emails:
-                # Handle timezone-aware comparison
-                email_date = email.received_at
-                if email_date and email_date.tzinfo is None:
-                    email_date = email_date.replace(tzinfo=timezone.utc)
-
-                if email_date and email_date >= cutoff_date:
-                    # Avoid duplicate thread emails for better performance
-                    if email.thread_id not in seen_threads:
-                        seen_threads.add(email.thread_id)
-                        # Add similarity score to email object for context
-                        email._similarity_score = similarity_score
-                        relevant_emails.append(email)
-
-                        # Stop once we have enough emails
-                        if len(relevant_emails) >= self.max_email_context:
-                            break
+                # Add similarity score to email object for context
+                email._similarity_score = similarity_score
+                relevant_emails.append(email)
 
             # Cache the results for future use
             if relevant_emails:
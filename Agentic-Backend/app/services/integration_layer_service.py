@@ -15,6 +15,8 @@ import json
 import logging
 import hashlib
 import hmac
+import random
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Callable, Union
 from dataclasses import dataclass, field
@@ -27,12 +29,19 @@ from aiohttp import web, ClientSession, FormData
 from aiohttp.web import Request, Response
 import aiohttp
 from urllib.parse import urlparse, parse_qs
+from sqlalchemy import select, update
 
 from app.services.workflow_automation_service import workflow_automation_service
 from app.services.pubsub_service import RedisPubSubService as PubSubService
-from app.services.system_metrics_service import SystemMetricsService
+from app.services.system_metrics_service import system_metrics_service
+from app.services.priority_queue import RedisPriorityQueue, QUEUE_NAMES_KEY
+from app.services.webhook_outbox import WebhookOutbox
+from app.services.rate_limiter import RedisTokenBucketLimiter, TokenBucket, RateLimitDecision
+from app.services.load_balancing import AdaptiveBalancer
+from app.config import settings
 from app.utils.logging import get_logger
-from app.db.database import get_db
+from app.db.database import get_db, get_session_context
+from app.db.models import WebhookSubscription as WebhookSubscriptionModel
 from app.db.models import (
     WebhookSubscription,
     WebhookDeliveryLog,
@@ -45,6 +54,9 @@ from app.db.models import (
 
 logger = get_logger(__name__)
 
+# How long a worker leaves a subscription this process has not loaded before looking again
+UNKNOWN_SUBSCRIPTION_RETRY_SECONDS = 60
+
 
 class QueuePriority(Enum):
     """Queue priority levels"""
@@ -76,6 +88,7 @@ class QueueItem:
     max_retries: int = 3
     processing_deadline: Optional[datetime] = None
     callback_url: Optional[str] = None
+    last_error: Optional[str] = None
 
 
 @dataclass
@@ -91,6 +104,7 @@ class WebhookSubscription:
     failure_count: int = 0
     headers: Dict[str, str] = field(default_factory=dict)
     filters: Dict[str, Any] = field(default_factory=dict)
+    batch_size: int = 1  # events per delivery request
 
 
 @dataclass
@@ -101,6 +115,7 @@ class APIEndpoint:
     handler: Callable
     requires_auth: bool = True
     rate_limit: Optional[int] = None  # requests per minute
+    burst_limit: Optional[int] = None  # bucket size; defaults to rate_limit
     timeout: int = 30
     description: str = ""
 
@@ -123,7 +138,7 @@ class IntegrationLayerService:
     def __init__(self):
         self.redis: Optional[redis.Redis] = None
         self.pubsub_service = PubSubService()
-        self.metrics_service = SystemMetricsService()
+        self.metrics_service = system_metrics_service
         self.workflow_service = workflow_automation_service
 
         # Core components
@@ -135,7 +150,7 @@ class IntegrationLayerService:
         # Configuration
         self.api_endpoints: Dict[str, APIEndpoint] = {}
         self.webhook_subscriptions: Dict[str, WebhookSubscription] = {}
-        self.processing_queues: Dict[str, List[QueueItem]] = {}
+        self.processing_queues: Dict[str, RedisPriorityQueue] = {}
         self.backend_services: Dict[str, Dict[str, Any]] = {}
 
     async def initialize(self):
@@ -163,8 +178,9 @@ class IntegrationLayerService:
             await self._load_backend_services()
 
             # Start background tasks
-            asyncio.create_task(self._process_queues_background())
-            asyncio.create_task(self._health_check_backends())
+            await self.webhook_manager.initialize()
+            await self.queue_manager.start()
+            asyncio.create_task(self.load_balancer._health_check_backends())
 
             logger.info("Integration Layer Service initialized successfully")
 
@@ -176,7 +192,10 @@ class IntegrationLayerService:
         """Shutdown the integration layer service"""
         try:
             # Stop background tasks
-            # (Tasks will be cancelled when the event loop stops)
+            if self.queue_manager:
+                await self.queue_manager.stop()
+            if self.webhook_manager:
+                await self.webhook_manager.shutdown()
 
             # Close Redis connection
             if self.redis:
@@ -199,6 +218,9 @@ class APIGateway:
         self.integration_service = integration_service
         self.rate_limits: Dict[str, Dict[str, Any]] = {}
         self.request_cache: Dict[str, Any] = {}
+        self.rate_limiter = RedisTokenBucketLimiter(integration_service.redis)
+        self.key_rate_limit = getattr(settings, 'api_gateway_key_rate_limit_per_minute', 600)
+        self.key_burst_limit = getattr(settings, 'api_gateway_key_burst_limit', 0)
 
     async def handle_request(self, request: Request) -> Response:
         """Handle incoming API requests"""
@@ -231,13 +253,14 @@ class APIGateway:
                     )
 
             # Check rate limiting
-            if endpoint.rate_limit:
-                rate_check = await self._check_rate_limit(request, endpoint)
-                if not rate_check['allowed']:
-                    return web.json_response(
-                        {"error": "Rate limit exceeded", "retry_after": rate_check['retry_after']},
-                        status=429
-                    )
+            rate_decision = await self._check_rate_limit(request, endpoint)
+            if rate_decision and not rate_decision.allowed:
+                headers = rate_decision.headers()
+                return web.json_response(
+                    {"error": "Rate limit exceeded", "retry_after": int(headers["Retry-After"])},
+                    status=429,
+                    headers=headers
+                )
 
             # Route to appropriate handler
             try:
@@ -253,6 +276,9 @@ class APIGateway:
                 # Log successful request
                 logger.info(f"API request completed: {method} {path}")
 
+                if rate_decision and isinstance(result, web.StreamResponse) and not result.prepared:
+                    result.headers.update(rate_decision.headers())
+
                 return result
 
             except asyncio.TimeoutError:
@@ -300,38 +326,37 @@ class APIGateway:
             logger.error(f"Authentication check error: {e}")
             return {"valid": False, "error": "Authentication system error"}
 
-    async def _check_rate_limit(self, request: Request, endpoint: APIEndpoint) -> Dict[str, Any]:
-        """Check rate limiting for the request"""
-        try:
-            # Get client identifier (IP or API key)
-            client_id = request.headers.get('X-API-Key') or request.remote
-
-            # Create rate limit key
-            rate_key = f"rate_limit:{client_id}:{endpoint.path}"
-
-            # Get current request count
-            current_count = await self.integration_service.redis.get(rate_key) or 0
-            current_count = int(current_count)
-
-            # Check if limit exceeded
-            if current_count >= endpoint.rate_limit:
-                # Calculate retry after time (1 minute window)
-                retry_after = 60
-                return {"allowed": False, "retry_after": retry_after}
-
-            # Increment counter
-            await self.integration_service.redis.incr(rate_key)
-
-            # Set expiry if this is the first request
-            if current_count == 0:
-                await self.integration_service.redis.expire(rate_key, 60)  # 1 minute window
-
-            return {"allowed": True}
+    async def _check_rate_limit(self, request: Request, endpoint: APIEndpoint) -> Optional[RateLimitDecision]:
+        """
+        Check and consume rate limit quota for the request.
+
+        The per-client bucket and, for rate limited endpoints, the per-client
+        endpoint bucket are checked and charged in one atomic Redis call.
+
+        Returns:
+            The limiter decision, or None if no limit applies or Redis is unavailable
+        """
+        # Get client identifier (IP or API key)
+        client_id = request.headers.get('X-API-Key') or request.remote
+
+        buckets = []
+        if self.key_rate_limit:
+            buckets.append(TokenBucket.per_minute(
+                f"rate_limit:{client_id}", self.key_rate_limit, self.key_burst_limit
+            ))
+        if endpoint.rate_limit:
+            buckets.append(TokenBucket.per_minute(
+                f"rate_limit:{client_id}:{endpoint.path}", endpoint.rate_limit, endpoint.burst_limit
+            ))
+        if not buckets:
+            return None
 
+        try:
+            return await self.rate_limiter.acquire(buckets)
         except Exception as e:
             logger.error(f"Rate limit check error: {e}")
             # Allow request on error to avoid blocking legitimate traffic
-            return {"allowed": True}
+            return None
 
     async def register_endpoint(self, endpoint: APIEndpoint):
         """Register a new API endpoint"""
@@ -350,18 +375,58 @@ class APIGateway:
 # ============================================================================
 
 class WebhookManager:
-    """Manages webhook subscriptions and notifications"""
+    """
+    Manages webhook subscriptions and notifications.
+
+    Triggering an event only writes it to the Redis delivery outbox (one
+    pipelined write, body serialized once). A pool of delivery workers leases
+    subscriptions with due deliveries, sends them (optionally batched) under
+    a per-endpoint concurrency limit, and reschedules failures with
+    exponential backoff and jitter. Subscription state changes are collected
+    in memory and flushed to the database periodically.
+    """
 
     def __init__(self, integration_service):
         self.integration_service = integration_service
         self.http_session: Optional[ClientSession] = None
+        self.outbox: Optional[WebhookOutbox] = None
+
+        self.worker_count = getattr(settings, 'webhook_delivery_workers', 8)
+        self.endpoint_concurrency = getattr(settings, 'webhook_endpoint_concurrency', 4)
+        self.default_batch_size = getattr(settings, 'webhook_default_batch_size', 1)
+        self.max_attempts = getattr(settings, 'webhook_max_attempts', 8)
+        self.retry_base_seconds = getattr(settings, 'webhook_retry_base_seconds', 1.0)
+        self.retry_max_seconds = getattr(settings, 'webhook_retry_max_seconds', 600.0)
+        self.deactivate_after_failures = getattr(settings, 'webhook_deactivate_after_failures', 5)
+        self.stats_flush_interval = getattr(settings, 'webhook_stats_flush_interval_seconds', 10.0)
+        self.poll_interval = getattr(settings, 'webhook_poll_interval_seconds', 1.0)
+
+        self._endpoint_limits: Dict[str, asyncio.Semaphore] = {}
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        # subscription_id -> column values awaiting the next flush
+        self._pending_updates: Dict[str, Dict[str, Any]] = {}
+        self.delivery_stats = {"events": 0, "delivered": 0, "failed_attempts": 0, "dead_lettered": 0, "requests": 0}
 
     async def initialize(self):
         """Initialize webhook manager"""
-        self.http_session = ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+        self.http_session = ClientSession(timeout=aiohttp.ClientTimeout(total=getattr(settings, 'webhook_request_timeout_seconds', 30)))
+        self.outbox = WebhookOutbox(
+            self.integration_service.redis,
+            event_ttl_seconds=getattr(settings, 'webhook_event_ttl_seconds', 259200)
+        )
+        self._tasks = [asyncio.create_task(self._delivery_worker(f"{uuid.uuid4().hex[:8]}-{i}")) for i in range(self.worker_count)]
+        self._tasks.append(asyncio.create_task(self._flush_subscription_updates_periodically()))
 
     async def shutdown(self):
         """Shutdown webhook manager"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        await self._flush_subscription_updates()
+
         if self.http_session:
             await self.http_session.close()
 
@@ -384,7 +449,8 @@ class WebhookManager:
                 events=[WebhookEvent(event) for event in subscription_data['events']],
                 secret=secret,
                 headers=subscription_data.get('headers', {}),
-                filters=subscription_data.get('filters', {})
+                filters=subscription_data.get('filters', {}),
+                batch_size=max(1, int(subscription_data.get('batch_size', self.default_batch_size)))
             )
 
             # Store subscription
@@ -408,6 +474,11 @@ class WebhookManager:
 
             # Remove from memory
             del self.integration_service.webhook_subscriptions[subscription_id]
+            self._pending_updates.pop(subscription_id, None)
+
+            # Drop undelivered events
+            if self.outbox:
+                await self.outbox.remove_subscription(subscription_id)
 
             # Remove from database
             await self._delete_webhook_subscription(subscription_id)
@@ -419,17 +490,14 @@ class WebhookManager:
             logger.error(f"Failed to remove webhook subscription: {e}")
             raise
 
-    async def trigger_webhook(self, event: WebhookEvent, data: Dict[str, Any]):
-        """Trigger webhooks for a specific event"""
-        try:
-            matching_subscriptions = [
-                sub for sub in self.integration_service.webhook_subscriptions.values()
-                if event in sub.events and sub.is_active
-            ]
-
-            if not matching_subscriptions:
-                return
+    async def trigger_webhook(self, event: WebhookEvent, data: Dict[str, Any]) -> int:
+        """
+        Queue an event for delivery to every matching subscription.
 
+        Returns:
+            Number of subscriptions the event was queued for
+        """
+        try:
             # Prepare webhook payload
             payload = {
                 "event": event.value,
@@ -437,68 +505,202 @@ class WebhookManager:
                 "data": data
             }
 
-            # Trigger webhooks asynchronously
-            tasks = [
-                self._send_webhook(subscription, payload)
-                for subscription in matching_subscriptions
+            matching_subscriptions = [
+                sub.id for sub in self.integration_service.webhook_subscriptions.values()
+                if event in sub.events and sub.is_active and self._matches_filters(payload, sub.filters)
             ]
 
-            await asyncio.gather(*tasks, return_exceptions=True)
+            if not matching_subscriptions:
+                return 0
+
+            event_id = f"{event.value}:{uuid.uuid4()}"
+            payload["event_id"] = event_id
+
+            # Serialized once; every delivery sends (and signs) these exact bytes
+            await self.outbox.add_event(event_id, json.dumps(payload, sort_keys=True, default=str), matching_subscriptions)
+            self.delivery_stats["events"] += 1
+            self._wakeup.set()
+            return len(matching_subscriptions)
 
         except Exception as e:
             logger.error(f"Failed to trigger webhooks for event {event.value}: {e}")
+            return 0
 
-    async def _send_webhook(self, subscription: WebhookSubscription, payload: Dict[str, Any]):
-        """Send webhook to a specific subscription"""
-        try:
-            # Check filters
-            if not self._matches_filters(payload, subscription.filters):
-                return
+    def get_delivery_stats(self) -> Dict[str, Any]:
+        """Process-local delivery counters"""
+        return {
+            **self.delivery_stats,
+            "workers": self.worker_count,
+            "pending_subscription_updates": len(self._pending_updates)
+        }
 
-            # Prepare headers
-            headers = {
-                'Content-Type': 'application/json',
-                'User-Agent': 'Agentic-Backend-Webhook/1.0',
-                'X-Webhook-ID': subscription.id,
-                'X-Webhook-Event': payload['event'],
-                **subscription.headers
-            }
+    async def _delivery_worker(self, worker_id: str):
+        """Lease subscriptions with due deliveries and send them"""
+        while True:
+            try:
+                subscription_id = await self.outbox.claim_subscription(worker_id)
+                if subscription_id is None:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                not_before = None
+                subscription = self.integration_service.webhook_subscriptions.get(subscription_id)
+                try:
+                    if subscription is None:
+                        # Not loaded in this process (created elsewhere, or being
+                        # removed by its unsubscribe): leave its deliveries alone
+                        not_before = time.time() + UNKNOWN_SUBSCRIPTION_RETRY_SECONDS
+                        continue
+                    if not subscription.is_active:
+                        # Keep its deliveries until it is reactivated or removed
+                        not_before = time.time() + 3600
+                        continue
+                    await self._deliver_due(subscription, worker_id)
+                finally:
+                    await self.outbox.release(subscription_id, worker_id, not_before)
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in webhook delivery worker {worker_id}: {e}")
+                await asyncio.sleep(1)
 
-            # Add signature for verification
-            signature = self._generate_signature(json.dumps(payload, sort_keys=True), subscription.secret)
-            headers['X-Webhook-Signature'] = signature
+    async def _deliver_due(self, subscription: WebhookSubscription, worker_id: str):
+        """Send a leased subscription's due deliveries in batches, renewing the lease per batch"""
+        limit = self._endpoint_limits.setdefault(urlparse(subscription.url).netloc, asyncio.Semaphore(self.endpoint_concurrency))
 
-            # Send webhook
-            async with self.http_session.post(
-                subscription.url,
-                json=payload,
-                headers=headers
-            ) as response:
+        while True:
+            if not await self.outbox.renew(subscription.id, worker_id):
+                # Lease expired and another worker may own the subscription now
+                logger.warning(f"Lost webhook delivery lease for {subscription.id}; stopping this drain")
+                return
 
-                # Update subscription stats
-                subscription.last_triggered = datetime.utcnow()
+            due = await self.outbox.take_due(subscription.id, subscription.batch_size)
+            if not due:
+                return
 
-                if response.status >= 200 and response.status < 300:
-                    subscription.failure_count = 0
-                    logger.info(f"Webhook sent successfully: {subscription.id} -> {subscription.url}")
-                else:
-                    subscription.failure_count += 1
-                    logger.warning(f"Webhook failed: {subscription.id} -> {subscription.url} (status: {response.status})")
+            # Bodies expire with the event TTL; those deliveries are dropped
+            expired = [event_id for event_id, body, _ in due if not body]
+            due = [delivery for delivery in due if delivery[1]]
+            if expired:
+                await self.outbox.complete(subscription.id, expired)
+            if not due:
+                continue
+
+            async with limit:
+                error = await self._send_webhook(subscription, due)
+
+            event_ids = [event_id for event_id, _, _ in due]
+            if error is None:
+                await self.outbox.complete(subscription.id, event_ids)
+                self.delivery_stats["delivered"] += len(event_ids)
+                self._record_delivery(subscription, success=True)
+                continue
+
+            delays = {event_id: self._retry_delay(attempts + 1) for event_id, _, attempts in due}
+            dead = await self.outbox.fail(subscription.id, delays, self.max_attempts, error)
+            self.delivery_stats["failed_attempts"] += len(event_ids)
+            self.delivery_stats["dead_lettered"] += len(dead)
+            if dead:
+                logger.error(f"Dead-lettered {len(dead)} webhook deliveries to {subscription.id} after {self.max_attempts} attempts: {error}")
+            self._record_delivery(subscription, success=False)
+            return
+
+    async def _send_webhook(self, subscription: WebhookSubscription, deliveries: List[tuple]) -> Optional[str]:
+        """Send one request for a batch of deliveries. Returns an error description, or None on success"""
+        if len(deliveries) == 1 and subscription.batch_size == 1:
+            event_id, body, attempts = deliveries[0]
+            event_name = event_id.rsplit(":", 1)[0]
+        else:
+            body = '{"events": [' + ", ".join(delivery[1] for delivery in deliveries) + ']}'
+            event_name = "batch"
+            attempts = max(delivery[2] for delivery in deliveries)
+
+        # Prepare headers
+        headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': 'Agentic-Backend-Webhook/1.0',
+            'X-Webhook-ID': subscription.id,
+            'X-Webhook-Event': event_name,
+            'X-Webhook-Delivery-Count': str(len(deliveries)),
+            'X-Webhook-Attempt': str(attempts + 1),
+            **subscription.headers
+        }
 
-                    # Deactivate after too many failures
-                    if subscription.failure_count >= 5:
-                        subscription.is_active = False
-                        logger.error(f"Deactivated webhook subscription {subscription.id} due to repeated failures")
+        # Signature over the exact bytes sent
+        headers['X-Webhook-Signature'] = self._generate_signature(body, subscription.secret)
 
-                # Persist updated subscription
-                await self._persist_webhook_subscription(subscription)
+        self.delivery_stats["requests"] += 1
+        try:
+            async with self.http_session.post(subscription.url, data=body.encode(), headers=headers) as response:
+                if 200 <= response.status < 300:
+                    logger.debug(f"Webhook sent successfully: {subscription.id} -> {subscription.url} ({len(deliveries)} events)")
+                    return None
+                logger.warning(f"Webhook failed: {subscription.id} -> {subscription.url} (status: {response.status})")
+                return f"HTTP {response.status}"
 
         except Exception as e:
-            logger.error(f"Failed to send webhook {subscription.id}: {e}")
+            logger.warning(f"Failed to send webhook {subscription.id}: {e}")
+            return type(e).__name__ + (f": {e}" if str(e) else "")
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Exponential backoff with equal jitter for the given failed attempt number"""
+        delay = min(self.retry_max_seconds, self.retry_base_seconds * (2 ** (attempt - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _record_delivery(self, subscription: WebhookSubscription, success: bool):
+        """Update subscription state in memory and mark it for the next flush"""
+        subscription.last_triggered = datetime.utcnow()
+
+        if success:
+            subscription.failure_count = 0
+        else:
             subscription.failure_count += 1
 
-            if subscription.failure_count >= 5:
+            # Deactivate after too many consecutive failures
+            if subscription.failure_count >= self.deactivate_after_failures and subscription.is_active:
                 subscription.is_active = False
+                logger.error(f"Deactivated webhook subscription {subscription.id} due to repeated failures")
+
+        self._pending_updates[subscription.id] = {
+            "last_triggered": subscription.last_triggered,
+            "failure_count": subscription.failure_count,
+            "is_active": subscription.is_active
+        }
+
+    async def _flush_subscription_updates_periodically(self):
+        while True:
+            try:
+                await asyncio.sleep(self.stats_flush_interval)
+                await self._flush_subscription_updates()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error flushing webhook subscription updates: {e}")
+
+    async def _flush_subscription_updates(self):
+        """Write aggregated subscription state in one bulk UPDATE"""
+        if not self._pending_updates:
+            return
+
+        updates, self._pending_updates = self._pending_updates, {}
+        try:
+            async with get_session_context() as session:
+                await session.execute(
+                    update(WebhookSubscriptionModel),
+                    [{"id": uuid.UUID(subscription_id), **values} for subscription_id, values in updates.items()]
+                )
+                await session.commit()
+
+        except Exception as e:
+            logger.error(f"Failed to flush {len(updates)} webhook subscription updates: {e}")
+            # Keep them for the next flush unless newer values arrived meanwhile
+            for subscription_id, values in updates.items():
+                self._pending_updates.setdefault(subscription_id, values)
 
     def _matches_filters(self, payload: Dict[str, Any], filters: Dict[str, Any]) -> bool:
         """Check if webhook payload matches subscription filters"""
@@ -540,11 +742,11 @@ class WebhookManager:
     async def _persist_webhook_subscription(self, subscription: WebhookSubscription):
         """Persist webhook subscription to database"""
         try:
-            async with get_db() as session:
-                db_subscription = WebhookSubscription(
-                    id=subscription.id,
+            async with get_session_context() as session:
+                db_subscription = WebhookSubscriptionModel(
+                    id=uuid.UUID(subscription.id),
                     url=subscription.url,
-                    events=subscription.events,
+                    events=[event.value for event in subscription.events],
                     secret=subscription.secret,
                     is_active=subscription.is_active,
                     created_at=subscription.created_at,
@@ -553,7 +755,6 @@ class WebhookManager:
                 )
                 session.add(db_subscription)
                 await session.commit()
-                await session.refresh(db_subscription)
 
                 logger.info(f"Persisted webhook subscription: {subscription.id}")
 
@@ -564,10 +765,10 @@ class WebhookManager:
     async def _delete_webhook_subscription(self, subscription_id: str):
         """Delete webhook subscription from database"""
         try:
-            async with get_db() as session:
+            async with get_session_context() as session:
                 # Find the subscription
                 result = await session.execute(
-                    select(WebhookSubscription).where(WebhookSubscription.id == subscription_id)
+                    select(WebhookSubscriptionModel).where(WebhookSubscriptionModel.id == uuid.UUID(subscription_id))
                 )
                 db_subscription = result.scalar_one_or_none()
 
@@ -588,99 +789,135 @@ class WebhookManager:
 # ============================================================================
 
 class QueueManager:
-    """Manages asynchronous processing queues with priority support"""
+    """
+    Manages asynchronous processing queues with priority support.
+
+    Queues are durable Redis priority queues (see ``RedisPriorityQueue``).
+    Each queue has a dispatcher that claims batches of up to the number of
+    free worker slots and processes them concurrently, so throughput scales
+    with the configured concurrency rather than a polling interval. Items
+    that fail are retried up to ``max_retries`` and then dead-lettered.
+    """
 
     def __init__(self, integration_service):
         self.integration_service = integration_service
         self.processing_workers: Dict[str, asyncio.Task] = {}
+        self.default_concurrency = getattr(settings, 'integration_queue_worker_concurrency', 4)
+        self.batch_size = getattr(settings, 'integration_queue_dequeue_batch_size', 10)
+        self.poll_interval = getattr(settings, 'integration_queue_poll_interval_seconds', 0.5)
+        self.maintenance_interval = getattr(settings, 'integration_queue_maintenance_interval_seconds', 5.0)
+        self.queue_concurrency: Dict[str, int] = {}
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        self._active: Dict[str, set] = {}
+        self._maintenance_task: Optional[asyncio.Task] = None
+
+    def get_queue(self, queue_name: str) -> RedisPriorityQueue:
+        """Get (or create) the queue engine for a queue name"""
+        queues = self.integration_service.processing_queues
+        queue = queues.get(queue_name)
+        if queue is None:
+            queue = RedisPriorityQueue(
+                self.integration_service.redis,
+                queue_name,
+                visibility_timeout=getattr(settings, 'integration_queue_visibility_timeout_seconds', 300),
+                default_deadline_seconds=getattr(settings, 'integration_queue_default_deadline_seconds', 3600),
+                dead_letter_retention_seconds=getattr(settings, 'integration_queue_dead_letter_retention_seconds', 86400)
+            )
+            queues[queue_name] = queue
+        return queue
+
+    async def start(self):
+        """Start dispatchers for all known queues and the maintenance loop"""
+        for queue_name in await self.integration_service.redis.smembers(QUEUE_NAMES_KEY):
+            self._ensure_dispatcher(queue_name)
+        self._maintenance_task = asyncio.create_task(self._maintain_queues())
+
+    async def stop(self):
+        """Stop dispatchers; in-flight items are reclaimed after their visibility timeout"""
+        tasks = list(self.processing_workers.values())
+        if self._maintenance_task:
+            tasks.append(self._maintenance_task)
+        for active in self._active.values():
+            tasks.extend(active)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.processing_workers.clear()
+        self._maintenance_task = None
+
+    def set_queue_concurrency(self, queue_name: str, concurrency: int):
+        """Set how many items of a queue this process works on at once"""
+        self.queue_concurrency[queue_name] = max(1, concurrency)
+        if queue_name in self._wakeups:
+            self._wakeups[queue_name].set()
 
     async def enqueue_item(self, queue_name: str, item_data: Dict[str, Any], priority: QueuePriority = QueuePriority.NORMAL) -> str:
         """Add an item to a processing queue"""
         try:
-            item = QueueItem(
-                id=str(uuid.uuid4()),
-                type=item_data.get('type', 'generic'),
-                priority=priority,
+            item_id = await self.get_queue(queue_name).enqueue(
+                item_type=item_data.get('type', 'generic'),
                 data=item_data,
-                created_at=datetime.utcnow(),
-                max_retries=item_data.get('max_retries', 3),
-                processing_deadline=item_data.get('deadline'),
+                priority=priority.value,
+                max_retries=int(item_data.get('max_retries', 3)),
+                deadline=item_data.get('deadline'),
                 callback_url=item_data.get('callback_url')
             )
 
-            # Initialize queue if it doesn't exist
-            if queue_name not in self.integration_service.processing_queues:
-                self.integration_service.processing_queues[queue_name] = []
+            self._ensure_dispatcher(queue_name)
+            self._wakeups[queue_name].set()
 
-            # Add item to queue (maintain priority order)
-            queue = self.integration_service.processing_queues[queue_name]
-            insert_index = 0
-
-            for i, existing_item in enumerate(queue):
-                if item.priority.value > existing_item.priority.value:
-                    insert_index = i
-                    break
-                insert_index = i + 1
-
-            queue.insert(insert_index, item)
-
-            # Persist to Redis for distributed processing
-            await self._persist_queue_item(queue_name, item)
-
-            logger.info(f"Enqueued item {item.id} in queue {queue_name} with priority {priority.name}")
-            return item.id
+            logger.debug(f"Enqueued item {item_id} in queue {queue_name} with priority {priority.name}")
+            return item_id
 
         except Exception as e:
             logger.error(f"Failed to enqueue item: {e}")
             raise
 
-    async def dequeue_item(self, queue_name: str) -> Optional[QueueItem]:
-        """Remove and return the next item from a queue"""
+    async def dequeue_items(self, queue_name: str, count: int = 1) -> List[QueueItem]:
+        """
+        Claim up to ``count`` items from a queue.
+
+        Claimed items must be finished with ``complete_item`` or ``fail_item``
+        before the visibility timeout, or they are returned to the queue.
+        """
         try:
-            queue = self.integration_service.processing_queues.get(queue_name, [])
+            return [self._to_queue_item(item) for item in await self.get_queue(queue_name).dequeue(count)]
+        except Exception as e:
+            logger.error(f"Failed to dequeue items from {queue_name}: {e}")
+            return []
 
-            if not queue:
-                return None
+    async def dequeue_item(self, queue_name: str) -> Optional[QueueItem]:
+        """Claim the next item from a queue"""
+        items = await self.dequeue_items(queue_name, 1)
+        return items[0] if items else None
 
-            # Get highest priority item
-            item = queue.pop(0)
+    async def complete_item(self, queue_name: str, item_id: str) -> bool:
+        """Acknowledge a claimed item as processed"""
+        return await self.get_queue(queue_name).ack(item_id)
 
-            # Remove from Redis
-            await self._remove_queue_item(queue_name, item.id)
+    async def fail_item(self, queue_name: str, item_id: str, error: str, dead_letter: bool = False) -> Optional[str]:
+        """Record a failed attempt; returns "retried", "dead_lettered" or None if not in flight"""
+        return await self.get_queue(queue_name).fail(item_id, error, dead_letter=dead_letter)
 
-            logger.info(f"Dequeued item {item.id} from queue {queue_name}")
-            return item
+    async def remove_item(self, queue_name: str, item_id: str) -> Optional[QueueItem]:
+        """Remove an item from a queue in any state"""
+        item = await self.get_queue(queue_name).remove(item_id)
+        return self._to_queue_item(item) if item else None
 
-        except Exception as e:
-            logger.error(f"Failed to dequeue item from {queue_name}: {e}")
-            return None
+    async def list_items(self, queue_name: str, limit: int = 50, dead_letter: bool = False) -> List[QueueItem]:
+        """Items at the head of a queue, or its most recent dead letters"""
+        return [self._to_queue_item(item) for item in await self.get_queue(queue_name).peek(limit, dead=dead_letter)]
+
+    async def list_queues(self) -> List[str]:
+        """Names of all queues that have ever had items enqueued"""
+        return sorted(await self.integration_service.redis.smembers(QUEUE_NAMES_KEY))
 
     async def get_queue_stats(self, queue_name: str) -> Dict[str, Any]:
         """Get statistics for a processing queue"""
         try:
-            queue = self.integration_service.processing_queues.get(queue_name, [])
-
-            stats = {
-                "queue_name": queue_name,
-                "total_items": len(queue),
-                "items_by_priority": {},
-                "oldest_item_age_seconds": None,
-                "average_wait_time_seconds": None
-            }
-
-            if queue:
-                # Count items by priority
-                priority_counts = {}
-                for item in queue:
-                    priority_name = item.priority.name
-                    priority_counts[priority_name] = priority_counts.get(priority_name, 0) + 1
-
-                stats["items_by_priority"] = priority_counts
-
-                # Calculate oldest item age
-                oldest_item = min(queue, key=lambda x: x.created_at)
-                stats["oldest_item_age_seconds"] = (datetime.utcnow() - oldest_item.created_at).total_seconds()
-
+            stats = await self.get_queue(queue_name).stats()
+            stats["concurrency"] = self.queue_concurrency.get(queue_name, self.default_concurrency)
+            stats["active_workers"] = len(self._active.get(queue_name, ()))
             return stats
 
         except Exception as e:
@@ -688,21 +925,13 @@ class QueueManager:
             return {"error": str(e)}
 
     async def retry_failed_item(self, queue_name: str, item_id: str) -> bool:
-        """Retry processing a failed queue item"""
+        """Retry processing a dead-lettered queue item"""
         try:
-            # Find item in Redis (for failed items that were removed from memory)
-            item_data = await self.integration_service.redis.hgetall(f"queue:{queue_name}:failed:{item_id}")
-
-            if not item_data:
+            if not await self.get_queue(queue_name).retry_dead(item_id):
                 return False
 
-            # Recreate item and re-enqueue
-            item_data['retry_count'] = str(int(item_data.get('retry_count', 0)) + 1)
-
-            await self.enqueue_item(queue_name, item_data, QueuePriority(item_data.get('priority', 2)))
-
-            # Remove from failed items
-            await self.integration_service.redis.delete(f"queue:{queue_name}:failed:{item_id}")
+            self._ensure_dispatcher(queue_name)
+            self._wakeups[queue_name].set()
 
             logger.info(f"Retried failed item {item_id} in queue {queue_name}")
             return True
@@ -711,29 +940,75 @@ class QueueManager:
             logger.error(f"Failed to retry item {item_id}: {e}")
             return False
 
-    async def _process_queues_background(self):
-        """Background task to process queued items"""
+    def _ensure_dispatcher(self, queue_name: str):
+        task = self.processing_workers.get(queue_name)
+        if task is None or task.done():
+            self._wakeups.setdefault(queue_name, asyncio.Event())
+            self._active.setdefault(queue_name, set())
+            self.processing_workers[queue_name] = asyncio.create_task(self._dispatch_queue(queue_name))
+
+    async def _dispatch_queue(self, queue_name: str):
+        """Claim batches of items as worker slots free up and process them concurrently"""
+        queue = self.get_queue(queue_name)
+        wakeup = self._wakeups[queue_name]
+        active = self._active[queue_name]
+
         while True:
             try:
-                # Process each queue
-                for queue_name in list(self.integration_service.processing_queues.keys()):
-                    item = await self.dequeue_item(queue_name)
+                free_slots = self.queue_concurrency.get(queue_name, self.default_concurrency) - len(active)
+                if free_slots <= 0:
+                    await asyncio.wait(active, return_when=asyncio.FIRST_COMPLETED)
+                    continue
 
-                    if item:
-                        # Process item asynchronously
-                        asyncio.create_task(self._process_queue_item(queue_name, item))
+                wakeup.clear()
+                items = await queue.dequeue(min(free_slots, self.batch_size))
+                if not items:
+                    # Local enqueues wake us immediately; the timeout picks up other processes' items
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
 
-                # Wait before next processing cycle
-                await asyncio.sleep(1)
+                for item in items:
+                    task = asyncio.create_task(self._process_queue_item(queue_name, self._to_queue_item(item)))
+                    active.add(task)
+                    task.add_done_callback(active.discard)
 
+            except asyncio.CancelledError:
+                break
             except Exception as e:
-                logger.error(f"Error in queue processing background task: {e}")
+                logger.error(f"Error dispatching queue {queue_name}: {e}")
                 await asyncio.sleep(5)  # Wait longer on error
 
+    async def _maintain_queues(self):
+        """Reclaim expired in-flight items and start dispatchers for queues created elsewhere"""
+        while True:
+            try:
+                await asyncio.sleep(self.maintenance_interval)
+                for queue_name in await self.integration_service.redis.smembers(QUEUE_NAMES_KEY):
+                    self._ensure_dispatcher(queue_name)
+                    result = await self.get_queue(queue_name).reclaim()
+                    if result["expired"]:
+                        logger.warning(f"Reclaimed {result['expired']} expired in-flight items in queue {queue_name}")
+                        self._wakeups[queue_name].set()
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in queue maintenance task: {e}")
+
     async def _process_queue_item(self, queue_name: str, item: QueueItem):
         """Process a single queue item"""
+        queue = self.get_queue(queue_name)
         try:
-            logger.info(f"Processing queue item {item.id} of type {item.type}")
+            if item.processing_deadline and item.processing_deadline < datetime.utcnow():
+                await queue.fail(item.id, "processing deadline exceeded", dead_letter=True)
+                if item.callback_url:
+                    await self._send_processing_callback(item, {"status": "failed", "error": "processing deadline exceeded"})
+                return
+
+            logger.debug(f"Processing queue item {item.id} of type {item.type}")
 
             # Process based on item type
             if item.type == 'workflow_execution':
@@ -746,26 +1021,21 @@ class QueueManager:
                 # Generic processing
                 await self._process_generic_item(item)
 
+            await queue.ack(item.id)
+
             # Send callback if specified
             if item.callback_url:
                 await self._send_processing_callback(item, {"status": "completed"})
 
+        except asyncio.CancelledError:
+            # Shutdown: leave the item in flight to be reclaimed by any worker
+            raise
         except Exception as e:
             logger.error(f"Failed to process queue item {item.id}: {e}")
 
-            # Handle retry logic
-            item.retry_count += 1
-
-            if item.retry_count < item.max_retries:
-                # Re-enqueue for retry
-                await self.enqueue_item(queue_name, item.data, item.priority)
-            else:
-                # Mark as failed
-                await self._mark_item_failed(queue_name, item)
-
-                # Send failure callback
-                if item.callback_url:
-                    await self._send_processing_callback(item, {"status": "failed", "error": str(e)})
+            outcome = await queue.fail(item.id, str(e))
+            if outcome == "dead_lettered" and item.callback_url:
+                await self._send_processing_callback(item, {"status": "failed", "error": str(e)})
 
     async def _process_workflow_item(self, item: QueueItem):
         """Process a workflow execution item"""
@@ -792,27 +1062,6 @@ class QueueManager:
         # Placeholder for generic processing logic
         logger.info(f"Processing generic item: {item.data}")
 
-    async def _mark_item_failed(self, queue_name: str, item: QueueItem):
-        """Mark a queue item as failed"""
-        try:
-            # Store in Redis for potential retry
-            failed_key = f"queue:{queue_name}:failed:{item.id}"
-            item_data = {
-                "id": item.id,
-                "type": item.type,
-                "priority": item.priority.value,
-                "data": json.dumps(item.data),
-                "retry_count": item.retry_count,
-                "failed_at": datetime.utcnow().isoformat(),
-                "error": "Processing failed"
-            }
-
-            await self.integration_service.redis.hset(failed_key, mapping=item_data)
-            await self.integration_service.redis.expire(failed_key, 86400)  # 24 hours
-
-        except Exception as e:
-            logger.error(f"Failed to mark item {item.id} as failed: {e}")
-
     async def _send_processing_callback(self, item: QueueItem, result: Dict[str, Any]):
         """Send callback notification for processed item"""
         try:
@@ -822,67 +1071,20 @@ class QueueManager:
         except Exception as e:
             logger.error(f"Failed to send callback for item {item.id}: {e}")
 
-    async def _persist_queue_item(self, queue_name: str, item: QueueItem):
-        """Persist queue item to database and Redis"""
-        try:
-            # Persist to database
-            async with get_db() as session:
-                db_item = QueueItem(
-                    id=item.id,
-                    queue_name=queue_name,
-                    type=item.type,
-                    priority=item.priority.name.lower(),
-                    data=item.data,
-                    status="pending",
-                    created_at=item.created_at,
-                    retry_count=item.retry_count,
-                    max_retries=item.max_retries,
-                    callback_url=item.callback_url,
-                    processing_deadline=item.processing_deadline
-                )
-                session.add(db_item)
-                await session.commit()
-
-            # Also persist to Redis for fast access
-            item_key = f"queue:{queue_name}:item:{item.id}"
-            item_data = {
-                "id": item.id,
-                "type": item.type,
-                "priority": item.priority.value,
-                "data": json.dumps(item.data),
-                "created_at": item.created_at.isoformat(),
-                "retry_count": item.retry_count,
-                "max_retries": item.max_retries,
-                "callback_url": item.callback_url or ""
-            }
-
-            await self.integration_service.redis.hset(item_key, mapping=item_data)
-
-        except Exception as e:
-            logger.error(f"Failed to persist queue item {item.id}: {e}")
-
-    async def _remove_queue_item(self, queue_name: str, item_id: str):
-        """Remove queue item from database and Redis"""
-        try:
-            # Remove from database
-            async with get_db() as session:
-                result = await session.execute(
-                    select(QueueItem).where(
-                        QueueItem.id == item_id,
-                        QueueItem.queue_name == queue_name
-                    )
-                )
-                db_item = result.scalar_one_or_none()
-                if db_item:
-                    await session.delete(db_item)
-                    await session.commit()
-
-            # Remove from Redis
-            item_key = f"queue:{queue_name}:item:{item_id}"
-            await self.integration_service.redis.delete(item_key)
-
-        except Exception as e:
-            logger.error(f"Failed to remove queue item {item_id}: {e}")
+    @staticmethod
+    def _to_queue_item(item: Dict[str, Any]) -> QueueItem:
+        return QueueItem(
+            id=item["id"],
+            type=item["type"],
+            priority=QueuePriority(item["priority"]),
+            data=item["data"],
+            created_at=datetime.utcfromtimestamp(item["created_at"]),
+            retry_count=item["retry_count"],
+            max_retries=item["max_retries"],
+            processing_deadline=datetime.utcfromtimestamp(item["deadline"]) if item["deadline"] else None,
+            callback_url=item["callback_url"],
+            last_error=item.get("last_error")
+        )
 
 
 # ============================================================================
@@ -896,7 +1098,15 @@ class LoadBalancer:
         self.integration_service = integration_service
         self.backend_health: Dict[str, bool] = {}
         self.request_counts: Dict[str, int] = {}
-        self.response_times: Dict[str, List[float]] = {}
+        self.health_check_interval = getattr(settings, 'load_balancer_health_check_interval_seconds', 30)
+        self.balancer = AdaptiveBalancer(
+            strategy=getattr(settings, 'load_balancer_strategy', 'p2c'),
+            ewma_alpha=getattr(settings, 'load_balancer_ewma_alpha', 0.3),
+            consecutive_failures=getattr(settings, 'load_balancer_ejection_consecutive_failures', 5),
+            base_ejection_seconds=getattr(settings, 'load_balancer_base_ejection_seconds', 30.0),
+            max_ejection_percent=getattr(settings, 'load_balancer_max_ejection_percent', 50.0),
+            slow_start_seconds=getattr(settings, 'load_balancer_slow_start_seconds', 30.0)
+        )
 
     async def distribute_request(self, request_type: str, request_data: Dict[str, Any]) -> Dict[str, Any]:
         """Distribute a request to the most appropriate backend"""
@@ -944,6 +1154,7 @@ class LoadBalancer:
                 await session.commit()
 
             # Add to in-memory cache
+            self.balancer.add_backend(backend_id, weight=backend_config.get("weight", 1.0))
             self.integration_service.backend_services[backend_id] = {
                 "config": backend_config,
                 "health": True,
@@ -976,6 +1187,7 @@ class LoadBalancer:
                     await session.commit()
 
             # Remove from in-memory cache
+            self.balancer.remove_backend(backend_id)
             if backend_id in self.integration_service.backend_services:
                 del self.integration_service.backend_services[backend_id]
                 logger.info(f"Unregistered backend: {backend_id}")
@@ -990,14 +1202,18 @@ class LoadBalancer:
             stats = {
                 "total_backends": len(self.integration_service.backend_services),
                 "healthy_backends": sum(1 for b in self.integration_service.backend_services.values() if b["health"]),
+                "ejected_backends": sum(1 for backend_id in self.integration_service.backend_services if self.balancer.is_ejected(backend_id)),
+                "strategy": self.balancer.strategy,
                 "backend_details": {}
             }
 
             for backend_id, backend_info in self.integration_service.backend_services.items():
+                last_health_check = backend_info["last_health_check"]
                 stats["backend_details"][backend_id] = {
                     "health": backend_info["health"],
-                    "last_health_check": backend_info["last_health_check"].isoformat(),
-                    "stats": backend_info["stats"]
+                    "last_health_check": last_health_check.isoformat() if last_health_check else None,
+                    "stats": backend_info["stats"],
+                    "balancer": self.balancer.get_state(backend_id)
                 }
 
             return stats
@@ -1027,36 +1243,9 @@ class LoadBalancer:
             return []
 
     async def _select_best_backend(self, available_backends: List[str], request_data: Dict[str, Any]) -> str:
-        """Select the best backend using load balancing algorithm"""
+        """Select a backend by outstanding requests and EWMA latency, skipping ejected backends"""
         try:
-            if len(available_backends) == 1:
-                return available_backends[0]
-
-            # Use round-robin with health and load consideration
-            backend_scores = {}
-
-            for backend_id in available_backends:
-                backend_info = self.integration_service.backend_services[backend_id]
-                stats = backend_info["stats"]
-
-                # Calculate score based on multiple factors
-                health_score = 1.0 if backend_info["health"] else 0.0
-                load_score = max(0, 1.0 - (stats["active_requests"] / 10))  # Prefer less loaded
-                response_time_score = max(0, 1.0 - (stats["average_response_time"] / 5000))  # Prefer faster
-                error_rate_score = max(0, 1.0 - stats["error_rate"])  # Prefer lower error rate
-
-                # Weighted score
-                total_score = (
-                    health_score * 0.4 +
-                    load_score * 0.3 +
-                    response_time_score * 0.2 +
-                    error_rate_score * 0.1
-                )
-
-                backend_scores[backend_id] = total_score
-
-            # Select backend with highest score
-            return max(backend_scores, key=backend_scores.get)
+            return self.balancer.select(available_backends)
 
         except Exception as e:
             logger.error(f"Failed to select best backend: {e}")
@@ -1071,36 +1260,27 @@ class LoadBalancer:
 
             # Increment active request count
             backend_info["stats"]["active_requests"] += 1
+            self.balancer.on_request_start(backend_id)
+            start_time = time.monotonic()
+            success = False
 
             try:
-                # Simulate backend processing (replace with actual backend call)
-                start_time = datetime.utcnow()
-
                 # Here you would make actual call to backend service
                 result = await self._call_backend_service(backend_config, request_data)
-
-                # Calculate response time
-                response_time = (datetime.utcnow() - start_time).total_seconds() * 1000
-
-                # Update response time statistics
-                if backend_id not in self.response_times:
-                    self.response_times[backend_id] = []
-
-                self.response_times[backend_id].append(response_time)
-
-                # Keep only last 100 response times
-                if len(self.response_times[backend_id]) > 100:
-                    self.response_times[backend_id].pop(0)
-
-                # Update average response time
-                backend_info["stats"]["average_response_time"] = sum(self.response_times[backend_id]) / len(self.response_times[backend_id])
-
+                success = "error" not in result
                 return result
 
             finally:
+                response_time = (time.monotonic() - start_time) * 1000
+                self.balancer.on_request_end(backend_id, response_time, success)
+
                 # Decrement active request count
                 backend_info["stats"]["active_requests"] -= 1
                 backend_info["stats"]["total_requests"] += 1
+                # The backend may have been unregistered mid-request; keep the last average then
+                ewma_latency_ms = self.balancer.get_state(backend_id).get("ewma_latency_ms")
+                if ewma_latency_ms is not None:
+                    backend_info["stats"]["average_response_time"] = ewma_latency_ms
 
         except Exception as e:
             logger.error(f"Failed to route to backend {backend_id}: {e}")
@@ -1138,7 +1318,7 @@ class LoadBalancer:
         """Background task to health check all backends"""
         while True:
             try:
-                for backend_id, backend_info in self.integration_service.backend_services.items():
+                for backend_id, backend_info in list(self.integration_service.backend_services.items()):
                     try:
                         # Perform health check
                         is_healthy = await self._check_backend_health(backend_info["config"])
@@ -1152,10 +1332,14 @@ class LoadBalancer:
 
                     except Exception as e:
                         logger.error(f"Health check failed for backend {backend_id}: {e}")
+                        is_healthy = False
                         backend_info["health"] = False
 
+                    # Recovered backends slow-start in the balancer
+                    self.balancer.set_health(backend_id, is_healthy)
+
                 # Wait before next health check cycle
-                await asyncio.sleep(30)  # Check every 30 seconds
+                await asyncio.sleep(self.health_check_interval)
 
             except Exception as e:
                 logger.error(f"Error in backend health check task: {e}")
@@ -1166,7 +1350,7 @@ class LoadBalancer:
         try:
             # Placeholder health check implementation
             # In real implementation, this would make HTTP call to backend health endpoint
-            health_url = backend_config.get("health_url")
+            health_url = backend_config.get("health_check_url") or backend_config.get("health_url")
 
             if health_url:
                 async with ClientSession() as session:
@@ -1576,8 +1760,8 @@ IntegrationLayerService._handle_backend_stats = _handle_backend_stats
 async def _load_webhook_subscriptions(self):
     """Load webhook subscriptions from database"""
     try:
-        async with get_db() as session:
-            result = await session.execute(select(WebhookSubscription))
+        async with get_session_context() as session:
+            result = await session.execute(select(WebhookSubscriptionModel))
             db_subscriptions = result.scalars().all()
 
             for db_sub in db_subscriptions:
@@ -1585,14 +1769,15 @@ async def _load_webhook_subscriptions(self):
                 subscription = WebhookSubscription(
                     id=str(db_sub.id),
                     url=db_sub.url,
-                    events=db_sub.events,
+                    events=[WebhookEvent(event) for event in db_sub.events],
                     secret=db_sub.secret,
                     is_active=db_sub.is_active,
                     created_at=db_sub.created_at,
                     last_triggered=db_sub.last_triggered,
                     failure_count=db_sub.failure_count,
-                    headers=db_sub.headers,
-                    filters=db_sub.filters
+                    headers=db_sub.headers or {},
+                    filters=db_sub.filters or {},
+                    batch_size=self.webhook_manager.default_batch_size
                 )
                 self.webhook_subscriptions[subscription.id] = subscription
 
@@ -1624,6 +1809,11 @@ async def _load_backend_services(self):
                     **db_service.config
                 }
 
+                # Known backends don't slow-start on process restart
+                balancer = self.load_balancer.balancer
+                balancer.add_backend(str(db_service.id), weight=service_config.get("weight", 1.0), slow_start=False)
+                balancer.set_health(str(db_service.id), db_service.health_status == "healthy")
+
                 self.backend_services[str(db_service.id)] = {
                     "config": service_config,
                     "health": db_service.health_status == "healthy",
@@ -29,6 +29,7 @@ from app.services.ollama_client import OllamaClient
 from app.services.vision_ai_service import VisionAIService
 from app.services.semantic_processing_service import SemanticProcessingService
 from app.services.media_download_service import MediaDownloadService
+from app.services.relationship_extraction_service import relationship_extraction_service
 from app.connectors.social_media import TwitterConnector
 from app.utils.logging import get_logger
 
@@ -787,6 +788,14 @@ class KnowledgeBaseWorkflowService:
             )
         )
 
+        # Contribute the item to the shared knowledge graph (no-op unless enabled)
+        await relationship_extraction_service.ingest_content(
+            {"text": item.full_content},
+            source_type="knowledge_base_item",
+            source_id=str(item.id),
+            db=self.db
+        )
+
         return {
             "embeddings_generated": True,
             "model_used": model,
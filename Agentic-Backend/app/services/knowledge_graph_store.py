@@ -0,0 +1,433 @@
+"""
+Knowledge Graph Store for the persistent, shared knowledge graph.
+
+Extraction results from every content source (knowledge base items,
+emails, ...) are merged incrementally into one Postgres-backed graph:
+- Entities are resolved through a normalized-text alias table, so the same
+  entity extracted from different items maps to one node
+- Relationships are upserted on (source, target, type), accumulating
+  evidence instead of duplicating edges
+- Mentions record which source items each entity came from
+- Neighborhood / k-hop queries run as a single recursive CTE
+"""
+
+import uuid
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, AsyncIterator
+
+from sqlalchemy import select, update, delete, text, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_session_context
+from app.db.models.knowledge_graph import (
+    KnowledgeGraphEntity,
+    KnowledgeGraphAlias,
+    KnowledgeGraphRelationship,
+    KnowledgeGraphMention
+)
+from app.services.relationship_extraction_service import (
+    Entity,
+    Relationship,
+    KnowledgeGraph,
+    normalize_entity_text
+)
+from app.utils.logging import get_logger
+
+logger = get_logger("knowledge_graph_store")
+
+
+# Walks edges in both directions; the non-recursive "edges" CTE is inlined
+# by Postgres so each step uses the source/target indexes.
+NEIGHBORHOOD_QUERY = text("""
+    WITH RECURSIVE edges AS (
+        SELECT source_entity_id AS from_id, target_entity_id AS to_id, relationship_type
+        FROM knowledge_graph_relationships
+        UNION ALL
+        SELECT target_entity_id AS from_id, source_entity_id AS to_id, relationship_type
+        FROM knowledge_graph_relationships
+    ),
+    walk(entity_id, depth) AS (
+        SELECT CAST(:entity_id AS uuid), 0
+        UNION
+        SELECT e.to_id, w.depth + 1
+        FROM walk w
+        JOIN edges e ON e.from_id = w.entity_id
+        WHERE w.depth < :max_hops
+          AND (CAST(:relationship_types AS text[]) IS NULL OR e.relationship_type = ANY(CAST(:relationship_types AS text[])))
+    )
+    SELECT entity_id, MIN(depth) AS depth
+    FROM walk
+    GROUP BY entity_id
+    ORDER BY MIN(depth)
+    LIMIT :limit
+""")
+
+
+class KnowledgeGraphStore:
+    """Persistent knowledge graph shared across content sources."""
+
+    @asynccontextmanager
+    async def _session(self, session: Optional[AsyncSession]) -> AsyncIterator[AsyncSession]:
+        """
+        Use the caller's session, or open (and commit) a new one.
+
+        Work on a caller's session runs in a savepoint so a failed merge
+        doesn't abort the caller's transaction.
+        """
+        if session is not None:
+            async with session.begin_nested():
+                yield session
+            return
+
+        async with get_session_context() as own_session:
+            yield own_session
+            await own_session.commit()
+
+    async def merge_graph(
+        self,
+        graph: KnowledgeGraph,
+        source_type: str,
+        source_id: str,
+        session: Optional[AsyncSession] = None
+    ) -> Dict[str, str]:
+        """
+        Merge an extraction result's graph into the persistent graph.
+
+        Args:
+            graph: Graph produced by a single extraction
+            source_type: Kind of item the graph was extracted from
+            source_id: ID of that item
+            session: Optional session to join (the caller commits)
+
+        Returns:
+            Mapping of the graph's local entity IDs to persistent entity IDs
+        """
+        if not graph.entities:
+            return {}
+
+        # Local entity id -> normalized key (plus any aliases)
+        keys: Dict[str, str] = {}
+        alias_keys: Dict[str, List[str]] = {}
+        for entity_id, entity in graph.entities.items():
+            key = normalize_entity_text(entity.text)
+            if not key:
+                continue
+            keys[entity_id] = key
+            alias_keys[entity_id] = [
+                alias_key for alias_key in (normalize_entity_text(a) for a in entity.metadata.get('aliases', []))
+                if alias_key and alias_key != key
+            ]
+
+        async with self._session(session) as db:
+            all_keys = set(keys.values())
+            for aliases in alias_keys.values():
+                all_keys.update(aliases)
+
+            # Resolve known entities through the alias table
+            resolved: Dict[str, uuid.UUID] = {}
+            if all_keys:
+                rows = await db.execute(
+                    select(KnowledgeGraphAlias.normalized_alias, KnowledgeGraphAlias.entity_id)
+                    .where(KnowledgeGraphAlias.normalized_alias.in_(all_keys))
+                )
+                resolved = {row.normalized_alias: row.entity_id for row in rows}
+
+            id_map: Dict[str, uuid.UUID] = {}
+            existing_ids = set()
+            new_rows: Dict[str, Dict[str, Any]] = {}
+            for entity_id, key in keys.items():
+                match = resolved.get(key) or next((resolved[a] for a in alias_keys[entity_id] if a in resolved), None)
+                if match is not None:
+                    id_map[entity_id] = match
+                    existing_ids.add(match)
+                    continue
+
+                entity = graph.entities[entity_id]
+                row = new_rows.get(key)
+                if row is None or entity.confidence > row["confidence"]:
+                    new_rows[key] = {
+                        "text": entity.text,
+                        "normalized_text": key,
+                        "entity_type": entity.entity_type,
+                        "confidence": entity.confidence,
+                        "mention_count": 1
+                    }
+
+            # Insert new entities; a concurrent insert of the same entity
+            # resolves to the existing row
+            if new_rows:
+                stmt = insert(KnowledgeGraphEntity).values(list(new_rows.values()))
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[KnowledgeGraphEntity.normalized_text],
+                    set_={
+                        "mention_count": KnowledgeGraphEntity.mention_count + 1,
+                        "confidence": func.greatest(KnowledgeGraphEntity.confidence, stmt.excluded.confidence),
+                        "updated_at": func.now()
+                    }
+                ).returning(KnowledgeGraphEntity.id, KnowledgeGraphEntity.normalized_text)
+                inserted = {row.normalized_text: row.id for row in await db.execute(stmt)}
+                for entity_id, key in keys.items():
+                    if entity_id not in id_map and key in inserted:
+                        id_map[entity_id] = inserted[key]
+
+            if existing_ids:
+                await db.execute(
+                    update(KnowledgeGraphEntity)
+                    .where(KnowledgeGraphEntity.id.in_(existing_ids))
+                    .values(mention_count=KnowledgeGraphEntity.mention_count + 1, updated_at=func.now())
+                )
+
+            # Register every surface form seen for the resolved entities
+            alias_rows = {}
+            for entity_id, persistent_id in id_map.items():
+                for alias_key in [keys[entity_id]] + alias_keys[entity_id]:
+                    alias_rows.setdefault(alias_key, persistent_id)
+            if alias_rows:
+                await db.execute(
+                    insert(KnowledgeGraphAlias)
+                    .values([{"normalized_alias": k, "entity_id": v} for k, v in alias_rows.items()])
+                    .on_conflict_do_nothing()
+                )
+
+            await self._upsert_relationships(db, graph.relationships, id_map)
+
+            mention_rows = [
+                {"entity_id": persistent_id, "source_type": source_type, "source_id": str(source_id)}
+                for persistent_id in set(id_map.values())
+            ]
+            if mention_rows:
+                await db.execute(insert(KnowledgeGraphMention).values(mention_rows).on_conflict_do_nothing())
+
+        logger.debug(f"Merged {len(id_map)} entities and {len(graph.relationships)} relationships from {source_type}:{source_id}")
+        return {entity_id: str(persistent_id) for entity_id, persistent_id in id_map.items()}
+
+    async def _upsert_relationships(
+        self,
+        db: AsyncSession,
+        relationships: List[Relationship],
+        id_map: Dict[str, uuid.UUID]
+    ):
+        """Upsert edges, strengthening ones that already exist."""
+        # Collapse edges that map onto the same persistent edge; a single
+        # INSERT .. ON CONFLICT cannot touch the same row twice.
+        rows: Dict[tuple, Dict[str, Any]] = {}
+        for rel in relationships:
+            source = id_map.get(rel.source_entity)
+            target = id_map.get(rel.target_entity)
+            if source is None or target is None:
+                continue
+
+            key = (source, target, rel.relationship_type)
+            row = rows.get(key)
+            if row is None:
+                rows[key] = {
+                    "source_entity_id": source,
+                    "target_entity_id": target,
+                    "relationship_type": rel.relationship_type,
+                    "confidence": rel.confidence,
+                    "evidence_count": 1,
+                    "context": rel.context
+                }
+            else:
+                row["confidence"] = max(row["confidence"], rel.confidence)
+
+        if not rows:
+            return
+
+        stmt = insert(KnowledgeGraphRelationship).values(list(rows.values()))
+        await db.execute(stmt.on_conflict_do_update(
+            constraint="uq_kg_relationship",
+            set_={
+                "evidence_count": KnowledgeGraphRelationship.evidence_count + 1,
+                "confidence": func.greatest(KnowledgeGraphRelationship.confidence, stmt.excluded.confidence),
+                "context": func.coalesce(KnowledgeGraphRelationship.context, stmt.excluded.context),
+                "updated_at": func.now()
+            }
+        ))
+
+    async def find_entity(self, entity_text: str, session: Optional[AsyncSession] = None) -> Optional[Dict[str, Any]]:
+        """Look up an entity by any of its surface forms."""
+        async with self._session(session) as db:
+            result = await db.execute(
+                select(KnowledgeGraphEntity)
+                .join(KnowledgeGraphAlias, KnowledgeGraphAlias.entity_id == KnowledgeGraphEntity.id)
+                .where(KnowledgeGraphAlias.normalized_alias == normalize_entity_text(entity_text))
+            )
+            entity = result.scalar_one_or_none()
+            return self._entity_to_dict(entity) if entity else None
+
+    async def add_alias(self, entity_id: str, alias: str, session: Optional[AsyncSession] = None):
+        """Make ``alias`` resolve to an entity, replacing any previous mapping."""
+        async with self._session(session) as db:
+            stmt = insert(KnowledgeGraphAlias).values(
+                normalized_alias=normalize_entity_text(alias),
+                entity_id=uuid.UUID(str(entity_id))
+            )
+            await db.execute(stmt.on_conflict_do_update(
+                index_elements=[KnowledgeGraphAlias.normalized_alias],
+                set_={"entity_id": stmt.excluded.entity_id}
+            ))
+
+    async def merge_entities(self, primary_id: str, duplicate_id: str, session: Optional[AsyncSession] = None):
+        """
+        Fold one persistent entity into another.
+
+        Edges, aliases and mentions of the duplicate move to the primary
+        entity (combining with edges/mentions it already has) and the
+        duplicate is deleted.
+        """
+        if str(primary_id) == str(duplicate_id):
+            return
+
+        params = {"primary": str(primary_id), "duplicate": str(duplicate_id)}
+        async with self._session(session) as db:
+            await db.execute(text("""
+                INSERT INTO knowledge_graph_relationships
+                    (id, source_entity_id, target_entity_id, relationship_type, confidence, evidence_count, context)
+                SELECT gen_random_uuid(),
+                       CASE WHEN source_entity_id = CAST(:duplicate AS uuid) THEN CAST(:primary AS uuid) ELSE source_entity_id END,
+                       CASE WHEN target_entity_id = CAST(:duplicate AS uuid) THEN CAST(:primary AS uuid) ELSE target_entity_id END,
+                       relationship_type, MAX(confidence), SUM(evidence_count), MAX(context)
+                FROM knowledge_graph_relationships
+                WHERE source_entity_id = CAST(:duplicate AS uuid) OR target_entity_id = CAST(:duplicate AS uuid)
+                GROUP BY 2, 3, relationship_type
+                ON CONFLICT ON CONSTRAINT uq_kg_relationship DO UPDATE SET
+                    confidence = GREATEST(knowledge_graph_relationships.confidence, EXCLUDED.confidence),
+                    evidence_count = knowledge_graph_relationships.evidence_count + EXCLUDED.evidence_count,
+                    updated_at = now()
+            """), params)
+            await db.execute(text("""
+                INSERT INTO knowledge_graph_mentions (id, entity_id, source_type, source_id)
+                SELECT gen_random_uuid(), CAST(:primary AS uuid), source_type, source_id
+                FROM knowledge_graph_mentions
+                WHERE entity_id = CAST(:duplicate AS uuid)
+                ON CONFLICT ON CONSTRAINT uq_kg_mention DO NOTHING
+            """), params)
+            await db.execute(
+                update(KnowledgeGraphAlias)
+                .where(KnowledgeGraphAlias.entity_id == uuid.UUID(params["duplicate"]))
+                .values(entity_id=uuid.UUID(params["primary"]))
+            )
+            await db.execute(text("""
+                UPDATE knowledge_graph_entities p
+                SET mention_count = p.mention_count + d.mention_count,
+                    confidence = GREATEST(p.confidence, d.confidence),
+                    updated_at = now()
+                FROM knowledge_graph_entities d
+                WHERE p.id = CAST(:primary AS uuid) AND d.id = CAST(:duplicate AS uuid)
+            """), params)
+            # Cascades to the duplicate's remaining edges and mentions
+            await db.execute(delete(KnowledgeGraphEntity).where(KnowledgeGraphEntity.id == uuid.UUID(params["duplicate"])))
+
+    async def get_neighborhood(
+        self,
+        entity_id: str,
+        max_hops: int = 2,
+        relationship_types: Optional[List[str]] = None,
+        limit: int = 500,
+        session: Optional[AsyncSession] = None
+    ) -> KnowledgeGraph:
+        """
+        Get the subgraph within ``max_hops`` of an entity.
+
+        Args:
+            entity_id: Persistent ID of the start entity
+            max_hops: Maximum number of edges to traverse (direction ignored)
+            relationship_types: Only traverse these relationship types
+            limit: Maximum number of entities returned (closest first)
+            session: Optional session to use
+
+        Returns:
+            KnowledgeGraph with the reachable entities (hop distance in
+            ``metadata['hops']``) and the edges between them
+        """
+        async with self._session(session) as db:
+            rows = await db.execute(NEIGHBORHOOD_QUERY, {
+                "entity_id": str(entity_id),
+                "max_hops": max_hops,
+                "relationship_types": relationship_types,
+                "limit": limit
+            })
+            depths = {row.entity_id: row.depth for row in rows}
+
+            graph = KnowledgeGraph()
+            if not depths:
+                return graph
+
+            entities = await db.execute(
+                select(KnowledgeGraphEntity).where(KnowledgeGraphEntity.id.in_(depths.keys()))
+            )
+            for entity in entities.scalars():
+                graph.add_entity(Entity(
+                    entity_id=str(entity.id),
+                    text=entity.text,
+                    entity_type=entity.entity_type,
+                    start_pos=0,
+                    end_pos=0,
+                    confidence=entity.confidence or 0.0,
+                    metadata={"hops": depths[entity.id], "mention_count": entity.mention_count}
+                ))
+
+            edges_query = select(KnowledgeGraphRelationship).where(
+                KnowledgeGraphRelationship.source_entity_id.in_(depths.keys()),
+                KnowledgeGraphRelationship.target_entity_id.in_(depths.keys())
+            )
+            if relationship_types:
+                edges_query = edges_query.where(KnowledgeGraphRelationship.relationship_type.in_(relationship_types))
+
+            for rel in (await db.execute(edges_query)).scalars():
+                graph.add_relationship(Relationship(
+                    source_entity=str(rel.source_entity_id),
+                    target_entity=str(rel.target_entity_id),
+                    relationship_type=rel.relationship_type,
+                    confidence=rel.confidence or 0.0,
+                    context=rel.context,
+                    metadata={"evidence_count": rel.evidence_count}
+                ))
+
+            return graph
+
+    async def get_entities_for_source(
+        self,
+        source_type: str,
+        source_id: str,
+        session: Optional[AsyncSession] = None
+    ) -> List[Dict[str, Any]]:
+        """Get the entities extracted from a source item."""
+        async with self._session(session) as db:
+            result = await db.execute(
+                select(KnowledgeGraphEntity)
+                .join(KnowledgeGraphMention, KnowledgeGraphMention.entity_id == KnowledgeGraphEntity.id)
+                .where(
+                    KnowledgeGraphMention.source_type == source_type,
+                    KnowledgeGraphMention.source_id == str(source_id)
+                )
+            )
+            return [self._entity_to_dict(entity) for entity in result.scalars()]
+
+    async def get_stats(self, session: Optional[AsyncSession] = None) -> Dict[str, Any]:
+        """Get entity, relationship and mention counts."""
+        async with self._session(session) as db:
+            entity_count = await db.scalar(select(func.count()).select_from(KnowledgeGraphEntity))
+            relationship_count = await db.scalar(select(func.count()).select_from(KnowledgeGraphRelationship))
+            mention_count = await db.scalar(select(func.count()).select_from(KnowledgeGraphMention))
+            return {
+                "entity_count": entity_count or 0,
+                "relationship_count": relationship_count or 0,
+                "mention_count": mention_count or 0
+            }
+
+    def _entity_to_dict(self, entity: KnowledgeGraphEntity) -> Dict[str, Any]:
+        return {
+            "entity_id": str(entity.id),
+            "text": entity.text,
+            "entity_type": entity.entity_type,
+            "confidence": entity.confidence,
+            "mention_count": entity.mention_count,
+            "metadata": entity.entity_metadata or {}
+        }
+
+
+# Global instance
+knowledge_graph_store = KnowledgeGraphStore()
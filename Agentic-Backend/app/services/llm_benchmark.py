@@ -0,0 +1,504 @@
+"""
+LLM benchmark harness.
+
+Measures model latency and throughput from Ollama's own timing fields
+rather than wall-clock guesses:
+- Warmup runs so model load time is reported separately from steady state
+- Load / prefill / decode / time-to-first-token breakdown per request
+- p50/p95/p99 across repetitions
+- Concurrency sweeps to find each model's throughput knee
+- JSON result artifacts and regression comparison against a baseline
+- A stub backend with a simple latency model so the harness runs in CI
+"""
+
+import asyncio
+import json
+import platform
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Protocol
+
+from app.config import settings
+from app.services.ollama_client import ollama_client
+from app.utils.logging import get_logger
+
+logger = get_logger("llm_benchmark")
+
+NANOSECONDS = 1_000_000_000
+
+
+@dataclass
+class BenchmarkTask:
+    """A prompt to benchmark."""
+    id: str
+    prompt: str
+    type: str = "benchmark"
+
+
+@dataclass
+class BenchmarkSample:
+    """Timings for a single request (seconds unless noted)."""
+    task_id: str
+    concurrency: int
+    success: bool
+    task_type: str = "benchmark"
+    wall_time: float = 0.0
+    load_time: float = 0.0
+    prefill_time: float = 0.0
+    decode_time: float = 0.0
+    ttft: float = 0.0  # Client-observed time until decoding started
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    error: Optional[str] = None
+
+    @property
+    def decode_tokens_per_second(self) -> Optional[float]:
+        return self.output_tokens / self.decode_time if self.decode_time > 0 else None
+
+    @property
+    def prefill_tokens_per_second(self) -> Optional[float]:
+        return self.prompt_tokens / self.prefill_time if self.prefill_time > 0 else None
+
+    @classmethod
+    def from_response(
+        cls,
+        task_id: str,
+        concurrency: int,
+        response: Dict[str, Any],
+        wall_time: float,
+        task_type: str = "benchmark"
+    ) -> "BenchmarkSample":
+        """Build a sample from an Ollama generate response."""
+        decode_time = response.get("eval_duration", 0) / NANOSECONDS
+        return cls(
+            task_id=task_id,
+            concurrency=concurrency,
+            success=True,
+            task_type=task_type,
+            wall_time=wall_time,
+            load_time=response.get("load_duration", 0) / NANOSECONDS,
+            prefill_time=response.get("prompt_eval_duration", 0) / NANOSECONDS,
+            decode_time=decode_time,
+            # Everything before the first decoded token: network, queueing,
+            # model load and prefill
+            ttft=max(0.0, wall_time - decode_time),
+            prompt_tokens=response.get("prompt_eval_count", 0),
+            output_tokens=response.get("eval_count", 0)
+        )
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Linearly interpolated percentile of ``values`` (pct in 0-100)."""
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """Mean and tail percentiles of a series."""
+    values = [v for v in values if v is not None]
+    if not values:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "p99": None, "min": None, "max": None}
+
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "min": min(values),
+        "max": max(values)
+    }
+
+
+@dataclass
+class ConcurrencyResult:
+    """Aggregated results for one model at one concurrency level."""
+    concurrency: int
+    requests: int
+    successes: int
+    elapsed_seconds: float
+    throughput_tokens_per_second: float  # Output tokens across all in-flight requests
+    requests_per_second: float
+    wall_time: Dict[str, Optional[float]]
+    ttft: Dict[str, Optional[float]]
+    prefill_time: Dict[str, Optional[float]]
+    decode_time: Dict[str, Optional[float]]
+    decode_tokens_per_second: Dict[str, Optional[float]]
+    errors: List[str] = field(default_factory=list)
+    # Per task type breakdown of the same run (throughput shares the level's elapsed time)
+    by_task_type: Dict[str, "ConcurrencyResult"] = field(default_factory=dict)
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.requests if self.requests else 0.0
+
+    @classmethod
+    def from_samples(
+        cls,
+        concurrency: int,
+        samples: List[BenchmarkSample],
+        elapsed: float,
+        split_task_types: bool = True
+    ) -> "ConcurrencyResult":
+        ok = [s for s in samples if s.success]
+        by_task_type = {}
+        if split_task_types:
+            for task_type in sorted({s.task_type for s in samples}):
+                by_task_type[task_type] = cls.from_samples(
+                    concurrency, [s for s in samples if s.task_type == task_type], elapsed, split_task_types=False
+                )
+        output_tokens = sum(s.output_tokens for s in ok)
+        return cls(
+            concurrency=concurrency,
+            requests=len(samples),
+            successes=len(ok),
+            elapsed_seconds=elapsed,
+            throughput_tokens_per_second=output_tokens / elapsed if elapsed > 0 else 0.0,
+            requests_per_second=len(ok) / elapsed if elapsed > 0 else 0.0,
+            wall_time=summarize([s.wall_time for s in ok]),
+            ttft=summarize([s.ttft for s in ok]),
+            prefill_time=summarize([s.prefill_time for s in ok]),
+            decode_time=summarize([s.decode_time for s in ok]),
+            decode_tokens_per_second=summarize([s.decode_tokens_per_second for s in ok]),
+            errors=sorted({s.error for s in samples if s.error}),
+            by_task_type=by_task_type
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["success_rate"] = self.success_rate
+        data["by_task_type"] = {task_type: result.to_dict() for task_type, result in self.by_task_type.items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConcurrencyResult":
+        data = dict(data)
+        data.pop("success_rate", None)
+        # Reports saved before the per task type breakdown have no by_task_type
+        data["by_task_type"] = {
+            task_type: cls.from_dict(result) for task_type, result in (data.get("by_task_type") or {}).items()
+        }
+        return cls(**data)
+
+
+@dataclass
+class ModelBenchmarkResult:
+    """Benchmark results for one model across the concurrency sweep."""
+    model_name: str
+    cold_load_time: Optional[float]  # load_duration of the first warmup request
+    levels: List[ConcurrencyResult]
+    knee_concurrency: Optional[int] = None
+
+    def level(self, concurrency: int) -> Optional[ConcurrencyResult]:
+        return next((level for level in self.levels if level.concurrency == concurrency), None)
+
+    @property
+    def baseline(self) -> Optional[ConcurrencyResult]:
+        """Lowest-concurrency level, used for single-request latency."""
+        return min(self.levels, key=lambda level: level.concurrency) if self.levels else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "model_name": self.model_name,
+            "cold_load_time": self.cold_load_time,
+            "knee_concurrency": self.knee_concurrency,
+            "levels": [level.to_dict() for level in self.levels]
+        }
+
+
+@dataclass
+class BenchmarkReport:
+    """A full benchmark run, serializable as a JSON artifact."""
+    backend: str
+    models: Dict[str, ModelBenchmarkResult]
+    config: Dict[str, Any]
+    started_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    host: Dict[str, str] = field(default_factory=lambda: {
+        "hostname": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version()
+    })
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "started_at": self.started_at,
+            "host": self.host,
+            "config": self.config,
+            "models": {name: result.to_dict() for name, result in self.models.items()}
+        }
+
+    def save(self, path: Optional[str] = None) -> Path:
+        """Write the report as JSON (default: a timestamped file in the results dir)."""
+        if path is None:
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = Path(settings.llm_benchmark_results_dir) / f"benchmark_{stamp}.json"
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "BenchmarkReport":
+        """Load a report written by ``save``."""
+        data = json.loads(Path(path).read_text())
+        models = {}
+        for name, model_data in data["models"].items():
+            levels = [ConcurrencyResult.from_dict(level) for level in model_data["levels"]]
+            models[name] = ModelBenchmarkResult(
+                model_name=name,
+                cold_load_time=model_data.get("cold_load_time"),
+                levels=levels,
+                knee_concurrency=model_data.get("knee_concurrency")
+            )
+        return cls(
+            backend=data["backend"],
+            models=models,
+            config=data.get("config", {}),
+            started_at=data.get("started_at", ""),
+            host=data.get("host", {})
+        )
+
+
+def compare_reports(
+    baseline: BenchmarkReport,
+    current: BenchmarkReport,
+    tolerance: float = 0.1
+) -> List[Dict[str, Any]]:
+    """
+    Find regressions between two reports.
+
+    Compares, per model and concurrency level present in both, p95 wall
+    time and TTFT (higher is worse) and aggregate throughput (lower is worse).
+
+    Returns:
+        List of regressions exceeding ``tolerance`` (fractional change)
+    """
+    regressions = []
+    checks = [
+        ("wall_time_p95", lambda level: level.wall_time.get("p95"), True),
+        ("ttft_p95", lambda level: level.ttft.get("p95"), True),
+        ("throughput_tokens_per_second", lambda level: level.throughput_tokens_per_second, False),
+    ]
+
+    for model_name, current_result in current.models.items():
+        baseline_result = baseline.models.get(model_name)
+        if baseline_result is None:
+            continue
+
+        for level in current_result.levels:
+            baseline_level = baseline_result.level(level.concurrency)
+            if baseline_level is None:
+                continue
+
+            for metric, getter, higher_is_worse in checks:
+                old, new = getter(baseline_level), getter(level)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                if (change > tolerance) if higher_is_worse else (change < -tolerance):
+                    regressions.append({
+                        "model_name": model_name,
+                        "concurrency": level.concurrency,
+                        "metric": metric,
+                        "baseline": old,
+                        "current": new,
+                        "change": change
+                    })
+
+    return regressions
+
+
+class BenchmarkBackend(Protocol):
+    """Something that serves Ollama-style generate requests."""
+    name: str
+
+    async def generate(self, model: str, prompt: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        ...
+
+
+class OllamaBenchmarkBackend:
+    """Benchmarks the configured Ollama server."""
+    name = "ollama"
+
+    async def generate(self, model: str, prompt: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        return await ollama_client.generate(prompt=prompt, model=model, stream=False, options=options)
+
+
+class StubBenchmarkBackend:
+    """
+    Simulated Ollama backend for CI and harness development.
+
+    Requests pay a one-time load cost per model, then prefill and decode at
+    fixed token rates. Only ``parallel_slots`` requests are processed at once
+    (like OLLAMA_NUM_PARALLEL); the rest queue, so throughput flattens and
+    latency climbs past that concurrency.
+    """
+    name = "stub"
+
+    def __init__(
+        self,
+        load_seconds: float = 0.05,
+        prefill_tokens_per_second: float = 2000.0,
+        decode_tokens_per_second: float = 400.0,
+        parallel_slots: int = 2,
+        output_tokens: int = 16
+    ):
+        self.load_seconds = load_seconds
+        self.prefill_tokens_per_second = prefill_tokens_per_second
+        self.decode_tokens_per_second = decode_tokens_per_second
+        self.output_tokens = output_tokens
+        self._slots = asyncio.Semaphore(parallel_slots)
+        self._loaded: set = set()
+
+    async def generate(self, model: str, prompt: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        prompt_tokens = max(1, len(prompt.split()))
+        output_tokens = min(self.output_tokens, options.get("num_predict", self.output_tokens))
+
+        async with self._slots:
+            load = 0.0
+            if model not in self._loaded:
+                self._loaded.add(model)
+                load = self.load_seconds
+            prefill = prompt_tokens / self.prefill_tokens_per_second
+            decode = output_tokens / self.decode_tokens_per_second
+            await asyncio.sleep(load + prefill + decode)
+
+        return {
+            "model": model,
+            "response": " ".join(["token"] * output_tokens),
+            "done": True,
+            "load_duration": int(load * NANOSECONDS),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(prefill * NANOSECONDS),
+            "eval_count": output_tokens,
+            "eval_duration": int(decode * NANOSECONDS),
+            "total_duration": int((load + prefill + decode) * NANOSECONDS)
+        }
+
+
+def parse_concurrency_levels(value: str) -> List[int]:
+    """Parse a comma-separated list of concurrency levels."""
+    levels = sorted({int(part) for part in value.split(",") if part.strip()})
+    return [level for level in levels if level > 0] or [1]
+
+
+class LLMBenchmarkRunner:
+    """Runs warmups, repetitions and a concurrency sweep per model."""
+
+    def __init__(
+        self,
+        backend: Optional[BenchmarkBackend] = None,
+        warmup_runs: Optional[int] = None,
+        repetitions: Optional[int] = None,
+        concurrency_levels: Optional[List[int]] = None,
+        options: Optional[Dict[str, Any]] = None,
+        knee_tolerance: float = 0.1
+    ):
+        self.backend = backend or OllamaBenchmarkBackend()
+        self.warmup_runs = settings.llm_benchmark_warmup_runs if warmup_runs is None else warmup_runs
+        self.repetitions = max(1, repetitions or settings.llm_benchmark_repetitions)
+        self.concurrency_levels = concurrency_levels or parse_concurrency_levels(settings.llm_benchmark_concurrency_levels)
+        self.options = options or {"temperature": 0.1, "num_predict": 100}
+        self.knee_tolerance = knee_tolerance
+
+    async def run(self, models: List[str], tasks: List[BenchmarkTask]) -> BenchmarkReport:
+        """Benchmark each model (sequentially, so models don't compete)."""
+        results = {}
+        for model_name in models:
+            logger.info(f"Benchmarking {model_name} at concurrency {self.concurrency_levels}")
+            results[model_name] = await self.benchmark_model(model_name, tasks)
+
+        return BenchmarkReport(
+            backend=self.backend.name,
+            models=results,
+            config={
+                "warmup_runs": self.warmup_runs,
+                "repetitions": self.repetitions,
+                "concurrency_levels": self.concurrency_levels,
+                "options": self.options,
+                "tasks": [task.id for task in tasks],
+                "task_types": sorted({task.type for task in tasks})
+            }
+        )
+
+    async def benchmark_model(self, model_name: str, tasks: List[BenchmarkTask]) -> ModelBenchmarkResult:
+        """Warm a model up, then sweep the concurrency levels."""
+        cold_load_time = None
+        for i in range(self.warmup_runs):
+            sample = await self._run_request(model_name, tasks[i % len(tasks)], concurrency=1)
+            if i == 0 and sample.success:
+                cold_load_time = sample.load_time
+
+        levels = []
+        for concurrency in self.concurrency_levels:
+            levels.append(await self._run_level(model_name, tasks, concurrency))
+
+        return ModelBenchmarkResult(
+            model_name=model_name,
+            cold_load_time=cold_load_time,
+            levels=levels,
+            knee_concurrency=self._find_knee(levels)
+        )
+
+    async def _run_level(self, model_name: str, tasks: List[BenchmarkTask], concurrency: int) -> ConcurrencyResult:
+        """Run every task ``repetitions`` times with ``concurrency`` requests in flight."""
+        queue: asyncio.Queue = asyncio.Queue()
+        for _ in range(self.repetitions):
+            for task in tasks:
+                queue.put_nowait(task)
+
+        samples: List[BenchmarkSample] = []
+
+        async def worker():
+            while True:
+                try:
+                    task = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                samples.append(await self._run_request(model_name, task, concurrency))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+        return ConcurrencyResult.from_samples(concurrency, samples, elapsed)
+
+    async def _run_request(self, model_name: str, task: BenchmarkTask, concurrency: int) -> BenchmarkSample:
+        start = time.perf_counter()
+        try:
+            response = await self.backend.generate(model_name, task.prompt, self.options)
+            return BenchmarkSample.from_response(task.id, concurrency, response, time.perf_counter() - start, task.type)
+        except Exception as e:
+            return BenchmarkSample(
+                task_id=task.id,
+                concurrency=concurrency,
+                success=False,
+                task_type=task.type,
+                wall_time=time.perf_counter() - start,
+                error=str(e)
+            )
+
+    def _find_knee(self, levels: List[ConcurrencyResult]) -> Optional[int]:
+        """
+        Lowest concurrency reaching within ``knee_tolerance`` of peak throughput.
+
+        Past this point extra concurrency mostly adds queueing latency.
+        """
+        usable = [level for level in levels if level.successes]
+        if not usable:
+            return None
+
+        peak = max(level.throughput_tokens_per_second for level in usable)
+        for level in sorted(usable, key=lambda level: level.concurrency):
+            if level.throughput_tokens_per_second >= peak * (1 - self.knee_tolerance):
+                return level.concurrency
+        return None
@@ -0,0 +1,245 @@
+"""
+Adaptive backend selection for the integration layer load balancer.
+
+The balancer keeps live per-backend state and picks a backend per request:
+
+- Selection is power-of-two-choices (``p2c``): sample two available backends
+  and take the cheaper one, or ``least_outstanding``: take the cheapest of
+  all. Cost is ``ewma_latency * (outstanding + 1) / weight``, so a backend is
+  penalised the moment requests pile up on it instead of after its averages
+  catch up, and random sampling keeps simultaneous requests from herding.
+- Latency is an exponentially weighted moving average per backend; failed
+  requests count double so fast failures don't attract traffic.
+- Passive outlier ejection: a backend with ``consecutive_failures`` failed
+  requests in a row is skipped for ``base_ejection_seconds`` times the number
+  of recent ejections. At most ``max_ejection_percent`` of backends are
+  ejected at once; if every candidate is ejected or unhealthy the balancer
+  falls back to all candidates rather than failing the request.
+- Active health checks report through ``set_health``.
+- Slow start: a backend that recovers (from ejection or an unhealthy check)
+  or is newly added has its weight ramped up over ``slow_start_seconds``.
+
+The balancer does no I/O and takes an injectable clock and random source,
+so it can be driven by a simulation (see scripts/benchmark_load_balancer.py).
+"""
+
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from app.utils.logging import get_logger
+
+logger = get_logger("load_balancing")
+
+STRATEGIES = ("p2c", "least_outstanding")
+
+
+@dataclass
+class BackendState:
+    """Live load balancing state for one backend."""
+    backend_id: str
+    weight: float = 1.0
+    outstanding: int = 0
+    ewma_latency_ms: Optional[float] = None
+    consecutive_failures: int = 0
+    healthy: bool = True
+    ejected_until: float = 0.0
+    ejection_count: int = 0
+    slow_start_from: Optional[float] = None
+    total_requests: int = 0
+    total_failures: int = 0
+
+
+class AdaptiveBalancer:
+    """Selects backends by outstanding load and latency, with ejection and slow start."""
+
+    def __init__(
+        self,
+        strategy: str = "p2c",
+        ewma_alpha: float = 0.3,
+        consecutive_failures: int = 5,
+        base_ejection_seconds: float = 30.0,
+        max_ejection_percent: float = 50.0,
+        slow_start_seconds: float = 30.0,
+        slow_start_min_weight: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown load balancing strategy: {strategy}")
+        self.strategy = strategy
+        self.ewma_alpha = ewma_alpha
+        self.consecutive_failures = consecutive_failures
+        self.base_ejection_seconds = base_ejection_seconds
+        self.max_ejection_percent = max_ejection_percent
+        self.slow_start_seconds = slow_start_seconds
+        self.slow_start_min_weight = slow_start_min_weight
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.backends: Dict[str, BackendState] = {}
+
+    # ------------------------------------------------------------------
+    # Membership and health
+    # ------------------------------------------------------------------
+
+    def add_backend(self, backend_id: str, weight: float = 1.0, slow_start: bool = True) -> BackendState:
+        """Track a backend (idempotent). New backends slow-start unless told otherwise."""
+        state = self.backends.get(backend_id)
+        if state is None:
+            state = BackendState(backend_id=backend_id, weight=max(weight, 0.01))
+            if slow_start:
+                state.slow_start_from = self.clock()
+            self.backends[backend_id] = state
+        return state
+
+    def remove_backend(self, backend_id: str):
+        self.backends.pop(backend_id, None)
+
+    def set_health(self, backend_id: str, healthy: bool):
+        """Record an active health check result."""
+        state = self.add_backend(backend_id)
+        if healthy and not state.healthy:
+            state.slow_start_from = self.clock()
+            state.consecutive_failures = 0
+            logger.info(f"Backend {backend_id} recovered, slow-starting")
+        state.healthy = healthy
+
+    def is_ejected(self, backend_id: str) -> bool:
+        state = self.backends.get(backend_id)
+        return state is not None and state.ejected_until > self.clock()
+
+    # ------------------------------------------------------------------
+    # Selection
+    # ------------------------------------------------------------------
+
+    def _slow_start_factor(self, state: BackendState, now: float) -> float:
+        if not self.slow_start_seconds or state.slow_start_from is None:
+            return 1.0
+        elapsed = now - state.slow_start_from
+        if elapsed >= self.slow_start_seconds:
+            return 1.0
+        return max(self.slow_start_min_weight, elapsed / self.slow_start_seconds)
+
+    def _cost(self, state: BackendState, now: float, default_latency: float) -> float:
+        latency = state.ewma_latency_ms if state.ewma_latency_ms is not None else default_latency
+        weight = state.weight * self._slow_start_factor(state, now)
+        return max(latency, 1e-3) * (state.outstanding + 1) / weight
+
+    def _default_latency(self) -> float:
+        # Unmeasured backends are assumed to be average until they report
+        latencies = [s.ewma_latency_ms for s in self.backends.values() if s.ewma_latency_ms is not None]
+        return sum(latencies) / len(latencies) if latencies else 1.0
+
+    def select(self, candidates: List[str]) -> str:
+        """
+        Pick a backend for a request.
+
+        Args:
+            candidates: Backend ids able to serve the request
+
+        Returns:
+            The selected backend id
+        """
+        if not candidates:
+            raise ValueError("No candidate backends")
+
+        now = self.clock()
+        states = [self.add_backend(backend_id) for backend_id in candidates]
+        available = [s for s in states if s.healthy and s.ejected_until <= now]
+        if not available:
+            # Better to try a suspect backend than to fail outright
+            available = states
+
+        if len(available) == 1:
+            return available[0].backend_id
+
+        default_latency = self._default_latency()
+        if self.strategy == "p2c":
+            first, second = self.rng.sample(available, 2)
+            first_cost = self._cost(first, now, default_latency)
+            second_cost = self._cost(second, now, default_latency)
+            return (first if first_cost <= second_cost else second).backend_id
+
+        # least_outstanding: break ties randomly so equal backends share load
+        best_cost = None
+        best: List[BackendState] = []
+        for state in available:
+            cost = self._cost(state, now, default_latency)
+            if best_cost is None or cost < best_cost:
+                best_cost, best = cost, [state]
+            elif cost == best_cost:
+                best.append(state)
+        return self.rng.choice(best).backend_id
+
+    # ------------------------------------------------------------------
+    # Request accounting
+    # ------------------------------------------------------------------
+
+    def on_request_start(self, backend_id: str):
+        self.add_backend(backend_id).outstanding += 1
+
+    def on_request_end(self, backend_id: str, latency_ms: float, success: bool):
+        """Record a finished request's latency and outcome."""
+        state = self.backends.get(backend_id)
+        if state is None:
+            return
+
+        state.outstanding = max(0, state.outstanding - 1)
+        state.total_requests += 1
+
+        if not success:
+            # Fast failures must not make a backend look attractive
+            latency_ms = 2 * max(latency_ms, state.ewma_latency_ms or latency_ms)
+
+        if state.ewma_latency_ms is None:
+            state.ewma_latency_ms = latency_ms
+        else:
+            state.ewma_latency_ms += self.ewma_alpha * (latency_ms - state.ewma_latency_ms)
+
+        if success:
+            state.consecutive_failures = 0
+            return
+
+        state.total_failures += 1
+        state.consecutive_failures += 1
+        if self.consecutive_failures and state.consecutive_failures >= self.consecutive_failures:
+            self._eject(state)
+
+    def _eject(self, state: BackendState):
+        now = self.clock()
+        if state.ejected_until > now:
+            return
+
+        ejected = sum(1 for s in self.backends.values() if s.ejected_until > now)
+        if (ejected + 1) * 100.0 > self.max_ejection_percent * len(self.backends):
+            return
+
+        # Forget one past ejection per clean ejection interval since the last one ended
+        if state.ejection_count and self.base_ejection_seconds:
+            clean_intervals = int((now - state.ejected_until) / self.base_ejection_seconds)
+            state.ejection_count = max(0, state.ejection_count - clean_intervals)
+
+        state.ejection_count += 1
+        duration = self.base_ejection_seconds * min(state.ejection_count, 10)
+        state.ejected_until = now + duration
+        state.consecutive_failures = 0
+        # Ramp back up once the ejection ends
+        state.slow_start_from = state.ejected_until
+        logger.warning(f"Ejecting backend {state.backend_id} for {duration:.0f}s after repeated failures")
+
+    def get_state(self, backend_id: str) -> Dict[str, object]:
+        """Balancer view of a backend, for stats endpoints."""
+        state = self.backends.get(backend_id)
+        if state is None:
+            return {}
+        now = self.clock()
+        return {
+            "outstanding": state.outstanding,
+            "ewma_latency_ms": round(state.ewma_latency_ms, 2) if state.ewma_latency_ms is not None else None,
+            "ejected": state.ejected_until > now,
+            "ejected_for_seconds": round(max(0.0, state.ejected_until - now), 1),
+            "ejection_count": state.ejection_count,
+            "slow_start_factor": round(self._slow_start_factor(state, now), 2),
+            "weight": state.weight
+        }
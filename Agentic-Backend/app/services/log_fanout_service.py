@@ -0,0 +1,428 @@
+"""
+Log fan-out service for WebSocket log subscribers.
+
+Every API worker runs one consumer on the Redis log stream in its own
+consumer group, so every worker sees every published log regardless of
+which process (API worker or Celery) produced it. Each log is decoded once
+per worker, matched against subscriptions indexed by user and admin status,
+and the serialized WebSocket message is built once and handed to each
+recipient's bounded send queue. A per-connection sender task drains the
+queue; when a client falls behind, the oldest queued messages are dropped
+instead of stalling delivery to everyone else.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.utils.logging import get_logger
+from app.utils.metrics import MetricsCollector
+
+logger = get_logger("log_fanout_service")
+
+# Filter keys that control visibility rather than matching log fields
+SPECIAL_FILTER_KEYS = frozenset({"admin_mode"})
+
+GROUP_PREFIX = "ws_fanout_"
+
+# Stream field marking agent task logs, whose subscription filters are strict
+LOG_SOURCE_FIELD = "log_source"
+AGENT_LOG_SOURCE = "agent"
+
+
+def compile_log_filters(filters: Optional[Dict[str, Any]]) -> Tuple[Tuple[str, bool, Any], ...]:
+    """
+    Precompute subscription filter checks.
+
+    List values match by membership and scalar values match the log field
+    exactly after string conversion. Whether a key missing from a log
+    excludes it is decided per log, see ``LogSubscriber.matches``.
+
+    Returns:
+        Tuple of (key, is_list, expected) checks
+    """
+    checks = []
+    for key, value in (filters or {}).items():
+        if key in SPECIAL_FILTER_KEYS:
+            continue
+        if isinstance(value, list):
+            checks.append((key, True, tuple(value)))
+        else:
+            checks.append((key, False, str(value)))
+    return tuple(checks)
+
+
+def matches_log_filters(
+    log_data: Dict[str, Any],
+    checks: Tuple[Tuple[str, bool, Any], ...],
+    require_keys: bool = False
+) -> bool:
+    """
+    Check a log against compiled filters (see ``compile_log_filters``).
+
+    Args:
+        log_data: Log record
+        checks: Compiled filter checks
+        require_keys: Exclude the log when it lacks a filtered key (agent
+            task logs); otherwise such filters are ignored (unified logs)
+    """
+    for key, is_list, expected in checks:
+        if key not in log_data:
+            if require_keys:
+                return False
+            continue
+        value = log_data[key]
+        if is_list:
+            if value not in expected:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+class LogSubscriber:
+    """A WebSocket log subscription with its own bounded send queue."""
+
+    def __init__(self, connection_id: str, websocket, user, filters: Optional[Dict[str, Any]], queue_size: int):
+        self.connection_id = connection_id
+        self.websocket = websocket
+        self.user = user
+        self.queue: deque = deque(maxlen=max(1, queue_size))
+        self.wakeup = asyncio.Event()
+        self.dropped = 0
+        self.pending_drop_notice = 0
+        self.sender_task: Optional[asyncio.Task] = None
+        self.set_filters(filters)
+
+    def set_filters(self, filters: Optional[Dict[str, Any]]):
+        self.filters = filters or {}
+        self.checks = compile_log_filters(self.filters)
+
+    def matches(self, log_data: Dict[str, Any], require_keys: bool = False) -> bool:
+        return matches_log_filters(log_data, self.checks, require_keys)
+
+    def enqueue(self, message_text: str):
+        if len(self.queue) == self.queue.maxlen:
+            # Drop-oldest: a slow client loses history, not liveness
+            self.dropped += 1
+            self.pending_drop_notice += 1
+            MetricsCollector.increment_websocket_log_dropped()
+        self.queue.append(message_text)
+        self.wakeup.set()
+
+
+class LogFanoutService:
+    """Fans out log messages from the Redis log stream to local WebSocket subscribers."""
+
+    def __init__(self):
+        self.stream_name = settings.log_stream_name
+        self.queue_size = getattr(settings, 'log_fanout_queue_size', 1000)
+        self.send_timeout = getattr(settings, 'log_fanout_send_timeout_seconds', 5.0)
+        self.read_count = getattr(settings, 'log_fanout_read_count', 100)
+        self.stale_group_seconds = getattr(settings, 'log_fanout_stale_group_seconds', 600)
+        self.group_name = f"{GROUP_PREFIX}{socket.gethostname()}_{os.getpid()}"
+        self.consumer_name = "consumer"
+
+        self.subscribers: Dict[str, LogSubscriber] = {}
+        # Recipient indexes
+        self._by_user: Dict[Any, Set[str]] = {}
+        self._admins: Set[str] = set()
+        self._authenticated: Set[str] = set()
+
+        self.redis = None
+        self._consumer_task: Optional[asyncio.Task] = None
+        self.delivered = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether stream consumption is active (logs published to the stream will be delivered)."""
+        return self._consumer_task is not None and not self._consumer_task.done()
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def subscribe(self, connection_id: str, websocket, user=None, filters: Optional[Dict[str, Any]] = None):
+        """Register a connection for log delivery, or update its filters."""
+        subscriber = self.subscribers.get(connection_id)
+        if subscriber is not None:
+            subscriber.set_filters(filters)
+            return
+
+        subscriber = LogSubscriber(connection_id, websocket, user, filters, self.queue_size)
+        self.subscribers[connection_id] = subscriber
+        if user is not None:
+            self._authenticated.add(connection_id)
+            self._by_user.setdefault(user.id, set()).add(connection_id)
+            if user.is_superuser:
+                self._admins.add(connection_id)
+        subscriber.sender_task = asyncio.create_task(self._sender(subscriber))
+
+    def unsubscribe(self, connection_id: str):
+        """Remove a connection and stop its sender."""
+        subscriber = self.subscribers.pop(connection_id, None)
+        if subscriber is None:
+            return
+
+        self._authenticated.discard(connection_id)
+        self._admins.discard(connection_id)
+        if subscriber.user is not None:
+            connections = self._by_user.get(subscriber.user.id)
+            if connections is not None:
+                connections.discard(connection_id)
+                if not connections:
+                    del self._by_user[subscriber.user.id]
+
+        if subscriber.sender_task and subscriber.sender_task is not asyncio.current_task():
+            subscriber.sender_task.cancel()
+
+    def _recipients(self, user_id: Optional[Any], scope: str) -> Iterable[str]:
+        """Connections allowed to see a log with this user_id and scope."""
+        if scope == "admin":
+            return self._admins
+        if scope == "user":
+            if user_id:
+                own = self._by_user.get(user_id)
+                return (own | self._admins) if own else self._admins
+            # Logs without user_id are general logs visible to all authenticated users
+            return self._authenticated
+        return self.subscribers.keys()
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    def dispatch(
+        self,
+        log_data: Dict[str, Any],
+        user_id: Optional[Any] = None,
+        scope: str = "user",
+        message_text: Optional[str] = None,
+        require_filter_keys: bool = False
+    ) -> int:
+        """
+        Queue a log for every local subscriber allowed to see it.
+
+        Never awaits a socket; delivery happens in each subscriber's sender task.
+
+        Args:
+            log_data: Log record
+            user_id: Owner of the log (None for general logs)
+            scope: Visibility scope ("user", "admin", or anything else for all)
+            message_text: Pre-serialized WebSocket message, if already built
+            require_filter_keys: Exclude the log from subscriptions filtering
+                on a key it lacks
+
+        Returns:
+            Number of subscribers the log was queued for
+        """
+        recipients = [
+            self.subscribers[connection_id]
+            for connection_id in self._recipients(user_id, scope)
+            if connection_id in self.subscribers
+        ]
+        recipients = [
+            subscriber for subscriber in recipients
+            if subscriber.matches(log_data, require_filter_keys)
+        ]
+        if not recipients:
+            return 0
+
+        if message_text is None:
+            message_text = json.dumps({
+                "type": "log",
+                "data": log_data,
+                "timestamp": log_data.get("timestamp"),
+                "scope": scope
+            }, default=str)
+
+        for subscriber in recipients:
+            subscriber.enqueue(message_text)
+        self.delivered += len(recipients)
+        return len(recipients)
+
+    async def _sender(self, subscriber: LogSubscriber):
+        """Drain one subscriber's queue to its socket."""
+        try:
+            while True:
+                await subscriber.wakeup.wait()
+                subscriber.wakeup.clear()
+
+                while subscriber.queue:
+                    if subscriber.pending_drop_notice:
+                        notice = json.dumps({"type": "logs_dropped", "count": subscriber.pending_drop_notice})
+                        subscriber.pending_drop_notice = 0
+                        await asyncio.wait_for(subscriber.websocket.send_text(notice), self.send_timeout)
+                    message_text = subscriber.queue.popleft()
+                    await asyncio.wait_for(subscriber.websocket.send_text(message_text), self.send_timeout)
+
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"Stopping log delivery to {subscriber.connection_id}: {e}")
+            self.unsubscribe(subscriber.connection_id)
+
+    # ------------------------------------------------------------------
+    # Stream consumption
+    # ------------------------------------------------------------------
+
+    async def start(self, redis_client):
+        """Create this worker's consumer group and start consuming the log stream."""
+        if self.running:
+            return
+
+        self.redis = redis_client
+        try:
+            await self.redis.xgroup_create(name=self.stream_name, groupname=self.group_name, id="$", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        try:
+            # Register the consumer now so other workers starting at the same
+            # time see the group as in use before our first read
+            await self.redis.xgroup_createconsumer(self.stream_name, self.group_name, self.consumer_name)
+        except Exception as e:
+            logger.debug(f"Failed to create consumer for {self.group_name}: {e}")
+
+        await self._prune_stale_groups()
+        self._consumer_task = asyncio.create_task(self._consume())
+        logger.info(f"Log fan-out consuming {self.stream_name} as group {self.group_name}")
+
+    async def stop(self):
+        """Stop consuming, remove this worker's group and stop all senders."""
+        if self._consumer_task:
+            self._consumer_task.cancel()
+            try:
+                await self._consumer_task
+            except asyncio.CancelledError:
+                pass
+            self._consumer_task = None
+
+        if self.redis is not None:
+            try:
+                await self.redis.xgroup_destroy(self.stream_name, self.group_name)
+            except Exception as e:
+                logger.debug(f"Failed to destroy consumer group {self.group_name}: {e}")
+
+        for connection_id in list(self.subscribers):
+            self.unsubscribe(connection_id)
+
+    async def _prune_stale_groups(self):
+        """
+        Destroy fan-out groups left behind by workers that exited without cleanup.
+
+        A group is stale when its most recently active consumer has been idle
+        longer than ``stale_group_seconds``. A group without consumers may
+        belong to a worker that is still starting, so it is only removed once
+        its last-delivered id is that old as well.
+        """
+        stale_ms = self.stale_group_seconds * 1000
+        try:
+            groups = await self.redis.xinfo_groups(self.stream_name)
+            for group in groups:
+                name = group.get("name")
+                if not name or not name.startswith(GROUP_PREFIX) or name == self.group_name:
+                    continue
+                consumers = await self.redis.xinfo_consumers(self.stream_name, name)
+                idle_ms = min((consumer.get("idle", 0) for consumer in consumers), default=None)
+                if idle_ms is None:
+                    idle_ms = self._stream_id_age_ms(group.get("last-delivered-id"))
+                if idle_ms > stale_ms:
+                    await self.redis.xgroup_destroy(self.stream_name, name)
+                    logger.info(f"Removed stale log fan-out group {name}")
+        except Exception as e:
+            logger.debug(f"Failed to prune stale fan-out groups: {e}")
+
+    @staticmethod
+    def _stream_id_age_ms(stream_id: Optional[str]) -> int:
+        """Milliseconds since a stream id's timestamp part (0 if unknown)."""
+        try:
+            timestamp_ms = int(str(stream_id).split("-", 1)[0])
+        except (TypeError, ValueError):
+            return 0
+        if timestamp_ms == 0:
+            # "0-0": the group never saw an entry, its age is unknown
+            return 0
+        return max(0, int(time.time() * 1000) - timestamp_ms)
+
+    async def _consume(self):
+        while True:
+            try:
+                response = await self.redis.xreadgroup(
+                    groupname=self.group_name,
+                    consumername=self.consumer_name,
+                    streams={self.stream_name: ">"},
+                    count=self.read_count,
+                    block=1000
+                )
+                if not response:
+                    continue
+
+                message_ids: List[str] = []
+                for _, messages in response:
+                    for message_id, fields in messages:
+                        message_ids.append(message_id)
+                        try:
+                            self._dispatch_stream_message(fields)
+                        except Exception as e:
+                            logger.error(f"Failed to fan out log {message_id}: {e}")
+
+                # Per-worker group: acknowledge the whole batch at once so the PEL stays empty
+                await self.redis.xack(self.stream_name, self.group_name, *message_ids)
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                if "NOGROUP" in str(e):
+                    # Stream was deleted or trimmed away with our group; recreate it
+                    try:
+                        await self.redis.xgroup_create(name=self.stream_name, groupname=self.group_name, id="$", mkstream=True)
+                    except Exception:
+                        pass
+                logger.error(f"Error consuming log stream: {e}")
+                await asyncio.sleep(1)  # Backoff on error
+
+    def _dispatch_stream_message(self, fields: Dict[str, Any]):
+        """Decode a stream entry once and queue it for local subscribers."""
+        payload = fields.get("payload")
+        if payload:
+            log_data = json.loads(payload)
+        else:
+            # Entries published without a payload field only have flat string fields
+            log_data = dict(fields)
+
+        scope = log_data.get("scope") or "user"
+        user_id = log_data.get("user_id")
+        if isinstance(user_id, str):
+            user_id = int(user_id) if user_id.isdigit() else None
+
+        message_text = None
+        if payload:
+            # Reuse the published serialization instead of re-encoding the record
+            message_text = (
+                '{"type": "log", "data": ' + payload +
+                ', "timestamp": ' + json.dumps(log_data.get("timestamp")) +
+                ', "scope": ' + json.dumps(scope) + '}'
+            )
+        require_filter_keys = fields.get(LOG_SOURCE_FIELD) == AGENT_LOG_SOURCE
+        self.dispatch(log_data, user_id, scope, message_text, require_filter_keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Fan-out statistics."""
+        return {
+            "running": self.running,
+            "group_name": self.group_name,
+            "subscribers": len(self.subscribers),
+            "delivered": self.delivered,
+            "dropped": sum(subscriber.dropped for subscriber in self.subscribers.values()),
+            "queued": sum(len(subscriber.queue) for subscriber in self.subscribers.values())
+        }
+
+
+# Global instance
+log_fanout_service = LogFanoutService()
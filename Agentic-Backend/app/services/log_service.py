@@ -5,6 +5,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models.task import TaskLog, LogLevel
 from app.db.database import get_session_context
 from app.services.pubsub_service import pubsub_service
+from app.services.log_fanout_service import (
+    log_fanout_service,
+    compile_log_filters,
+    matches_log_filters,
+    LOG_SOURCE_FIELD,
+    AGENT_LOG_SOURCE
+)
 from app.api.routes.websocket import manager as websocket_manager
 from app.utils.logging import get_logger
 from app.utils.metrics import MetricsCollector
@@ -43,8 +50,11 @@ class LogService:
             log_record = await self._store_log(task_id, agent_id, level, message, context)
             
             # Publish to Redis Stream for real-time streaming
+            stream_id = None
             try:
-                stream_id = await self.pubsub.publish_log(log_data)
+                stream_id = await self.pubsub.publish_log(
+                    log_data, extra_fields={LOG_SOURCE_FIELD: AGENT_LOG_SOURCE}
+                )
                 # Update the database record with stream_id
                 if log_record and stream_id:
                     async with get_session_context() as session:
@@ -55,7 +65,7 @@ class LogService:
                 logger.error(f"Failed to publish log to stream: {e}")
             
             # Broadcast to WebSocket subscribers
-            await self._broadcast_to_websockets(log_data)
+            await self._broadcast_to_websockets(log_data, published=bool(stream_id))
             
             # Update metrics
             MetricsCollector.increment_log_messages(level.value, "agent")
@@ -95,17 +105,15 @@ class LogService:
             logger.error(f"Failed to store log in database: {e}")
             raise
     
-    async def _broadcast_to_websockets(self, log_data: Dict[str, Any]):
+    async def _broadcast_to_websockets(self, log_data: Dict[str, Any], published: bool = False):
         """Broadcast log message to WebSocket subscribers."""
         try:
-            # Broadcast to log subscribers with matching filters
-            for connection_id, filters in self.websocket_manager.log_subscriptions.items():
-                if self._matches_subscription_filters(log_data, filters):
-                    await self.websocket_manager.send_personal_message({
-                        "type": "log",
-                        "data": log_data
-                    }, connection_id)
-            
+            # Log subscribers: logs on the stream are delivered by the fan-out
+            # consumer in every API worker; otherwise queue for local subscribers.
+            # A subscription filtering on a key the agent log lacks excludes it.
+            if not (published and log_fanout_service.running):
+                await self.websocket_manager.broadcast_log(log_data, require_filter_keys=True)
+
             # Broadcast to task-specific subscribers
             task_id = UUID(log_data["task_id"])
             if task_id in self.websocket_manager.task_subscriptions:
@@ -118,27 +126,6 @@ class LogService:
         except Exception as e:
             logger.error(f"Failed to broadcast to WebSocket: {e}")
     
-    def _matches_subscription_filters(
-        self,
-        log_data: Dict[str, Any],
-        filters: Dict[str, Any]
-    ) -> bool:
-        """Check if log data matches WebSocket subscription filters."""
-        if not filters:
-            return True
-        
-        for key, value in filters.items():
-            if key not in log_data:
-                return False
-            
-            if isinstance(value, list):
-                if log_data[key] not in value:
-                    return False
-            elif log_data[key] != str(value):  # Convert to string for comparison
-                return False
-        
-        return True
-    
     async def get_task_logs(
         self,
         task_id: UUID,
@@ -180,11 +167,8 @@ class LogService:
             
             # Apply filters if provided
             if filters:
-                filtered_messages = []
-                for msg in messages:
-                    if self._matches_subscription_filters(msg, filters):
-                        filtered_messages.append(msg)
-                return filtered_messages
+                checks = compile_log_filters(filters)
+                return [msg for msg in messages if matches_log_filters(msg, checks, require_keys=True)]
             
             return messages
             
@@ -2,14 +2,22 @@
 Media Download Service
 
 This service handles downloading and caching media files from various sources,
-with support for rate limiting, error handling, and storage management.
+with support for rate limiting, error handling, and storage management. Media
+is stored content-addressed (by SHA-256) with a SQLite index mapping URLs to
+blobs.
 """
 
 import asyncio
 import aiofiles
 import aiohttp
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator, AsyncIterator
 from datetime import datetime, timedelta
 import hashlib
 import mimetypes
@@ -50,22 +58,200 @@ class DownloadResult:
         }
 
 
+class MediaIndex:
+    """
+    SQLite index of the content-addressed media store.
+
+    Tracks blobs (keyed by SHA-256), which URLs resolved to which blob, and
+    the named hardlinks handed out to callers, so lookups, eviction and
+    statistics never have to walk the cache directory. A link that had to
+    be a copy (no hardlink support) records the extra bytes it occupies.
+
+    The connection is shared by the worker threads the service offloads
+    index calls to, so every statement runs under ``_lock``.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS blobs (
+            sha256 TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            content_type TEXT,
+            category TEXT,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_blobs_last_access ON blobs(last_access);
+        CREATE TABLE IF NOT EXISTS urls (
+            url TEXT PRIMARY KEY,
+            sha256 TEXT NOT NULL REFERENCES blobs(sha256) ON DELETE CASCADE
+        );
+        CREATE TABLE IF NOT EXISTS links (
+            path TEXT PRIMARY KEY,
+            sha256 TEXT NOT NULL REFERENCES blobs(sha256) ON DELETE CASCADE,
+            extra_bytes INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_urls_sha256 ON urls(sha256);
+        CREATE INDEX IF NOT EXISTS idx_links_sha256 ON links(sha256);
+    """
+
+    def __init__(self, index_path: Path):
+        self._conn = sqlite3.connect(str(index_path), isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(self.SCHEMA)
+        link_columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(links)")}
+        if "extra_bytes" not in link_columns:
+            self._conn.execute("ALTER TABLE links ADD COLUMN extra_bytes INTEGER NOT NULL DEFAULT 0")
+
+    def lookup_url(self, url: str) -> Optional[sqlite3.Row]:
+        """Return the blob a URL was previously resolved to, if any."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT b.* FROM urls u JOIN blobs b ON b.sha256 = u.sha256 WHERE u.url = ?",
+                (url,)
+            ).fetchone()
+
+    def get_blob(self, sha256: str) -> Optional[sqlite3.Row]:
+        """Return a blob row by digest."""
+        with self._lock:
+            return self._conn.execute("SELECT * FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+
+    def add_blob(self, sha256: str, path: str, size: int, content_type: str, category: str):
+        """Record a blob, or refresh its access time if it already exists."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO blobs (sha256, path, size, content_type, category, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(sha256) DO UPDATE SET last_access = excluded.last_access
+                """,
+                (sha256, path, size, content_type, category, now, now)
+            )
+
+    def map_url(self, url: str, sha256: str):
+        """Point a URL at a blob."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO urls (url, sha256) VALUES (?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET sha256 = excluded.sha256",
+                (url, sha256)
+            )
+
+    def add_link(self, path: str, sha256: str, extra_bytes: int = 0):
+        """Record a named link to a blob (``extra_bytes`` > 0 for a copy)."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO links (path, sha256, extra_bytes) VALUES (?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET sha256 = excluded.sha256, extra_bytes = excluded.extra_bytes",
+                (path, sha256, extra_bytes)
+            )
+
+    def remove_link(self, path: str):
+        """Forget a named link whose file is gone or no longer holds the blob."""
+        with self._lock:
+            self._conn.execute("DELETE FROM links WHERE path = ?", (path,))
+
+    def touch(self, sha256: str):
+        """Mark a blob as recently used."""
+        with self._lock:
+            self._conn.execute("UPDATE blobs SET last_access = ? WHERE sha256 = ?", (time.time(), sha256))
+
+    def links_for(self, sha256: str) -> List[str]:
+        """Return all hardlink paths that share a blob."""
+        with self._lock:
+            rows = self._conn.execute("SELECT path FROM links WHERE sha256 = ?", (sha256,)).fetchall()
+        return [row["path"] for row in rows]
+
+    def remove_blob(self, sha256: str):
+        """Drop a blob together with its URL mappings and links."""
+        with self._lock:
+            self._conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+
+    def total_size(self) -> int:
+        """Total bytes stored: blobs once each (hardlinks are free) plus link copies."""
+        with self._lock:
+            blob_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            link_bytes = self._conn.execute("SELECT COALESCE(SUM(extra_bytes), 0) FROM links").fetchone()[0]
+        return blob_bytes + link_bytes
+
+    def least_recently_used(self, older_than: Optional[float] = None) -> Iterator[sqlite3.Row]:
+        """Iterate blobs from least to most recently used."""
+        if older_than is None:
+            query, params = "SELECT * FROM blobs ORDER BY last_access", ()
+        else:
+            query, params = "SELECT * FROM blobs WHERE last_access < ? ORDER BY last_access", (older_than,)
+        with self._lock:
+            return iter(self._conn.execute(query, params).fetchall())
+
+    def stats(self) -> Dict[str, Any]:
+        """Aggregate blob, URL and link counts."""
+        with self._lock:
+            blob_count, total_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()
+            categories = {
+                row["category"] or "other": row["n"]
+                for row in self._conn.execute("SELECT category, COUNT(*) AS n FROM blobs GROUP BY category")
+            }
+            url_count = self._conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+            link_count, link_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(extra_bytes), 0) FROM links"
+            ).fetchone()
+        return {
+            "blob_count": blob_count,
+            "total_size": total_size + link_bytes,
+            "file_types": categories,
+            "url_count": url_count,
+            "link_count": link_count
+        }
+
+    def close(self):
+        """Close the index connection."""
+        with self._lock:
+            self._conn.close()
+
+
 class MediaDownloadService:
-    """Service for downloading and managing media files."""
+    """
+    Service for downloading and managing media files.
+
+    Downloads are stored once per distinct content under
+    ``blobs/<sha[:2]>/<sha256><ext>``. Callers that ask for a specific
+    filename get a hardlink to the blob, so identical media referenced by
+    several KB items occupies disk space only once. An LRU evictor keeps the
+    store within ``max_cache_size_mb`` using the index alone.
+
+    Downloads of the same URL are serialized, since they share one partial
+    file; index calls run in worker threads to keep SQLite off the event loop.
+    """
 
     def __init__(
         self,
         cache_dir: str = "/app/media_cache",
         max_concurrent_downloads: int = 3,
         timeout_seconds: int = 30,
-        max_file_size_mb: int = 50
+        max_file_size_mb: int = 50,
+        max_cache_size_mb: int = 5120
     ):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.blob_dir = self.cache_dir / "blobs"
+        self.partial_dir = self.cache_dir / "partial"
+        self.blob_dir.mkdir(exist_ok=True)
+        self.partial_dir.mkdir(exist_ok=True)
         self.max_concurrent = max_concurrent_downloads
         self.timeout = aiohttp.ClientTimeout(total=timeout_seconds)
         self.max_file_size = max_file_size_mb * 1024 * 1024  # Convert to bytes
+        self.max_cache_size = max_cache_size_mb * 1024 * 1024
         self.semaphore = asyncio.Semaphore(max_concurrent_downloads)
+        self.index = MediaIndex(self.cache_dir / "index.sqlite")
+        self._session: Optional[aiohttp.ClientSession] = None
+        # URL hash -> [lock, number of callers holding or awaiting it]
+        self._url_locks: Dict[str, List[Any]] = {}
 
         # Supported media types
         self.supported_types = {
@@ -78,6 +264,42 @@ class MediaDownloadService:
         self.rate_limits = {}
         self.request_counts = {}
 
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared, pooled HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrent * 2,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                connector=connector,
+                headers={
+                    'User-Agent': 'Agentic-Backend/1.0',
+                    'Accept': '*/*'
+                }
+            )
+        return self._session
+
+    async def close(self):
+        """Close the shared HTTP session."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @asynccontextmanager
+    async def _url_lock(self, url_key: str) -> AsyncIterator[None]:
+        """Hold the per-URL lock, dropping it once no caller needs it."""
+        entry = self._url_locks.setdefault(url_key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._url_locks.pop(url_key, None)
+
     async def download_media(
         self,
         url: str,
@@ -85,36 +307,41 @@ class MediaDownloadService:
         headers: Optional[Dict[str, str]] = None
     ) -> DownloadResult:
         """
-        Download media from URL and save to cache directory.
+        Download media from URL into the content-addressed store.
 
         Args:
             url: Media URL to download
-            filename: Optional custom filename
+            filename: Optional name for a hardlink to the stored blob
             headers: Optional HTTP headers
 
         Returns:
             DownloadResult with download information
         """
-        async with self.semaphore:  # Limit concurrent downloads
+        url_key = hashlib.sha256(url.encode()).hexdigest()
+
+        # A second caller for the same URL waits here (without holding a
+        # download slot) and is then served from the index
+        async with self._url_lock(url_key), self.semaphore:
             result = DownloadResult()
             start_time = datetime.now()
 
             try:
-                # Check rate limit
-                domain = urlparse(url).netloc
-                if not await self._check_rate_limit(domain):
-                    result.success = False
-                    result.error_message = f"Rate limit exceeded for domain: {domain}"
+                # A URL we have resolved before is served from the index
+                blob = await asyncio.to_thread(self.index.lookup_url, url)
+                if blob and Path(blob["path"]).exists():
+                    await asyncio.to_thread(self.index.touch, blob["sha256"])
+                    file_path = await asyncio.to_thread(self._link_blob, blob, filename)
+                    result.success = True
+                    result.file_path = str(file_path)
+                    result.file_size = blob["size"]
+                    result.content_type = blob["content_type"] or self._get_content_type_from_path(file_path)
+                    result.download_time = 0.0
+                    result.metadata = {"cached": True, "sha256": blob["sha256"]}
                     return result
 
-                # Generate filename if not provided
-                if not filename:
-                    filename = self._generate_filename(url)
-
-                file_path = self.cache_dir / filename
-
-                # Check if file already exists
-                if file_path.exists():
+                # Files cached under an explicit name before the store existed
+                if filename and (self.cache_dir / filename).exists():
+                    file_path = self.cache_dir / filename
                     result.success = True
                     result.file_path = str(file_path)
                     result.file_size = file_path.stat().st_size
@@ -123,68 +350,96 @@ class MediaDownloadService:
                     result.metadata = {"cached": True}
                     return result
 
-                # Download the file
-                async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                    request_headers = headers or {}
-                    request_headers.update({
-                        'User-Agent': 'Agentic-Backend/1.0',
-                        'Accept': '*/*'
-                    })
-
-                    async with session.get(url, headers=request_headers) as response:
-                        if response.status != 200:
-                            result.success = False
-                            result.error_message = f"HTTP {response.status}: {response.reason}"
-                            return result
-
-                        # Check content type
-                        content_type = response.headers.get('content-type', '').lower()
-                        if not self._is_supported_content_type(content_type):
-                            result.success = False
-                            result.error_message = f"Unsupported content type: {content_type}"
-                            return result
-
-                        # Check content length
-                        content_length = response.headers.get('content-length')
-                        if content_length and int(content_length) > self.max_file_size:
-                            result.success = False
-                            result.error_message = f"File too large: {content_length} bytes (max: {self.max_file_size})"
-                            return result
-
-                        # Download and save file
-                        downloaded_size = 0
-                        async with aiofiles.open(file_path, 'wb') as f:
-                            async for chunk in response.content.iter_chunked(8192):
-                                if downloaded_size + len(chunk) > self.max_file_size:
-                                    result.success = False
-                                    result.error_message = "File size limit exceeded during download"
-                                    file_path.unlink(missing_ok=True)
-                                    return result
-
-                                await f.write(chunk)
-                                downloaded_size += len(chunk)
-
-                        # Verify download
-                        if not file_path.exists():
-                            result.success = False
-                            result.error_message = "File was not saved successfully"
-                            return result
-
-                        result.success = True
-                        result.file_path = str(file_path)
-                        result.file_size = downloaded_size
-                        result.content_type = content_type or self._get_content_type_from_path(file_path)
-                        result.download_time = (datetime.now() - start_time).total_seconds()
-                        result.metadata = {
-                            "url": url,
-                            "domain": domain,
-                            "headers": dict(response.headers),
-                            "cached": False
-                        }
-
-                        logger.info(f"Downloaded media: {url} -> {file_path} ({downloaded_size} bytes)")
+                # Check rate limit
+                domain = urlparse(url).netloc
+                if not await self._check_rate_limit(domain):
+                    result.success = False
+                    result.error_message = f"Rate limit exceeded for domain: {domain}"
+                    return result
+
+                partial_path = self.partial_dir / f"{url_key}.part"
+                request_headers = dict(headers or {})
+
+                # Resume an interrupted download of the same URL
+                hasher = hashlib.sha256()
+                resume_from = 0
+                if partial_path.exists():
+                    resume_from = partial_path.stat().st_size
+                    await asyncio.to_thread(self._hash_into, hasher, partial_path)
+                    request_headers['Range'] = f"bytes={resume_from}-"
+
+                session = await self._get_session()
+                async with session.get(url, headers=request_headers) as response:
+                    if response.status == 200 and resume_from:
+                        # Server ignored the Range header; start over
+                        hasher = hashlib.sha256()
+                        resume_from = 0
+                    elif response.status == 416 and resume_from:
+                        # Partial file is stale or already complete; retry cleanly next time
+                        partial_path.unlink(missing_ok=True)
+                        result.success = False
+                        result.error_message = "Resume range not satisfiable; partial download discarded"
+                        return result
+                    elif response.status not in (200, 206):
+                        result.success = False
+                        result.error_message = f"HTTP {response.status}: {response.reason}"
+                        return result
+
+                    # Check content type
+                    content_type = response.headers.get('content-type', '').split(';')[0].strip().lower()
+                    if not self._is_supported_content_type(content_type):
+                        result.success = False
+                        result.error_message = f"Unsupported content type: {content_type}"
                         return result
 
+                    # Check content length
+                    content_length = response.headers.get('content-length')
+                    if content_length and resume_from + int(content_length) > self.max_file_size:
+                        result.success = False
+                        result.error_message = f"File too large: {resume_from + int(content_length)} bytes (max: {self.max_file_size})"
+                        return result
+
+                    # Download into the partial file, hashing as we go
+                    downloaded_size = resume_from
+                    async with aiofiles.open(partial_path, 'ab' if resume_from else 'wb') as f:
+                        async for chunk in response.content.iter_chunked(65536):
+                            if downloaded_size + len(chunk) > self.max_file_size:
+                                result.success = False
+                                result.error_message = "File size limit exceeded during download"
+                                partial_path.unlink(missing_ok=True)
+                                return result
+
+                            await f.write(chunk)
+                            hasher.update(chunk)
+                            downloaded_size += len(chunk)
+
+                    content_type = content_type or self._get_content_type_from_path(Path(urlparse(url).path))
+                    blob = await asyncio.to_thread(
+                        self._store_blob, partial_path, hasher.hexdigest(), downloaded_size, content_type, url
+                    )
+                    await asyncio.to_thread(self.index.map_url, url, blob["sha256"])
+                    file_path = await asyncio.to_thread(self._link_blob, blob, filename)
+
+                    result.success = True
+                    result.file_path = str(file_path)
+                    result.file_size = downloaded_size
+                    result.content_type = content_type
+                    result.download_time = (datetime.now() - start_time).total_seconds()
+                    result.metadata = {
+                        "url": url,
+                        "domain": domain,
+                        "headers": dict(response.headers),
+                        "cached": False,
+                        "resumed_from": resume_from,
+                        "sha256": blob["sha256"],
+                        "deduplicated": blob["deduplicated"]
+                    }
+
+                    logger.info(f"Downloaded media: {url} -> {file_path} ({downloaded_size} bytes)")
+
+                await self._enforce_size_budget()
+                return result
+
             except asyncio.TimeoutError:
                 result.success = False
                 result.error_message = "Download timeout"
@@ -199,6 +454,132 @@ class MediaDownloadService:
             result.download_time = (datetime.now() - start_time).total_seconds()
             return result
 
+    def _hash_into(self, hasher, path: Path):
+        """Feed an existing file into a running hash."""
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(chunk)
+
+    def _store_blob(self, partial_path: Path, sha256: str, size: int, content_type: str, url: str) -> Dict[str, Any]:
+        """Move a completed download into the store, deduplicating by digest."""
+        existing = self.index.get_blob(sha256)
+        if existing and Path(existing["path"]).exists():
+            partial_path.unlink(missing_ok=True)
+            self.index.touch(sha256)
+            return {**dict(existing), "deduplicated": True}
+
+        extension = (
+            mimetypes.guess_extension(content_type or '')
+            or Path(urlparse(url).path).suffix
+            or '.bin'
+        )
+        blob_path = self.blob_dir / sha256[:2] / f"{sha256}{extension}"
+        blob_path.parent.mkdir(exist_ok=True)
+        os.replace(partial_path, blob_path)
+
+        category = self._get_media_category(content_type)
+        self.index.add_blob(sha256, str(blob_path), size, content_type, category)
+        return {
+            "sha256": sha256,
+            "path": str(blob_path),
+            "size": size,
+            "content_type": content_type,
+            "deduplicated": False
+        }
+
+    def _link_blob(self, blob, filename: Optional[str]) -> Path:
+        """Expose a blob under ``filename`` via a hardlink, or return the blob path."""
+        blob_path = Path(blob["path"])
+        if not filename:
+            return blob_path
+
+        link_path = self.cache_dir / filename
+        link_path.parent.mkdir(parents=True, exist_ok=True)
+        if link_path.exists():
+            if os.path.samefile(link_path, blob_path):
+                return link_path
+            link_path.unlink()
+
+        extra_bytes = 0
+        try:
+            os.link(blob_path, link_path)
+        except OSError:
+            # Hardlinks unsupported (e.g. across devices); fall back to a copy
+            shutil.copy2(blob_path, link_path)
+            extra_bytes = blob["size"]
+
+        self.index.add_link(str(link_path), blob["sha256"], extra_bytes)
+        return link_path
+
+    def _blob_in_use(self, blob) -> bool:
+        """
+        Whether named links still hold a blob's data.
+
+        Links whose file the caller has since deleted are dropped from the
+        index on the way, so their blob becomes evictable again.
+        """
+        blob_path = Path(blob["path"])
+        in_use = False
+        for link in self.index.links_for(blob["sha256"]):
+            if not Path(link).exists():
+                self.index.remove_link(link)
+                continue
+            in_use = True
+        try:
+            # Hardlinks the index doesn't know about keep the data alive too
+            return in_use or blob_path.stat().st_nlink > 1
+        except FileNotFoundError:
+            return in_use
+
+    def _evict_blob(self, blob) -> int:
+        """
+        Drop a blob from the store; returns bytes freed on disk.
+
+        Callers skip blobs that are still in use (see ``_blob_in_use``):
+        named links are file paths KB items hold on to, and evicting their
+        blob would free nothing while losing it from the dedup index.
+        """
+        blob_path = Path(blob["path"])
+        freed = 0
+        try:
+            if blob_path.stat().st_nlink == 1:
+                freed = blob["size"]
+            blob_path.unlink()
+        except FileNotFoundError:
+            pass
+        self.index.remove_blob(blob["sha256"])
+        return freed
+
+    def _evict_to_budget(self) -> Dict[str, int]:
+        """Evict least recently used unlinked blobs until the stored size fits the budget."""
+        excess = self.index.total_size() - self.max_cache_size
+        evicted = 0
+        freed = 0
+        for blob in self.index.least_recently_used():
+            if excess <= 0:
+                break
+            if self._blob_in_use(blob):
+                continue
+            blob_freed = self._evict_blob(blob)
+            freed += blob_freed
+            excess -= blob_freed
+            evicted += 1
+        return {"evicted": evicted, "freed": freed, "excess": max(0, excess)}
+
+    async def _enforce_size_budget(self):
+        """Evict least recently used blobs until the store fits the size budget."""
+        outcome = await asyncio.to_thread(self._evict_to_budget)
+        if outcome["evicted"]:
+            logger.info(
+                f"Evicted {outcome['evicted']} media blobs ({outcome['freed']} bytes freed) "
+                f"to stay within cache budget"
+            )
+        if outcome["excess"]:
+            logger.warning(
+                f"Media store is {outcome['excess']} bytes over budget; "
+                f"the remaining blobs are held by linked files"
+            )
+
     async def batch_download_media(
         self,
         urls: List[Dict[str, Any]]
@@ -255,7 +636,7 @@ class MediaDownloadService:
 
     async def cleanup_old_files(self, max_age_days: int = 30) -> Dict[str, Any]:
         """
-        Clean up old cached files.
+        Clean up cached media not accessed within ``max_age_days``.
 
         Args:
             max_age_days: Maximum age of files to keep
@@ -264,19 +645,19 @@ class MediaDownloadService:
             Cleanup statistics
         """
         try:
-            cutoff_date = datetime.now() - timedelta(days=max_age_days)
+            cutoff = (datetime.now() - timedelta(days=max_age_days)).timestamp()
             deleted_files = []
             total_size_freed = 0
 
-            for file_path in self.cache_dir.glob('*'):
-                if file_path.is_file():
-                    # Check file modification time
-                    mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-                    if mtime < cutoff_date:
-                        size = file_path.stat().st_size
-                        file_path.unlink()
-                        deleted_files.append(str(file_path))
-                        total_size_freed += size
+            def evict_old():
+                nonlocal total_size_freed
+                for blob in self.index.least_recently_used(older_than=cutoff):
+                    if self._blob_in_use(blob):
+                        continue
+                    deleted_files.append(blob["path"])
+                    total_size_freed += self._evict_blob(blob)
+
+            await asyncio.to_thread(evict_old)
 
             return {
                 "deleted_files": len(deleted_files),
@@ -294,30 +675,18 @@ class MediaDownloadService:
             }
 
     def get_cache_stats(self) -> Dict[str, Any]:
-        """Get cache directory statistics."""
+        """Get media store statistics from the index."""
         try:
-            total_files = 0
-            total_size = 0
-            file_types = {}
-
-            for file_path in self.cache_dir.glob('*'):
-                if file_path.is_file():
-                    total_files += 1
-                    size = file_path.stat().st_size
-                    total_size += size
-
-                    # Categorize by file type
-                    content_type = self._get_content_type_from_path(file_path)
-                    if content_type:
-                        category = self._get_media_category(content_type)
-                        file_types[category] = file_types.get(category, 0) + 1
-
+            stats = self.index.stats()
             return {
                 "cache_directory": str(self.cache_dir),
-                "total_files": total_files,
-                "total_size_bytes": total_size,
-                "total_size_mb": round(total_size / (1024 * 1024), 2),
-                "file_types": file_types,
+                "total_files": stats["blob_count"],
+                "total_size_bytes": stats["total_size"],
+                "total_size_mb": round(stats["total_size"] / (1024 * 1024), 2),
+                "max_size_mb": round(self.max_cache_size / (1024 * 1024), 2),
+                "file_types": stats["file_types"],
+                "indexed_urls": stats["url_count"],
+                "linked_files": stats["link_count"],
                 "max_concurrent_downloads": self.max_concurrent
             }
 
@@ -350,28 +719,6 @@ class MediaDownloadService:
         self.request_counts[minute_key] = current_count + 1
         return True
 
-    def _generate_filename(self, url: str) -> str:
-        """Generate a unique filename for the URL."""
-        # Create hash of URL for uniqueness
-        url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
-
-        # Get file extension from URL or content type
-        parsed = urlparse(url)
-        path = parsed.path
-        extension = Path(path).suffix
-
-        if not extension:
-            extension = '.bin'  # Default extension
-
-        # Combine hash with original filename
-        original_name = Path(path).stem
-        if original_name:
-            filename = f"{original_name}_{url_hash}{extension}"
-        else:
-            filename = f"{url_hash}{extension}"
-
-        return filename
-
     def _is_supported_content_type(self, content_type: str) -> bool:
         """Check if content type is supported."""
         if not content_type:
@@ -0,0 +1,241 @@
+"""
+OCR batch engine.
+
+Dispatches the pages of an OCR batch to the vision model with bounded
+parallelism. Each page is read once, downscaled and re-encoded when it is
+oversized, and its base64 encoding is streamed straight into the HTTP
+request body instead of being materialized as a Python string.
+"""
+
+import base64
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+
+from PIL import Image, ImageOps
+
+from app.config import settings
+from app.services.ollama_client import sync_ollama_client
+from app.utils.logging import get_logger
+
+logger = get_logger("ocr_batch_engine")
+
+# base64 turns 3 input bytes into 4 output bytes, so chunk on multiples of 3
+# to keep each encoded chunk free of padding.
+B64_CHUNK_SIZE = 3 * 64 * 1024
+_IMAGE_PLACEHOLDER = "__ocr_image__"
+
+# Formats the vision models accept as-is; anything else is re-encoded.
+PASSTHROUGH_FORMATS = {"PNG", "JPEG"}
+
+VISION_OCR_PROMPT = """
+                Analyze this image and extract all visible text. Convert the text to clean, well-formatted Markdown.
+
+                Instructions:
+                - Extract ALL text from the image exactly as it appears
+                - Use proper Markdown formatting for headers, lists, tables, etc.
+                - For tables, use Markdown table syntax
+                - Preserve the original structure and formatting as much as possible
+                - Do not add any introductory text or explanations
+                - Return only the extracted text in Markdown format
+                """
+
+GENERIC_OCR_PROMPT = """
+                Perform high-quality OCR on this image.
+                1. Extract ALL text exactly as it appears.
+                2. Preserve formatting (headers, lists, tables) using Markdown.
+                3. If there are tables, format them as Markdown tables.
+                4. Do not add conversational filler (like "Here is the text"). Just provide the Markdown content.
+                """
+
+
+@dataclass
+class OCRPage:
+    """A single page of an OCR batch."""
+    index: int
+    image_path: str
+
+
+@dataclass
+class OCRPageResult:
+    """Outcome of sending one page to the OCR model."""
+    page: OCRPage
+    response: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    read_failed: bool = False  # The image itself could not be loaded
+    duration_seconds: float = 0.0
+    image_info: Dict[str, Any] = field(default_factory=dict)
+
+
+def prepare_image(image_path: str, max_dimension: int, max_bytes: int) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Load an image for upload, downscaling oversized scans.
+
+    Images that are already within the dimension and size budget and in a
+    format the model accepts are returned byte-for-byte. Everything else is
+    orientation-normalized, shrunk to ``max_dimension`` on its longest side
+    and re-encoded as JPEG.
+
+    Returns:
+        Tuple of (bytes to upload, image info dict)
+    """
+    with open(image_path, "rb") as f:
+        data = f.read()
+
+    info: Dict[str, Any] = {"original_bytes": len(data), "resized": False}
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            info["width"], info["height"] = img.size
+            info["format"] = img.format
+            if (
+                max(img.size) <= max_dimension
+                and len(data) <= max_bytes
+                and img.format in PASSTHROUGH_FORMATS
+            ):
+                info["upload_bytes"] = len(data)
+                return data, info
+
+            normalized = ImageOps.exif_transpose(img)
+            normalized.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+            if normalized.mode not in ("RGB", "L"):
+                normalized = normalized.convert("RGB")
+
+            buffer = io.BytesIO()
+            normalized.save(buffer, format="JPEG", quality=90, optimize=True)
+            encoded = buffer.getvalue()
+    except Exception as e:
+        # Not decodable by Pillow; let the model try the original bytes
+        logger.warning(f"Could not preprocess {image_path}, uploading original: {e}")
+        info["upload_bytes"] = len(data)
+        return data, info
+
+    info.update({
+        "resized": True,
+        "width": normalized.width,
+        "height": normalized.height,
+        "upload_bytes": len(encoded)
+    })
+    return encoded, info
+
+
+def iter_request_body(payload: Dict[str, Any], image_data: bytes) -> Iterator[bytes]:
+    """
+    Serialize ``payload`` with the image placeholder replaced by streamed base64.
+
+    The JSON around the placeholder is encoded once; the image is base64
+    encoded chunk by chunk from a memoryview so neither the encoded string
+    nor a full copy of the request body is ever held in memory.
+    """
+    encoded_payload = json.dumps(payload)
+    prefix, suffix = encoded_payload.split(json.dumps(_IMAGE_PLACEHOLDER), 1)
+
+    yield prefix.encode() + b'"'
+    view = memoryview(image_data)
+    for start in range(0, len(view), B64_CHUNK_SIZE):
+        yield base64.b64encode(view[start:start + B64_CHUNK_SIZE])
+    yield b'"' + suffix.encode()
+
+
+class OCRBatchEngine:
+    """
+    Runs OCR over a batch of pages with bounded parallel dispatch.
+
+    Results are yielded as pages finish (not in page order) so the caller
+    can checkpoint progress while the model keeps working on the rest.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_concurrency: Optional[int] = None,
+        max_dimension: Optional[int] = None,
+        max_upload_bytes: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        self.model = model
+        self.max_concurrency = max(1, max_concurrency or settings.ocr_max_concurrency)
+        self.max_dimension = max_dimension or settings.ocr_max_image_dimension
+        self.max_upload_bytes = max_upload_bytes or settings.ocr_max_upload_bytes
+        self.timeout = timeout or settings.ocr_request_timeout
+
+    def _build_request(self) -> Tuple[str, Dict[str, Any]]:
+        """Build the endpoint and payload template for the configured model."""
+        options = {
+            "temperature": 0.1,
+            "top_p": 0.9,
+            "num_ctx": 4096  # Ensure enough context for full page
+        }
+
+        if "deepseek-ocr" in self.model.lower():
+            # deepseek-ocr is served through the chat endpoint with its own prompt format
+            return "/api/chat", {
+                "model": self.model,
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": "# document: <image>\n<|grounding|>Convert the document to markdown.",
+                        "images": [_IMAGE_PLACEHOLDER]
+                    }
+                ],
+                "stream": False,
+                "options": options
+            }
+
+        prompt = VISION_OCR_PROMPT if "llama3.2-vision" in self.model.lower() else GENERIC_OCR_PROMPT
+        return "/api/generate", {
+            "model": self.model,
+            "prompt": prompt,
+            "images": [_IMAGE_PLACEHOLDER],
+            "stream": False,
+            "options": options
+        }
+
+    def process_page(self, page: OCRPage) -> OCRPageResult:
+        """Prepare one page and send it to the OCR model."""
+        result = OCRPageResult(page=page)
+
+        try:
+            image_data, result.image_info = prepare_image(
+                page.image_path, self.max_dimension, self.max_upload_bytes
+            )
+        except Exception as e:
+            result.error = str(e)
+            result.read_failed = True
+            return result
+
+        endpoint, payload = self._build_request()
+        start_time = time.perf_counter()
+        try:
+            result.response = sync_ollama_client.post_stream(
+                endpoint,
+                iter_request_body(payload, image_data),
+                timeout=self.timeout
+            )
+        except Exception as e:
+            result.error = str(e)
+        finally:
+            result.duration_seconds = time.perf_counter() - start_time
+
+        return result
+
+    def run(self, pages: List[OCRPage]) -> Iterator[OCRPageResult]:
+        """
+        Process pages with at most ``max_concurrency`` requests in flight.
+
+        Yields:
+            OCRPageResult for each page, in completion order
+        """
+        if not pages:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="ocr")
+        try:
+            futures = [executor.submit(self.process_page, page) for page in pages]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # If the consumer stops early, don't start pages nobody will record
+            executor.shutdown(wait=True, cancel_futures=True)
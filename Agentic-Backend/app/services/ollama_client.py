@@ -1,13 +1,26 @@
 import aiohttp
 import asyncio
 import threading
-from typing import Dict, Any, Optional, List, AsyncGenerator
+from typing import Dict, Any, Optional, List, AsyncGenerator, Iterable
 from app.config import settings
 from app.utils.logging import get_logger
+from app.utils.tracing import traced, set_span_attributes, SpanKind
 
 logger = get_logger("ollama_client")
 
 
+def _record_usage(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach Ollama token counts and server-side duration to the active trace span."""
+    if isinstance(result, dict):
+        total_duration = result.get("total_duration")
+        set_span_attributes(**{
+            "llm.prompt_tokens": result.get("prompt_eval_count"),
+            "llm.completion_tokens": result.get("eval_count"),
+            "llm.server_duration_ms": round(total_duration / 1e6, 3) if total_duration else None
+        })
+    return result
+
+
 class OllamaClient:
     """Async client for Ollama API with context-aware session management."""
 
@@ -97,6 +110,7 @@ class OllamaClient:
             self.session = None
             logger.info("Disconnected from Ollama")
     
+    @traced("ollama.generate", kind=SpanKind.CLIENT)
     async def generate(
         self,
         prompt: str,
@@ -144,6 +158,7 @@ class OllamaClient:
             raise Exception("Failed to establish Ollama connection")
 
         model = model or self.default_model
+        set_span_attributes(**{"llm.model": model})
 
         payload = {
             "model": model,
@@ -188,11 +203,11 @@ class OllamaClient:
                 if stream:
                     streaming_results = await self._handle_streaming_response(response)
                     # Return the last result or aggregate as needed
-                    return streaming_results[-1] if streaming_results else {}
+                    return _record_usage(streaming_results[-1]) if streaming_results else {}
                 else:
                     result = await response.json()
                     logger.debug(f"Generated response: {result.get('response', '')[:100]}...")
-                    return result
+                    return _record_usage(result)
                     
         except aiohttp.ClientError as e:
             logger.error(f"HTTP error in generate: {e}")
@@ -201,6 +216,7 @@ class OllamaClient:
             logger.error(f"Error in generate: {e}")
             raise
     
+    @traced("ollama.chat", kind=SpanKind.CLIENT)
     async def chat(
         self,
         messages: List[Dict[str, str]],
@@ -240,6 +256,7 @@ class OllamaClient:
             raise Exception("Failed to establish Ollama connection")
 
         model = model or self.default_model
+        set_span_attributes(**{"llm.model": model})
 
         payload = {
             "model": model,
@@ -276,11 +293,11 @@ class OllamaClient:
                 if stream:
                     streaming_results = await self._handle_streaming_response(response)
                     # Return the last result or aggregate as needed
-                    return streaming_results[-1] if streaming_results else {}
+                    return _record_usage(streaming_results[-1]) if streaming_results else {}
                 else:
                     result = await response.json()
                     logger.debug(f"Chat response: {result.get('message', {}).get('content', '')[:100]}...")
-                    return result
+                    return _record_usage(result)
                     
         except aiohttp.ClientError as e:
             logger.error(f"HTTP error in chat: {e}")
@@ -304,6 +321,7 @@ class OllamaClient:
                     continue
         return results
     
+    @traced("ollama.embeddings", kind=SpanKind.CLIENT)
     async def embeddings(
         self,
         prompt: str,
@@ -319,6 +337,7 @@ class OllamaClient:
             raise Exception("Failed to establish Ollama connection")
 
         model = model or self.default_model
+        set_span_attributes(**{"llm.model": model})
         
         payload = {
             "model": model,
@@ -342,6 +361,51 @@ class OllamaClient:
             logger.error(f"Error in embeddings: {e}")
             raise
     
+    @traced("ollama.embed", kind=SpanKind.CLIENT)
+    async def embed(
+        self,
+        inputs: List[str],
+        model: Optional[str] = None
+    ) -> List[List[float]]:
+        """
+        Generate embeddings for several texts in one call (``/api/embed``).
+
+        Returns:
+            One embedding per input, in input order
+        """
+        if not self.session or self.session.closed:
+            await self.connect()
+
+        if not self.session:
+            raise Exception("Failed to establish Ollama connection")
+
+        model = model or self.default_model
+        set_span_attributes(**{"llm.model": model})
+
+        payload = {
+            "model": model,
+            "input": inputs
+        }
+
+        try:
+            logger.debug(f"Generating {len(inputs)} embeddings with model {model}")
+
+            async with self.session.post(f"{self.base_url}/api/embed", json=payload) as response:
+                response.raise_for_status()
+                result = await response.json()
+
+            embeddings = result.get("embeddings") or []
+            if len(embeddings) != len(inputs):
+                raise ValueError(f"Expected {len(inputs)} embeddings, got {len(embeddings)}")
+            return embeddings
+
+        except aiohttp.ClientError as e:
+            logger.error(f"HTTP error in batch embeddings: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Error in batch embeddings: {e}")
+            raise
+
     async def list_models(self) -> Dict[str, Any]:
         """List available models."""
         # Ensure session is available and reconnect if needed
@@ -450,9 +514,11 @@ class SyncOllamaClient:
         self.session = self.requests.Session()
         self.session.headers.update({"Content-Type": "application/json"})
 
+    @traced("ollama.generate", kind=SpanKind.CLIENT)
     def generate(self, prompt: str, model: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """Synchronous generate method using requests."""
         model = model or self.default_model
+        set_span_attributes(**{"llm.model": model})
 
         payload = {
             "model": model,
@@ -475,14 +541,16 @@ class SyncOllamaClient:
         try:
             response = self.session.post(f"{self.base_url}/api/generate", json=payload)
             response.raise_for_status()
-            return response.json()
+            return _record_usage(response.json())
         except Exception as e:
             logger.error(f"Error in sync generate: {e}")
             raise
 
+    @traced("ollama.chat", kind=SpanKind.CLIENT)
     def chat(self, messages: List[Dict[str, str]], model: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """Synchronous chat method using requests."""
         model = model or self.default_model
+        set_span_attributes(**{"llm.model": model})
 
         payload = {
             "model": model,
@@ -498,14 +566,16 @@ class SyncOllamaClient:
         try:
             response = self.session.post(f"{self.base_url}/api/chat", json=payload)
             response.raise_for_status()
-            return response.json()
+            return _record_usage(response.json())
         except Exception as e:
             logger.error(f"Error in sync chat: {e}")
             raise
 
+    @traced("ollama.embeddings", kind=SpanKind.CLIENT)
     def embeddings(self, prompt: str, model: Optional[str] = None) -> Dict[str, Any]:
         """Synchronous embeddings method using requests."""
         model = model or self.default_model
+        set_span_attributes(**{"llm.model": model})
 
         payload = {
             "model": model,
@@ -564,6 +634,26 @@ class SyncOllamaClient:
             logger.error(f"Error in sync pull_model: {e}")
             raise
 
+    def post_stream(
+        self,
+        endpoint: str,
+        body: Iterable[bytes],
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        POST a pre-encoded JSON body supplied as an iterator of byte chunks.
+
+        The body is sent with chunked transfer encoding, so large payloads
+        (e.g. base64 images) never have to be assembled in memory.
+        """
+        try:
+            response = self.session.post(f"{self.base_url}{endpoint}", data=body, timeout=timeout)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"Error in sync post_stream to {endpoint}: {e}")
+            raise
+
     def close(self):
         """Close the requests session."""
         if self.session:
@@ -22,6 +22,7 @@ import statistics
 
 from app.config import settings
 from app.services.ollama_client import ollama_client
+from app.services.llm_benchmark import LLMBenchmarkRunner, BenchmarkTask, BenchmarkReport
 from app.utils.logging import get_logger
 
 logger = get_logger("performance_optimization_service")
@@ -118,6 +119,10 @@ class PerformanceOptimizationService:
         # Performance tracking
         self.model_metrics: Dict[str, Dict[str, ModelPerformanceMetrics]] = defaultdict(dict)
         self.request_history: List[Dict[str, Any]] = []
+        self._benchmarks_loaded = False
+        # Benchmark tail latency stands in for live data until this many live requests exist
+        self.min_live_samples = getattr(settings, 'llm_benchmark_min_live_samples', 20)
+        self.benchmark_max_age = timedelta(hours=getattr(settings, 'llm_benchmark_max_age_hours', 168.0))
 
         # Optimization thresholds
         self.performance_thresholds = {
@@ -177,6 +182,11 @@ class PerformanceOptimizationService:
         try:
             constraints = constraints or {}
 
+            # Seed metrics from the latest saved benchmark run
+            if not self._benchmarks_loaded:
+                self._benchmarks_loaded = True
+                self.load_benchmark_results()
+
             # Get available models for task type
             available_models = await self._get_available_models_for_task(task_type)
 
@@ -291,10 +301,11 @@ class PerformanceOptimizationService:
             score = 0.0
             factors = 0
 
-            # Response time score
-            if metrics.avg_response_time is not None:
+            # Response time score (benchmark tail latency until live data takes over)
+            response_time = self._benchmark_p95(metrics) or metrics.avg_response_time
+            if response_time is not None:
                 max_time = constraints.get("max_response_time", self.performance_thresholds["max_response_time"])
-                time_score = max(0, 1 - (metrics.avg_response_time / max_time))
+                time_score = max(0, 1 - (response_time / max_time))
                 score += time_score
                 factors += 1
 
@@ -317,6 +328,20 @@ class PerformanceOptimizationService:
             logger.error(f"Performance score calculation failed: {e}")
             return 0.5
 
+    def _benchmark_p95(self, metrics: ModelPerformanceMetrics) -> Optional[float]:
+        """Benchmark p95 wall time, if it is recent and live samples are still too few."""
+        benchmark = metrics.metadata.get("benchmark")
+        if not benchmark or metrics.total_requests >= self.min_live_samples:
+            return None
+
+        try:
+            measured_at = datetime.fromisoformat(benchmark.get("measured_at", ""))
+        except ValueError:
+            return None
+        if datetime.now() - measured_at > self.benchmark_max_age:
+            return None
+        return benchmark.get("wall_time_p95")
+
     async def record_model_performance(
         self,
         model_name: str,
@@ -644,102 +669,163 @@ class PerformanceOptimizationService:
         """
         Benchmark multiple models on test tasks.
 
+        Runs the LLM benchmark harness (warmup, repetitions, concurrency
+        sweep), saves the JSON artifact and feeds the results into the
+        metrics used by select_optimal_model.
+
         Args:
             models: List of model names to benchmark
-            test_tasks: List of test tasks
-            **kwargs: Additional benchmarking parameters
+            test_tasks: List of test tasks ({"id", "prompt", "type"})
+            **kwargs: Additional benchmarking parameters (temperature,
+                max_tokens, warmup_runs, repetitions, concurrency_levels,
+                backend, save_artifact)
 
         Returns:
             Benchmarking results
         """
         try:
-            results = {}
+            runner = LLMBenchmarkRunner(
+                backend=kwargs.get("backend"),
+                warmup_runs=kwargs.get("warmup_runs"),
+                repetitions=kwargs.get("repetitions"),
+                concurrency_levels=kwargs.get("concurrency_levels"),
+                options={
+                    "temperature": kwargs.get("temperature", 0.1),
+                    "num_predict": kwargs.get("max_tokens", 100)
+                }
+            )
+            tasks = [
+                BenchmarkTask(
+                    id=str(task.get("id", i)),
+                    prompt=task.get("prompt", ""),
+                    type=task.get("type", "benchmark")
+                )
+                for i, task in enumerate(test_tasks)
+            ]
+            report = await runner.run(models, tasks)
 
-            for model_name in models:
-                model_results = []
-
-                for task in test_tasks:
-                    start_time = time.time()
-
-                    try:
-                        # Execute task with model
-                        response = await ollama_client.generate(
-                            model=model_name,
-                            prompt=task.get("prompt", ""),
-                            options={
-                                "temperature": kwargs.get("temperature", 0.1),
-                                "num_predict": kwargs.get("max_tokens", 100)
-                            }
-                        )
-
-                        response_time = time.time() - start_time
-                        tokens_generated = len(response.get("response", "").split())
-
-                        model_results.append({
-                            "task_id": task.get("id", ""),
-                            "response_time": response_time,
-                            "tokens_generated": tokens_generated,
-                            "success": True
-                        })
-
-                        # Record performance
-                        await self.record_model_performance(
-                            model_name=model_name,
-                            task_type=task.get("type", "benchmark"),
-                            response_time=response_time,
-                            tokens_generated=tokens_generated,
-                            success=True
-                        )
-
-                    except Exception as e:
-                        response_time = time.time() - start_time
-                        model_results.append({
-                            "task_id": task.get("id", ""),
-                            "response_time": response_time,
-                            "error": str(e),
-                            "success": False
-                        })
-
-                        # Record error
-                        await self.record_model_performance(
-                            model_name=model_name,
-                            task_type=task.get("type", "benchmark"),
-                            response_time=response_time,
-                            tokens_generated=0,
-                            success=False,
-                            error_type=str(e)
-                        )
-
-                # Calculate aggregate metrics
-                successful_tasks = [r for r in model_results if r["success"]]
-                if successful_tasks:
-                    avg_response_time = statistics.mean([r["response_time"] for r in successful_tasks])
-                    avg_tokens_per_second = statistics.mean([
-                        r["tokens_generated"] / r["response_time"] for r in successful_tasks
-                        if r["response_time"] > 0
-                    ])
-                    success_rate = len(successful_tasks) / len(model_results)
+            artifact_path = None
+            if kwargs.get("save_artifact", True):
+                artifact_path = str(report.save())
 
-                    results[model_name] = {
-                        "avg_response_time": avg_response_time,
-                        "avg_tokens_per_second": avg_tokens_per_second,
-                        "success_rate": success_rate,
-                        "total_tasks": len(model_results),
-                        "successful_tasks": len(successful_tasks)
-                    }
-                else:
+            self.apply_benchmark_report(report)
+
+            results = {}
+            for model_name, model_result in report.models.items():
+                baseline = model_result.baseline
+                if baseline is None or not baseline.successes:
                     results[model_name] = {
                         "error": "No successful tasks",
-                        "total_tasks": len(model_results),
+                        "total_tasks": baseline.requests if baseline else 0,
                         "successful_tasks": 0
                     }
+                    continue
+
+                results[model_name] = {
+                    "avg_response_time": baseline.wall_time["mean"],
+                    "avg_tokens_per_second": baseline.decode_tokens_per_second["mean"],
+                    "success_rate": baseline.success_rate,
+                    "total_tasks": baseline.requests,
+                    "successful_tasks": baseline.successes,
+                    "knee_concurrency": model_result.knee_concurrency,
+                    **model_result.to_dict()
+                }
 
+            if artifact_path:
+                results["artifact_path"] = artifact_path
             return results
 
         except Exception as e:
             logger.error(f"Model benchmarking failed: {e}")
             return {"error": str(e)}
 
+    def apply_benchmark_report(self, report: BenchmarkReport):
+        """
+        Seed model metrics from a benchmark report.
+
+        Each task type only gets the baseline measured on its own prompts.
+        The numbers are kept under ``metadata["benchmark"]`` with the run's
+        timestamp; live counters are never overwritten. A metrics entry with
+        no live requests yet also takes the benchmark averages, which the
+        first live request replaces (they carry zero weight in the rolling
+        averages).
+        """
+        for model_name, model_result in report.models.items():
+            baseline = model_result.baseline
+            if baseline is None or not baseline.successes:
+                continue
+
+            baselines = baseline.by_task_type
+            if not baselines:
+                # Older reports without a per task type breakdown: only a
+                # single-type run can be attributed to its type
+                task_types = report.config.get("task_types") or ["benchmark"]
+                baselines = {task_types[0]: baseline} if len(task_types) == 1 else {}
+
+            knee = model_result.level(model_result.knee_concurrency) if model_result.knee_concurrency else None
+            for task_type, measured in baselines.items():
+                if not measured.successes:
+                    continue
+
+                benchmark = {
+                    "measured_at": report.started_at,
+                    "requests": measured.requests,
+                    "success_rate": measured.success_rate,
+                    "wall_time_p50": measured.wall_time["p50"],
+                    "wall_time_p95": measured.wall_time["p95"],
+                    "wall_time_p99": measured.wall_time["p99"],
+                    "ttft_p95": measured.ttft["p95"],
+                    "decode_tokens_per_second_p50": measured.decode_tokens_per_second["p50"],
+                    "cold_load_time": model_result.cold_load_time,
+                    "knee_concurrency": model_result.knee_concurrency,
+                    "knee_throughput_tokens_per_second": knee.throughput_tokens_per_second if knee else None
+                }
+
+                metrics = self.model_metrics[model_name].get(task_type)
+                if metrics is None:
+                    metrics = ModelPerformanceMetrics(model_name=model_name, task_type=task_type)
+                    self.model_metrics[model_name][task_type] = metrics
+
+                previous = metrics.metadata.get("benchmark")
+                if previous and previous.get("measured_at", "") > report.started_at:
+                    continue
+                metrics.metadata["benchmark"] = benchmark
+
+                if metrics.total_requests == 0:
+                    metrics.avg_response_time = benchmark["wall_time_p50"]
+                    metrics.avg_tokens_per_second = benchmark["decode_tokens_per_second_p50"]
+                    metrics.success_rate = benchmark["success_rate"]
+
+    def load_benchmark_results(self, path: Optional[str] = None) -> bool:
+        """
+        Apply a saved benchmark artifact (default: the newest non-stub run
+        in the results dir).
+
+        Returns:
+            True if a report was loaded
+        """
+        try:
+            if path is not None:
+                candidates = [Path(path)]
+            else:
+                candidates = sorted(Path(settings.llm_benchmark_results_dir).glob("benchmark_*.json"), reverse=True)
+
+            for candidate in candidates:
+                report = BenchmarkReport.load(str(candidate))
+                # Simulated runs must never steer real model selection
+                if report.backend == "stub" and path is None:
+                    continue
+
+                self.apply_benchmark_report(report)
+                logger.info(f"Loaded benchmark results from {candidate}")
+                return True
+
+            return False
+
+        except Exception as e:
+            logger.warning(f"Could not load benchmark results: {e}")
+            return False
+
     async def health_check(self) -> Dict[str, Any]:
         """Check the health of the performance optimization service."""
         try:
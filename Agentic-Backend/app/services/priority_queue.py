@@ -0,0 +1,398 @@
+"""
+Redis-backed priority queue engine.
+
+Each queue is a set of Redis keys under ``queue:{name}``:
+
+- ``pending``   ZSET of ready item ids, ordered by priority band then deadline
+- ``inflight``  ZSET of dequeued item ids scored by visibility expiry
+- ``queued``    ZSET of ready item ids scored by the time they became ready
+- ``dead``      ZSET of dead-lettered item ids scored by failure time
+- ``item:{id}`` HASH with the item fields and its retry state
+- ``stats``     HASH of counters and wait-time totals
+- ``waits``     LIST of recent wait times (capped) for percentiles
+
+Dequeue, failure and reclaim are Lua scripts, so moving an item between
+states is atomic and costs one round trip for a whole batch. Items that are
+not acknowledged within the visibility timeout are reclaimed (counted as a
+failed attempt), which makes processing at-least-once across workers and
+restarts.
+"""
+
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+from app.utils.logging import get_logger
+
+logger = get_logger("priority_queue")
+
+QUEUE_NAMES_KEY = "queue:names"
+
+# Priority dominates the score; deadlines (epoch seconds) order items within a band
+PRIORITY_BAND = 1e10
+MAX_PRIORITY = 4
+
+
+_DEQUEUE_SCRIPT = """
+local ids = redis.call('ZRANGE', KEYS[1], 0, tonumber(ARGV[3]) - 1)
+if #ids == 0 then
+    return {}
+end
+local now = tonumber(ARGV[1])
+local visible_at = now + tonumber(ARGV[2])
+local result = {}
+local wait_total = 0
+local wait_max = tonumber(redis.call('HGET', KEYS[4], 'wait_seconds_max') or '0')
+for _, id in ipairs(ids) do
+    local queued_at = tonumber(redis.call('ZSCORE', KEYS[3], id) or ARGV[1])
+    local wait = now - queued_at
+    wait_total = wait_total + wait
+    if wait > wait_max then
+        wait_max = wait
+    end
+    redis.call('LPUSH', KEYS[5], wait)
+    redis.call('ZADD', KEYS[2], visible_at, id)
+    result[#result + 1] = redis.call('HGETALL', ARGV[4] .. id)
+end
+redis.call('ZREM', KEYS[1], unpack(ids))
+redis.call('ZREM', KEYS[3], unpack(ids))
+redis.call('LTRIM', KEYS[5], 0, tonumber(ARGV[5]) - 1)
+redis.call('HINCRBY', KEYS[4], 'dequeued', #ids)
+redis.call('HINCRBYFLOAT', KEYS[4], 'wait_seconds_total', wait_total)
+redis.call('HSET', KEYS[4], 'wait_seconds_max', wait_max)
+return result
+"""
+
+_ACK_SCRIPT = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('DEL', ARGV[2] .. ARGV[1])
+redis.call('HINCRBY', KEYS[2], 'completed', 1)
+return 1
+"""
+
+# Returns 0 if the item was not in flight, 1 if re-queued, 2 if dead-lettered
+_FAIL_SCRIPT = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+local key = ARGV[2] .. ARGV[1]
+local now = tonumber(ARGV[3])
+redis.call('HSET', key, 'last_error', ARGV[4])
+local retries = redis.call('HINCRBY', key, 'retry_count', 1)
+local max_retries = tonumber(redis.call('HGET', key, 'max_retries') or '0')
+if ARGV[5] == '1' or retries >= max_retries then
+    redis.call('HSET', key, 'failed_at', now)
+    redis.call('ZADD', KEYS[4], now, ARGV[1])
+    redis.call('HINCRBY', KEYS[5], 'dead_lettered', 1)
+    return 2
+end
+redis.call('ZADD', KEYS[2], tonumber(redis.call('HGET', key, 'score')), ARGV[1])
+redis.call('ZADD', KEYS[3], now, ARGV[1])
+redis.call('HINCRBY', KEYS[5], 'retried', 1)
+return 1
+"""
+
+# Re-queue (or dead-letter) in-flight items whose visibility timeout expired,
+# and drop dead letters older than the retention window
+_RECLAIM_SCRIPT = """
+local now = tonumber(ARGV[1])
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, tonumber(ARGV[3]))
+local reclaimed = 0
+for _, id in ipairs(ids) do
+    redis.call('ZREM', KEYS[1], id)
+    local key = ARGV[2] .. id
+    local retries = redis.call('HINCRBY', key, 'retry_count', 1)
+    local max_retries = tonumber(redis.call('HGET', key, 'max_retries') or '0')
+    redis.call('HSET', key, 'last_error', 'visibility timeout expired')
+    if retries >= max_retries then
+        redis.call('HSET', key, 'failed_at', now)
+        redis.call('ZADD', KEYS[4], now, id)
+        redis.call('HINCRBY', KEYS[5], 'dead_lettered', 1)
+    else
+        redis.call('ZADD', KEYS[2], tonumber(redis.call('HGET', key, 'score')), id)
+        redis.call('ZADD', KEYS[3], now, id)
+        reclaimed = reclaimed + 1
+    end
+end
+if reclaimed > 0 then
+    redis.call('HINCRBY', KEYS[5], 'reclaimed', reclaimed)
+end
+local expired = redis.call('ZRANGEBYSCORE', KEYS[4], '-inf', tonumber(ARGV[4]), 'LIMIT', 0, tonumber(ARGV[3]))
+for _, id in ipairs(expired) do
+    redis.call('ZREM', KEYS[4], id)
+    redis.call('DEL', ARGV[2] .. id)
+end
+return {#ids, #expired}
+"""
+
+_RETRY_DEAD_SCRIPT = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+local key = ARGV[2] .. ARGV[1]
+redis.call('HSET', key, 'retry_count', 0)
+redis.call('HDEL', key, 'failed_at')
+redis.call('ZADD', KEYS[2], tonumber(redis.call('HGET', key, 'score')), ARGV[1])
+redis.call('ZADD', KEYS[3], tonumber(ARGV[3]), ARGV[1])
+return 1
+"""
+
+
+def to_timestamp(value: Union[None, int, float, str, datetime]) -> Optional[float]:
+    """Convert a deadline given as epoch seconds, ISO string or datetime to epoch seconds."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        # Naive datetimes in this codebase are UTC
+        return (value - datetime(1970, 1, 1)).total_seconds()
+    return value.timestamp()
+
+
+def compute_score(priority: int, deadline: float) -> float:
+    """Ordering score: higher priority first, then earliest deadline first."""
+    return (MAX_PRIORITY - priority) * PRIORITY_BAND + deadline
+
+
+class RedisPriorityQueue:
+    """A single durable priority queue with visibility timeouts and a dead-letter set."""
+
+    def __init__(
+        self,
+        redis_client,
+        name: str,
+        visibility_timeout: float = 300.0,
+        default_deadline_seconds: float = 3600.0,
+        dead_letter_retention_seconds: float = 86400.0,
+        wait_samples: int = 1000
+    ):
+        self.redis = redis_client
+        self.name = name
+        self.visibility_timeout = visibility_timeout
+        self.default_deadline_seconds = default_deadline_seconds
+        self.dead_letter_retention_seconds = dead_letter_retention_seconds
+        self.wait_samples = wait_samples
+
+        prefix = f"queue:{name}"
+        self.item_prefix = f"{prefix}:item:"
+        self.pending_key = f"{prefix}:pending"
+        self.inflight_key = f"{prefix}:inflight"
+        self.queued_key = f"{prefix}:queued"
+        self.dead_key = f"{prefix}:dead"
+        self.stats_key = f"{prefix}:stats"
+        self.waits_key = f"{prefix}:waits"
+
+        self._dequeue = redis_client.register_script(_DEQUEUE_SCRIPT)
+        self._ack = redis_client.register_script(_ACK_SCRIPT)
+        self._fail = redis_client.register_script(_FAIL_SCRIPT)
+        self._reclaim = redis_client.register_script(_RECLAIM_SCRIPT)
+        self._retry_dead = redis_client.register_script(_RETRY_DEAD_SCRIPT)
+
+    async def enqueue(
+        self,
+        item_type: str,
+        data: Dict[str, Any],
+        priority: int,
+        max_retries: int = 3,
+        deadline: Union[None, int, float, str, datetime] = None,
+        callback_url: Optional[str] = None,
+        item_id: Optional[str] = None
+    ) -> str:
+        """
+        Add an item to the queue.
+
+        Items without an explicit deadline get an implicit one of
+        ``default_deadline_seconds`` after enqueue, so within a priority band
+        they stay FIFO relative to each other while explicit deadlines can
+        move ahead of them.
+
+        Returns:
+            Item id
+        """
+        item_id = item_id or str(uuid.uuid4())
+        now = time.time()
+        deadline_ts = to_timestamp(deadline)
+        score = compute_score(priority, deadline_ts if deadline_ts is not None else now + self.default_deadline_seconds)
+
+        fields = {
+            "id": item_id,
+            "type": item_type,
+            "priority": priority,
+            "data": json.dumps(data, default=str),
+            "created_at": now,
+            "deadline": deadline_ts if deadline_ts is not None else "",
+            "max_retries": max_retries,
+            "retry_count": 0,
+            "callback_url": callback_url or "",
+            "score": score
+        }
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(self.item_prefix + item_id, mapping=fields)
+        pipe.zadd(self.pending_key, {item_id: score})
+        pipe.zadd(self.queued_key, {item_id: now})
+        pipe.sadd(QUEUE_NAMES_KEY, self.name)
+        pipe.hincrby(self.stats_key, "enqueued", 1)
+        await pipe.execute()
+        return item_id
+
+    async def dequeue(self, count: int = 1) -> List[Dict[str, Any]]:
+        """
+        Claim up to ``count`` items in priority/deadline order.
+
+        Claimed items stay invisible for the visibility timeout and must be
+        acknowledged with ``ack`` or ``fail``; otherwise they are reclaimed.
+        """
+        rows = await self._dequeue(
+            keys=[self.pending_key, self.inflight_key, self.queued_key, self.stats_key, self.waits_key],
+            args=[time.time(), self.visibility_timeout, count, self.item_prefix, self.wait_samples]
+        )
+        return [self._decode(row) for row in rows if row]
+
+    async def ack(self, item_id: str) -> bool:
+        """Mark an in-flight item as completed and delete it."""
+        return bool(await self._ack(keys=[self.inflight_key, self.stats_key], args=[item_id, self.item_prefix]))
+
+    async def fail(self, item_id: str, error: str, dead_letter: bool = False) -> Optional[str]:
+        """
+        Record a failed attempt for an in-flight item.
+
+        Args:
+            item_id: Item id
+            error: Error message kept on the item
+            dead_letter: Skip remaining retries and dead-letter immediately
+
+        Returns:
+            "retried", "dead_lettered", or None if the item was not in flight
+        """
+        result = await self._fail(
+            keys=[self.inflight_key, self.pending_key, self.queued_key, self.dead_key, self.stats_key],
+            args=[item_id, self.item_prefix, time.time(), error[:1000], "1" if dead_letter else "0"]
+        )
+        return {1: "retried", 2: "dead_lettered"}.get(int(result))
+
+    async def reclaim(self, limit: int = 100) -> Dict[str, int]:
+        """Re-queue expired in-flight items and purge expired dead letters."""
+        now = time.time()
+        expired, purged = await self._reclaim(
+            keys=[self.inflight_key, self.pending_key, self.queued_key, self.dead_key, self.stats_key],
+            args=[now, self.item_prefix, limit, now - self.dead_letter_retention_seconds]
+        )
+        return {"expired": int(expired), "purged": int(purged)}
+
+    async def retry_dead(self, item_id: str) -> bool:
+        """Move a dead-lettered item back to the queue with a fresh retry budget."""
+        return bool(await self._retry_dead(
+            keys=[self.dead_key, self.pending_key, self.queued_key],
+            args=[item_id, self.item_prefix, time.time()]
+        ))
+
+    async def remove(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Remove an item in any state. Returns the removed item, if it existed."""
+        key = self.item_prefix + item_id
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hgetall(key)
+        pipe.zrem(self.pending_key, item_id)
+        pipe.zrem(self.queued_key, item_id)
+        pipe.zrem(self.inflight_key, item_id)
+        pipe.zrem(self.dead_key, item_id)
+        pipe.delete(key)
+        fields = (await pipe.execute())[0]
+        return self._decode(fields) if fields else None
+
+    async def peek(self, limit: int = 50, dead: bool = False) -> List[Dict[str, Any]]:
+        """Items at the head of the queue (or the most recent dead letters) without claiming them."""
+        if dead:
+            ids = await self.redis.zrevrange(self.dead_key, 0, limit - 1)
+        else:
+            ids = await self.redis.zrange(self.pending_key, 0, limit - 1)
+        if not ids:
+            return []
+        pipe = self.redis.pipeline(transaction=False)
+        for item_id in ids:
+            pipe.hgetall(self.item_prefix + item_id)
+        return [self._decode(fields) for fields in await pipe.execute() if fields]
+
+    async def size(self) -> int:
+        return await self.redis.zcard(self.pending_key)
+
+    async def stats(self) -> Dict[str, Any]:
+        """Queue depth by state and priority, throughput counters and wait-time statistics."""
+        now = time.time()
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zcard(self.pending_key)
+        pipe.zcard(self.inflight_key)
+        pipe.zcard(self.dead_key)
+        pipe.zrange(self.queued_key, 0, 0, withscores=True)
+        pipe.hgetall(self.stats_key)
+        pipe.lrange(self.waits_key, 0, -1)
+        for priority in range(MAX_PRIORITY, 0, -1):
+            band_start = (MAX_PRIORITY - priority) * PRIORITY_BAND
+            pipe.zcount(self.pending_key, band_start, f"({band_start + PRIORITY_BAND}")
+        results = await pipe.execute()
+
+        pending, in_flight, dead, oldest, counters, waits = results[:6]
+        by_priority = results[6:]
+        counters = {key: float(value) for key, value in (counters or {}).items()}
+        dequeued = counters.get("dequeued", 0)
+        samples = sorted(float(wait) for wait in waits)
+
+        return {
+            "queue_name": self.name,
+            "total_items": pending,
+            "in_flight": in_flight,
+            "dead_letter": dead,
+            "items_by_priority": {
+                name: count
+                for name, count in zip(("CRITICAL", "HIGH", "NORMAL", "LOW"), by_priority)
+                if count
+            },
+            "oldest_item_age_seconds": now - oldest[0][1] if oldest else None,
+            "average_wait_time_seconds": counters.get("wait_seconds_total", 0) / dequeued if dequeued else None,
+            "max_wait_time_seconds": counters.get("wait_seconds_max") if dequeued else None,
+            "p50_wait_time_seconds": _percentile(samples, 0.50),
+            "p95_wait_time_seconds": _percentile(samples, 0.95),
+            "enqueued": int(counters.get("enqueued", 0)),
+            "dequeued": int(dequeued),
+            "completed": int(counters.get("completed", 0)),
+            "retried": int(counters.get("retried", 0)),
+            "reclaimed": int(counters.get("reclaimed", 0)),
+            "dead_lettered": int(counters.get("dead_lettered", 0))
+        }
+
+    @staticmethod
+    def _decode(fields) -> Dict[str, Any]:
+        if isinstance(fields, list):
+            # HGETALL inside Lua returns a flat [field, value, ...] list
+            fields = dict(zip(fields[::2], fields[1::2]))
+        deadline = fields.get("deadline")
+        return {
+            "id": fields.get("id"),
+            "type": fields.get("type", "generic"),
+            "priority": int(fields.get("priority", 2)),
+            "data": json.loads(fields.get("data") or "{}"),
+            "created_at": float(fields.get("created_at") or 0),
+            "deadline": float(deadline) if deadline else None,
+            "max_retries": int(fields.get("max_retries") or 0),
+            "retry_count": int(fields.get("retry_count") or 0),
+            "callback_url": fields.get("callback_url") or None,
+            "last_error": fields.get("last_error"),
+            "failed_at": float(fields["failed_at"]) if fields.get("failed_at") else None
+        }
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
@@ -51,8 +51,14 @@ class RedisPubSubService:
             await self.redis.close()
             logger.info("Disconnected from Redis")
     
-    async def publish_log(self, log_data: Dict[str, Any]) -> str:
-        """Publish a log message to Redis Stream."""
+    async def publish_log(self, log_data: Dict[str, Any], extra_fields: Optional[Dict[str, str]] = None) -> str:
+        """
+        Publish a log message to Redis Stream.
+
+        Args:
+            log_data: Log record
+            extra_fields: Stream fields for consumers that are not part of the record
+        """
         if not self.redis:
             raise RuntimeError("Redis connection not established")
         
@@ -71,6 +77,12 @@ class RedisPubSubService:
                     else:
                         cleaned_data[key] = str(value)
 
+            # Full record serialized once, so consumers (e.g. the WebSocket
+            # log fan-out) can forward it without rebuilding typed values
+            cleaned_data["payload"] = json.dumps(log_data, default=str)
+            if extra_fields:
+                cleaned_data.update(extra_fields)
+
             # Generate unique stream ID
             stream_id = await self.redis.xadd(
                 name=self.stream_name,
@@ -0,0 +1,145 @@
+"""
+Atomic Redis token-bucket rate limiter.
+
+Each bucket is a Redis hash ``{tokens, ts}`` refilled continuously at
+``rate_per_second`` up to ``capacity`` (the burst size). A request may check
+several buckets at once (e.g. per API key and per key+endpoint); the Lua
+script refills them, admits the request only if every bucket has enough
+tokens, and then deducts from all of them, so concurrent requests can never
+over-admit and a denied request consumes nothing. Buckets always carry an
+expiry equal to their time-to-full, so idle keys clean themselves up.
+
+Time comes from the Redis server (``TIME``), so API processes with skewed
+clocks share consistent buckets. The limiter only needs a client exposing
+``register_script``, which makes it usable with an in-process fake Redis
+(e.g. ``fakeredis.aioredis.FakeRedis``) in tests.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, List
+
+from app.utils.logging import get_logger
+
+logger = get_logger("rate_limiter")
+
+
+_TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local levels = {}
+local allowed = 1
+local retry_after = 0
+
+for i = 1, #KEYS do
+    local rate = tonumber(ARGV[i * 2])
+    local capacity = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local level = tonumber(state[1])
+    local ts = tonumber(state[2])
+    if level == nil or ts == nil then
+        level = capacity
+        ts = now
+    end
+    level = math.min(capacity, level + math.max(0, now - ts) * rate)
+    levels[i] = level
+    if level < cost then
+        allowed = 0
+        local wait = (cost - level) / rate
+        if wait > retry_after then
+            retry_after = wait
+        end
+    end
+end
+
+local remaining = -1
+local limit = 0
+local reset_after = 0
+for i = 1, #KEYS do
+    local rate = tonumber(ARGV[i * 2])
+    local capacity = tonumber(ARGV[i * 2 + 1])
+    local level = levels[i]
+    if allowed == 1 then
+        level = level - cost
+    end
+    redis.call('HSET', KEYS[i], 'tokens', level, 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], math.ceil((capacity - level) / rate * 1000) + 1000)
+    -- Report the most constrained bucket
+    if remaining == -1 or math.floor(level) < remaining then
+        remaining = math.floor(level)
+        limit = capacity
+        reset_after = (capacity - level) / rate
+    end
+end
+
+return {allowed, remaining, limit, tostring(retry_after), tostring(reset_after)}
+"""
+
+
+@dataclass
+class TokenBucket:
+    """A token bucket: sustained ``rate_per_second`` with bursts up to ``capacity``."""
+    key: str
+    rate_per_second: float
+    capacity: float
+
+    @classmethod
+    def per_minute(cls, key: str, requests_per_minute: float, burst: float = None) -> "TokenBucket":
+        return cls(key=key, rate_per_second=requests_per_minute / 60.0, capacity=burst or requests_per_minute)
+
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of a rate limit check for the most constrained bucket."""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # seconds until the request would be admitted (0 if allowed)
+    reset_after: float  # seconds until the bucket is full again
+
+    def headers(self) -> Dict[str, str]:
+        """Standard rate limit response headers."""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(0, self.remaining)),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after))
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class RedisTokenBucketLimiter:
+    """Checks and consumes one or more token buckets in a single atomic Redis call."""
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self._script = redis_client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    async def acquire(self, buckets: List[TokenBucket], cost: float = 1) -> RateLimitDecision:
+        """
+        Consume ``cost`` tokens from every bucket, or from none if any bucket is short.
+
+        Args:
+            buckets: Buckets that must all admit the request
+            cost: Tokens the request consumes
+
+        Returns:
+            Decision with quota information for the most constrained bucket
+        """
+        args = [cost]
+        for bucket in buckets:
+            args.extend([bucket.rate_per_second, bucket.capacity])
+
+        allowed, remaining, limit, retry_after, reset_after = await self._script(
+            keys=[bucket.key for bucket in buckets],
+            args=args
+        )
+        return RateLimitDecision(
+            allowed=bool(allowed),
+            limit=int(limit),
+            remaining=int(remaining),
+            retry_after=float(retry_after),
+            reset_after=float(reset_after)
+        )
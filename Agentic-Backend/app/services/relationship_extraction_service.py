@@ -13,6 +13,7 @@ This service provides advanced relationship extraction capabilities including:
 import asyncio
 import json
 import re
+import unicodedata
 from typing import Dict, Any, List, Optional, Tuple, Union, Set
 from datetime import datetime
 from pathlib import Path
@@ -25,6 +26,15 @@ from app.utils.logging import get_logger
 logger = get_logger("relationship_extraction_service")
 
 
+def normalize_entity_text(text: str) -> str:
+    """Normalize entity text for deduplication and alias lookup."""
+    normalized = unicodedata.normalize("NFKC", text or "").casefold()
+    normalized = " ".join(re.sub(r"[^\w\s&]", " ", normalized).split())
+    if normalized.startswith("the "):
+        normalized = normalized[4:]
+    return normalized
+
+
 class RelationshipExtractionError(Exception):
     """Raised when relationship extraction fails."""
     pass
@@ -96,7 +106,14 @@ class Relationship:
 
 
 class KnowledgeGraph:
-    """Represents a knowledge graph of entities and relationships."""
+    """
+    Represents a knowledge graph of entities and relationships.
+
+    Relationships are indexed by source, target and type, and entities by
+    normalized text (including aliases), so lookups don't scan the graph.
+    Adding an edge that already exists (same source, target and type)
+    strengthens the existing edge instead of duplicating it.
+    """
 
     def __init__(self):
         self.entities: Dict[str, Entity] = {}
@@ -104,29 +121,204 @@ class KnowledgeGraph:
         self.entity_types: Set[str] = set()
         self.relationship_types: Set[str] = set()
 
+        # Indexes
+        self._outgoing: Dict[str, List[Relationship]] = defaultdict(list)
+        self._incoming: Dict[str, List[Relationship]] = defaultdict(list)
+        self._by_type: Dict[str, List[Relationship]] = defaultdict(list)
+        self._edges: Dict[Tuple[str, str, str], Relationship] = {}
+        self._text_index: Dict[str, str] = {}  # normalized text/alias -> entity_id
+
     def add_entity(self, entity: Entity):
         """Add an entity to the graph."""
         self.entities[entity.entity_id] = entity
         self.entity_types.add(entity.entity_type)
 
-    def add_relationship(self, relationship: Relationship):
-        """Add a relationship to the graph."""
+        self._text_index.setdefault(normalize_entity_text(entity.text), entity.entity_id)
+        for alias in entity.metadata.get('aliases', []):
+            self._text_index.setdefault(normalize_entity_text(alias), entity.entity_id)
+
+    def add_alias(self, entity_id: str, alias: str):
+        """Make ``alias`` resolve to an existing entity."""
+        entity = self.entities[entity_id]
+        self._text_index[normalize_entity_text(alias)] = entity_id
+        aliases = entity.metadata.setdefault('aliases', [])
+        if alias not in aliases and alias != entity.text:
+            aliases.append(alias)
+
+    def add_relationship(self, relationship: Relationship) -> Relationship:
+        """
+        Add a relationship to the graph.
+
+        Returns:
+            The relationship stored in the graph (an existing edge when
+            this one duplicates it)
+        """
+        key = (relationship.source_entity, relationship.target_entity, relationship.relationship_type)
+        existing = self._edges.get(key)
+        if existing is not None:
+            existing.confidence = max(existing.confidence, relationship.confidence)
+            existing.metadata['evidence_count'] = existing.metadata.get('evidence_count', 1) + 1
+            return existing
+
+        self._edges[key] = relationship
         self.relationships.append(relationship)
         self.relationship_types.add(relationship.relationship_type)
+        self._index_relationship(relationship)
+        return relationship
+
+    def _index_relationship(self, relationship: Relationship):
+        self._outgoing[relationship.source_entity].append(relationship)
+        self._incoming[relationship.target_entity].append(relationship)
+        self._by_type[relationship.relationship_type].append(relationship)
 
     def get_entity_by_text(self, text: str) -> Optional[Entity]:
-        """Get entity by text content."""
-        for entity in self.entities.values():
-            if entity.text == text:
-                return entity
-        return None
+        """Get entity by text content or one of its aliases."""
+        entity_id = self._text_index.get(normalize_entity_text(text))
+        return self.entities.get(entity_id) if entity_id else None
 
     def get_relationships_for_entity(self, entity_id: str) -> List[Relationship]:
         """Get all relationships for a specific entity."""
-        return [
-            rel for rel in self.relationships
-            if rel.source_entity == entity_id or rel.target_entity == entity_id
+        outgoing = self._outgoing.get(entity_id, [])
+        incoming = [rel for rel in self._incoming.get(entity_id, []) if rel.source_entity != entity_id]
+        return outgoing + incoming
+
+    def get_relationships_by_type(self, relationship_type: str) -> List[Relationship]:
+        """Get all relationships of a type."""
+        return list(self._by_type.get(relationship_type, []))
+
+    def get_neighbors(
+        self,
+        entity_id: str,
+        max_hops: int = 1,
+        relationship_types: Optional[List[str]] = None
+    ) -> Dict[str, int]:
+        """
+        Entities reachable from ``entity_id`` within ``max_hops`` edges,
+        ignoring edge direction.
+
+        Returns:
+            Mapping of entity ID to hop distance (excluding the start entity)
+        """
+        allowed = set(relationship_types) if relationship_types else None
+        distances = {entity_id: 0}
+        frontier = [entity_id]
+
+        for hop in range(1, max_hops + 1):
+            next_frontier = []
+            for current in frontier:
+                for rel in self._outgoing.get(current, []) + self._incoming.get(current, []):
+                    if allowed is not None and rel.relationship_type not in allowed:
+                        continue
+                    neighbor = rel.target_entity if rel.source_entity == current else rel.source_entity
+                    if neighbor not in distances:
+                        distances[neighbor] = hop
+                        next_frontier.append(neighbor)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+        del distances[entity_id]
+        return distances
+
+    def merge_entities(self, primary_id: str, duplicate_id: str):
+        """Fold ``duplicate_id`` into ``primary_id``, repointing its relationships."""
+        if primary_id == duplicate_id or duplicate_id not in self.entities:
+            return
+
+        duplicate = self.entities.pop(duplicate_id)
+        moved = self._outgoing.pop(duplicate_id, []) + [
+            rel for rel in self._incoming.pop(duplicate_id, []) if rel.source_entity != duplicate_id
         ]
+        removed = set()
+        for rel in moved:
+            self._unindex_relationship(rel, duplicate_id)
+            if rel.source_entity == duplicate_id:
+                rel.source_entity = primary_id
+            if rel.target_entity == duplicate_id:
+                rel.target_entity = primary_id
+
+            key = (rel.source_entity, rel.target_entity, rel.relationship_type)
+            existing = self._edges.get(key)
+            if existing is not None:
+                existing.confidence = max(existing.confidence, rel.confidence)
+                existing.metadata['evidence_count'] = (
+                    existing.metadata.get('evidence_count', 1) + rel.metadata.get('evidence_count', 1)
+                )
+                removed.add(id(rel))
+            else:
+                self._edges[key] = rel
+                self._index_relationship(rel)
+
+        if removed:
+            self.relationships = [rel for rel in self.relationships if id(rel) not in removed]
+
+        for key, entity_id in list(self._text_index.items()):
+            if entity_id == duplicate_id:
+                self._text_index[key] = primary_id
+        self.add_alias(primary_id, duplicate.text)
+
+    def _unindex_relationship(self, relationship: Relationship, detached_entity_id: Optional[str] = None):
+        """Drop an edge from the indexes; ``detached_entity_id``'s adjacency lists are already gone."""
+        if relationship.source_entity != detached_entity_id:
+            self._outgoing[relationship.source_entity].remove(relationship)
+        if relationship.target_entity != detached_entity_id:
+            self._incoming[relationship.target_entity].remove(relationship)
+        self._by_type[relationship.relationship_type].remove(relationship)
+        del self._edges[(relationship.source_entity, relationship.target_entity, relationship.relationship_type)]
+
+    def merge(self, other: "KnowledgeGraph") -> Dict[str, str]:
+        """
+        Merge another graph into this one.
+
+        Entities are matched by normalized text and aliases; unmatched
+        entities are added (renamed if their ID is already taken).
+
+        Returns:
+            Mapping of ``other``'s entity IDs to IDs in this graph
+        """
+        id_map: Dict[str, str] = {}
+
+        for entity in other.entities.values():
+            existing = self.get_entity_by_text(entity.text)
+            if existing is not None:
+                existing.confidence = max(existing.confidence, entity.confidence)
+                for alias in entity.metadata.get('aliases', []):
+                    self.add_alias(existing.entity_id, alias)
+                id_map[entity.entity_id] = existing.entity_id
+                continue
+
+            entity_id = entity.entity_id
+            suffix = len(self.entities)
+            while entity_id in self.entities:
+                entity_id = f"entity_{suffix}"
+                suffix += 1
+
+            self.add_entity(Entity(
+                entity_id=entity_id,
+                text=entity.text,
+                entity_type=entity.entity_type,
+                start_pos=entity.start_pos,
+                end_pos=entity.end_pos,
+                confidence=entity.confidence,
+                metadata=dict(entity.metadata)
+            ))
+            id_map[entity.entity_id] = entity_id
+
+        for rel in other.relationships:
+            source = id_map.get(rel.source_entity)
+            target = id_map.get(rel.target_entity)
+            if source is None or target is None:
+                continue
+            self.add_relationship(Relationship(
+                source_entity=source,
+                target_entity=target,
+                relationship_type=rel.relationship_type,
+                confidence=rel.confidence,
+                context=rel.context,
+                metadata=dict(rel.metadata)
+            ))
+
+        return id_map
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert knowledge graph to dictionary."""
@@ -257,6 +449,16 @@ class RelationshipExtractionService:
                     content_text, result.entities, **kwargs
                 )
 
+            if kwargs.get('persist_graph') and result.knowledge_graph.entities:
+                # Merge into the shared persistent graph
+                from app.services.knowledge_graph_store import knowledge_graph_store
+                result.metadata['graph_entity_ids'] = await knowledge_graph_store.merge_graph(
+                    result.knowledge_graph,
+                    source_type=content_data.get('source_type', 'content'),
+                    source_id=content_id,
+                    session=kwargs.get('db')
+                )
+
             # Set processing metadata
             result.processing_time_ms = (datetime.now() - start_time).total_seconds() * 1000
             result.model_used = self.default_model
@@ -537,7 +739,7 @@ Limit to {max_relationships} most important relationships.
             # Check for duplicate entities
             text_to_entities = defaultdict(list)
             for entity in knowledge_graph.entities.values():
-                text_to_entities[entity.text.lower()].append(entity)
+                text_to_entities[normalize_entity_text(entity.text)].append(entity)
 
             # Merge duplicate entities
             for text, entities in text_to_entities.items():
@@ -546,17 +748,8 @@ Limit to {max_relationships} most important relationships.
                     entities.sort(key=lambda e: e.confidence, reverse=True)
                     primary_entity = entities[0]
 
-                    # Update relationships to point to primary entity
                     for entity in entities[1:]:
-                        # Update relationships
-                        for rel in knowledge_graph.relationships:
-                            if rel.source_entity == entity.entity_id:
-                                rel.source_entity = primary_entity.entity_id
-                            if rel.target_entity == entity.entity_id:
-                                rel.target_entity = primary_entity.entity_id
-
-                        # Remove duplicate entity
-                        del knowledge_graph.entities[entity.entity_id]
+                        knowledge_graph.merge_entities(primary_entity.entity_id, entity.entity_id)
 
         except Exception as e:
             logger.error(f"Graph consistency validation failed: {e}")
@@ -640,6 +833,45 @@ Limit to {max_relationships} most important relationships.
 
         return processed_results
 
+    async def ingest_content(
+        self,
+        content_data: Dict[str, Any],
+        source_type: str,
+        source_id: str,
+        db=None,
+        **kwargs
+    ) -> Optional[RelationshipExtractionResult]:
+        """
+        Extract a content item's graph and merge it into the persistent graph.
+
+        Does nothing unless ``knowledge_graph_ingest_enabled`` is set, and never
+        raises, so it can be called from ingestion pipelines unconditionally.
+
+        Args:
+            content_data: Content data dictionary
+            source_type: Kind of item ('knowledge_base_item', 'email', ...)
+            source_id: ID of the item
+            db: Optional database session to join (the caller commits)
+            **kwargs: Additional extraction options
+
+        Returns:
+            RelationshipExtractionResult, or None if skipped or failed
+        """
+        if not settings.knowledge_graph_ingest_enabled:
+            return None
+
+        try:
+            return await self.extract_relationships(
+                {**content_data, 'content_id': str(source_id), 'source_type': source_type},
+                extraction_types=['entities', 'relationships', 'knowledge_graph'],
+                persist_graph=True,
+                db=db,
+                **kwargs
+            )
+        except Exception as e:
+            logger.warning(f"Knowledge graph ingestion failed for {source_type}:{source_id}: {e}")
+            return None
+
     def get_supported_entity_types(self) -> List[str]:
         """Get list of supported entity types."""
         return self.entity_types.copy()
@@ -1,8 +1,6 @@
 """
 Schema management service for dynamic agent schemas.
 """
-import hashlib
-import json
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -19,6 +17,7 @@ from app.schemas.agent_schema import (
     FieldDefinition,
     FieldType
 )
+from app.schemas.validator_compiler import schema_hash, schema_validator_cache
 from app.db.models.agent_type import AgentType, DynamicTable, RegisteredTool
 from app.utils.logging import get_logger
 
@@ -269,9 +268,7 @@ class SchemaManager:
     
     def _generate_schema_hash(self, schema_dict: Dict[str, Any]) -> str:
         """Generate a SHA-256 hash of the schema for versioning."""
-        # Create a normalized JSON string for consistent hashing
-        normalized_json = json.dumps(schema_dict, sort_keys=True, separators=(',', ':'))
-        return hashlib.sha256(normalized_json.encode('utf-8')).hexdigest()
+        return schema_hash(schema_dict)
     
     async def register_agent_type(self, schema_dict: Dict[str, Any], created_by: Optional[str] = None) -> AgentType:
         """
@@ -342,6 +339,10 @@ class SchemaManager:
                 self.db.add(dynamic_table)
             
             await self.db.commit()
+
+            # Drop validators compiled for earlier versions and compile this one up front
+            schema_validator_cache.invalidate(agent_schema.agent_type)
+            schema_validator_cache.get(agent_schema, validation_result.schema_hash)
             
             logger.info(f"Registered agent type: {agent_schema.agent_type} v{agent_schema.metadata.version}")
             return agent_type
@@ -511,6 +512,7 @@ class SchemaManager:
             agent_type.deprecated_at = datetime.utcnow()
         
         await self.db.commit()
+        schema_validator_cache.invalidate(type_name)
         
         logger.info(f"Deprecated agent type: {type_name}" + (f" v{version}" if version else " (all versions)"))
         return True
@@ -1,8 +1,15 @@
+import asyncio
+import math
 import psutil
 import time
-from typing import Dict, Any, List, Optional
+from array import array
+from bisect import bisect_left
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from datetime import datetime
-import math
+
+from app.config import settings
+from app.utils.logging import get_logger
+from app.utils.metrics import MetricsCollector
 
 try:
     import pynvml
@@ -11,9 +18,140 @@ except ImportError:
     NVML_AVAILABLE = False
     pynvml = None
 
+logger = get_logger("system_metrics_service")
+
+# Numeric series kept in the history ring buffer
+HISTORY_FIELDS = (
+    "cpu_percent",
+    "cpu_user_percent",
+    "cpu_system_percent",
+    "cpu_iowait_percent",
+    "memory_percent",
+    "memory_used_gb",
+    "swap_percent",
+    "disk_percent",
+    "disk_read_bytes_per_sec",
+    "disk_write_bytes_per_sec",
+    "net_sent_bytes_per_sec",
+    "net_recv_bytes_per_sec",
+    "load_1m",
+    "load_5m",
+    "load_15m",
+    "gpu_utilization_percent",
+    "gpu_memory_percent",
+    "gpu_temperature_fahrenheit",
+    "gpu_power_watts",
+)
+
+
+class MetricsRingBuffer:
+    """
+    Fixed-capacity time series buffer backed by one array('d') per field.
+
+    Appending overwrites the oldest sample once full, so memory stays at
+    capacity * (fields + 1) * 8 bytes regardless of uptime. Missing values
+    are stored as NaN.
+    """
+
+    def __init__(self, capacity: int, fields: Sequence[str] = HISTORY_FIELDS):
+        self.capacity = max(1, int(capacity))
+        self.fields = tuple(fields)
+        self._timestamps = array('d', [0.0]) * self.capacity
+        self._series = {name: array('d', [math.nan]) * self.capacity for name in self.fields}
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, values: Dict[str, float]):
+        """Store one sample, overwriting the oldest when full."""
+        slot = self._next
+        self._timestamps[slot] = timestamp
+        for name, series in self._series.items():
+            value = values.get(name)
+            series[slot] = math.nan if value is None else float(value)
+
+        self._next = (slot + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _slot(self, position: int) -> int:
+        """Map a chronological position (0 = oldest) to a buffer slot."""
+        return (self._next - self._count + position) % self.capacity
+
+    def _first_position_after(self, since: float) -> int:
+        """Binary search the oldest chronological position with timestamp >= since."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._timestamps[self._slot(mid)] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def history(
+        self,
+        window_seconds: Optional[float] = None,
+        max_points: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+        now: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Return samples within the window, bucket-averaged down to max_points.
+
+        Args:
+            window_seconds: Only include samples newer than now - window_seconds
+            max_points: Maximum number of points per series (None = all)
+            fields: Series to include (None = all)
+            now: Reference time (defaults to time.time())
+
+        Returns:
+            Dict with epoch 'timestamps' and a list per field in 'series';
+            NaN values are returned as None.
+        """
+        selected = [name for name in (fields or self.fields) if name in self._series]
+
+        start = 0
+        if window_seconds is not None and self._count:
+            start = self._first_position_after((now if now is not None else time.time()) - window_seconds)
+        total = self._count - start
+
+        bucket = 1
+        if max_points and total > max_points:
+            bucket = math.ceil(total / max_points)
+
+        timestamps: List[float] = []
+        series: Dict[str, List[Optional[float]]] = {name: [] for name in selected}
+
+        for bucket_start in range(start, self._count, bucket):
+            slots = [self._slot(p) for p in range(bucket_start, min(bucket_start + bucket, self._count))]
+            # Bucket timestamp is the newest sample it covers
+            timestamps.append(self._timestamps[slots[-1]])
+            for name in selected:
+                data = self._series[name]
+                values = [data[slot] for slot in slots if not math.isnan(data[slot])]
+                series[name].append(round(sum(values) / len(values), 3) if values else None)
+
+        return {
+            "fields": selected,
+            "points": len(timestamps),
+            "bucket_size": bucket,
+            "timestamps": timestamps,
+            "series": series
+        }
+
 
 class SystemMetricsService:
-    """Service for collecting system utilization metrics."""
+    """
+    Service for collecting system utilization metrics.
+
+    A background sampler (see start()) collects a full snapshot every
+    SYSTEM_METRICS_SAMPLE_INTERVAL_SECONDS off the event loop, keeps it as
+    the latest snapshot, appends it to the history ring buffer and updates
+    the Prometheus gauges. The get_* methods serve the latest snapshot and
+    only collect on demand when the sampler is not running.
+    """
 
     def __init__(self):
         self.nvml_initialized = False
@@ -22,7 +160,23 @@ class SystemMetricsService:
                 pynvml.nvmlInit()
                 self.nvml_initialized = True
             except Exception as e:
-                print(f"Failed to initialize NVML: {e}")
+                logger.warning(f"Failed to initialize NVML: {e}")
+
+        self.sample_interval = max(0.5, float(getattr(settings, 'system_metrics_sample_interval_seconds', 5.0)))
+        self.history_buffer = MetricsRingBuffer(getattr(settings, 'system_metrics_history_size', 17280))
+
+        self._latest_snapshot: Optional[Dict[str, Any]] = None
+        self._latest_sampled_at = 0.0
+        self._previous_counters: Optional[Tuple[float, Any, Any]] = None
+        self._sampler_task: Optional[asyncio.Task] = None
+
+        # Prime the non-blocking CPU counters so the first interval=None call
+        # measures utilization since construction instead of returning 0.0
+        try:
+            psutil.cpu_percent(interval=None)
+            psutil.cpu_times_percent(interval=None)
+        except Exception:
+            pass
 
     def __del__(self):
         if self.nvml_initialized and NVML_AVAILABLE:
@@ -31,11 +185,270 @@ class SystemMetricsService:
             except:
                 pass
 
+    # ------------------------------------------------------------------
+    # Background sampling
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """Take an initial sample and start the background sampler."""
+        if self._sampler_task and not self._sampler_task.done():
+            return
+
+        try:
+            await self.sample()
+        except Exception as e:
+            logger.error(f"Initial system metrics sample failed: {e}")
+
+        self._sampler_task = asyncio.create_task(self._periodic_sample())
+        logger.info(f"System metrics sampler started (interval={self.sample_interval}s, "
+                    f"history={self.history_buffer.capacity} samples)")
+
+    async def stop(self):
+        """Stop the background sampler."""
+        if self._sampler_task:
+            self._sampler_task.cancel()
+            try:
+                await self._sampler_task
+            except asyncio.CancelledError:
+                pass
+            self._sampler_task = None
+
+    async def sample(self) -> Dict[str, Any]:
+        """Collect one snapshot off the event loop and record it."""
+        snapshot, values = await asyncio.to_thread(self._collect_snapshot)
+        self._record(snapshot, values)
+        return snapshot
+
+    async def _periodic_sample(self):
+        """Sample on a fixed schedule so slow collections don't drift the interval."""
+        loop = asyncio.get_running_loop()
+        next_run = loop.time()
+        while True:
+            try:
+                next_run += self.sample_interval
+                await asyncio.sleep(max(0.0, next_run - loop.time()))
+                await self.sample()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error sampling system metrics: {e}")
+                next_run = loop.time()
+
+    def _record(self, snapshot: Dict[str, Any], values: Dict[str, float]):
+        self._latest_snapshot = snapshot
+        self._latest_sampled_at = values["timestamp"]
+        self.history_buffer.append(values["timestamp"], values)
+        try:
+            MetricsCollector.record_system_metrics(values, snapshot.get("gpu", []))
+        except Exception as e:
+            logger.debug(f"Failed to update system metric gauges: {e}")
+
+    def _fresh_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Latest sampled snapshot, or None if the sampler is not keeping it current."""
+        if self._latest_snapshot is None:
+            return None
+        if time.time() - self._latest_sampled_at > self.sample_interval * 3:
+            return None
+        return self._latest_snapshot
+
+    def _collect_rates(self, now: float) -> Dict[str, Optional[float]]:
+        """Compute disk and network byte/packet rates from counter deltas since the previous call."""
+        try:
+            disk_io = psutil.disk_io_counters()
+        except Exception:
+            disk_io = None
+        try:
+            net_io = psutil.net_io_counters()
+        except Exception:
+            net_io = None
+
+        rates: Dict[str, Optional[float]] = {
+            "disk_read_bytes_per_sec": None,
+            "disk_write_bytes_per_sec": None,
+            "net_sent_bytes_per_sec": None,
+            "net_recv_bytes_per_sec": None,
+            "net_packets_sent_per_sec": None,
+            "net_packets_recv_per_sec": None
+        }
+
+        previous = self._previous_counters
+        self._previous_counters = (now, disk_io, net_io)
+        if not previous:
+            return rates
+
+        prev_time, prev_disk, prev_net = previous
+        elapsed = now - prev_time
+        if elapsed <= 0:
+            return rates
+
+        def rate(current, before):
+            # Counters can reset (e.g. interface restart); report 0 rather than a negative rate
+            return round(max(0, current - before) / elapsed, 2)
+
+        if disk_io and prev_disk:
+            rates["disk_read_bytes_per_sec"] = rate(disk_io.read_bytes, prev_disk.read_bytes)
+            rates["disk_write_bytes_per_sec"] = rate(disk_io.write_bytes, prev_disk.write_bytes)
+        if net_io and prev_net:
+            rates["net_sent_bytes_per_sec"] = rate(net_io.bytes_sent, prev_net.bytes_sent)
+            rates["net_recv_bytes_per_sec"] = rate(net_io.bytes_recv, prev_net.bytes_recv)
+            rates["net_packets_sent_per_sec"] = rate(net_io.packets_sent, prev_net.packets_sent)
+            rates["net_packets_recv_per_sec"] = rate(net_io.packets_recv, prev_net.packets_recv)
+        return rates
+
+    def _collect_snapshot(self) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Collect every metric group plus the flat numeric values for history and gauges."""
+        now = time.time()
+        rates = self._collect_rates(now)
+
+        network = self._collect_network_metrics()
+        if "error" not in network:
+            network["speeds"] = {
+                "bytes_sent_per_sec": rates["net_sent_bytes_per_sec"],
+                "bytes_recv_per_sec": rates["net_recv_bytes_per_sec"],
+                "packets_sent_per_sec": rates["net_packets_sent_per_sec"],
+                "packets_recv_per_sec": rates["net_packets_recv_per_sec"]
+            }
+
+        disk = self._collect_disk_metrics()
+        if "error" not in disk:
+            disk["rates"] = {
+                "read_bytes_per_sec": rates["disk_read_bytes_per_sec"],
+                "write_bytes_per_sec": rates["disk_write_bytes_per_sec"]
+            }
+
+        snapshot = {
+            "timestamp": datetime.utcfromtimestamp(now).isoformat() + "Z",
+            "cpu": self._collect_cpu_metrics(),
+            "memory": self._collect_memory_metrics(),
+            "disk": disk,
+            "network": network,
+            "gpu": self._collect_gpu_metrics(),
+            "load_average": self._collect_load_average(),
+            "swap": self._collect_swap_metrics(),
+            "system": self._collect_system_info()
+        }
+
+        cpu = snapshot["cpu"]
+        memory = snapshot["memory"]
+        swap = snapshot["swap"]
+        load = snapshot["load_average"]
+        gpus = [gpu for gpu in snapshot["gpu"] if "error" not in gpu]
+
+        values: Dict[str, float] = {
+            "timestamp": now,
+            "cpu_percent": cpu.get("usage_percent"),
+            "cpu_user_percent": cpu.get("times_percent", {}).get("user"),
+            "cpu_system_percent": cpu.get("times_percent", {}).get("system"),
+            "cpu_iowait_percent": cpu.get("times_percent", {}).get("iowait"),
+            "memory_percent": memory.get("usage_percent"),
+            "memory_used_gb": memory.get("used_gb"),
+            "swap_percent": swap.get("usage_percent"),
+            "disk_percent": disk.get("usage", {}).get("usage_percent"),
+            "load_1m": load.get("1m"),
+            "load_5m": load.get("5m"),
+            "load_15m": load.get("15m"),
+            "disk_read_bytes_per_sec": rates["disk_read_bytes_per_sec"],
+            "disk_write_bytes_per_sec": rates["disk_write_bytes_per_sec"],
+            "net_sent_bytes_per_sec": rates["net_sent_bytes_per_sec"],
+            "net_recv_bytes_per_sec": rates["net_recv_bytes_per_sec"]
+        }
+
+        if gpus:
+            total_memory = sum(gpu["memory"]["total_mb"] for gpu in gpus)
+            temperatures = [gpu["temperature_fahrenheit"] for gpu in gpus if gpu.get("temperature_fahrenheit") is not None]
+            power = [gpu["power"]["usage_watts"] for gpu in gpus if gpu["power"].get("usage_watts") is not None]
+            values["gpu_utilization_percent"] = sum(gpu["utilization"]["gpu_percent"] for gpu in gpus) / len(gpus)
+            values["gpu_memory_percent"] = (
+                sum(gpu["memory"]["used_mb"] for gpu in gpus) / total_memory * 100 if total_memory else None
+            )
+            values["gpu_temperature_fahrenheit"] = max(temperatures) if temperatures else None
+            values["gpu_power_watts"] = sum(power) if power else None
+
+        # Replace None with NaN so gauges and the ring buffer can skip them uniformly
+        values = {key: (math.nan if value is None else float(value)) for key, value in values.items()}
+        return snapshot, values
+
+    def get_history(
+        self,
+        window_seconds: Optional[float] = 3600,
+        max_points: Optional[int] = 360,
+        fields: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Get sampled metric history from the ring buffer.
+
+        Args:
+            window_seconds: How far back to look (None = entire buffer)
+            max_points: Downsample to at most this many points per series
+            fields: Series to return (defaults to all of HISTORY_FIELDS)
+
+        Returns:
+            Dict with timestamps, per-field series and sampling metadata
+        """
+        result = self.history_buffer.history(window_seconds=window_seconds, max_points=max_points, fields=fields)
+        result["sample_interval_seconds"] = self.sample_interval
+        result["available_fields"] = list(HISTORY_FIELDS)
+        return result
+
+    # ------------------------------------------------------------------
+    # Snapshot accessors (served from the latest sample when available)
+    # ------------------------------------------------------------------
+
+    def _latest_section(self, section: str, collect):
+        snapshot = self._fresh_snapshot()
+        if snapshot is not None and section in snapshot:
+            return snapshot[section]
+        return collect()
+
     def get_cpu_metrics(self) -> Dict[str, Any]:
         """Get CPU utilization metrics."""
+        return self._latest_section("cpu", self._collect_cpu_metrics)
+
+    def get_memory_metrics(self) -> Dict[str, Any]:
+        """Get memory utilization metrics."""
+        return self._latest_section("memory", self._collect_memory_metrics)
+
+    def get_disk_metrics(self) -> Dict[str, Any]:
+        """Get disk utilization metrics."""
+        return self._latest_section("disk", self._collect_disk_metrics)
+
+    def get_network_metrics(self) -> Dict[str, Any]:
+        """Get network utilization metrics."""
+        return self._latest_section("network", self._collect_network_metrics)
+
+    def get_load_average(self) -> Dict[str, Any]:
+        """Get system load average metrics."""
+        return self._latest_section("load_average", self._collect_load_average)
+
+    def get_swap_metrics(self) -> Dict[str, Any]:
+        """Get swap memory utilization metrics."""
+        return self._latest_section("swap", self._collect_swap_metrics)
+
+    def get_system_info(self) -> Dict[str, Any]:
+        """Get general system information."""
+        return self._latest_section("system", self._collect_system_info)
+
+    def get_gpu_metrics(self) -> List[Dict[str, Any]]:
+        """Get GPU utilization metrics for NVIDIA GPUs."""
+        return self._latest_section("gpu", self._collect_gpu_metrics)
+
+    def get_all_metrics(self) -> Dict[str, Any]:
+        """Get all system utilization metrics."""
+        snapshot = self._fresh_snapshot()
+        if snapshot is not None:
+            return snapshot
+        snapshot, _ = self._collect_snapshot()
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # Collectors
+    # ------------------------------------------------------------------
+
+    def _collect_cpu_metrics(self) -> Dict[str, Any]:
+        """Collect CPU utilization metrics (non-blocking: utilization since the previous call)."""
         try:
             # Get CPU usage percentage
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = psutil.cpu_percent(interval=None)
 
             # Get CPU frequency
             cpu_freq = psutil.cpu_freq()
@@ -48,7 +461,7 @@ class SystemMetricsService:
                 current_freq = None
 
             # Get CPU times
-            cpu_times = psutil.cpu_times_percent(interval=0.1)
+            cpu_times = psutil.cpu_times_percent(interval=None)
 
             # Get CPU count
             cpu_count = psutil.cpu_count()
@@ -105,8 +518,8 @@ class SystemMetricsService:
         except Exception as e:
             return {"error": f"Failed to get CPU metrics: {str(e)}"}
 
-    def get_memory_metrics(self) -> Dict[str, Any]:
-        """Get memory utilization metrics."""
+    def _collect_memory_metrics(self) -> Dict[str, Any]:
+        """Collect memory utilization metrics."""
         try:
             memory = psutil.virtual_memory()
 
@@ -123,8 +536,8 @@ class SystemMetricsService:
         except Exception as e:
             return {"error": f"Failed to get memory metrics: {str(e)}"}
 
-    def get_disk_metrics(self) -> Dict[str, Any]:
-        """Get disk utilization metrics."""
+    def _collect_disk_metrics(self) -> Dict[str, Any]:
+        """Collect disk utilization metrics."""
         try:
             # Get disk usage for root filesystem
             disk_usage = psutil.disk_usage('/')
@@ -151,8 +564,8 @@ class SystemMetricsService:
         except Exception as e:
             return {"error": f"Failed to get disk metrics: {str(e)}"}
 
-    def get_network_metrics(self) -> Dict[str, Any]:
-        """Get network utilization metrics."""
+    def _collect_network_metrics(self) -> Dict[str, Any]:
+        """Collect network utilization metrics."""
         try:
             # Get network I/O statistics
             net_io = psutil.net_io_counters()
@@ -172,18 +585,8 @@ class SystemMetricsService:
                         "mtu": stats.mtu
                     })
 
-            # Calculate network speeds (bytes per second) - this is an approximation
-            # In a real implementation, you'd track previous values and calculate rates
+            # Speeds are rates between samples, filled in by _collect_snapshot
             network_speeds = None
-            if net_io:
-                # These are cumulative counters, not rates
-                # For actual speeds, you'd need to sample over time
-                network_speeds = {
-                    "bytes_sent_per_sec": net_io.bytes_sent,  # Placeholder - would need time-based calculation
-                    "bytes_recv_per_sec": net_io.bytes_recv,  # Placeholder - would need time-based calculation
-                    "packets_sent_per_sec": net_io.packets_sent,  # Placeholder
-                    "packets_recv_per_sec": net_io.packets_recv   # Placeholder
-                }
 
             return {
                 "io": {
@@ -202,8 +605,8 @@ class SystemMetricsService:
         except Exception as e:
             return {"error": f"Failed to get network metrics: {str(e)}"}
 
-    def get_load_average(self) -> Dict[str, Any]:
-        """Get system load average metrics."""
+    def _collect_load_average(self) -> Dict[str, Any]:
+        """Collect system load average metrics."""
         try:
             load_avg = psutil.getloadavg()
             return {
@@ -214,8 +617,8 @@ class SystemMetricsService:
         except Exception as e:
             return {"error": f"Failed to get load average: {str(e)}"}
 
-    def get_swap_metrics(self) -> Dict[str, Any]:
-        """Get swap memory utilization metrics."""
+    def _collect_swap_metrics(self) -> Dict[str, Any]:
+        """Collect swap memory utilization metrics."""
         try:
             swap = psutil.swap_memory()
             return {
@@ -229,8 +632,8 @@ class SystemMetricsService:
         except Exception as e:
             return {"error": f"Failed to get swap metrics: {str(e)}"}
 
-    def get_system_info(self) -> Dict[str, Any]:
-        """Get general system information."""
+    def _collect_system_info(self) -> Dict[str, Any]:
+        """Collect general system information."""
         try:
             # Get system uptime
             uptime_seconds = time.time() - psutil.boot_time()
@@ -254,8 +657,8 @@ class SystemMetricsService:
         except Exception as e:
             return {"error": f"Failed to get system info: {str(e)}"}
 
-    def get_gpu_metrics(self) -> List[Dict[str, Any]]:
-        """Get GPU utilization metrics for NVIDIA GPUs."""
+    def _collect_gpu_metrics(self) -> List[Dict[str, Any]]:
+        """Collect GPU utilization metrics for NVIDIA GPUs."""
         if not NVML_AVAILABLE:
             return [{"error": "pynvml library not available. Install with: pip install pynvml"}]
 
@@ -294,7 +697,7 @@ class SystemMetricsService:
                         # Convert Celsius to Fahrenheit
                         temperature_f = round((temperature * 9/5) + 32, 1)
                     except Exception as e:
-                        print(f"Warning: Could not get temperature for GPU {i}: {e}")
+                        logger.debug(f"Could not get temperature for GPU {i}: {e}")
 
                     # Get clock frequencies
                     graphics_clock = None
@@ -303,7 +706,7 @@ class SystemMetricsService:
                         graphics_clock = pynvml.nvmlDeviceGetClockInfo(handle, pynvml.NVML_CLOCK_GRAPHICS)
                         memory_clock = pynvml.nvmlDeviceGetClockInfo(handle, pynvml.NVML_CLOCK_MEM)
                     except Exception as e:
-                        print(f"Warning: Could not get clock info for GPU {i}: {e}")
+                        logger.debug(f"Could not get clock info for GPU {i}: {e}")
 
                     # Get power usage
                     power_usage = None
@@ -312,7 +715,7 @@ class SystemMetricsService:
                         power_usage = pynvml.nvmlDeviceGetPowerUsage(handle) / 1000.0  # Convert to watts
                         power_limit = pynvml.nvmlDeviceGetPowerManagementLimit(handle) / 1000.0
                     except Exception as e:
-                        print(f"Warning: Could not get power info for GPU {i}: {e}")
+                        logger.debug(f"Could not get power info for GPU {i}: {e}")
 
                     gpu_metrics.append({
                         "index": i,
@@ -346,20 +749,6 @@ class SystemMetricsService:
         except Exception as e:
             return [{"error": f"Failed to get GPU metrics: {str(e)}"}]
 
-    def get_all_metrics(self) -> Dict[str, Any]:
-        """Get all system utilization metrics."""
-        return {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "cpu": self.get_cpu_metrics(),
-            "memory": self.get_memory_metrics(),
-            "disk": self.get_disk_metrics(),
-            "network": self.get_network_metrics(),
-            "gpu": self.get_gpu_metrics(),
-            "load_average": self.get_load_average(),
-            "swap": self.get_swap_metrics(),
-            "system": self.get_system_info()
-        }
-
 
 # Global instance
 system_metrics_service = SystemMetricsService()
\ No newline at end of file
@@ -24,8 +24,10 @@ from app.db.models.task import TaskLog, LogLevel
 from app.db.models.user import User
 from app.db.database import get_session_context
 from app.services.pubsub_service import pubsub_service
+from app.services.log_fanout_service import log_fanout_service
 from app.utils.logging import get_logger
 from app.utils.metrics import MetricsCollector
+from app.utils.tracing import tracer, current_span, current_trace_id
 
 logger = get_logger("unified_log_service")
 
@@ -93,7 +95,8 @@ class UnifiedLogService:
     ) -> LogContext:
         """Create a new workflow logging context."""
         workflow_id = f"{workflow_type.value}_{uuid.uuid4().hex[:8]}"
-        trace_id = uuid.uuid4().hex
+        # Join the active trace (HTTP request or Celery task) so logs and spans correlate
+        trace_id = current_trace_id() or uuid.uuid4().hex
 
         context = LogContext(
             user_id=user_id,
@@ -200,6 +203,10 @@ class UnifiedLogService:
             if extra_metadata:
                 log_data["metadata"].update(extra_metadata)
 
+            span = current_span()
+            if span is not None and span.sampled and span.trace_id == context.trace_id:
+                log_data["span_id"] = span.span_id
+
             # Add error details if present
             if error:
                 log_data["error"] = {
@@ -226,8 +233,11 @@ class UnifiedLogService:
                     log_record.stream_id = stream_id
                     await session.commit()
 
-            # Send to WebSocket subscribers
-            await self._broadcast_log(log_data)
+            # Send to WebSocket subscribers directly only when the log did not go
+            # through the stream; otherwise the fan-out consumer in every API
+            # worker delivers it
+            if not (stream_id and log_fanout_service.running):
+                await self._broadcast_log(log_data)
 
             return log_id.hex
 
@@ -383,34 +393,41 @@ class UnifiedLogService:
     ):
         """Context manager for workflow logging."""
         context = await self.create_workflow_context(user_id, workflow_type, workflow_name, scope)
-        try:
-            yield context
-            await self.complete_workflow(context, success=True)
-        except Exception as e:
-            await self.complete_workflow(context, success=False, summary=f"Workflow failed: {str(e)}")
-            raise
+        with tracer.start_span(
+            f"workflow.{workflow_type.value}",
+            trace_id=context.trace_id,
+            attributes={"workflow.id": context.workflow_id, "workflow.name": workflow_name}
+        ):
+            try:
+                yield context
+                await self.complete_workflow(context, success=True)
+            except Exception as e:
+                await self.complete_workflow(context, success=False, summary=f"Workflow failed: {str(e)}")
+                raise
 
     @asynccontextmanager
     async def task_context(self, parent_context: LogContext, task_name: str, agent_id: Optional[str] = None):
         """Context manager for task logging."""
         context = await self.create_task_context(parent_context, task_name, agent_id)
-        try:
-            yield context
-            await self.log(context, LogLevel.INFO, f"Completed task: {task_name}", "task_manager")
-        except Exception as e:
-            await self.log(context, LogLevel.ERROR, f"Task failed: {task_name}", "task_manager", error=e)
-            raise
+        with tracer.start_span(f"task {task_name}", trace_id=context.trace_id, attributes={"task.id": context.task_id}):
+            try:
+                yield context
+                await self.log(context, LogLevel.INFO, f"Completed task: {task_name}", "task_manager")
+            except Exception as e:
+                await self.log(context, LogLevel.ERROR, f"Task failed: {task_name}", "task_manager", error=e)
+                raise
 
     @asynccontextmanager
     async def step_context(self, parent_context: LogContext, step_name: str):
         """Context manager for step logging."""
         context = await self.create_step_context(parent_context, step_name)
-        try:
-            yield context
-            await self.log(context, LogLevel.INFO, f"Completed step: {step_name}", "step_manager")
-        except Exception as e:
-            await self.log(context, LogLevel.ERROR, f"Step failed: {step_name}", "step_manager", error=e)
-            raise
+        with tracer.start_span(f"step {step_name}", trace_id=context.trace_id, attributes={"step.id": context.step_id}):
+            try:
+                yield context
+                await self.log(context, LogLevel.INFO, f"Completed step: {step_name}", "step_manager")
+            except Exception as e:
+                await self.log(context, LogLevel.ERROR, f"Step failed: {step_name}", "step_manager", error=e)
+                raise
 
     async def cleanup_old_logs(self, retention_days: int = 30):
         """Clean up old logs based on retention policy."""
@@ -10,19 +10,28 @@ This service provides comprehensive vision AI capabilities including:
 """
 
 import asyncio
-import base64
+import copy
+import hashlib
 import json
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
 from pathlib import Path
 import aiofiles
 
+from app.config import settings
 from app.services.ollama_client import ollama_client
 from app.services.model_capability_service import model_capability_service, ModelCapability
+from app.services.vision_preprocessing import (
+    PreparedImage, VisionResultCache, decode_image_input, prepare_image
+)
 from app.utils.logging import get_logger
 
 logger = get_logger("vision_ai_service")
 
+# Operations that depend on fine detail only reuse results for identical images
+EXACT_MATCH_OPERATIONS = {"extract_text"}
+
 
 class VisionAIError(Exception):
     """Custom exception for vision AI operations."""
@@ -57,12 +66,30 @@ class VisionAIResult:
 class VisionAIService:
     """Service for vision AI processing using Ollama models."""
 
+    # Preprocessed images kept for reuse when several operations run on one upload
+    PREPARED_IMAGE_MEMO_SIZE = 32
+
     def __init__(self):
         self.logger = get_logger("vision_ai_service")
         self.max_concurrent_tasks = 2  # Limited for 2x Tesla P40 homelab setup
         self.semaphore = asyncio.Semaphore(self.max_concurrent_tasks)
         self.supported_formats = ['jpeg', 'jpg', 'png', 'gif', 'webp', 'bmp']
 
+        self.max_image_dimension = getattr(settings, 'vision_max_image_dimension', 1344)
+        self.max_upload_bytes = getattr(settings, 'vision_max_upload_bytes', 1024 * 1024)
+        self.jpeg_quality = getattr(settings, 'vision_jpeg_quality', 85)
+        self._prepared_images: "OrderedDict[bytes, PreparedImage]" = OrderedDict()
+        self._in_flight: Dict[tuple, asyncio.Future] = {}
+        self.result_cache: Optional[VisionResultCache] = None
+        if getattr(settings, 'vision_cache_enabled', True):
+            self.result_cache = VisionResultCache(
+                max_entries=getattr(settings, 'vision_cache_max_entries', 1024),
+                ttl_seconds=getattr(settings, 'vision_cache_ttl_seconds', 86400),
+                max_distance=getattr(settings, 'vision_cache_max_distance', 6),
+                min_hash_bits=getattr(settings, 'vision_cache_min_hash_bits', 32),
+                max_color_delta=getattr(settings, 'vision_cache_max_color_delta', 24)
+            )
+
     async def initialize(self):
         """Initialize the vision AI service."""
         try:
@@ -92,75 +119,171 @@ class VisionAIService:
         Returns:
             VisionAIResult with analysis
         """
-        async with self.semaphore:  # Limit concurrent tasks
-            result = VisionAIResult()
-            start_time = datetime.now()
+        return await self._run_operation("analyze", image_data, prompt, model_name, max_tokens)
+
+    async def _prepare_image(self, image_data: Union[bytes, str]) -> PreparedImage:
+        """Preprocess an image off the event loop, reusing recent results for the same bytes."""
+        raw = decode_image_input(image_data)
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+        prepared = self._prepared_images.get(digest)
+        if prepared is not None:
+            self._prepared_images.move_to_end(digest)
+            return prepared
+
+        prepared = await asyncio.to_thread(
+            prepare_image, raw, self.max_image_dimension, self.max_upload_bytes, self.jpeg_quality
+        )
+        self._prepared_images[digest] = prepared
+        while len(self._prepared_images) > self.PREPARED_IMAGE_MEMO_SIZE:
+            self._prepared_images.popitem(last=False)
+        return prepared
+
+    @staticmethod
+    def _cache_scope(operation: str, model_name: str, prompt: str, max_tokens: int) -> str:
+        prompt_digest = hashlib.blake2b(prompt.encode('utf-8'), digest_size=8).hexdigest()
+        return f"{operation}:{model_name}:{max_tokens}:{prompt_digest}"
+
+    async def _run_operation(
+        self,
+        operation: str,
+        image_data: Union[bytes, str],
+        prompt: str,
+        model_name: Optional[str],
+        max_tokens: int
+    ) -> VisionAIResult:
+        """
+        Run a vision prompt against a preprocessed image, via the result cache.
 
-            try:
-                # Get vision-capable model
-                if not model_name:
-                    model_name = await model_capability_service.get_best_model_for_task(
-                        ModelCapability.VISION_ANALYSIS
-                    )
+        Cache hits return without waiting for a model slot.
+        """
+        result = VisionAIResult()
+        start_time = datetime.now()
 
-                if not model_name:
-                    raise VisionAIError("No vision-capable models available")
+        try:
+            # Get vision-capable model
+            if not model_name:
+                model_name = await model_capability_service.get_best_model_for_task(
+                    ModelCapability.VISION_ANALYSIS
+                )
 
-                result.model_used = model_name
+            if not model_name:
+                raise VisionAIError("No vision-capable models available")
+
+            result.model_used = model_name
+
+            prepared = await self._prepare_image(image_data)
+            scope = self._cache_scope(operation, model_name, prompt, max_tokens)
+            cached, value = await self._cached_or_call(scope, prepared, prompt, model_name, max_tokens,
+                                                        exact=operation in EXACT_MATCH_OPERATIONS)
+            result.result = value["result"]
+            result.confidence = value["confidence"]
+
+            result.processing_time = (datetime.now() - start_time).total_seconds()
+            result.metadata = {
+                "image_size_bytes": prepared.info["original_bytes"],
+                "upload_bytes": prepared.info["upload_bytes"],
+                "image_resized": prepared.info["resized"],
+                "image_dimensions": [prepared.info.get("width"), prepared.info.get("height")],
+                "cache_hit": cached,
+                "prompt": prompt,
+                "max_tokens": max_tokens
+            }
 
-                # Convert image to base64 if needed
-                if isinstance(image_data, bytes):
-                    image_b64 = base64.b64encode(image_data).decode('utf-8')
-                else:
-                    image_b64 = image_data
-
-                # For Ollama vision models, we need to use the chat endpoint with image data
-                # Create a message with the image
-                messages = [
-                    {
-                        "role": "user",
-                        "content": prompt,
-                        "images": [image_b64]
-                    }
-                ]
-
-                # Make request to Ollama using chat endpoint
-                response = await ollama_client.chat(
-                    messages=messages,
-                    model=model_name,
-                    stream=False,
-                    options={
-                        "num_predict": max_tokens,
-                        "temperature": 0.1  # Lower temperature for more accurate analysis
-                    }
-                )
+            self.logger.info(
+                f"Image {operation} completed in {result.processing_time:.2f}s using {model_name}"
+                f"{' (cached)' if cached else ''}"
+            )
+            return result
 
-                if response and 'response' in response:
-                    result.result = {
-                        "description": response['response'],
-                        "usage": response.get('usage', {}),
-                        "model": model_name
-                    }
-                    result.confidence = 0.8  # Default confidence for vision analysis
-                else:
-                    raise VisionAIError("Invalid response from vision model")
+        except Exception as e:
+            result.success = False
+            result.error_message = str(e)
+            result.processing_time = (datetime.now() - start_time).total_seconds()
+            self.logger.error(f"Image {operation} failed: {e}")
+            return result
 
-                result.processing_time = (datetime.now() - start_time).total_seconds()
-                result.metadata = {
-                    "image_size_bytes": len(image_data) if isinstance(image_data, bytes) else len(image_b64),
-                    "prompt": prompt,
-                    "max_tokens": max_tokens
-                }
+    async def _cached_or_call(
+        self,
+        scope: str,
+        prepared: PreparedImage,
+        prompt: str,
+        model_name: str,
+        max_tokens: int,
+        exact: bool
+    ):
+        """
+        Cached result for an image, calling the model on a miss.
 
-                self.logger.info(f"Image analysis completed in {result.processing_time:.2f}s using {model_name}")
-                return result
+        Concurrent requests for the same image and scope wait for the first
+        one's result instead of queueing their own model calls.
 
-            except Exception as e:
-                result.success = False
-                result.error_message = str(e)
-                result.processing_time = (datetime.now() - start_time).total_seconds()
-                self.logger.error(f"Image analysis failed: {e}")
-                return result
+        Returns:
+            Tuple of (served from cache, {"result": ..., "confidence": ...})
+        """
+        if self.result_cache:
+            value = self.result_cache.get(scope, prepared, exact)
+            if value is not None:
+                return True, value
+
+        flight_key = (scope, prepared.content_digest)
+        pending = self._in_flight.get(flight_key)
+        if pending is not None:
+            value = await asyncio.shield(pending)
+            if value is not None:
+                return True, copy.deepcopy(value)
+            # The first request failed; try for ourselves
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight.setdefault(flight_key, future)
+        value = None
+        try:
+            async with self.semaphore:  # Limit concurrent model calls
+                response = await self._call_model(prepared, prompt, model_name, max_tokens)
+            value = {
+                "result": {
+                    "description": response['response'],
+                    "usage": response.get('usage', {}),
+                    "model": model_name
+                },
+                "confidence": 0.8  # Default confidence for vision analysis
+            }
+            if self.result_cache:
+                self.result_cache.put(scope, prepared, value)
+            return False, copy.deepcopy(value)
+        finally:
+            future.set_result(value)
+            if self._in_flight.get(flight_key) is future:
+                del self._in_flight[flight_key]
+
+    async def _call_model(
+        self,
+        prepared: PreparedImage,
+        prompt: str,
+        model_name: str,
+        max_tokens: int
+    ) -> Dict[str, Any]:
+        # For Ollama vision models, we need to use the chat endpoint with image data
+        messages = [
+            {
+                "role": "user",
+                "content": prompt,
+                "images": [prepared.b64]
+            }
+        ]
+
+        response = await ollama_client.chat(
+            messages=messages,
+            model=model_name,
+            stream=False,
+            options={
+                "num_predict": max_tokens,
+                "temperature": 0.1  # Lower temperature for more accurate analysis
+            }
+        )
+
+        if not response or 'response' not in response:
+            raise VisionAIError("Invalid response from vision model")
+        return response
 
     async def detect_objects(
         self,
@@ -188,7 +311,7 @@ class VisionAIService:
         Format the response as a structured list.
         """
 
-        result = await self.analyze_image(image_data, prompt, model_name)
+        result = await self._run_operation("detect_objects", image_data, prompt, model_name, 500)
 
         if result.success:
             # Parse the response to extract structured object data
@@ -222,7 +345,7 @@ class VisionAIService:
         If no text is found, clearly state that.
         """
 
-        result = await self.analyze_image(image_data, prompt, model_name)
+        result = await self._run_operation("extract_text", image_data, prompt, model_name, 500)
 
         if result.success:
             extracted_text = result.result.get("description", "")
@@ -259,7 +382,7 @@ class VisionAIService:
         - Unique identifying features
         """
 
-        result = await self.analyze_image(query_image, prompt, model_name)
+        result = await self._run_operation("search_similar", query_image, prompt, model_name, 500)
 
         if result.success:
             result.result["search_criteria"] = self._extract_search_criteria(result.result.get("description", ""))
@@ -462,6 +585,8 @@ class VisionAIService:
                 "supported_models": len(models),
                 "max_concurrent_tasks": self.max_concurrent_tasks,
                 "supported_formats": self.supported_formats,
+                "max_image_dimension": self.max_image_dimension,
+                "result_cache": self.result_cache.get_stats() if self.result_cache else None,
                 "models": models,
                 "timestamp": datetime.now().isoformat()
             }
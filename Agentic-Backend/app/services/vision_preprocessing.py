@@ -0,0 +1,369 @@
+"""
+Image preprocessing and result caching for the vision AI service.
+
+``prepare_image`` turns an uploaded image into what is actually sent to the
+vision model: orientation is normalized from EXIF, the image is downscaled to
+the model's effective input resolution (vision models resize to a fixed
+budget anyway, so larger uploads only cost bytes and decode time) and
+re-encoded as JPEG. JPEGs are decoded with Pillow's draft mode, which lets
+libjpeg scale down during decode instead of materializing the full-size
+bitmap. Images already within budget are sent byte-for-byte.
+
+Each prepared image carries a 256-bit difference hash (dHash) of its
+normalized pixels. ``VisionResultCache`` keys results by operation, model,
+prompt and that hash, so repeated images return immediately and
+near-duplicates (re-encoded or resized reposts) match within a Hamming
+distance. The hash only sees grayscale gradients, so a near-duplicate must
+also have a similar coarse colour layout, and images whose hash sets few
+bits (flat colour, sparse text on a plain background) match exact content
+only, since unrelated images of that kind hash alike. Operations that read
+fine detail, such as OCR, always match exact content only.
+
+Everything here is CPU-only and synchronous; callers run ``prepare_image`` in
+a worker thread.
+"""
+
+import base64
+import binascii
+import copy
+import hashlib
+import io
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Set, Tuple, Union
+
+from PIL import Image, ImageOps
+
+from app.utils.logging import get_logger
+
+logger = get_logger("vision_preprocessing")
+
+# Formats the vision models accept as-is; anything else is re-encoded.
+PASSTHROUGH_FORMATS = {"PNG", "JPEG"}
+
+# dHash grid: HASH_SIZE x HASH_SIZE horizontal gradients -> 256-bit hash
+HASH_SIZE = 16
+
+# Colour signature grid: COLOR_GRID x COLOR_GRID mean RGB cells
+COLOR_GRID = 4
+
+_EXIF_ORIENTATION_TAG = 0x0112
+
+
+@dataclass
+class PreparedImage:
+    """An image ready to upload to a vision model."""
+    data: bytes
+    perceptual_hash: Optional[int]  # None if the image could not be decoded
+    content_digest: str
+    color_signature: Optional[bytes] = None  # Mean RGB per COLOR_GRID cell
+    info: Dict[str, Any] = field(default_factory=dict)
+    _b64: Optional[str] = None
+
+    @property
+    def b64(self) -> str:
+        """Base64 encoding of ``data``, computed once."""
+        if self._b64 is None:
+            self._b64 = base64.b64encode(self.data).decode('utf-8')
+        return self._b64
+
+
+def decode_image_input(image_data: Union[bytes, str]) -> bytes:
+    """Accept raw bytes or a base64 string (optionally a data URL)."""
+    if isinstance(image_data, bytes):
+        return image_data
+    if image_data.startswith("data:") and "," in image_data:
+        image_data = image_data.split(",", 1)[1]
+    try:
+        return base64.b64decode(image_data, validate=True)
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"Image data is not valid base64: {e}")
+
+
+def difference_hash(img: Image.Image, hash_size: int = HASH_SIZE) -> int:
+    """
+    Perceptual difference hash of an image.
+
+    The image is reduced to a (hash_size + 1) x hash_size grayscale grid and
+    each bit records whether a pixel is brighter than its right neighbour, so
+    the hash survives rescaling, re-compression and small colour shifts.
+    """
+    gray = img.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BOX)
+    pixels = gray.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def color_signature(img: Image.Image, grid: int = COLOR_GRID) -> bytes:
+    """Mean RGB of each cell of a grid x grid layout, row-major (3 bytes per cell)."""
+    return img.convert("RGB").resize((grid, grid), Image.Resampling.BOX).tobytes()
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def color_distance(a: Optional[bytes], b: Optional[bytes]) -> int:
+    """Largest per-channel difference between two colour signatures (255 if unknown)."""
+    if a is None or b is None or len(a) != len(b):
+        return 255
+    return max((abs(x - y) for x, y in zip(a, b)), default=0)
+
+
+def _flatten(img: Image.Image) -> Image.Image:
+    """Convert to RGB (or keep L), compositing transparency onto white."""
+    if img.mode in ("RGB", "L"):
+        return img
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def prepare_image(
+    image_data: Union[bytes, str],
+    max_dimension: int,
+    max_bytes: int,
+    jpeg_quality: int = 85
+) -> PreparedImage:
+    """
+    Normalize, downscale and re-encode an image for upload.
+
+    Images that are already within the dimension and size budget, upright and
+    in a format the model accepts are returned byte-for-byte. Everything else
+    is rotated upright, shrunk to ``max_dimension`` on its longest side and
+    re-encoded as JPEG. Images Pillow cannot decode are passed through
+    unchanged (without a perceptual hash) so the model can still try them.
+
+    Args:
+        image_data: Image bytes or base64 string
+        max_dimension: Longest side in pixels the model makes use of
+        max_bytes: Largest original that may be uploaded without re-encoding
+        jpeg_quality: Quality for re-encoded images
+
+    Returns:
+        PreparedImage with the upload bytes, perceptual hash and size info
+    """
+    data = decode_image_input(image_data)
+    info: Dict[str, Any] = {"original_bytes": len(data), "resized": False, "reencoded": False}
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            info["original_width"], info["original_height"] = img.size
+            info["format"] = img.format
+            orientation = img.getexif().get(_EXIF_ORIENTATION_TAG, 1)
+
+            passthrough = (
+                max(img.size) <= max_dimension
+                and len(data) <= max_bytes
+                and img.format in PASSTHROUGH_FORMATS
+                and orientation == 1
+            )
+
+            if img.format == "JPEG" and not passthrough:
+                # Let libjpeg scale by 1/2, 1/4 or 1/8 while decoding. Orientations
+                # 5-8 swap the axes, which doesn't matter for a square bound.
+                img.draft("RGB", (max_dimension, max_dimension))
+
+            normalized = ImageOps.exif_transpose(img)
+            if max(normalized.size) > max_dimension:
+                # Bicubic, as the models' own preprocessors use; reducing_gap lets
+                # Pillow box-reduce large images first
+                normalized.thumbnail((max_dimension, max_dimension), Image.Resampling.BICUBIC, reducing_gap=3.0)
+                info["resized"] = True
+            normalized = _flatten(normalized)
+            perceptual_hash = difference_hash(normalized)
+            signature = color_signature(normalized)
+
+            if passthrough:
+                upload = data
+            else:
+                buffer = io.BytesIO()
+                normalized.save(buffer, format="JPEG", quality=jpeg_quality, optimize=True)
+                upload = buffer.getvalue()
+                info["reencoded"] = True
+
+            info["width"], info["height"] = normalized.size
+
+    except Exception as e:
+        logger.warning(f"Could not preprocess image, uploading original: {e}")
+        upload = data
+        perceptual_hash = None
+        signature = None
+
+    info["upload_bytes"] = len(upload)
+    return PreparedImage(
+        data=upload,
+        perceptual_hash=perceptual_hash,
+        content_digest=hashlib.blake2b(upload, digest_size=16).hexdigest(),
+        color_signature=signature,
+        info=info
+    )
+
+
+@dataclass
+class _CacheEntry:
+    perceptual_hash: int
+    content_digest: str
+    color_signature: Optional[bytes]
+    value: Dict[str, Any]
+    expires_at: float
+
+
+class VisionResultCache:
+    """
+    LRU cache of vision results keyed by scope and perceptual hash.
+
+    A scope is the operation, model and prompt settings a result was produced
+    with; results are only ever shared within a scope. Lookups try the exact
+    hash first, then (for scopes that allow it) scan the scope for a hash
+    within ``max_distance`` bits whose colour signature is within
+    ``max_color_delta`` per channel. Hashes with fewer than ``min_hash_bits``
+    set carry too little structure to tell images apart, so they, and
+    entries stored under them, only match identical content.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 86400,
+        max_distance: int = 6,
+        min_hash_bits: int = 32,
+        max_color_delta: int = 24,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+        self.min_hash_bits = min_hash_bits
+        self.max_color_delta = max_color_delta
+        self.clock = clock
+        # Keyed by (scope, hash, None), or (scope, hash, content digest) for
+        # hashes too sparse to stand for an image on their own
+        self._entries: "OrderedDict[Tuple[str, int, Optional[str]], _CacheEntry]" = OrderedDict()
+        # Distinctive hashes per scope, the near-duplicate candidates
+        self._hashes_by_scope: Dict[str, Set[int]] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def get(self, scope: str, image: PreparedImage, exact: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Cached result for an image, or None.
+
+        Args:
+            scope: Operation/model/prompt scope
+            image: The prepared image
+            exact: Only accept identical content (no near-duplicate matching)
+        """
+        if image.perceptual_hash is None:
+            return None
+
+        now = self.clock()
+        with self._lock:
+            key = self._key(scope, image)
+            entry = self._live_entry(key, now)
+            if entry is not None and (
+                entry.content_digest == image.content_digest
+                or (not exact and self._similar(entry, image))
+            ):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry.value)
+
+            if not exact and self.max_distance > 0 and self._distinctive(image.perceptual_hash):
+                best_key, best_distance = None, self.max_distance + 1
+                for candidate in list(self._hashes_by_scope.get(scope, ())):
+                    if candidate == image.perceptual_hash:
+                        continue
+                    distance = hamming_distance(candidate, image.perceptual_hash)
+                    if distance < best_distance:
+                        candidate_key = (scope, candidate, None)
+                        candidate_entry = self._live_entry(candidate_key, now)
+                        if candidate_entry is not None and self._similar(candidate_entry, image):
+                            best_key, best_distance = candidate_key, distance
+                if best_key is not None:
+                    entry = self._entries[best_key]
+                    self._entries.move_to_end(best_key)
+                    self.near_hits += 1
+                    return copy.deepcopy(entry.value)
+
+            self.misses += 1
+            return None
+
+    def _key(self, scope: str, image: PreparedImage) -> Tuple[str, int, Optional[str]]:
+        if self._distinctive(image.perceptual_hash):
+            return (scope, image.perceptual_hash, None)
+        return (scope, image.perceptual_hash, image.content_digest)
+
+    def _distinctive(self, perceptual_hash: int) -> bool:
+        """Whether a hash has enough gradient bits for near-duplicate matching."""
+        return perceptual_hash.bit_count() >= self.min_hash_bits
+
+    def _similar(self, entry: _CacheEntry, image: PreparedImage) -> bool:
+        """Whether a cached entry may answer for a different encoding of ``image``."""
+        return (
+            self._distinctive(entry.perceptual_hash)
+            and color_distance(entry.color_signature, image.color_signature) <= self.max_color_delta
+        )
+
+    def put(self, scope: str, image: PreparedImage, value: Dict[str, Any]):
+        if image.perceptual_hash is None:
+            return
+        key = self._key(scope, image)
+        with self._lock:
+            self._entries[key] = _CacheEntry(
+                perceptual_hash=image.perceptual_hash,
+                content_digest=image.content_digest,
+                color_signature=image.color_signature,
+                value=copy.deepcopy(value),
+                expires_at=self.clock() + self.ttl_seconds
+            )
+            self._entries.move_to_end(key)
+            if key[2] is None:
+                self._hashes_by_scope.setdefault(scope, set()).add(image.perceptual_hash)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._forget(evicted_key)
+
+    def _live_entry(self, key: Tuple[str, int, Optional[str]], now: float) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= now:
+            del self._entries[key]
+            self._forget(key)
+            return None
+        return entry
+
+    def _forget(self, key: Tuple[str, int, Optional[str]]):
+        scope, perceptual_hash, content_digest = key
+        if content_digest is not None:
+            return
+        hashes = self._hashes_by_scope.get(scope)
+        if hashes is not None:
+            hashes.discard(perceptual_hash)
+            if not hashes:
+                del self._hashes_by_scope[scope]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hashes_by_scope.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "near_duplicate_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.near_hits) / lookups, 3) if lookups else 0.0
+        }
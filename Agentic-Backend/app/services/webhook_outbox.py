@@ -0,0 +1,240 @@
+"""
+Redis-backed webhook delivery outbox.
+
+Keys:
+
+- ``webhook:outbox:event:{event_id}``  serialized event body (written once, with a TTL)
+- ``webhook:outbox:sub:{sub_id}``      ZSET of event ids due for a subscription, scored by next attempt time
+- ``webhook:outbox:attempts:{sub_id}`` HASH of failed attempt counts per event id
+- ``webhook:outbox:ready``             ZSET of subscription ids scored by their earliest due delivery
+- ``webhook:outbox:lease:{sub_id}``    lease held by the worker currently delivering to a subscription
+- ``webhook:outbox:dead:{sub_id}``     capped LIST of deliveries that exhausted their attempts
+
+Event ids are ``{event_type}:{uuid}`` so workers can label deliveries without
+decoding bodies. A subscription is worked on by one worker at a time (the
+lease), so each subscriber has at most one request in flight and batches
+never overlap. The lease is renewed before every batch; a worker that finds
+it lost stops delivering. Deliveries go out in due-time order; a retried event is sent
+after events that became due while it was backing off.
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.logging import get_logger
+
+logger = get_logger("webhook_outbox")
+
+KEY_PREFIX = "webhook:outbox:"
+READY_KEY = f"{KEY_PREFIX}ready"
+DEAD_LETTER_LIMIT = 1000
+
+
+_CLAIM_SCRIPT = """
+local now = tonumber(ARGV[1])
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, 20)
+for _, sid in ipairs(ids) do
+    if redis.call('SET', ARGV[2] .. sid, ARGV[4], 'NX', 'PX', ARGV[3]) then
+        -- Push the subscription back so other workers skip it while leased
+        redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]) / 1000, sid)
+        return sid
+    end
+end
+return false
+"""
+
+# Extends a lease only while the caller still owns it, and keeps the
+# subscription pushed back in the ready set for the lease's duration
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+redis.call('ZADD', KEYS[2], 'XX', tonumber(ARGV[3]) + tonumber(ARGV[2]) / 1000, ARGV[4])
+return 1
+"""
+
+_TAKE_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local result = {}
+for _, eid in ipairs(ids) do
+    result[#result + 1] = {eid, redis.call('GET', ARGV[3] .. eid) or '', redis.call('HGET', KEYS[2], eid) or '0'}
+end
+return result
+"""
+
+# ARGV: now, max_attempts, error, then event_id/delay pairs. Returns dead-lettered event ids.
+_FAIL_SCRIPT = """
+local now = tonumber(ARGV[1])
+local max_attempts = tonumber(ARGV[2])
+local dead = {}
+for i = 4, #ARGV, 2 do
+    local eid = ARGV[i]
+    local attempts = redis.call('HINCRBY', KEYS[2], eid, 1)
+    if attempts >= max_attempts then
+        redis.call('ZREM', KEYS[1], eid)
+        redis.call('HDEL', KEYS[2], eid)
+        redis.call('LPUSH', KEYS[3], eid .. ' ' .. ARGV[3])
+        dead[#dead + 1] = eid
+    else
+        redis.call('ZADD', KEYS[1], 'XX', now + tonumber(ARGV[i + 1]), eid)
+    end
+end
+redis.call('LTRIM', KEYS[3], 0, %d)
+return dead
+""" % (DEAD_LETTER_LIMIT - 1)
+
+_RELEASE_SCRIPT = """
+local head = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+if #head == 0 then
+    redis.call('ZREM', KEYS[2], ARGV[1])
+else
+    local due = tonumber(head[2])
+    local not_before = tonumber(ARGV[2])
+    if not_before > due then
+        due = not_before
+    end
+    redis.call('ZADD', KEYS[2], due, ARGV[1])
+end
+if redis.call('GET', KEYS[3]) == ARGV[3] then
+    redis.call('DEL', KEYS[3])
+end
+return #head / 2
+"""
+
+
+class WebhookOutbox:
+    """Persistent per-subscription delivery schedule for webhook events."""
+
+    def __init__(self, redis_client, event_ttl_seconds: int = 259200, lease_seconds: float = 120.0):
+        self.redis = redis_client
+        self.event_ttl_seconds = event_ttl_seconds
+        self.lease_ms = int(lease_seconds * 1000)
+
+        self._claim = redis_client.register_script(_CLAIM_SCRIPT)
+        self._renew = redis_client.register_script(_RENEW_SCRIPT)
+        self._take = redis_client.register_script(_TAKE_SCRIPT)
+        self._fail = redis_client.register_script(_FAIL_SCRIPT)
+        self._release = redis_client.register_script(_RELEASE_SCRIPT)
+
+    @staticmethod
+    def _sub_key(subscription_id: str) -> str:
+        return f"{KEY_PREFIX}sub:{subscription_id}"
+
+    @staticmethod
+    def _attempts_key(subscription_id: str) -> str:
+        return f"{KEY_PREFIX}attempts:{subscription_id}"
+
+    @staticmethod
+    def _lease_key(subscription_id: str) -> str:
+        return f"{KEY_PREFIX}lease:{subscription_id}"
+
+    @staticmethod
+    def _dead_key(subscription_id: str) -> str:
+        return f"{KEY_PREFIX}dead:{subscription_id}"
+
+    async def add_event(self, event_id: str, body: str, subscription_ids: List[str]):
+        """Store an event body once and schedule it for immediate delivery to each subscription."""
+        now = time.time()
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.set(f"{KEY_PREFIX}event:{event_id}", body, ex=self.event_ttl_seconds)
+        for subscription_id in subscription_ids:
+            pipe.zadd(self._sub_key(subscription_id), {event_id: now})
+            # LT only ever moves a subscription earlier (and still adds new ones)
+            pipe.zadd(READY_KEY, {subscription_id: now}, lt=True)
+        await pipe.execute()
+
+    async def claim_subscription(self, worker_id: str) -> Optional[str]:
+        """Lease a subscription with due deliveries, if any."""
+        return await self._claim(
+            keys=[READY_KEY],
+            args=[time.time(), f"{KEY_PREFIX}lease:", self.lease_ms, worker_id]
+        )
+
+    async def renew(self, subscription_id: str, worker_id: str) -> bool:
+        """Extend a subscription lease; False if the worker no longer holds it."""
+        renewed = await self._renew(
+            keys=[self._lease_key(subscription_id), READY_KEY],
+            args=[worker_id, self.lease_ms, time.time(), subscription_id]
+        )
+        return bool(renewed)
+
+    async def take_due(self, subscription_id: str, limit: int) -> List[Tuple[str, str, int]]:
+        """Due deliveries for a leased subscription as (event_id, body, failed_attempts)."""
+        rows = await self._take(
+            keys=[self._sub_key(subscription_id), self._attempts_key(subscription_id)],
+            args=[time.time(), limit, f"{KEY_PREFIX}event:"]
+        )
+        return [(event_id, body, int(attempts)) for event_id, body, attempts in rows]
+
+    async def complete(self, subscription_id: str, event_ids: List[str]):
+        """Remove delivered (or undeliverable) events from a subscription's schedule."""
+        if not event_ids:
+            return
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.zrem(self._sub_key(subscription_id), *event_ids)
+        pipe.hdel(self._attempts_key(subscription_id), *event_ids)
+        await pipe.execute()
+
+    async def fail(
+        self,
+        subscription_id: str,
+        delays: Dict[str, float],
+        max_attempts: int,
+        error: str
+    ) -> List[str]:
+        """
+        Record a failed attempt for each event and schedule its retry.
+
+        Args:
+            subscription_id: Subscription id
+            delays: Retry delay in seconds per event id
+            max_attempts: Attempts after which an event is dead-lettered
+            error: Short error description kept with dead letters
+
+        Returns:
+            Event ids that were dead-lettered
+        """
+        args = [time.time(), max_attempts, error[:200]]
+        for event_id, delay in delays.items():
+            args.extend([event_id, delay])
+        return await self._fail(
+            keys=[self._sub_key(subscription_id), self._attempts_key(subscription_id), self._dead_key(subscription_id)],
+            args=args
+        )
+
+    async def release(self, subscription_id: str, worker_id: str, not_before: Optional[float] = None) -> int:
+        """
+        Release a subscription lease and reschedule it at its next due delivery.
+
+        Returns:
+            1 if deliveries remain scheduled for the subscription, else 0
+        """
+        return await self._release(
+            keys=[self._sub_key(subscription_id), READY_KEY, self._lease_key(subscription_id)],
+            args=[subscription_id, not_before or 0, worker_id]
+        )
+
+    async def remove_subscription(self, subscription_id: str):
+        """Drop everything scheduled for a subscription."""
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.zrem(READY_KEY, subscription_id)
+        pipe.delete(
+            self._sub_key(subscription_id),
+            self._attempts_key(subscription_id),
+            self._lease_key(subscription_id),
+            self._dead_key(subscription_id)
+        )
+        await pipe.execute()
+
+    async def get_stats(self, subscription_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        """Pending and dead-lettered delivery counts per subscription."""
+        pipe = self.redis.pipeline(transaction=False)
+        for subscription_id in subscription_ids:
+            pipe.zcard(self._sub_key(subscription_id))
+            pipe.llen(self._dead_key(subscription_id))
+        results = await pipe.execute()
+        return {
+            subscription_id: {"pending": results[i * 2], "dead_lettered": results[i * 2 + 1]}
+            for i, subscription_id in enumerate(subscription_ids)
+        }
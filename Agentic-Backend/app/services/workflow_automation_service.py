@@ -11,10 +11,11 @@ Author: Kilo Code
 """
 
 import asyncio
+import contextlib
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Callable, Union
+from typing import Dict, List, Optional, Any, Callable, Set, Union
 from dataclasses import dataclass, field
 from enum import Enum
 import uuid
@@ -28,13 +29,18 @@ from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
+from app.config import settings
 from app.db.database import get_db
 from app.services.pubsub_service import RedisPubSubService as PubSubService
-from app.services.system_metrics_service import SystemMetricsService
+from app.services.system_metrics_service import system_metrics_service
+from app.services.workflow_dag_executor import WorkflowDAGExecutor
 from app.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+CHECKPOINT_KEY_PREFIX = "workflow_checkpoint:"
+CHECKPOINT_META_FIELD = "__execution__"
+
 
 class WorkflowStatus(Enum):
     """Workflow execution status"""
@@ -135,10 +141,18 @@ class WorkflowAutomationService:
         self.scheduler = AsyncIOScheduler()
         self.redis: Optional[redis.Redis] = None
         self.pubsub_service = PubSubService()
-        self.metrics_service = SystemMetricsService()
+        self.metrics_service = system_metrics_service
         self.active_workflows: Dict[str, WorkflowExecution] = {}
         self.workflow_definitions: Dict[str, WorkflowDefinition] = {}
         self.workflow_schedules: Dict[str, WorkflowSchedule] = {}
+        self.executors: Dict[str, WorkflowDAGExecutor] = {}
+        self.checkpoint_ttl = getattr(settings, 'workflow_checkpoint_ttl_seconds', 86400)
+        self.step_concurrency_limits = {
+            'ai': getattr(settings, 'workflow_step_concurrency_ai', 2),
+            'http': getattr(settings, 'workflow_step_concurrency_http', 16),
+            'db': getattr(settings, 'workflow_step_concurrency_db', 8)
+        }
+        self._step_semaphores: Dict[str, asyncio.Semaphore] = {}
 
     async def initialize(self):
         """Initialize the workflow automation service"""
@@ -413,6 +427,40 @@ class WorkflowAutomationService:
             logger.error(f"Failed to cancel workflow execution: {e}")
             raise
 
+    async def resume_workflow_execution(self, execution_id: str) -> bool:
+        """
+        Resume an interrupted execution from its checkpoint.
+
+        Steps that completed before the interruption are restored from the
+        checkpoint instead of being run again.
+
+        Returns:
+            True if the execution was restarted, False if it is still running
+        """
+        existing = self.active_workflows.get(execution_id)
+        if existing and existing.status in [WorkflowStatus.PENDING, WorkflowStatus.RUNNING, WorkflowStatus.RETRYING]:
+            return False
+
+        meta, _ = await self._load_checkpoint(execution_id)
+        if not meta:
+            raise ValueError(f"No checkpoint found for workflow execution: {execution_id}")
+        if meta['workflow_id'] not in self.workflow_definitions:
+            raise ValueError(f"Workflow definition not found: {meta['workflow_id']}")
+
+        execution = WorkflowExecution(
+            id=execution_id,
+            workflow_id=meta['workflow_id'],
+            status=WorkflowStatus.PENDING,
+            start_time=datetime.utcnow(),
+            priority=Priority(meta.get('priority', Priority.NORMAL.value)),
+            context=meta.get('context', {})
+        )
+        self.active_workflows[execution_id] = execution
+        asyncio.create_task(self._execute_workflow_async(execution))
+
+        logger.info(f"Resuming workflow execution {execution_id} from checkpoint")
+        return True
+
     async def get_workflow_execution_status(self, execution_id: str) -> Optional[WorkflowExecution]:
         """Get the status of a workflow execution"""
         return self.active_workflows.get(execution_id)
@@ -692,8 +740,8 @@ class WorkflowAutomationService:
                 base_allocation['memory_gb'] = base_allocation.get('memory_gb', 1) * 1.5
 
             # Adjust based on system load
-            metrics = await self.metrics_service.get_system_metrics()
-            system_load_factor = metrics.cpu.usage_percent / 100
+            cpu_metrics = self.metrics_service.get_cpu_metrics()
+            system_load_factor = cpu_metrics.get('usage_percent', 0) / 100
 
             if system_load_factor > 0.8:  # High load
                 base_allocation['cpu_percent'] = max(5, base_allocation.get('cpu_percent', 10) * 0.7)
@@ -725,8 +773,11 @@ class WorkflowAutomationService:
             success = await self._execute_workflow_steps(execution, definition)
 
             # Update final status
-            if success:
+            if execution.status == WorkflowStatus.CANCELLED:
+                logger.info(f"Workflow execution {execution.id} stopped after cancellation")
+            elif success:
                 execution.status = WorkflowStatus.COMPLETED
+                await self._clear_checkpoint(execution.id)
                 logger.info(f"Workflow execution {execution.id} completed successfully")
             else:
                 execution.status = WorkflowStatus.FAILED
@@ -756,79 +807,63 @@ class WorkflowAutomationService:
             asyncio.create_task(self._cleanup_execution_after_delay(execution.id, 3600))  # 1 hour
 
     async def _execute_workflow_steps(self, execution: WorkflowExecution, definition: WorkflowDefinition) -> bool:
-        """Execute all steps in a workflow"""
+        """Execute all steps in a workflow as a dependency graph, resuming from any checkpoint"""
         try:
-            # Get initial steps (no dependencies)
-            pending_steps = [step_id for step_id, step in definition.steps.items()
-                           if not step.dependencies]
-
-            completed_steps = set()
-
-            while pending_steps:
-                # Execute steps that can run in parallel
-                parallel_tasks = []
-
-                for step_id in pending_steps[:]:  # Copy to avoid modification during iteration
-                    step = definition.steps[step_id]
-
-                    # Check if all dependencies are satisfied
-                    if all(dep in completed_steps for dep in step.dependencies):
-                        # Check step conditions
-                        if await self.evaluate_conditions(step.conditions, execution.context):
-                            parallel_tasks.append(self._execute_step(execution, step_id))
-                            pending_steps.remove(step_id)
-
-                # Wait for parallel tasks to complete
-                if parallel_tasks:
-                    results = await asyncio.gather(*parallel_tasks, return_exceptions=True)
-
-                    # Process results
-                    for i, result in enumerate(results):
-                        if isinstance(result, Exception):
-                            logger.error(f"Step execution failed: {result}")
-                            return False
-
-                # Check for completion
-                if not parallel_tasks and pending_steps:
-                    logger.error(f"Workflow stuck with pending steps: {pending_steps}")
-                    return False
+            executor = WorkflowDAGExecutor(self, execution, definition)
+        except ValueError as e:
+            logger.error(f"Invalid workflow {definition.id}: {e}")
+            execution.error_message = str(e)
+            return False
 
-            return True
+        try:
+            completed = await self._restore_checkpoint(execution)
+            await self._checkpoint_execution(execution)
+
+            self.executors[execution.id] = executor
+            return await executor.run(completed)
 
         except Exception as e:
             logger.error(f"Error executing workflow steps: {e}")
             return False
 
-    async def _execute_step(self, execution: WorkflowExecution, step_id: str) -> bool:
-        """Execute a single workflow step with atomic processing"""
-        try:
-            definition = self.workflow_definitions[execution.workflow_id]
-            step = definition.steps[step_id]
+        finally:
+            self.executors.pop(execution.id, None)
 
-            execution.current_step = step_id
+    async def _run_step(self, execution: WorkflowExecution, step_id: str):
+        """Run a single workflow step and record its result; raises on failure"""
+        definition = self.workflow_definitions[execution.workflow_id]
+        step = definition.steps[step_id]
 
-            logger.info(f"Executing step {step_id} for workflow {execution.workflow_id}")
+        execution.current_step = step_id
 
-            # Execute the step based on its type
-            result = await self._execute_step_by_type(step, execution.context)
+        logger.info(f"Executing step {step_id} for workflow {execution.workflow_id}")
 
-            # Store result with atomic write
-            step_result = {
-                'status': 'completed',
-                'result': result,
-                'timestamp': datetime.utcnow().isoformat(),
-                'step_id': step_id
-            }
+        # Execute the step based on its type
+        result = await self._execute_step_by_type(step, execution.context)
 
-            execution.step_results[step_id] = step_result
+        # Store result with atomic write
+        step_result = {
+            'status': 'completed',
+            'result': result,
+            'timestamp': datetime.utcnow().isoformat(),
+            'step_id': step_id
+        }
 
-            # Update context with step result
-            execution.context[f"step_{step_id}_result"] = result
+        execution.step_results[step_id] = step_result
 
-            # Atomic progress tracking for homelab setup
-            await self._update_execution_progress(execution, step_id, step_result)
+        # Update context with step result
+        execution.context[f"step_{step_id}_result"] = result
 
-            logger.info(f"Step {step_id} completed successfully with atomic write")
+        # Atomic progress tracking for homelab setup
+        await self._update_execution_progress(execution, step_id, step_result)
+
+        logger.info(f"Step {step_id} completed successfully with atomic write")
+
+    async def _execute_step(self, execution: WorkflowExecution, step_id: str) -> bool:
+        """Execute a single workflow step with atomic processing"""
+        step = self.workflow_definitions[execution.workflow_id].steps[step_id]
+        try:
+            await self._run_step(execution, step_id)
             return True
 
         except Exception as e:
@@ -837,6 +872,107 @@ class WorkflowAutomationService:
             # Handle error with retry/recovery logic
             return await self.handle_workflow_error(execution, step_id, e, step)
 
+    def _step_retry_delay(self, step: WorkflowStep, error: Exception, attempt: int) -> Optional[float]:
+        """Backoff before retrying a step after its nth failed attempt, or None if it should not be retried"""
+        if self._is_llm_related_error(error):
+            # For LLM errors, use more conservative retry logic
+            if attempt < min(step.max_retries, 3):
+                return min(600, 5 * attempt)  # API rate limits, model loading, etc.
+            return None
+
+        if attempt < step.max_retries:
+            return min(300, 2 ** attempt)
+        return None
+
+    def _step_slot(self, group: Optional[str]):
+        """Concurrency slot for a step group, shared by all executions in this process"""
+        limit = self.step_concurrency_limits.get(group) if group else None
+        if not limit:
+            return contextlib.nullcontext()
+        semaphore = self._step_semaphores.get(group)
+        if semaphore is None:
+            semaphore = self._step_semaphores[group] = asyncio.Semaphore(limit)
+        return semaphore
+
+    # ============================================================================
+    # Checkpoints
+    # ============================================================================
+
+    async def _checkpoint_execution(self, execution: WorkflowExecution):
+        """Record what is needed to resume an execution (kept from its first run)"""
+        if not self.redis:
+            return
+        try:
+            key = f"{CHECKPOINT_KEY_PREFIX}{execution.id}"
+            meta = {
+                'workflow_id': execution.workflow_id,
+                'priority': execution.priority.value,
+                'context': execution.context,
+                'started_at': execution.start_time.isoformat()
+            }
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hsetnx(key, CHECKPOINT_META_FIELD, json.dumps(meta, default=str))
+            pipe.expire(key, self.checkpoint_ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to checkpoint execution {execution.id}: {e}")
+
+    async def _checkpoint_step(self, execution: WorkflowExecution, step_id: str, step_result: Dict[str, Any]):
+        """Record a finished step so a resumed execution does not run it again"""
+        if not self.redis:
+            return
+        try:
+            key = f"{CHECKPOINT_KEY_PREFIX}{execution.id}"
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(key, step_id, json.dumps(step_result, default=str))
+            pipe.expire(key, self.checkpoint_ttl)
+            await pipe.execute()
+        except Exception as e:
+            # The step still counts; it may just run again on resume
+            logger.warning(f"Failed to checkpoint step {step_id} of execution {execution.id}: {e}")
+
+    async def _load_checkpoint(self, execution_id: str):
+        """Load (execution meta, step results) from an execution's checkpoint"""
+        if not self.redis:
+            return None, {}
+        fields = await self.redis.hgetall(f"{CHECKPOINT_KEY_PREFIX}{execution_id}")
+        meta = fields.pop(CHECKPOINT_META_FIELD, None)
+        return (json.loads(meta) if meta else None), {
+            step_id: json.loads(value) for step_id, value in fields.items()
+        }
+
+    async def _restore_checkpoint(self, execution: WorkflowExecution) -> Set[str]:
+        """Restore checkpointed step results into an execution; returns the finished step ids"""
+        try:
+            _, step_results = await self._load_checkpoint(execution.id)
+        except Exception as e:
+            logger.warning(f"Failed to load checkpoint for execution {execution.id}: {e}")
+            return set()
+
+        definition = self.workflow_definitions[execution.workflow_id]
+        finished = set()
+        for step_id, step_result in step_results.items():
+            if step_id not in definition.steps or step_result.get('status') not in ('completed', 'skipped', 'recovered'):
+                continue
+            execution.step_results[step_id] = step_result
+            if step_result['status'] == 'completed':
+                execution.context[f"step_{step_id}_result"] = step_result.get('result')
+            if step_id not in execution.processed_items:
+                execution.processed_items.append(step_id)
+            finished.add(step_id)
+
+        if finished:
+            logger.info(f"Restored {len(finished)} checkpointed steps for execution {execution.id}")
+        return finished
+
+    async def _clear_checkpoint(self, execution_id: str):
+        if not self.redis:
+            return
+        try:
+            await self.redis.delete(f"{CHECKPOINT_KEY_PREFIX}{execution_id}")
+        except Exception as e:
+            logger.warning(f"Failed to clear checkpoint for execution {execution_id}: {e}")
+
     async def _execute_step_by_type(self, step: WorkflowStep, context: Dict[str, Any]) -> Any:
         """Execute a step based on its type"""
         try:
@@ -927,6 +1063,11 @@ class WorkflowAutomationService:
                 execution.error_message = reason
                 execution.end_time = datetime.utcnow()
 
+                # Stop in-flight steps promptly
+                executor = self.executors.get(execution_id)
+                if executor:
+                    await executor.cancel()
+
                 logger.info(f"Cancelled workflow execution: {execution_id} - {reason}")
 
         except Exception as e:
@@ -936,7 +1077,7 @@ class WorkflowAutomationService:
         """Update execution progress with atomic writes for homelab setup"""
         try:
             # Track successfully processed items
-            if step_result['status'] == 'completed':
+            if step_result['status'] in ('completed', 'skipped'):
                 if step_id not in execution.processed_items:
                     execution.processed_items.append(step_id)
 
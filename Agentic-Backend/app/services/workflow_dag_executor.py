@@ -0,0 +1,246 @@
+"""
+Event-driven DAG executor for workflow automation.
+
+Steps are scheduled by dependency counting: every step tracks how many of
+its dependencies are unresolved, and is launched the moment the last one
+finishes, so a slow step only delays the steps that actually depend on it
+and total time is bounded by the critical path.
+
+- Conditions are evaluated once, when a step becomes ready. A step whose
+  conditions are false is skipped; a skipped step still releases its
+  dependents, which evaluate their own conditions.
+- Steps run under the service's per-group concurrency limits (AI, HTTP, DB),
+  shared by every workflow in the process. Retries back off outside the slot.
+- A step that exhausts its retries runs its ``on_failure`` step instead, if
+  any; otherwise the workflow fails and every in-flight step is cancelled.
+- Completed steps are checkpointed, and checkpointed steps are not re-run
+  when an execution is resumed.
+"""
+
+import asyncio
+from collections import deque
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, TYPE_CHECKING
+
+from app.utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from app.services.workflow_automation_service import (
+        WorkflowAutomationService, WorkflowDefinition, WorkflowExecution
+    )
+
+logger = get_logger("workflow_dag_executor")
+
+# Step type -> concurrency group
+STEP_CONCURRENCY_GROUPS = {
+    "ai_processing": "ai",
+    "http_request": "http",
+    "webhook": "http",
+    "database_query": "db",
+}
+
+
+def step_concurrency_group(step) -> Optional[str]:
+    """Concurrency group for a step; ``config.concurrency_group`` overrides the type default."""
+    return step.config.get("concurrency_group") or STEP_CONCURRENCY_GROUPS.get(step.type)
+
+
+class WorkflowDAGExecutor:
+    """Runs one workflow execution's steps as a dependency graph."""
+
+    def __init__(
+        self,
+        service: "WorkflowAutomationService",
+        execution: "WorkflowExecution",
+        definition: "WorkflowDefinition"
+    ):
+        self.service = service
+        self.execution = execution
+        self.definition = definition
+        self.steps = definition.steps
+        self.dependents: Dict[str, List[str]] = {step_id: [] for step_id in self.steps}
+        self.remaining: Dict[str, int] = {}
+        self.running: Dict[asyncio.Task, str] = {}
+        self.completed: Set[str] = set()
+
+        for step_id, step in self.steps.items():
+            unique_dependencies = set(step.dependencies)
+            for dependency in unique_dependencies:
+                if dependency not in self.steps:
+                    raise ValueError(f"Step {step_id} depends on unknown step {dependency}")
+                self.dependents[dependency].append(step_id)
+            self.remaining[step_id] = len(unique_dependencies)
+
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        remaining = dict(self.remaining)
+        ready = [step_id for step_id, count in remaining.items() if count == 0]
+        visited = 0
+        while ready:
+            step_id = ready.pop()
+            visited += 1
+            for dependent in self.dependents[step_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if visited != len(self.steps):
+            cyclic = sorted(step_id for step_id, count in remaining.items() if count > 0)
+            raise ValueError(f"Workflow has a dependency cycle among steps: {cyclic}")
+
+    def _release(self, step_id: str) -> List[str]:
+        """Resolve a step and return the dependents that just became ready."""
+        ready = []
+        for dependent in self.dependents[step_id]:
+            self.remaining[dependent] -= 1
+            if self.remaining[dependent] == 0:
+                ready.append(dependent)
+        return ready
+
+    async def _start_ready(self, ready: Iterable[str]):
+        queue = deque(ready)
+        while queue:
+            step_id = queue.popleft()
+            step = self.steps[step_id]
+
+            if step_id in self.completed:
+                # Restored from a checkpoint
+                queue.extend(self._release(step_id))
+                continue
+
+            if not await self.service.evaluate_conditions(step.conditions, self.execution.context):
+                logger.info(f"Skipping step {step_id} for execution {self.execution.id}: conditions not met")
+                step_result = {
+                    'status': 'skipped',
+                    'timestamp': datetime.utcnow().isoformat(),
+                    'step_id': step_id
+                }
+                self.execution.step_results[step_id] = step_result
+                await self.service._update_execution_progress(self.execution, step_id, step_result)
+                await self.service._checkpoint_step(self.execution, step_id, step_result)
+                queue.extend(self._release(step_id))
+                continue
+
+            task = asyncio.create_task(self._run_step(step_id), name=f"workflow-step-{self.execution.id}-{step_id}")
+            self.running[task] = step_id
+
+    async def _attempt(self, step_id: str):
+        step = self.steps[step_id]
+        async with self.service._step_slot(step_concurrency_group(step)):
+            try:
+                await asyncio.wait_for(self.service._run_step(self.execution, step_id), step.timeout_seconds)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Step {step_id} timed out after {step.timeout_seconds}s")
+
+    async def _run_step(self, step_id: str):
+        """Run a step with retries and its failure fallback; raises if the step ultimately fails."""
+        step = self.steps[step_id]
+        attempt = 0
+        while True:
+            try:
+                await self._attempt(step_id)
+                await self.service._checkpoint_step(self.execution, step_id, self.execution.step_results[step_id])
+                return
+            except Exception as e:
+                attempt += 1
+                self.execution.error_message = str(e)
+                delay = self.service._step_retry_delay(step, e, attempt)
+                if delay is None:
+                    error = e
+                    break
+                self.execution.retry_count += 1
+                logger.info(f"Retrying step {step_id} for execution {self.execution.id} in {delay}s (attempt {attempt}): {e}")
+                await asyncio.sleep(delay)
+
+        if step.on_failure and step.on_failure in self.steps:
+            logger.info(f"Step {step_id} failed, running alternative step {step.on_failure}: {error}")
+            await self._attempt(step.on_failure)
+            step_result = {
+                'status': 'recovered',
+                'alternative_step': step.on_failure,
+                'error': str(error),
+                'timestamp': datetime.utcnow().isoformat(),
+                'step_id': step_id
+            }
+            self.execution.step_results[step_id] = step_result
+            await self.service._checkpoint_step(self.execution, step.on_failure, self.execution.step_results[step.on_failure])
+            await self.service._checkpoint_step(self.execution, step_id, step_result)
+            return
+
+        raise error
+
+    async def run(self, completed: Iterable[str] = ()) -> bool:
+        """
+        Execute the workflow's steps.
+
+        Args:
+            completed: Step ids already completed (from a checkpoint); they are not re-run
+
+        Returns:
+            True if every step completed or was skipped, False otherwise
+        """
+        self.completed = set(completed)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.definition.max_execution_time
+
+        await self._start_ready(step_id for step_id, count in self.remaining.items() if count == 0)
+
+        try:
+            while self.running:
+                timeout = deadline - loop.time()
+                done, _ = await asyncio.wait(
+                    self.running, timeout=max(0.0, timeout), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    self.execution.error_message = (
+                        f"Workflow exceeded its maximum execution time of {self.definition.max_execution_time}s"
+                    )
+                    logger.error(f"Execution {self.execution.id}: {self.execution.error_message}")
+                    return False
+
+                ready = []
+                for task in done:
+                    step_id = self.running.pop(task)
+                    if task.cancelled():
+                        return False
+
+                    error = task.exception()
+                    if error is not None:
+                        logger.error(f"Workflow execution {self.execution.id} failed at step {step_id}: {error}")
+                        self.execution.error_message = str(error)
+                        self.execution.step_results[step_id] = {
+                            'status': 'failed',
+                            'error': str(error),
+                            'timestamp': datetime.utcnow().isoformat(),
+                            'step_id': step_id
+                        }
+                        return False
+
+                    ready.extend(self._release(step_id))
+
+                await self._start_ready(ready)
+
+            unfinished = [step_id for step_id, count in self.remaining.items() if count > 0]
+            if unfinished:
+                logger.error(f"Workflow stuck with pending steps: {unfinished}")
+                return False
+            return True
+
+        finally:
+            await self.cancel()
+
+    async def cancel(self):
+        """Cancel every in-flight step and wait for them to unwind."""
+        tasks = list(self.running)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for task in tasks:
+            step_id = self.running.pop(task, None)
+            if step_id is not None and step_id not in self.execution.step_results:
+                self.execution.step_results[step_id] = {
+                    'status': 'cancelled',
+                    'timestamp': datetime.utcnow().isoformat(),
+                    'step_id': step_id
+                }
@@ -0,0 +1,354 @@
+"""
+Workflow progress channel between Celery workers and API WebSocket clients.
+
+Celery tasks cannot reach the API process's WebSocket connections, so
+progress travels through Redis instead:
+
+- Workers use ``workflow_progress_publisher`` (synchronous). Each update is
+  one pipelined Redis round trip: PUBLISH on the progress channel plus a
+  short-lived snapshot key for clients that subscribe late. Updates are
+  coalesced to at most ``workflow_progress_max_updates_per_second`` per
+  workflow; phase changes and final updates are always sent, and the newest
+  update held back by coalescing is sent when its window closes.
+- API workers run ``workflow_progress_relay``, which subscribes to the
+  channel and forwards each event to the sockets subscribed to that
+  workflow's owner and (optionally) that workflow id. Each socket keeps only
+  the latest pending event per workflow, so a slow client skips stale
+  progress instead of queueing it.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Set
+
+from app.config import settings
+from app.utils.logging import get_logger
+
+logger = get_logger("workflow_progress_service")
+
+SNAPSHOT_KEY_PREFIX = "workflow_progress:"
+
+# Statuses after which no more progress is expected for a workflow
+FINAL_STATUSES = frozenset({"completed", "failed", "cancelled", "error"})
+
+
+def _snapshot_key(workflow_id: str) -> str:
+    return f"{SNAPSHOT_KEY_PREFIX}{workflow_id}"
+
+
+class WorkflowProgressPublisher:
+    """Publishes workflow progress events from Celery workers."""
+
+    def __init__(self):
+        self.channel = getattr(settings, 'workflow_progress_channel', 'workflow_progress')
+        max_rate = getattr(settings, 'workflow_progress_max_updates_per_second', 4.0)
+        self.min_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.snapshot_ttl = getattr(settings, 'workflow_progress_snapshot_ttl_seconds', 3600)
+        self._redis = None
+        # workflow_id -> (last publish time, last phase)
+        self._last_sent: Dict[str, tuple] = {}
+        # workflow_id -> (newest coalesced message, its phase), sent by a timer
+        self._held: Dict[str, tuple] = {}
+        self._flush_timers: Dict[str, threading.Timer] = {}
+        # Publishing and the trailing-flush timers run on different threads
+        self._lock = threading.RLock()
+        self.published = 0
+        self.coalesced = 0
+
+    @property
+    def redis(self):
+        # Created lazily so forked Celery workers each get their own connection pool
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+        return self._redis
+
+    def publish(
+        self,
+        workflow_id: str,
+        user_id: Any,
+        event: Dict[str, Any],
+        force: bool = False
+    ) -> bool:
+        """
+        Publish a progress event for a workflow.
+
+        Args:
+            workflow_id: Workflow the event belongs to
+            user_id: Owner of the workflow, used to route the event
+            event: Event body; should include a "type" field
+            force: Send even if the workflow is over its update rate
+
+        Returns:
+            True if the event was sent now, False if it was held back by
+            coalescing (it goes out when the window closes, unless superseded)
+            or publishing failed
+        """
+        workflow_id = str(workflow_id)
+        now = time.monotonic()
+        # Enveloped events carry their fields under "data"
+        body = event["data"] if isinstance(event.get("data"), dict) else event
+        phase = body.get("current_phase")
+        status = body.get("status")
+        final = status in FINAL_STATUSES or (body.get("progress_percentage") or 0) >= 100
+
+        message = dict(event)
+        message["workflow_id"] = workflow_id
+        message["user_id"] = str(user_id)
+        message.setdefault("timestamp", time.time())
+
+        with self._lock:
+            last = self._last_sent.get(workflow_id)
+            if not force and not final and last is not None:
+                last_time, last_phase = last
+                if phase == last_phase and now - last_time < self.min_interval:
+                    self.coalesced += 1
+                    self._hold(workflow_id, message, phase, self.min_interval - (now - last_time))
+                    return False
+
+            return self._send(workflow_id, message, phase, status in FINAL_STATUSES)
+
+    def _hold(self, workflow_id: str, message: Dict[str, Any], phase: Any, delay: float):
+        """Keep the newest coalesced update and schedule it for when the window closes."""
+        self._held[workflow_id] = (message, phase)
+        if workflow_id not in self._flush_timers:
+            timer = threading.Timer(delay, self._flush_held, (workflow_id,))
+            timer.daemon = True
+            self._flush_timers[workflow_id] = timer
+            timer.start()
+
+    def _flush_held(self, workflow_id: str):
+        """Send the update held back for a workflow, unless a newer one went out first."""
+        with self._lock:
+            self._flush_timers.pop(workflow_id, None)
+            held = self._held.pop(workflow_id, None)
+            if held is not None:
+                message, phase = held
+                self._send(workflow_id, message, phase, False)
+
+    def _send(self, workflow_id: str, message: Dict[str, Any], phase: Any, final: bool) -> bool:
+        """Publish a message and its snapshot in one round trip. Caller holds ``_lock``."""
+        # Whatever was held back is older than this update
+        self._held.pop(workflow_id, None)
+        if final:
+            timer = self._flush_timers.pop(workflow_id, None)
+            if timer is not None:
+                timer.cancel()
+
+        payload = json.dumps(message, default=str)
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.publish(self.channel, payload)
+            pipe.set(_snapshot_key(workflow_id), payload, ex=self.snapshot_ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to publish progress for workflow {workflow_id}: {e}")
+            return False
+
+        now = time.monotonic()
+        if final:
+            self._last_sent.pop(workflow_id, None)
+        else:
+            self._last_sent[workflow_id] = (now, phase)
+            if len(self._last_sent) > 1000:
+                # Forget workflows that stopped without a final status; past the interval they can't coalesce anyway
+                self._last_sent = {
+                    key: value for key, value in self._last_sent.items()
+                    if now - value[0] < self.min_interval
+                }
+        self.published += 1
+        return True
+
+
+class ProgressSubscriber:
+    """A WebSocket subscribed to workflow progress for one user."""
+
+    def __init__(self, connection_id: str, websocket, user_keys: Iterable[str], workflow_ids: Iterable[str]):
+        self.connection_id = connection_id
+        self.websocket = websocket
+        self.user_keys = {str(key) for key in user_keys if key is not None}
+        # Empty means every workflow owned by the user
+        self.workflow_ids: Set[str] = {str(workflow_id) for workflow_id in workflow_ids if workflow_id}
+        # workflow_id -> latest unsent payload
+        self.pending: Dict[str, str] = {}
+        self.wakeup = asyncio.Event()
+        self.sender_task: Optional[asyncio.Task] = None
+
+    def wants(self, workflow_id: str) -> bool:
+        return not self.workflow_ids or workflow_id in self.workflow_ids
+
+    def offer(self, workflow_id: str, payload: str):
+        # Replacing an unsent event for the same workflow coalesces slow clients
+        self.pending[workflow_id] = payload
+        self.wakeup.set()
+
+
+class WorkflowProgressRelay:
+    """Relays workflow progress events from Redis to this API worker's WebSocket clients."""
+
+    def __init__(self):
+        self.channel = getattr(settings, 'workflow_progress_channel', 'workflow_progress')
+        self.send_timeout = getattr(settings, 'log_fanout_send_timeout_seconds', 5.0)
+        self.subscribers: Dict[str, ProgressSubscriber] = {}
+        self._by_user: Dict[str, Set[str]] = {}
+        self.redis = None
+        self._pubsub = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self.relayed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._listener_task is not None and not self._listener_task.done()
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def subscribe(self, connection_id: str, websocket, user, workflow_id: Optional[str] = None):
+        """
+        Subscribe a connection to progress for the user's workflows.
+
+        Without a workflow_id the connection receives every workflow owned by
+        the user; each call with a workflow_id narrows it to the given ids.
+        """
+        subscriber = self.subscribers.get(connection_id)
+        if subscriber is None:
+            # Workflows record their owner either by user id or by username
+            subscriber = ProgressSubscriber(connection_id, websocket, (user.id, user.username), ())
+            self.subscribers[connection_id] = subscriber
+            for key in subscriber.user_keys:
+                self._by_user.setdefault(key, set()).add(connection_id)
+            subscriber.sender_task = asyncio.create_task(self._sender(subscriber))
+
+        if workflow_id:
+            subscriber.workflow_ids.add(str(workflow_id))
+
+    def unsubscribe(self, connection_id: str):
+        """Remove a connection and stop its sender."""
+        subscriber = self.subscribers.pop(connection_id, None)
+        if subscriber is None:
+            return
+
+        for key in subscriber.user_keys:
+            connections = self._by_user.get(key)
+            if connections is not None:
+                connections.discard(connection_id)
+                if not connections:
+                    del self._by_user[key]
+
+        if subscriber.sender_task and subscriber.sender_task is not asyncio.current_task():
+            subscriber.sender_task.cancel()
+
+    async def get_snapshot(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Latest published progress event for a workflow, if still retained."""
+        if self.redis is None:
+            return None
+        try:
+            payload = await self.redis.get(_snapshot_key(str(workflow_id)))
+            return json.loads(payload) if payload else None
+        except Exception as e:
+            logger.debug(f"Failed to load progress snapshot for {workflow_id}: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # Relay
+    # ------------------------------------------------------------------
+
+    def dispatch(self, payload: str) -> int:
+        """Hand a published progress event to every matching local subscriber."""
+        event = json.loads(payload)
+        workflow_id = str(event.get("workflow_id"))
+        connection_ids = self._by_user.get(str(event.get("user_id")))
+        if not connection_ids:
+            return 0
+
+        delivered = 0
+        for connection_id in connection_ids:
+            subscriber = self.subscribers.get(connection_id)
+            if subscriber is not None and subscriber.wants(workflow_id):
+                subscriber.offer(workflow_id, payload)
+                delivered += 1
+        self.relayed += delivered
+        return delivered
+
+    async def _sender(self, subscriber: ProgressSubscriber):
+        """Drain one subscriber's pending events to its socket."""
+        try:
+            while True:
+                await subscriber.wakeup.wait()
+                subscriber.wakeup.clear()
+
+                while subscriber.pending:
+                    workflow_id = next(iter(subscriber.pending))
+                    payload = subscriber.pending.pop(workflow_id)
+                    await asyncio.wait_for(subscriber.websocket.send_text(payload), self.send_timeout)
+
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"Stopping progress delivery to {subscriber.connection_id}: {e}")
+            self.unsubscribe(subscriber.connection_id)
+
+    async def start(self, redis_client):
+        """Subscribe to the progress channel and start relaying."""
+        if self.running:
+            return
+
+        self.redis = redis_client
+        self._pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self.channel)
+        self._listener_task = asyncio.create_task(self._listen())
+        logger.info(f"Relaying workflow progress from channel {self.channel}")
+
+    async def stop(self):
+        """Stop relaying and release all subscribers."""
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(self.channel)
+                await self._pubsub.close()
+            except Exception as e:
+                logger.debug(f"Failed to close progress subscription: {e}")
+            self._pubsub = None
+
+        for connection_id in list(self.subscribers):
+            self.unsubscribe(connection_id)
+
+    async def _listen(self):
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+                if not message or message.get("type") != "message":
+                    continue
+                try:
+                    self.dispatch(message["data"])
+                except Exception as e:
+                    logger.error(f"Failed to relay workflow progress: {e}")
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error reading workflow progress channel: {e}")
+                await asyncio.sleep(1)  # Backoff on error
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Relay statistics."""
+        return {
+            "running": self.running,
+            "subscribers": len(self.subscribers),
+            "relayed": self.relayed
+        }
+
+
+# Global instances
+workflow_progress_publisher = WorkflowProgressPublisher()
+workflow_progress_relay = WorkflowProgressRelay()
@@ -450,6 +450,7 @@ def _process_email_workflow_sync(workflow_id: str, mailbox_config: Dict[str, Any
     from app.connectors.communication import SyncEmailConnector as EmailConnector
     from app.connectors.base import ConnectorConfig, ConnectorType
     from app.services.pubsub_service import pubsub_service
+    from app.services.workflow_progress_service import workflow_progress_publisher
     import json
     from datetime import datetime
 
@@ -459,6 +460,7 @@ def _process_email_workflow_sync(workflow_id: str, mailbox_config: Dict[str, Any
     # Initialize progress tracking
     phases = []
     current_phase = "initialization"
+    progress_user_id = None
 
     def update_progress(phase_name: str, progress_percentage: float = 0, items_processed: int = 0, total_items: int = 0, model_used: str = "n/a", tasks_created: int = 0):
         """Update workflow progress and send to frontend."""
@@ -502,41 +504,10 @@ def _process_email_workflow_sync(workflow_id: str, mailbox_config: Dict[str, Any
                 'model_used': model_used
             }
 
-            # Import WebSocket manager and send progress update
-            try:
-                from app.api.routes.websocket import manager
-                # Send to all connected clients (in production, filter by user)
-                # For now, broadcast to all email progress connections
-                import asyncio
-                
-                # Check if there's an event loop running
-                try:
-                    loop = asyncio.get_running_loop()
-                    # If we're in an event loop context, create task
-                    asyncio.create_task(manager.broadcast(progress_data, list(manager.active_connections.keys())))
-                except RuntimeError:
-                    # No event loop running, we're in Celery worker context
-                    # Create a new event loop just for this operation
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        # Filter connections to email progress connections only
-                        email_connections = [conn_id for conn_id in manager.active_connections.keys() 
-                                           if conn_id.startswith('email_progress_')]
-                        if email_connections:
-                            loop.run_until_complete(manager.broadcast(progress_data, email_connections))
-                        else:
-                            logger.debug("No email progress WebSocket connections to broadcast to")
-                    finally:
-                        loop.close()
-                        asyncio.set_event_loop(None)
-                        
-            except ImportError:
-                logger.warning("WebSocket manager not available for progress updates")
-            except Exception as ws_error:
-                logger.warning(f"Failed to send WebSocket progress update: {ws_error}")
+            # Relay to subscribed WebSocket clients through Redis (coalesced per workflow)
+            workflow_progress_publisher.publish(workflow_id, progress_user_id, progress_data)
 
-            logger.info(f"Workflow {workflow_id} progress: {phase_name} - {progress_percentage}% ({tasks_created} tasks)")
+            logger.debug(f"Workflow {workflow_id} progress: {phase_name} - {progress_percentage}% ({tasks_created} tasks)")
 
         except Exception as e:
             logger.warning(f"Failed to send progress update: {e}")
@@ -550,6 +521,7 @@ def _process_email_workflow_sync(workflow_id: str, mailbox_config: Dict[str, Any
 
         # Initialize sync services with user_id to load user-specific settings
         user_id = workflow.user_id
+        progress_user_id = user_id
         sync_email_analysis_service = SyncEmailAnalysisService(user_id=user_id)
         sync_email_task_converter = SyncEmailTaskConverter(user_id=user_id)
 
@@ -855,6 +827,15 @@ def _process_email_workflow_sync(workflow_id: str, mailbox_config: Dict[str, Any
         # except Exception as e:
         #     logger.warning(f"Failed to publish notification: {e}")
 
+        workflow_progress_publisher.publish(workflow_id, progress_user_id, {
+            'type': 'workflow_progress',
+            'status': 'completed',
+            'current_phase': 'completion',
+            'progress_percentage': 100,
+            'emails_processed': emails_processed,
+            'tasks_created': tasks_created
+        }, force=True)
+
         logger.info(f"Completed email workflow {workflow_id}: {emails_processed} emails, {tasks_created} tasks, {emails_skipped_duplicate} duplicates skipped")
 
         return {
@@ -893,6 +874,14 @@ def _process_email_workflow_sync(workflow_id: str, mailbox_config: Dict[str, Any
         except Exception as log_error:
             logger.error(f"Failed to log workflow error: {log_error}")
 
+        if progress_user_id is not None:
+            workflow_progress_publisher.publish(workflow_id, progress_user_id, {
+                'type': 'workflow_progress',
+                'status': 'failed',
+                'current_phase': current_phase,
+                'error': str(e)
+            }, force=True)
+
         raise e
 
     finally:
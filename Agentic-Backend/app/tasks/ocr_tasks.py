@@ -10,16 +10,15 @@ from datetime import datetime
 from sqlalchemy import select, update
 from app.celery_app import celery_app
 from app.db.database import get_celery_db_session
-from app.services.ollama_client import sync_ollama_client
+from app.services.ocr_batch_engine import OCRBatchEngine, OCRPage
 from app.db.models.ocr_workflow import OCRWorkflow, OCRBatch, OCRImage, OCRWorkflowLog
 from app.utils.logging import get_logger
 from app.services.pubsub_service import pubsub_service
 from app.db.models.notification import Notification
-import base64
+from app.config import settings
 import os
+import time
 from pathlib import Path
-import io
-from PIL import Image
 import markdown2
 
 logger = get_logger("ocr_tasks")
@@ -124,6 +123,27 @@ def process_ocr_workflow_task(self, workflow_id: str, ocr_model: str, image_path
         return _process_ocr_workflow_sync(self, db, workflow_id, ocr_model, image_paths, batch_name, user_id)
 
 
+def _extract_ocr_text(response: Dict[str, Any], model: str, image_name: str) -> str:
+    """Extract the OCR text from a generate or chat API response."""
+    if not response:
+        logger.error("Empty response received from Ollama API")
+        return "[Empty response received from Ollama API]"
+
+    if 'response' in response:
+        return response['response'].strip()
+
+    if 'message' in response and 'content' in response['message']:
+        # Handle chat API response format
+        response_content = response['message']['content']
+        # Post-process deepseek-ocr raw output to clean markdown
+        if 'deepseek-ocr' in model.lower():
+            return _post_process_deepseek_ocr_output(response_content)
+        return response_content.strip()
+
+    logger.warning(f"Unexpected response format for {image_name}: {list(response.keys())}")
+    return f"[Unexpected response format: {list(response.keys())}]"
+
+
 def _process_ocr_workflow_sync(
     task: OCRTask,
     db,
@@ -133,9 +153,17 @@ def _process_ocr_workflow_sync(
     batch_name: str,
     user_id: str
 ) -> Dict[str, Any]:
-    """Synchronous implementation of OCR workflow processing."""
+    """
+    Synchronous implementation of OCR workflow processing.
+
+    Pages are dispatched to the OCR model in parallel by OCRBatchEngine and
+    their results are checkpointed as OCRImage rows in periodic batched
+    commits. If the task is retried, pages already completed in the
+    unfinished batch are skipped.
+    """
     logger.info(f"Starting OCR workflow processing for workflow {workflow_id}, user {user_id}, model {ocr_model}, {len(image_paths)} images")
     workflow_uuid = UUID(workflow_id)
+    total_images = len(image_paths)
 
     # Get or create workflow
     workflow = db.query(OCRWorkflow).filter(OCRWorkflow.id == workflow_uuid).first()
@@ -155,227 +183,148 @@ def _process_ocr_workflow_sync(
         logger.info(f"Found existing workflow {workflow_id}")
 
     workflow.status = "running"
-    workflow.started_at = datetime.utcnow()
-    workflow.total_images = len(image_paths)  # Set total images for progress tracking
+    workflow.started_at = workflow.started_at or datetime.utcnow()
+    workflow.total_images = total_images  # Set total images for progress tracking
     db.commit()
 
-    # Create initial log
-    _log_workflow_progress_sync(db, workflow_uuid, None, None,
-                               f"Started OCR processing for {len(image_paths)} images", "info", user_id)
+    # Resume an unfinished batch from a previous attempt of this task
+    batch = db.query(OCRBatch).filter(
+        OCRBatch.workflow_id == workflow_uuid,
+        OCRBatch.batch_name == batch_name,
+        OCRBatch.status == "processing"
+    ).first()
+
+    if batch:
+        image_records = {
+            image.processing_order: image
+            for image in db.query(OCRImage).filter(OCRImage.batch_id == batch.id).all()
+        }
+    else:
+        batch = OCRBatch(
+            workflow_id=workflow_uuid,
+            batch_name=batch_name,
+            total_images=total_images,
+            status="processing",
+            started_at=datetime.utcnow()
+        )
+        db.add(batch)
+        db.commit()
+        db.refresh(batch)
+        image_records = {}
 
-    # Create batch
-    batch = OCRBatch(
-        workflow_id=workflow_uuid,
-        batch_name=batch_name,
-        total_images=len(image_paths),
-        status="processing"
-    )
-    db.add(batch)
-    db.commit()
-    db.refresh(batch)
-
-    # Process images
-    combined_markdown = ""
-    processed_count = 0
-
-    for i, image_path in enumerate(image_paths):
-        try:
-            # Update progress
-            task.update_state(
-                state='PROGRESS',
-                meta={
-                    'current': i,
-                    'total': len(image_paths),
-                    'message': f'Processing image {i+1}/{len(image_paths)}'
-                }
-            )
+    completed_orders = {
+        order for order, image in image_records.items() if image.status == "completed"
+    }
+    processed_count = len(completed_orders)
+    pages = [
+        OCRPage(index=i, image_path=path)
+        for i, path in enumerate(image_paths)
+        if i not in completed_orders
+    ]
+
+    if completed_orders:
+        _log_workflow_progress_sync(db, workflow_uuid, batch.id, None,
+                                   f"Resuming OCR processing: {processed_count}/{total_images} images already done, "
+                                   f"{len(pages)} to process", "info", user_id)
+    else:
+        _log_workflow_progress_sync(db, workflow_uuid, batch.id, None,
+                                   f"Started OCR processing for {total_images} images", "info", user_id)
 
-            # Load image
-            with open(image_path, 'rb') as f:
-                image_data = base64.b64encode(f.read()).decode('utf-8')
-
-            # OCR with Ollama - use the selected model directly
-            # The intelligent model selection system handles availability
-            selected_model = ocr_model
-
-            # Use appropriate prompt based on model type
-            if 'llama3.2-vision' in selected_model.lower():
-                prompt = """
-                Analyze this image and extract all visible text. Convert the text to clean, well-formatted Markdown.
-
-                Instructions:
-                - Extract ALL text from the image exactly as it appears
-                - Use proper Markdown formatting for headers, lists, tables, etc.
-                - For tables, use Markdown table syntax
-                - Preserve the original structure and formatting as much as possible
-                - Do not add any introductory text or explanations
-                - Return only the extracted text in Markdown format
-                """
-            else:  # deepseek-ocr and other models
-                prompt = """
-                Perform high-quality OCR on this image.
-                1. Extract ALL text exactly as it appears.
-                2. Preserve formatting (headers, lists, tables) using Markdown.
-                3. If there are tables, format them as Markdown tables.
-                4. Do not add conversational filler (like "Here is the text"). Just provide the Markdown content.
-                """
-
-            logger.info(f"Sending OCR request to Ollama model {ocr_model} for image {os.path.basename(image_path)}")
-            logger.info(f"Image size: {len(image_data)} bytes, base64 encoded length: {len(image_data)}")
-            _log_workflow_progress_sync(db, workflow_uuid, batch.id, None,
-                                       f"Sending image {i+1} to {ocr_model}...", "info", user_id)
-
-            # Add detailed logging for timeout configuration
-            logger.info(f"Current Celery task time limits - hard: {task.request.time_limit if hasattr(task.request, 'time_limit') else 'N/A'}, soft: {task.request.soft_time_limit if hasattr(task.request, 'soft_time_limit') else 'N/A'}")
-
-            try:
-                # Use shorter timeout for OCR operations (2 minutes total, 90 seconds read)
-                logger.info(f"Making Ollama API call to {selected_model} with image size: {len(image_data)} chars")
-                logger.info(f"Starting OCR processing at: {datetime.utcnow().isoformat()}")
-                start_time = datetime.utcnow()
-
-                # Add explicit timeout handling for Ollama client
-                from app.services.ollama_client import ollama_client
-                import asyncio
-
-                # Set a generous timeout for OCR operations (30 minutes)
-                try:
-                    # Use the chat API endpoint for deepseek-ocr model as recommended
-                    if 'deepseek-ocr' in selected_model.lower():
-                        # Use chat API with proper prompt format for deepseek-ocr
-                        logger.info(f"Using chat API endpoint for deepseek-ocr model")
-                        response = sync_ollama_client.chat(
-                            model=selected_model,
-                            messages=[
-                                {
-                                    "role": "user",
-                                    "content": "# document: <image>\n<|grounding|>Convert the document to markdown.",
-                                    "images": [image_data]
-                                }
-                            ],
-                            options={
-                                "temperature": 0.1,
-                                "top_p": 0.9,
-                                "num_ctx": 4096  # Ensure enough context for full page
-                            },
-                            timeout=1800  # 30 minutes timeout for OCR
-                        )
-                    else:
-                        # Use generate API for other models
-                        logger.info(f"Using generate API endpoint for {selected_model} model")
-                        response = sync_ollama_client.generate(
-                            prompt=prompt,
-                            model=selected_model,
-                            options={
-                                "images": [image_data],
-                                "temperature": 0.1,
-                                "top_p": 0.9,
-                                "num_ctx": 4096  # Ensure enough context for full page
-                            },
-                            timeout=1800  # 30 minutes timeout for OCR
-                        )
-                except Exception as e:
-                    logger.error(f"Ollama client error with extended timeout: {str(e)}")
-                    raise
-
-                end_time = datetime.utcnow()
-                duration = (end_time - start_time).total_seconds()
-                logger.info(f"Received OCR response from Ollama in {duration:.2f} seconds")
-                logger.info(f"Response keys: {list(response.keys()) if response else 'None'}")
-                logger.info(f"Response has 'response' key: {'response' in response if response else False}")
-
-                # Log the actual response content for debugging
-                if response:
-                    if 'response' in response:
-                        response_content = response['response']
-                        logger.info(f"OCR response length: {len(response_content)} characters")
-                        logger.info(f"OCR response preview: {response_content[:200] if len(response_content) > 200 else response_content}")
-                        ocr_text = response_content.strip()
-                    elif 'message' in response and 'content' in response['message']:
-                        # Handle chat API response format
-                        response_content = response['message']['content']
-                        logger.info(f"OCR response length: {len(response_content)} characters")
-                        logger.info(f"OCR response preview: {response_content[:200] if len(response_content) > 200 else response_content}")
-
-                        # Post-process deepseek-ocr raw output to clean markdown
-                        if 'deepseek-ocr' in selected_model.lower():
-                            ocr_text = _post_process_deepseek_ocr_output(response_content)
-                        else:
-                            ocr_text = response_content.strip()
-                    else:
-                        logger.warning(f"Unexpected response format: {list(response.keys())}")
-                        ocr_text = f"[Unexpected response format: {list(response.keys())}]"
-                else:
-                    logger.error("Empty response received from Ollama API")
-                    ocr_text = "[Empty response received from Ollama API]"
-
-                if not ocr_text:
-                    logger.warning(f"Empty OCR response for image {os.path.basename(image_path)}")
-                    ocr_text = f"[No text extracted from {os.path.basename(image_path)}]"
-                    _log_workflow_progress_sync(db, workflow_uuid, batch.id, None,
-                                               f"Warning: No text extracted from image {i+1}", "warning", user_id)
-
-            except Exception as ocr_error:
-                error_msg = str(ocr_error)
-                logger.error(f"OCR API call failed for image {os.path.basename(image_path)}: {error_msg}")
-
-                # Check if it's a timeout-related error
-                if "timeout" in error_msg.lower() or "time" in error_msg.lower():
-                    ocr_text = f"[OCR timed out for {os.path.basename(image_path)}: {error_msg}]"
-                    _log_workflow_progress_sync(db, workflow_uuid, batch.id, None,
-                                               f"OCR API timed out for image {i+1}: {error_msg}", "error", user_id)
-                else:
-                    ocr_text = f"[OCR failed for {os.path.basename(image_path)}: {error_msg}]"
-                    _log_workflow_progress_sync(db, workflow_uuid, batch.id, None,
-                                               f"OCR API failed for image {i+1}: {error_msg}", "error", user_id)
-
-            # Create image record
+    engine = OCRBatchEngine(ocr_model)
+    logger.info(f"Dispatching {len(pages)} pages to {ocr_model} with concurrency {engine.max_concurrency}")
+
+    unflushed = 0
+    last_flush = time.monotonic()
+
+    def flush_progress():
+        nonlocal unflushed, last_flush
+        batch.processed_images = processed_count
+        workflow.processed_images = processed_count
+        db.commit()
+        task.update_state(
+            state='PROGRESS',
+            meta={
+                'current': processed_count,
+                'total': total_images,
+                'message': f'Processed {processed_count}/{total_images} images'
+            }
+        )
+        unflushed = 0
+        last_flush = time.monotonic()
+
+    for result in engine.run(pages):
+        i = result.page.index
+        image_path = result.page.image_path
+        image_name = os.path.basename(image_path)
+        image_record = image_records.get(i)
+        if image_record is None:
             image_record = OCRImage(
                 batch_id=batch.id,
                 workflow_id=workflow_uuid,
-                original_filename=os.path.basename(image_path),
+                original_filename=image_name,
                 file_path=image_path,
-                status="completed",
-                processing_order=i,
-                ocr_model_used=selected_model,
-                raw_markdown=ocr_text,
-                processed_markdown=ocr_text,  # For now, same as raw
-                confidence_score=0.8,  # TODO: Extract from Ollama response if available
-                processed_at=datetime.utcnow()
+                processing_order=i
             )
-
             db.add(image_record)
-            combined_markdown += f"\n\n--- Page {i+1} ---\n\n"
-            combined_markdown += ocr_text
+            image_records[i] = image_record
+
+        image_record.ocr_model_used = ocr_model
+        image_record.file_size = result.image_info.get("original_bytes")
+        image_record.image_width = result.image_info.get("width")
+        image_record.image_height = result.image_info.get("height")
+        image_record.image_metadata = result.image_info or None
+
+        if result.read_failed:
+            logger.error(f"Failed to process image {image_path}: {result.error}")
+            image_record.status = "failed"
+            image_record.error_message = result.error
+            image_record.retry_count = (image_record.retry_count or 0) + 1
+            _log_workflow_progress_sync(db, workflow_uuid, batch.id, None,
+                                       f"Failed to process image {image_name}: {result.error}", "error", user_id, commit=False)
+        elif result.error:
+            # Leave the page failed so a resumed attempt sends it to the model again
+            error_msg = result.error
+            logger.error(f"OCR API call failed for image {image_name}: {error_msg}")
+            timed_out = "timeout" in error_msg.lower() or "time" in error_msg.lower()
+            image_record.status = "failed"
+            image_record.error_message = f"OCR timed out: {error_msg}" if timed_out else f"OCR failed: {error_msg}"
+            image_record.retry_count = (image_record.retry_count or 0) + 1
+            _log_workflow_progress_sync(db, workflow_uuid, batch.id, None,
+                                       f"OCR API {'timed out' if timed_out else 'failed'} for image {i+1}: {error_msg}", "error", user_id, commit=False)
+        else:
+            logger.info(f"Received OCR response for {image_name} in {result.duration_seconds:.2f} seconds")
+            ocr_text = _extract_ocr_text(result.response, ocr_model, image_name)
+            if not ocr_text:
+                logger.warning(f"Empty OCR response for image {image_name}")
+                ocr_text = f"[No text extracted from {image_name}]"
+                _log_workflow_progress_sync(db, workflow_uuid, batch.id, None,
+                                           f"Warning: No text extracted from image {i+1}", "warning", user_id, commit=False)
+
+            image_record.status = "completed"
+            image_record.error_message = None
+            image_record.raw_markdown = ocr_text
+            image_record.processed_markdown = ocr_text  # For now, same as raw
+            image_record.confidence_score = 0.8  # TODO: Extract from Ollama response if available
+            image_record.processed_at = datetime.utcnow()
             processed_count += 1
 
-            # Update batch and workflow progress
-            batch.processed_images = processed_count
-            workflow.processed_images = processed_count
-            db.commit()
-
-            # Log progress
             _log_workflow_progress_sync(db, workflow_uuid, batch.id, None,
-                                       f"Successfully processed image {i+1}/{len(image_paths)}", "success", user_id)
+                                       f"Successfully processed image {i+1}/{total_images}", "success", user_id, commit=False)
 
-        except Exception as e:
-            logger.error(f"Failed to process image {image_path}: {e}")
+        # Checkpoint in batches rather than committing per image
+        unflushed += 1
+        if (unflushed >= settings.ocr_progress_flush_pages
+                or time.monotonic() - last_flush >= settings.ocr_progress_flush_seconds):
+            flush_progress()
 
-            # Create failed image record
-            image_record = OCRImage(
-                batch_id=batch.id,
-                workflow_id=workflow_uuid,
-                original_filename=os.path.basename(image_path),
-                file_path=image_path,
-                status="failed",
-                processing_order=i,
-                error_message=str(e)
-            )
-            db.add(image_record)
-            db.commit()  # Commit failure record
+    flush_progress()
 
-            _log_workflow_progress_sync(db, workflow_uuid, batch.id, None,
-                                       f"Failed to process image {os.path.basename(image_path)}: {e}", "error", user_id)
+    # Assemble the document in page order, including pages from earlier attempts
+    combined_markdown = "".join(
+        f"\n\n--- Page {order+1} ---\n\n{image_records[order].raw_markdown}"
+        for order in sorted(image_records)
+        if image_records[order].status == "completed"
+    )
 
     # Update batch completion
     batch.status = "completed"
@@ -391,12 +340,12 @@ def _process_ocr_workflow_sync(
         workflow.error_message = "No images were successfully processed"
         _log_workflow_progress_sync(db, workflow_uuid, batch.id, None,
                                    "OCR workflow failed: No images were successfully processed", "error", user_id)
-    elif processed_count < len(image_paths):
+    elif processed_count < total_images:
         # Some images failed but some succeeded
         workflow.status = "completed"
-        workflow.error_message = f"Partial success: {processed_count}/{len(image_paths)} images processed"
+        workflow.error_message = f"Partial success: {processed_count}/{total_images} images processed"
         _log_workflow_progress_sync(db, workflow_uuid, batch.id, None,
-                                   f"OCR workflow completed with partial success: {processed_count}/{len(image_paths)} images processed", "warning", user_id)
+                                   f"OCR workflow completed with partial success: {processed_count}/{total_images} images processed", "warning", user_id)
     else:
         # All images processed successfully
         workflow.status = "completed"
@@ -404,15 +353,14 @@ def _process_ocr_workflow_sync(
                                    f"OCR workflow completed successfully: {processed_count} images processed", "success", user_id)
 
     # Update workflow completion stats
-    workflow.total_images = len(image_paths)
+    workflow.total_images = total_images
     workflow.processed_images = processed_count
     workflow.total_pages = processed_count
     workflow.completed_at = datetime.utcnow()
 
     # Log final completion details
-    logger.info(f"OCR workflow completed - Total images: {len(image_paths)}, Processed: {processed_count}")
+    logger.info(f"OCR workflow completed - Total images: {total_images}, Processed: {processed_count}")
     logger.info(f"Final combined markdown length: {len(combined_markdown)} characters")
-    logger.info(f"Final markdown preview: {combined_markdown[:500] if len(combined_markdown) > 500 else combined_markdown}")
 
     db.commit()
 
@@ -427,9 +375,12 @@ def _process_ocr_workflow_sync(
     _send_completion_notification_sync(db, workflow.user_id, workflow_uuid, batch.id, processed_count)
 
     # Clean up uploaded images after processing to prevent storage accumulation
-    # Note: Only the processed results (markdown) are stored in the database
+    # Note: Only the processed results (markdown) are stored in the database.
+    # Images of failed pages are kept so a later run can retry them.
     try:
-        for image_path in image_paths:
+        for i, image_path in enumerate(image_paths):
+            if i not in image_records or image_records[i].status != "completed":
+                continue
             if os.path.exists(image_path):
                 os.remove(image_path)
                 logger.info(f"Cleaned up temporary image file: {image_path}")
@@ -441,7 +392,7 @@ def _process_ocr_workflow_sync(
         "batch_id": str(batch.id),
         "status": "completed",
         "processed_images": processed_count,
-        "total_images": len(image_paths),
+        "total_images": total_images,
         "combined_markdown": combined_markdown.strip()
     }
 
@@ -453,9 +404,14 @@ def _log_workflow_progress_sync(
     image_id = None,
     message: str = "",
     level: str = "info",
-    user_id: str = "system"
+    user_id: str = "system",
+    commit: bool = True
 ):
-    """Log workflow progress synchronously."""
+    """
+    Log workflow progress synchronously.
+
+    Pass ``commit=False`` to stage the entry for the caller's next commit.
+    """
     from datetime import datetime
 
     # Use UTC timezone for all backend timestamps (best practice)
@@ -472,7 +428,8 @@ def _log_workflow_progress_sync(
         timestamp=current_time_utc  # Use UTC timezone timestamp (backend standard)
     )
     db.add(log_entry)
-    db.commit()
+    if commit:
+        db.commit()
 
 
 def _broadcast_workflow_update_sync(
@@ -481,9 +438,9 @@ def _broadcast_workflow_update_sync(
     status: str,
     user_id: str
 ) -> None:
-    """Broadcast OCR workflow status update via WebSocket synchronously."""
+    """Publish OCR workflow status to WebSocket subscribers through the Redis progress channel."""
     try:
-        from app.api.routes.websocket import manager
+        from app.services.workflow_progress_service import workflow_progress_publisher
         from app.db.models.ocr_workflow import OCRBatch
 
         # Get updated workflow data
@@ -496,7 +453,6 @@ def _broadcast_workflow_update_sync(
 
         # Broadcast to WebSocket connections
         message = {
-            "type": "ocr_workflow_status",
             "workflow_id": str(workflow_id),
             "status": status,
             "progress": {
@@ -519,10 +475,12 @@ def _broadcast_workflow_update_sync(
             "completed_at": workflow.completed_at.isoformat() if workflow.completed_at else None
         }
 
-        # Broadcast to all connections subscribed to this workflow
-        # Fix async await issue
-        import asyncio
-        asyncio.run(manager.broadcast_workflow_update(message, user_id, str(workflow_id)))
+        # Status changes are always sent, bypassing progress coalescing
+        workflow_progress_publisher.publish(str(workflow_id), user_id, {
+            "type": "ocr_workflow_status",
+            "data": message,
+            "timestamp": datetime.utcnow().isoformat()
+        }, force=True)
 
     except Exception as e:
         logger.error(f"Failed to broadcast OCR workflow update: {e}")
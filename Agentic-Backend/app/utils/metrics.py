@@ -1,5 +1,5 @@
-from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry
-from typing import Dict, Any
+from prometheus_client import Counter, Histogram, Gauge, Summary, CollectorRegistry
+from typing import Dict, Any, List, Optional, Tuple
 import time
 
 # Create a custom registry for better control
@@ -27,6 +27,8 @@ active_tasks = Gauge(
     registry=registry
 )
 
+# Request metrics are labelled by matched route template (e.g. /api/v1/emails/{email_id}),
+# never the raw path, so series count is bounded by the number of routes
 api_requests = Counter(
     'api_requests_total',
     'Total API requests',
@@ -34,6 +36,40 @@ api_requests = Counter(
     registry=registry
 )
 
+api_request_duration = Histogram(
+    'api_request_duration_seconds',
+    'API request latency by route template',
+    ['method', 'route', 'status_class'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+    registry=registry
+)
+
+api_requests_in_progress = Gauge(
+    'api_requests_in_progress',
+    'API requests currently being processed',
+    ['method'],
+    registry=registry
+)
+
+api_request_size = Summary(
+    'api_request_size_bytes',
+    'API request body size (from Content-Length)',
+    ['method', 'route'],
+    registry=registry
+)
+
+api_response_size = Summary(
+    'api_response_size_bytes',
+    'API response body size (from Content-Length)',
+    ['method', 'route'],
+    registry=registry
+)
+
+KNOWN_HTTP_METHODS = frozenset({'GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS'})
+
+# Resolved label children per (method, route, status_code); bounded by routes x methods x statuses
+_api_request_children: Dict[Tuple[str, str, int], Tuple[Any, Any, Any, Any]] = {}
+
 websocket_connections = Gauge(
     'websocket_connections_active',
     'Number of active WebSocket connections',
@@ -41,6 +77,12 @@ websocket_connections = Gauge(
     registry=registry
 )
 
+websocket_log_dropped = Counter(
+    'websocket_log_messages_dropped_total',
+    'Log messages dropped from full per-connection WebSocket send queues',
+    registry=registry
+)
+
 log_messages = Counter(
     'log_messages_total',
     'Total log messages by level',
@@ -55,6 +97,79 @@ redis_operations = Counter(
     registry=registry
 )
 
+system_cpu_usage = Gauge(
+    'system_cpu_usage_percent',
+    'Host CPU utilization',
+    registry=registry
+)
+
+system_memory_usage = Gauge(
+    'system_memory_usage_percent',
+    'Host memory utilization',
+    registry=registry
+)
+
+system_swap_usage = Gauge(
+    'system_swap_usage_percent',
+    'Host swap utilization',
+    registry=registry
+)
+
+system_disk_usage = Gauge(
+    'system_disk_usage_percent',
+    'Root filesystem utilization',
+    registry=registry
+)
+
+system_disk_io = Gauge(
+    'system_disk_io_bytes_per_second',
+    'Host disk throughput',
+    ['direction'],
+    registry=registry
+)
+
+system_network_io = Gauge(
+    'system_network_io_bytes_per_second',
+    'Host network throughput',
+    ['direction'],
+    registry=registry
+)
+
+system_load_average = Gauge(
+    'system_load_average',
+    'Host load average',
+    ['period'],
+    registry=registry
+)
+
+system_gpu_utilization = Gauge(
+    'system_gpu_utilization_percent',
+    'GPU utilization',
+    ['gpu'],
+    registry=registry
+)
+
+system_gpu_memory_used = Gauge(
+    'system_gpu_memory_used_bytes',
+    'GPU memory in use',
+    ['gpu'],
+    registry=registry
+)
+
+system_gpu_temperature = Gauge(
+    'system_gpu_temperature_fahrenheit',
+    'GPU temperature',
+    ['gpu'],
+    registry=registry
+)
+
+system_gpu_power = Gauge(
+    'system_gpu_power_watts',
+    'GPU power draw',
+    ['gpu'],
+    registry=registry
+)
+
 
 class MetricsCollector:
     """Helper class for collecting application metrics."""
@@ -79,11 +194,52 @@ class MetricsCollector:
         """Increment API request counter."""
         api_requests.labels(method=method, endpoint=endpoint, status_code=status_code).inc()
     
+    @staticmethod
+    def track_api_request_in_progress(method: str, delta: int = 1):
+        """Increment/decrement the in-flight API request gauge."""
+        method = method if method in KNOWN_HTTP_METHODS else 'OTHER'
+        api_requests_in_progress.labels(method=method).inc(delta)
+
+    @staticmethod
+    def record_api_request(
+        method: str,
+        route: str,
+        status_code: int,
+        duration: float,
+        request_size: Optional[int] = None,
+        response_size: Optional[int] = None
+    ):
+        """Record a completed API request against its route template."""
+        method = method if method in KNOWN_HTTP_METHODS else 'OTHER'
+        key = (method, route, status_code)
+        children = _api_request_children.get(key)
+        if children is None:
+            children = (
+                api_requests.labels(method=method, endpoint=route, status_code=status_code),
+                api_request_duration.labels(method=method, route=route, status_class=f"{status_code // 100}xx"),
+                api_request_size.labels(method=method, route=route),
+                api_response_size.labels(method=method, route=route)
+            )
+            _api_request_children[key] = children
+
+        counter, histogram, request_summary, response_summary = children
+        counter.inc()
+        histogram.observe(duration)
+        if request_size is not None:
+            request_summary.observe(request_size)
+        if response_size is not None:
+            response_summary.observe(response_size)
+
     @staticmethod
     def increment_websocket_connections(endpoint: str, delta: int = 1):
         """Increment/decrement WebSocket connections."""
         websocket_connections.labels(endpoint=endpoint).inc(delta)
     
+    @staticmethod
+    def increment_websocket_log_dropped():
+        """Increment dropped WebSocket log message counter."""
+        websocket_log_dropped.inc()
+
     @staticmethod
     def increment_log_messages(level: str, source: str = "app"):
         """Increment log message counter."""
@@ -94,6 +250,35 @@ class MetricsCollector:
         """Increment Redis operation counter."""
         redis_operations.labels(operation=operation, status=status).inc()
 
+    @staticmethod
+    def record_system_metrics(values: Dict[str, float], gpus: List[Dict[str, Any]]):
+        """Set host gauges from a system metrics sample (NaN values are skipped)."""
+        def _set(gauge, value):
+            if value == value:  # NaN check
+                gauge.set(value)
+
+        _set(system_cpu_usage, values.get('cpu_percent', float('nan')))
+        _set(system_memory_usage, values.get('memory_percent', float('nan')))
+        _set(system_swap_usage, values.get('swap_percent', float('nan')))
+        _set(system_disk_usage, values.get('disk_percent', float('nan')))
+        _set(system_disk_io.labels(direction='read'), values.get('disk_read_bytes_per_sec', float('nan')))
+        _set(system_disk_io.labels(direction='write'), values.get('disk_write_bytes_per_sec', float('nan')))
+        _set(system_network_io.labels(direction='sent'), values.get('net_sent_bytes_per_sec', float('nan')))
+        _set(system_network_io.labels(direction='recv'), values.get('net_recv_bytes_per_sec', float('nan')))
+        for period in ('1m', '5m', '15m'):
+            _set(system_load_average.labels(period=period), values.get(f'load_{period}', float('nan')))
+
+        for gpu in gpus:
+            if 'error' in gpu:
+                continue
+            label = str(gpu['index'])
+            system_gpu_utilization.labels(gpu=label).set(gpu['utilization']['gpu_percent'])
+            system_gpu_memory_used.labels(gpu=label).set(gpu['memory']['used_mb'] * 1024 * 1024)
+            if gpu.get('temperature_fahrenheit') is not None:
+                system_gpu_temperature.labels(gpu=label).set(gpu['temperature_fahrenheit'])
+            if gpu['power'].get('usage_watts') is not None:
+                system_gpu_power.labels(gpu=label).set(gpu['power']['usage_watts'])
+
 
 class Timer:
     """Context manager for timing operations."""
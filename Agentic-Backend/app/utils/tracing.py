@@ -0,0 +1,636 @@
+"""
+Lightweight request/workflow tracing.
+
+Spans share the 32-hex trace_id used by UnifiedLogService's LogContext, so
+workflow logs and timing spans correlate. Instrumentation covers:
+- HTTP requests (LoggingMiddleware opens the server span)
+- SQLAlchemy statements (instrument_sqlalchemy)
+- Redis commands and pipelines (instrument_redis)
+- Celery tasks, with W3C traceparent propagation through message headers
+  (instrument_celery)
+- Ollama calls and any other function via the @traced decorator
+
+Sampling is decided once at the root span. Unsampled traces still carry a
+trace_id for propagation, but their child spans are never allocated, and DB,
+Redis and Ollama spans are only created inside a sampled trace. Finished
+spans are batched by a background thread and exported either as OTLP/HTTP
+JSON to a local collector or as JSON lines to the application log.
+"""
+
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import random
+import threading
+import time
+import urllib.request
+from collections import deque
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.logging import get_logger
+
+logger = get_logger("tracing")
+
+
+class SpanKind(IntEnum):
+    """OTLP span kinds."""
+    INTERNAL = 1
+    SERVER = 2
+    CLIENT = 3
+    PRODUCER = 4
+    CONSUMER = 5
+
+
+class StatusCode(IntEnum):
+    """OTLP status codes."""
+    UNSET = 0
+    OK = 1
+    ERROR = 2
+
+
+def _new_trace_id() -> str:
+    return f"{random.getrandbits(128):032x}"
+
+
+def _new_span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_span_id", "name", "kind", "sampled",
+        "start_time_ns", "end_time_ns", "attributes", "status_code", "status_message"
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str] = None,
+        kind: SpanKind = SpanKind.INTERNAL,
+        sampled: bool = True,
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_span_id()
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.sampled = sampled
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = attributes if attributes is not None and sampled else {}
+        self.status_code = StatusCode.UNSET
+        self.status_message: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        if self.sampled and value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        if self.sampled:
+            for key, value in attributes.items():
+                if value is not None:
+                    self.attributes[key] = value
+
+    def set_error(self, message: Optional[str] = None):
+        self.status_code = StatusCode.ERROR
+        self.status_message = message
+
+    def record_exception(self, exc: BaseException):
+        self.set_error(str(exc)[:500])
+        self.set_attribute("exception.type", type(exc).__name__)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_time_ns is None:
+            return None
+        return (self.end_time_ns - self.start_time_ns) / 1e6
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header value for propagating this span as parent."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind.name.lower(),
+            "start_time_ns": self.start_time_ns,
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            "status": self.status_code.name.lower(),
+            "status_message": self.status_message,
+            "attributes": self.attributes
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": int(self.kind),
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns or self.start_time_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": int(self.status_code)}
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """Parse a W3C traceparent header into (trace_id, parent_span_id, sampled)."""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16)
+        int(parts[2], 16)
+        flags = int(parts[3][:2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 0x01)
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """The active span in this context, if any."""
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    """trace_id of the active span, if any."""
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+def set_span_attributes(**attributes: Any):
+    """Set attributes on the active span if it is being recorded."""
+    span = _current_span.get()
+    if span is not None and span.sampled:
+        span.set_attributes(attributes)
+
+
+# Returned when tracing is disabled or a child span is skipped; never exported
+_NOOP_SPAN = Span("noop", "0" * 32, sampled=False)
+
+
+class _SpanScope:
+    """Context manager (sync and async) that activates a span and finishes it on exit."""
+
+    __slots__ = ("_tracer", "span", "_activate", "_token")
+
+    def __init__(self, tracer: Optional["Tracer"], span: Span, activate: bool = True):
+        self._tracer = tracer
+        self.span = span
+        self._activate = activate
+        self._token = None
+
+    def __enter__(self) -> Span:
+        if self._activate:
+            self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+        if self._tracer is not None:
+            if exc is not None and self.span.status_code != StatusCode.ERROR:
+                self.span.record_exception(exc)
+            self._tracer._finish(self.span)
+        return False
+
+    async def __aenter__(self) -> Span:
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+# ----------------------------------------------------------------------
+# Exporters
+# ----------------------------------------------------------------------
+
+class LogSpanExporter:
+    """Writes finished spans as JSON lines to the application log."""
+
+    def export(self, spans: List[Span]):
+        for span in spans:
+            logger.info("trace_span " + json.dumps(span.to_dict(), default=str))
+
+
+class OTLPHttpSpanExporter:
+    """Posts finished spans to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.resource = {
+            "attributes": [
+                _otlp_attribute("service.name", service_name),
+                _otlp_attribute("process.pid", os.getpid())
+            ]
+        }
+
+    def export(self, spans: List[Span]):
+        payload = {
+            "resourceSpans": [{
+                "resource": self.resource,
+                "scopeSpans": [{
+                    "scope": {"name": "app.utils.tracing"},
+                    "spans": [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class BatchSpanProcessor:
+    """
+    Buffers finished spans and exports them from a daemon thread.
+
+    The buffer is bounded (oldest spans are dropped when full) so a slow or
+    unavailable collector never grows memory or blocks request handling.
+    The thread is started lazily per process so forked Celery workers get
+    their own.
+    """
+
+    def __init__(self, exporter, max_queue_size: int = 8192, batch_size: int = 256, interval: float = 5.0):
+        self.exporter = exporter
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self._queue: deque = deque(maxlen=max(1, max_queue_size))
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.exported = 0
+        self.export_errors = 0
+
+    def on_end(self, span: Span):
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(span)
+        if self._pid != os.getpid():
+            self._start()
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._wakeup = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        while self._queue:
+            batch = []
+            while self._queue and len(batch) < self.batch_size:
+                batch.append(self._queue.popleft())
+            try:
+                self.exporter.export(batch)
+                self.exported += len(batch)
+            except Exception as e:
+                self.export_errors += 1
+                logger.debug(f"Span export failed ({len(batch)} spans dropped): {e}")
+
+
+# ----------------------------------------------------------------------
+# Tracer
+# ----------------------------------------------------------------------
+
+class Tracer:
+    """Creates spans, applies head sampling and hands finished spans to the processor."""
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        sample_rate: Optional[float] = None,
+        processor: Optional[BatchSpanProcessor] = None
+    ):
+        self.enabled = enabled if enabled is not None else getattr(settings, 'tracing_enabled', False)
+        self.sample_rate = sample_rate if sample_rate is not None else getattr(settings, 'tracing_sample_rate', 0.05)
+        self._processor = processor
+
+    @property
+    def processor(self) -> BatchSpanProcessor:
+        if self._processor is None:
+            self._processor = BatchSpanProcessor(
+                _create_exporter(),
+                max_queue_size=getattr(settings, 'tracing_max_queue_size', 8192),
+                batch_size=getattr(settings, 'tracing_export_batch_size', 256),
+                interval=getattr(settings, 'tracing_export_interval_seconds', 5.0)
+            )
+        return self._processor
+
+    def start_span(
+        self,
+        name: str,
+        kind: SpanKind = SpanKind.INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+        trace_id: Optional[str] = None,
+        parent_span_id: Optional[str] = None,
+        sampled: Optional[bool] = None,
+        child_only: bool = False
+    ) -> _SpanScope:
+        """
+        Start a span as a context manager (`with` or `async with`).
+
+        Args:
+            name: Span name
+            kind: Span kind
+            attributes: Initial attributes
+            trace_id: Continue this trace (e.g. a LogContext trace_id) when it
+                differs from the active span's trace
+            parent_span_id: Remote parent span (e.g. from a traceparent header)
+            sampled: Remote sampling decision; None samples at TRACING_SAMPLE_RATE
+            child_only: Only create the span inside a sampled trace (for
+                high-frequency operations such as DB statements)
+
+        Returns:
+            Span scope; entering it yields the span
+        """
+        if not self.enabled:
+            return _SpanScope(None, _NOOP_SPAN, activate=False)
+
+        parent = _current_span.get()
+        if parent is not None and (trace_id is None or trace_id == parent.trace_id):
+            if not parent.sampled:
+                # Unsampled trace: children reuse the parent for propagation only
+                return _SpanScope(None, parent, activate=False)
+            return _SpanScope(self, Span(name, parent.trace_id, parent.span_id, kind, True, attributes))
+
+        if child_only:
+            return _SpanScope(None, _NOOP_SPAN, activate=False)
+
+        if sampled is None:
+            sampled = random.random() < self.sample_rate
+        span = Span(name, trace_id or _new_trace_id(), parent_span_id, kind, sampled, attributes)
+        return _SpanScope(self if sampled else None, span)
+
+    def _finish(self, span: Span):
+        span.end_time_ns = time.time_ns()
+        if span.sampled:
+            self.processor.on_end(span)
+
+    def shutdown(self):
+        """Export any buffered spans."""
+        if self._processor is not None:
+            self._processor.flush()
+
+
+def _create_exporter():
+    exporter = getattr(settings, 'tracing_exporter', 'log')
+    if exporter == 'otlp':
+        return OTLPHttpSpanExporter(
+            endpoint=getattr(settings, 'tracing_otlp_endpoint', 'http://localhost:4318/v1/traces'),
+            service_name=getattr(settings, 'tracing_service_name', 'agentic-backend')
+        )
+    return LogSpanExporter()
+
+
+def traced(name: Optional[str] = None, kind: SpanKind = SpanKind.INTERNAL, child_only: bool = True):
+    """
+    Decorator that wraps a sync or async function in a span.
+
+    Args:
+        name: Span name (defaults to the qualified function name)
+        kind: Span kind
+        child_only: Only trace calls made inside a sampled trace
+    """
+    def decorator(func: Callable):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.start_span(span_name, kind=kind, child_only=child_only):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.start_span(span_name, kind=kind, child_only=child_only):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+# ----------------------------------------------------------------------
+# Instrumentation
+# ----------------------------------------------------------------------
+
+def instrument_sqlalchemy(engine):
+    """Record a span per statement executed on a (sync) SQLAlchemy engine inside a sampled trace."""
+    if not tracer.enabled:
+        return
+
+    from sqlalchemy import event
+
+    max_statement_length = getattr(settings, 'tracing_db_statement_max_length', 300)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        scope = tracer.start_span("db.query", kind=SpanKind.CLIENT, child_only=True)
+        if scope.span.sampled:
+            scope.span.set_attributes({
+                "db.system": engine.dialect.name,
+                "db.statement": statement[:max_statement_length],
+                "db.executemany": executemany
+            })
+            scope.__enter__()
+            conn.info.setdefault("trace_scopes", []).append(scope)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        scopes = conn.info.get("trace_scopes")
+        if scopes:
+            scope = scopes.pop()
+            if cursor is not None and getattr(cursor, "rowcount", -1) >= 0:
+                scope.span.set_attribute("db.rowcount", cursor.rowcount)
+            scope.__exit__(None, None, None)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        scopes = conn.info.get("trace_scopes") if conn is not None else None
+        if scopes:
+            error = exception_context.original_exception
+            scopes.pop().__exit__(type(error), error, None)
+
+
+_redis_instrumented = False
+
+
+def instrument_redis():
+    """Record spans for Redis commands and pipelines (sync and asyncio clients) inside sampled traces."""
+    global _redis_instrumented
+    if _redis_instrumented or not tracer.enabled:
+        return
+    _redis_instrumented = True
+
+    import redis.client
+    import redis.asyncio.client
+
+    def command_name(args) -> str:
+        name = args[0] if args else "unknown"
+        return name.decode() if isinstance(name, bytes) else str(name)
+
+    def active() -> bool:
+        span = _current_span.get()
+        return span is not None and span.sampled
+
+    original_async_execute = redis.asyncio.client.Redis.execute_command
+    original_async_pipeline = redis.asyncio.client.Pipeline.execute
+    original_sync_execute = redis.client.Redis.execute_command
+    original_sync_pipeline = redis.client.Pipeline.execute
+
+    async def async_execute_command(self, *args, **options):
+        if not active():
+            return await original_async_execute(self, *args, **options)
+        with tracer.start_span(f"redis.{command_name(args).lower()}", kind=SpanKind.CLIENT,
+                               attributes={"db.system": "redis"}):
+            return await original_async_execute(self, *args, **options)
+
+    async def async_pipeline_execute(self, *args, **kwargs):
+        if not active():
+            return await original_async_pipeline(self, *args, **kwargs)
+        with tracer.start_span("redis.pipeline", kind=SpanKind.CLIENT,
+                               attributes={"db.system": "redis", "redis.commands": len(self.command_stack)}):
+            return await original_async_pipeline(self, *args, **kwargs)
+
+    def sync_execute_command(self, *args, **options):
+        if not active():
+            return original_sync_execute(self, *args, **options)
+        with tracer.start_span(f"redis.{command_name(args).lower()}", kind=SpanKind.CLIENT,
+                               attributes={"db.system": "redis"}):
+            return original_sync_execute(self, *args, **options)
+
+    def sync_pipeline_execute(self, *args, **kwargs):
+        if not active():
+            return original_sync_pipeline(self, *args, **kwargs)
+        with tracer.start_span("redis.pipeline", kind=SpanKind.CLIENT,
+                               attributes={"db.system": "redis", "redis.commands": len(self.command_stack)}):
+            return original_sync_pipeline(self, *args, **kwargs)
+
+    redis.asyncio.client.Redis.execute_command = async_execute_command
+    redis.asyncio.client.Pipeline.execute = async_pipeline_execute
+    redis.client.Redis.execute_command = sync_execute_command
+    redis.client.Pipeline.execute = sync_pipeline_execute
+
+
+_celery_instrumented = False
+
+
+def instrument_celery():
+    """
+    Propagate traces across Celery: publishers add a traceparent header and
+    workers run each task inside a consumer span continuing that trace.
+    """
+    global _celery_instrumented
+    if _celery_instrumented or not tracer.enabled:
+        return
+    _celery_instrumented = True
+
+    from celery import signals
+
+    active_scopes: Dict[str, _SpanScope] = {}
+
+    @signals.before_task_publish.connect(weak=False)
+    def _inject_trace_headers(headers=None, **kwargs):
+        span = _current_span.get()
+        if span is not None and headers is not None:
+            headers["traceparent"] = span.traceparent
+
+    @signals.task_prerun.connect(weak=False)
+    def _start_task_span(task_id=None, task=None, **kwargs):
+        remote = parse_traceparent(getattr(task.request, "traceparent", None))
+        trace_id, parent_span_id, sampled = remote if remote else (None, None, None)
+        scope = tracer.start_span(
+            f"celery.task {task.name}",
+            kind=SpanKind.CONSUMER,
+            attributes={"celery.task_id": task_id, "celery.task_name": task.name},
+            trace_id=trace_id,
+            parent_span_id=parent_span_id,
+            sampled=sampled
+        )
+        scope.__enter__()
+        active_scopes[task_id] = scope
+
+    @signals.task_failure.connect(weak=False)
+    def _mark_task_failed(task_id=None, exception=None, **kwargs):
+        scope = active_scopes.get(task_id)
+        if scope is not None and exception is not None:
+            scope.span.record_exception(exception)
+
+    @signals.task_postrun.connect(weak=False)
+    def _end_task_span(task_id=None, state=None, **kwargs):
+        scope = active_scopes.pop(task_id, None)
+        if scope is not None:
+            scope.span.set_attribute("celery.state", state)
+            scope.__exit__(None, None, None)
+
+
+def setup_tracing():
+    """Install process-wide instrumentation (Redis, Celery) when tracing is enabled."""
+    if not tracer.enabled:
+        return
+    instrument_redis()
+    instrument_celery()
+    logger.info(f"Tracing enabled (sample_rate={tracer.sample_rate}, "
+                f"exporter={getattr(settings, 'tracing_exporter', 'log')})")
+
+
+# Global instance
+tracer = Tracer()
+atexit.register(tracer.shutdown)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Audio Segmentation Benchmark
+
+Generates a synthetic recording (speech-like bursts separated by pauses over
+a low noise floor, with occasional long uninterrupted passages) and runs it
+through app.services.audio_segmentation, reporting:
+
+- segments produced, speech kept and the longest segment
+- decode + VAD throughput (seconds of audio per second)
+- peak Python memory while segmenting, next to the size of the recording
+- base64 bytes a request would upload for ``--operations`` analyses:
+  legacy (the whole file once per analysis) vs segmented (speech only)
+
+Examples:
+    python scripts/benchmark_audio_segmentation.py
+    python scripts/benchmark_audio_segmentation.py --minutes 60 --sample-rate 16000
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+import tracemalloc
+import wave
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.services.audio_segmentation import iter_audio_segments
+
+
+def synthetic_recording(minutes: float, sample_rate: int, seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+
+        remaining = minutes * 60
+        speaking = False
+        while remaining > 0:
+            if speaking:
+                seconds = rng.uniform(20, 90) if rng.random() < 0.1 else rng.uniform(1, 8)
+            else:
+                seconds = rng.uniform(0.2, 3)
+            seconds = min(seconds, remaining)
+            n = int(seconds * sample_rate)
+            samples = rng.normal(0, 10 ** (-65 / 20) * 32768, n)
+            if speaking:
+                t = np.arange(n) / sample_rate
+                envelope = 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(3, 5) * t) ** 2
+                samples += envelope * (np.sin(2 * np.pi * rng.uniform(120, 260) * t) * 0.2 * 32768
+                                       + rng.normal(0, 0.03 * 32768, n))
+            wav.writeframes(samples.clip(-32768, 32767).astype("<i2").tobytes())
+            remaining -= seconds
+            speaking = not speaking
+    return buffer.getvalue()
+
+
+async def segment(audio: bytes, args):
+    count = 0
+    speech = longest = 0.0
+    encoded = 0
+    async for seg in iter_audio_segments(audio, max_segment_seconds=args.max_segment, overlap_seconds=args.overlap):
+        count += 1
+        speech += seg.duration_seconds
+        longest = max(longest, seg.duration_seconds)
+        encoded += len(seg.b64)
+    return count, speech, longest, encoded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark streaming audio decoding and VAD segmentation")
+    parser.add_argument("--minutes", type=float, default=20.0)
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--max-segment", type=float, default=30.0)
+    parser.add_argument("--overlap", type=float, default=1.0)
+    parser.add_argument("--operations", type=int, default=5, help="Analyses run on the recording")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    audio = synthetic_recording(args.minutes, args.sample_rate, args.seed)
+    duration = args.minutes * 60
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    count, speech, longest, encoded = asyncio.run(segment(audio, args))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    legacy_upload = (len(audio) + 2) // 3 * 4 * args.operations
+    segmented_upload = encoded * args.operations
+
+    print(f"recording:        {duration / 60:.0f} min, {len(audio) / 1e6:.1f} MB")
+    print(f"segments:         {count} (longest {longest:.1f}s), speech kept {speech:.0f}s ({100 * speech / duration:.0f}%)")
+    print(f"throughput:       {duration / elapsed:.0f}x realtime ({elapsed:.2f}s)")
+    print(f"peak memory:      {peak / 1e6:.1f} MB while segmenting")
+    print(f"upload, {args.operations} ops:   legacy {legacy_upload / 1e6:.1f} MB in {args.operations} requests, "
+          f"segmented {segmented_upload / 1e6:.1f} MB in {count * args.operations} requests "
+          f"(largest {longest:.0f}s each)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+LLM Benchmark Script
+
+Runs the LLM benchmark harness against Ollama (or the simulated stub
+backend for CI), writes a JSON artifact, and optionally compares it with a
+baseline artifact, exiting non-zero on regressions.
+
+Examples:
+    python scripts/benchmark_llm.py --models llama3.2:3b qwen2.5:7b
+    python scripts/benchmark_llm.py --backend stub --models stub-model \\
+        --output /tmp/bench.json --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.llm_benchmark import (
+    LLMBenchmarkRunner,
+    BenchmarkTask,
+    BenchmarkReport,
+    OllamaBenchmarkBackend,
+    StubBenchmarkBackend,
+    compare_reports,
+    parse_concurrency_levels
+)
+from app.utils.logging import get_logger
+
+logger = get_logger("llm_benchmark_script")
+
+DEFAULT_TASKS = [
+    BenchmarkTask(id="short_answer", prompt="In one sentence, what is a hash table?", type="text_generation"),
+    BenchmarkTask(id="classification", prompt="Classify the sentiment of this review as positive, negative or neutral: 'The battery lasts all day but the screen scratches easily.'", type="classification"),
+    BenchmarkTask(id="summary", prompt="Summarize the following in two sentences: The quarterly report shows revenue grew 12% while operating costs rose 4%, driven mostly by new hires in the support team. Management expects growth to slow next quarter due to seasonal demand.", type="text_generation"),
+]
+
+
+def load_tasks(path: str):
+    """Load tasks from a JSON file: [{"id", "prompt", "type"}, ...]."""
+    with open(path) as f:
+        return [
+            BenchmarkTask(id=str(task.get("id", i)), prompt=task["prompt"], type=task.get("type", "benchmark"))
+            for i, task in enumerate(json.load(f))
+        ]
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark LLM latency and throughput")
+    parser.add_argument("--models", nargs="+", required=True, help="Models to benchmark")
+    parser.add_argument("--backend", choices=["ollama", "stub"], default="ollama")
+    parser.add_argument("--tasks", help="JSON file with benchmark tasks")
+    parser.add_argument("--warmup", type=int, default=None, help="Warmup requests per model")
+    parser.add_argument("--repetitions", type=int, default=None, help="Repetitions of each task per concurrency level")
+    parser.add_argument("--concurrency", default=None, help="Comma-separated concurrency levels, e.g. 1,2,4,8")
+    parser.add_argument("--max-tokens", type=int, default=100)
+    parser.add_argument("--output", help="Artifact path (default: timestamped file in LLM_BENCHMARK_RESULTS_DIR)")
+    parser.add_argument("--baseline", help="Baseline artifact to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed fractional regression")
+    args = parser.parse_args()
+
+    runner = LLMBenchmarkRunner(
+        backend=StubBenchmarkBackend() if args.backend == "stub" else OllamaBenchmarkBackend(),
+        warmup_runs=args.warmup,
+        repetitions=args.repetitions,
+        concurrency_levels=parse_concurrency_levels(args.concurrency) if args.concurrency else None,
+        options={"temperature": 0.1, "num_predict": args.max_tokens}
+    )
+    tasks = load_tasks(args.tasks) if args.tasks else DEFAULT_TASKS
+
+    report = await runner.run(args.models, tasks)
+    path = report.save(args.output)
+
+    print(f"{'model':<30} {'conc':>4} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'ttft p95':>9} {'decode t/s':>10} {'agg t/s':>9}")
+    for model_name, result in report.models.items():
+        for level in result.levels:
+            knee = " <- knee" if level.concurrency == result.knee_concurrency else ""
+            print(
+                f"{model_name:<30} {level.concurrency:>4} "
+                f"{level.wall_time['p50'] or 0:>8.3f} {level.wall_time['p95'] or 0:>8.3f} {level.wall_time['p99'] or 0:>8.3f} "
+                f"{level.ttft['p95'] or 0:>9.3f} {level.decode_tokens_per_second['p50'] or 0:>10.1f} "
+                f"{level.throughput_tokens_per_second:>9.1f}{knee}"
+            )
+    print(f"\nResults written to {path}")
+
+    if args.baseline:
+        regressions = compare_reports(BenchmarkReport.load(args.baseline), report, tolerance=args.tolerance)
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['model_name']} c={regression['concurrency']} {regression['metric']}: "
+                f"{regression['baseline']:.3f} -> {regression['current']:.3f} ({regression['change']:+.1%})"
+            )
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
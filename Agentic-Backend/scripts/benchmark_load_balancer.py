@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Load Balancer Simulation Benchmark
+
+Drives backend selection strategies through a discrete-event simulation of
+synthetic backends (virtual time, no sockets), and reports end-to-end
+latency percentiles, error rate and traffic share per backend.
+
+Backends (each serves ``--slots`` requests at a time and queues the rest):
+- fast:     lognormal service time, mean 20ms
+- medium:   mean 40ms
+- brownout: mean 40ms, but fails fast (5ms errors) during the middle of the
+            run; active health checks see it as down for that window
+- slow:     mean 150ms
+
+Requests arrive as a Poisson process at ``--load`` times the fleet capacity.
+
+Strategies compared:
+- legacy:            the previous scoring (static averages, always the maximum score)
+- least_outstanding: AdaptiveBalancer, cheapest of all backends
+- p2c:               AdaptiveBalancer, power of two choices
+
+Examples:
+    python scripts/benchmark_load_balancer.py
+    python scripts/benchmark_load_balancer.py --duration 120 --load 0.85 --seed 7
+"""
+
+import argparse
+import heapq
+import math
+import os
+import random
+import sys
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.load_balancing import AdaptiveBalancer
+
+
+class SimBackend:
+    def __init__(self, name: str, slots: int, mean_ms: float, brownout: Optional[Tuple[float, float]] = None):
+        self.name = name
+        self.slots = slots
+        self.mean_ms = mean_ms
+        self.brownout = brownout
+        self.busy = 0
+        self.queue: deque = deque()
+        self.served = 0
+        self.failed = 0
+
+    @property
+    def capacity(self) -> float:
+        """Requests per second at full utilisation."""
+        return self.slots / (self.mean_ms / 1000)
+
+    def is_down(self, now: float) -> bool:
+        return self.brownout is not None and self.brownout[0] <= now < self.brownout[1]
+
+    def service(self, now: float, rng: random.Random) -> Tuple[float, bool]:
+        if self.is_down(now):
+            return 0.005, False
+        sigma = 0.6
+        mu = math.log(self.mean_ms / 1000) - sigma ** 2 / 2
+        return rng.lognormvariate(mu, sigma), True
+
+
+class LegacyBalancer:
+    """The previous LoadBalancer._select_best_backend scoring, for comparison."""
+
+    def __init__(self):
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self.response_times: Dict[str, List[float]] = {}
+        self.healthy: Dict[str, bool] = {}
+
+    def _stats(self, backend_id: str) -> Dict[str, float]:
+        return self.stats.setdefault(backend_id, {
+            "active_requests": 0, "average_response_time": 0.0, "error_rate": 0.0, "total": 0, "errors": 0
+        })
+
+    def set_health(self, backend_id: str, healthy: bool):
+        self.healthy[backend_id] = healthy
+
+    def select(self, candidates: List[str]) -> str:
+        available = [b for b in candidates if self.healthy.get(b, True)] or candidates
+        scores = {}
+        for backend_id in available:
+            stats = self._stats(backend_id)
+            scores[backend_id] = (
+                1.0 * 0.4 +
+                max(0, 1.0 - stats["active_requests"] / 10) * 0.3 +
+                max(0, 1.0 - stats["average_response_time"] / 5000) * 0.2 +
+                max(0, 1.0 - stats["error_rate"]) * 0.1
+            )
+        return max(scores, key=scores.get)
+
+    def on_request_start(self, backend_id: str):
+        self._stats(backend_id)["active_requests"] += 1
+
+    def on_request_end(self, backend_id: str, latency_ms: float, success: bool):
+        stats = self._stats(backend_id)
+        stats["active_requests"] -= 1
+        stats["total"] += 1
+        times = self.response_times.setdefault(backend_id, [])
+        times.append(latency_ms)
+        if len(times) > 100:
+            times.pop(0)
+        stats["average_response_time"] = sum(times) / len(times)
+        if not success:
+            stats["errors"] += 1
+            stats["error_rate"] = stats["errors"] / stats["total"]
+
+
+def build_backends(slots: int, duration: float) -> Dict[str, SimBackend]:
+    backends = [
+        SimBackend("fast", slots, 20),
+        SimBackend("medium", slots, 40),
+        SimBackend("brownout", slots, 40, brownout=(duration * 0.4, duration * 0.6)),
+        SimBackend("slow", slots, 150),
+    ]
+    return {backend.name: backend for backend in backends}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(math.ceil(pct / 100 * len(sorted_values))) - 1)
+    return sorted_values[max(0, index)]
+
+
+def simulate(strategy: str, args) -> Dict[str, object]:
+    rng = random.Random(args.seed)
+    backends = build_backends(args.slots, args.duration)
+    names = list(backends)
+    arrival_rate = args.load * sum(b.capacity for b in backends.values())
+
+    now = 0.0
+    if strategy == "legacy":
+        balancer = LegacyBalancer()
+    else:
+        balancer = AdaptiveBalancer(
+            strategy=strategy,
+            base_ejection_seconds=5.0,
+            slow_start_seconds=5.0,
+            clock=lambda: now,
+            rng=random.Random(args.seed + 1)
+        )
+        for name in names:
+            balancer.add_backend(name, slow_start=False)
+
+    events: List[tuple] = []
+    seq = 0
+
+    def schedule(at: float, kind: str, data=None):
+        nonlocal seq
+        seq += 1
+        heapq.heappush(events, (at, seq, kind, data))
+
+    def start_service(backend: SimBackend, arrived_at: float):
+        backend.busy += 1
+        duration, success = backend.service(now, rng)
+        schedule(now + duration, "done", (backend, arrived_at, success))
+
+    latencies: List[float] = []
+    errors = 0
+    schedule(rng.expovariate(arrival_rate), "arrival")
+    schedule(args.health_interval, "health")
+
+    while events:
+        now, _, kind, data = heapq.heappop(events)
+        if kind == "arrival":
+            if now >= args.duration:
+                continue
+            backend = backends[balancer.select(names)]
+            balancer.on_request_start(backend.name)
+            if backend.busy < backend.slots:
+                start_service(backend, now)
+            else:
+                backend.queue.append(now)
+            schedule(now + rng.expovariate(arrival_rate), "arrival")
+
+        elif kind == "done":
+            backend, arrived_at, success = data
+            backend.busy -= 1
+            latency_ms = (now - arrived_at) * 1000
+            balancer.on_request_end(backend.name, latency_ms, success)
+            if success:
+                backend.served += 1
+                latencies.append(latency_ms)
+            else:
+                backend.failed += 1
+                errors += 1
+            if backend.queue:
+                start_service(backend, backend.queue.popleft())
+
+        elif kind == "health":
+            for backend in backends.values():
+                balancer.set_health(backend.name, not backend.is_down(now))
+            if now < args.duration:
+                schedule(now + args.health_interval, "health")
+
+    latencies.sort()
+    total = len(latencies) + errors
+    return {
+        "requests": total,
+        "error_pct": 100.0 * errors / total if total else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "p999": percentile(latencies, 99.9),
+        "share": {name: 100.0 * (b.served + b.failed) / total for name, b in backends.items()} if total else {}
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Simulate load balancing strategies against synthetic backends")
+    parser.add_argument("--duration", type=float, default=60.0, help="Simulated seconds")
+    parser.add_argument("--load", type=float, default=0.7, help="Offered load as a fraction of fleet capacity")
+    parser.add_argument("--slots", type=int, default=8, help="Concurrent requests per backend")
+    parser.add_argument("--health-interval", type=float, default=5.0, help="Active health check interval (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--strategies", nargs="+", default=["legacy", "least_outstanding", "p2c"],
+                        choices=["legacy", "least_outstanding", "p2c"])
+    args = parser.parse_args()
+
+    results = {strategy: simulate(strategy, args) for strategy in args.strategies}
+    names = list(build_backends(args.slots, args.duration))
+
+    print(f"{'strategy':<18} {'requests':>9} {'errors%':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>9} {'p99.9 ms':>9}  share% " + "/".join(names))
+    for strategy, result in results.items():
+        share = "/".join(f"{result['share'].get(name, 0):.0f}" for name in names)
+        print(
+            f"{strategy:<18} {result['requests']:>9} {result['error_pct']:>8.2f} {result['p50']:>8.1f} "
+            f"{result['p95']:>8.1f} {result['p99']:>9.1f} {result['p999']:>9.1f}  {share}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Middleware Micro-Benchmark
+
+Measures requests/sec through the HTTP middleware stack on a trivial
+endpoint by driving the ASGI app directly (no sockets, no HTTP client), so
+the numbers reflect per-request middleware overhead only.
+
+Stacks compared:
+- none:     the bare FastAPI app
+- basehttp: three pass-through BaseHTTPMiddleware layers, the shape of the
+            previous stack (a lower bound on its cost, since the old layers
+            also did their own work)
+- asgi:     the current LoggingMiddleware, AgentSecurityMiddleware and
+            RequestValidationMiddleware
+
+Examples:
+    python scripts/benchmark_middleware.py
+    python scripts/benchmark_middleware.py --requests 20000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.api.middleware import LoggingMiddleware
+from app.api.security_middleware import AgentSecurityMiddleware, RequestValidationMiddleware, MockSecurityService
+
+
+class PassThroughMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+def build_app(stack: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/ping/{item_id}")
+    async def ping(item_id: str):
+        return {"ok": True}
+
+    if stack == "basehttp":
+        for _ in range(3):
+            app.add_middleware(PassThroughMiddleware)
+    elif stack == "asgi":
+        app.add_middleware(RequestValidationMiddleware, security_service=MockSecurityService())
+        app.add_middleware(AgentSecurityMiddleware, security_service=MockSecurityService())
+        app.add_middleware(LoggingMiddleware)
+
+    return app
+
+
+def make_scope(i: int) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": f"/api/v1/ping/{i}",
+        "raw_path": f"/api/v1/ping/{i}".encode(),
+        "root_path": "",
+        "query_string": b"verbose=0",
+        "headers": [(b"host", b"bench"), (b"user-agent", b"benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+
+async def call(app, i: int):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"Unexpected status {message['status']}")
+
+    await app(make_scope(i), receive, send)
+
+
+async def run(app, requests: int, concurrency: int) -> float:
+    # Warm up (route compilation, lazy middleware stack build)
+    for i in range(min(200, requests)):
+        await call(app, i)
+
+    start = time.perf_counter()
+    for batch_start in range(0, requests, concurrency):
+        batch = range(batch_start, min(batch_start + concurrency, requests))
+        await asyncio.gather(*(call(app, i) for i in batch))
+    return requests / (time.perf_counter() - start)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark HTTP middleware overhead")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--stacks", nargs="+", default=["none", "basehttp", "asgi"],
+                        choices=["none", "basehttp", "asgi"])
+    args = parser.parse_args()
+
+    results = {}
+    for stack in args.stacks:
+        results[stack] = await run(build_app(stack), args.requests, args.concurrency)
+
+    baseline = results.get("none")
+    print(f"{'stack':<10} {'req/s':>10} {'us/req':>8} {'overhead us':>12}")
+    for stack, rps in results.items():
+        overhead = f"{(1 / rps - 1 / baseline) * 1e6:>12.1f}" if baseline else f"{'-':>12}"
+        print(f"{stack:<10} {rps:>10.0f} {1e6 / rps:>8.1f} {overhead}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Schema Validation Benchmark
+
+Measures dynamic agent input validations per second for:
+- legacy:   the previous field-by-field walk (DynamicAgent._validate_input and
+            _validate_field_value as they were before compiled validators)
+- compiled: the cached validators from app.schemas.validator_compiler
+
+Both paths run over the same generated payloads (a mix of valid and invalid
+inputs) and the benchmark checks that they produce identical results before
+timing them. Nested item validation is compiled-only, so the schema used here
+sticks to checks both paths perform.
+
+Examples:
+    python scripts/benchmark_schema_validation.py
+    python scripts/benchmark_schema_validation.py --payloads 2000 --rounds 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.schemas.agent_schema import AgentSchema
+from app.schemas.validator_compiler import schema_validator_cache
+
+
+SCHEMA = {
+    "agent_type": "benchmark_agent",
+    "metadata": {"name": "Benchmark", "description": "Validation benchmark", "category": "test", "version": "1.0.0"},
+    "data_models": {
+        "result": {"table_name": "benchmark_results", "fields": {"value": {"type": "string", "required": True}}}
+    },
+    "processing_pipeline": {"steps": [{"name": "process", "tool": "llm"}]},
+    "tools": {"llm": {"type": "llm_processor"}},
+    "input_schema": {
+        "query": {"type": "string", "required": True, "min_length": 3, "max_length": 500},
+        "email": {"type": "string", "pattern": r"^[\w.+-]+@[\w-]+\.[\w.]+$"},
+        "ticket_id": {"type": "string", "pattern": r"^[A-Z]{3}-\d{4,8}$"},
+        "max_results": {"type": "integer", "range": [1, 100], "default": 10},
+        "temperature": {"type": "float", "range": [0.0, 2.0], "default": 0.7},
+        "include_sources": {"type": "boolean", "default": False},
+        "tags": {"type": "array"},
+        "priority": {"type": "enum", "values": ["low", "normal", "high", "urgent"], "default": "normal"},
+        "language": {"type": "enum", "values": ["en", "de", "fr", "es", "it", "nl", "pt"]},
+        "notes": {"type": "text"},
+        "options": {"type": "json"},
+        "retries": {"type": "integer", "range": [0, 5]},
+    },
+    "output_schema": {"answer": {"type": "text", "required": True}},
+}
+
+
+# ---------------------------------------------------------------------------
+# Previous implementation, kept here for comparison
+# ---------------------------------------------------------------------------
+
+def legacy_validate_field_value(field_name: str, value: Any, field_def) -> Optional[str]:
+    from app.schemas.agent_schema import FieldType
+
+    try:
+        if field_def.type == FieldType.STRING:
+            if not isinstance(value, str):
+                return f"Field '{field_name}' must be a string"
+            if field_def.max_length and len(value) > field_def.max_length:
+                return f"Field '{field_name}' exceeds maximum length of {field_def.max_length}"
+            if field_def.min_length and len(value) < field_def.min_length:
+                return f"Field '{field_name}' is below minimum length of {field_def.min_length}"
+            if field_def.pattern:
+                import re
+                if not re.match(field_def.pattern, value):
+                    return f"Field '{field_name}' does not match required pattern"
+
+        elif field_def.type == FieldType.INTEGER:
+            if not isinstance(value, int):
+                return f"Field '{field_name}' must be an integer"
+            if field_def.range:
+                if value < field_def.range[0] or value > field_def.range[1]:
+                    return f"Field '{field_name}' must be between {field_def.range[0]} and {field_def.range[1]}"
+
+        elif field_def.type == FieldType.FLOAT:
+            if not isinstance(value, (int, float)):
+                return f"Field '{field_name}' must be a number"
+            if field_def.range:
+                if value < field_def.range[0] or value > field_def.range[1]:
+                    return f"Field '{field_name}' must be between {field_def.range[0]} and {field_def.range[1]}"
+
+        elif field_def.type == FieldType.BOOLEAN:
+            if not isinstance(value, bool):
+                return f"Field '{field_name}' must be a boolean"
+
+        elif field_def.type == FieldType.ARRAY:
+            if not isinstance(value, list):
+                return f"Field '{field_name}' must be an array"
+
+        elif field_def.type == FieldType.ENUM:
+            if field_def.values and value not in field_def.values:
+                return f"Field '{field_name}' must be one of: {', '.join(field_def.values)}"
+
+        return None
+
+    except Exception as e:
+        return f"Validation error for field '{field_name}': {str(e)}"
+
+
+def legacy_validate_input(schema: AgentSchema, input_data: Dict[str, Any]):
+    validated_input = {}
+    errors = []
+
+    for field_name, field_def in schema.input_schema.items():
+        if field_def.required and field_name not in input_data:
+            errors.append(f"Required field '{field_name}' is missing")
+        elif field_name in input_data:
+            value = input_data[field_name]
+            validation_error = legacy_validate_field_value(field_name, value, field_def)
+            if validation_error:
+                errors.append(validation_error)
+            else:
+                validated_input[field_name] = value
+        elif field_def.default is not None:
+            validated_input[field_name] = field_def.default
+
+    for field_name, value in input_data.items():
+        if field_name not in schema.input_schema:
+            validated_input[field_name] = value
+
+    return validated_input, errors
+
+
+# ---------------------------------------------------------------------------
+
+def make_payloads(count: int, invalid_ratio: float, rng: random.Random) -> List[Dict[str, Any]]:
+    payloads = []
+    for i in range(count):
+        payload = {
+            "query": f"find invoices for customer {i} " * rng.randint(1, 4),
+            "email": f"user{i}@example.com",
+            "ticket_id": f"ABC-{rng.randint(1000, 99999999)}",
+            "max_results": rng.randint(1, 100),
+            "temperature": rng.random() * 2,
+            "include_sources": rng.random() < 0.5,
+            "tags": ["billing", "urgent"],
+            "priority": rng.choice(["low", "normal", "high", "urgent"]),
+            "language": rng.choice(["en", "de", "fr"]),
+            "notes": "free text",
+            "options": {"mode": "fast"},
+            "retries": rng.randint(0, 5),
+            "request_source": "api",
+        }
+        if rng.random() < invalid_ratio:
+            field, bad = rng.choice([
+                ("email", "not-an-email"), ("max_results", 1000), ("priority", "whenever"),
+                ("query", "x"), ("include_sources", "yes"), ("temperature", "hot"), ("ticket_id", "abc-1"),
+            ])
+            payload[field] = bad
+        if rng.random() < 0.3:
+            for optional in ("max_results", "temperature", "priority", "retries"):
+                payload.pop(optional, None)
+        payloads.append(payload)
+    return payloads
+
+
+def run(fn, payloads, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for payload in payloads:
+            fn(payload)
+    return rounds * len(payloads) / (time.perf_counter() - start)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark dynamic agent schema validation")
+    parser.add_argument("--payloads", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--invalid-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    schema = AgentSchema(**SCHEMA)
+    payloads = make_payloads(args.payloads, args.invalid_ratio, random.Random(args.seed))
+
+    compiled = schema_validator_cache.get(schema).input
+
+    def legacy(payload):
+        return legacy_validate_input(schema, payload)
+
+    def compiled_path(payload):
+        return compiled.validate(payload)
+
+    mismatches = sum(1 for payload in payloads if legacy(payload) != compiled_path(payload))
+    if mismatches:
+        print(f"ERROR: {mismatches} payloads validated differently")
+        return 1
+
+    results = {"legacy": run(legacy, payloads, args.rounds), "compiled": run(compiled_path, payloads, args.rounds)}
+
+    print(f"{'path':<10} {'validations/s':>14} {'us/validation':>14}")
+    for name, rate in results.items():
+        print(f"{name:<10} {rate:>14.0f} {1e6 / rate:>14.2f}")
+    print(f"speedup: {results['compiled'] / results['legacy']:.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
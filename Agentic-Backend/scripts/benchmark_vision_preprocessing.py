@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Vision Preprocessing Benchmark
+
+Compares what VisionAIService sends to the vision model per image:
+- legacy:       the original upload, base64 encoded as-is for every operation
+- preprocessed: app.services.vision_preprocessing.prepare_image output, with
+                the perceptual-hash result cache in front of the model
+
+The synthetic corpus mixes phone photos (some stored sideways with an EXIF
+orientation), large PNG screenshots, small logos that are already within
+budget, and reposts (resized and re-compressed copies of earlier photos).
+Each image runs the analyze, detect_objects and extract_text operations.
+
+Reported per path: base64 bytes uploaded, pixels the model has to ingest
+(vision encoders resize to a fixed budget, so this is the work the model
+does on its side), CPU time spent preparing uploads, and model calls made.
+
+Examples:
+    python scripts/benchmark_vision_preprocessing.py
+    python scripts/benchmark_vision_preprocessing.py --photos 40 --reposts 20 --max-dimension 1120
+"""
+
+import argparse
+import base64
+import io
+import os
+import random
+import sys
+import time
+from typing import List, Tuple
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from app.services.vision_preprocessing import VisionResultCache, prepare_image
+
+OPERATIONS = [("analyze", False), ("detect_objects", False), ("extract_text", True)]
+
+
+def synthetic_scene(rng: random.Random, size: Tuple[int, int]) -> Image.Image:
+    img = Image.new("RGB", (400, 300), tuple(rng.randint(0, 255) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        x, y = rng.randint(0, 400), rng.randint(0, 300)
+        draw.ellipse(
+            [x, y, x + rng.randint(20, 150), y + rng.randint(20, 150)],
+            fill=tuple(rng.randint(0, 255) for _ in range(3))
+        )
+    return img.filter(ImageFilter.GaussianBlur(3)).resize(size, Image.Resampling.BICUBIC)
+
+
+def encode(img: Image.Image, fmt: str, orientation: int = 1, quality: int = 92) -> bytes:
+    buffer = io.BytesIO()
+    kwargs = {"quality": quality} if fmt == "JPEG" else {}
+    if orientation != 1:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        kwargs["exif"] = exif.tobytes()
+    img.save(buffer, format=fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def build_corpus(args) -> List[bytes]:
+    rng = random.Random(args.seed)
+    corpus, photos = [], []
+
+    for _ in range(args.photos):
+        scene = synthetic_scene(rng, (4032, 3024))
+        photos.append(scene)
+        if rng.random() < 0.3:
+            # Sensor-oriented pixels plus an EXIF rotation, as phones store portraits
+            corpus.append(encode(scene.transpose(Image.Transpose.ROTATE_90), "JPEG", orientation=6))
+        else:
+            corpus.append(encode(scene, "JPEG"))
+
+    for _ in range(args.screenshots):
+        screenshot = Image.new("RGB", (2560, 1440), "white")
+        draw = ImageDraw.Draw(screenshot)
+        for line in range(60):
+            draw.text((40, 20 + line * 23), f"Line {line}: " + "lorem ipsum " * rng.randint(2, 12), fill="black")
+        corpus.append(encode(screenshot, "PNG"))
+
+    for _ in range(args.logos):
+        corpus.append(encode(synthetic_scene(rng, (240, 80)), "PNG"))
+
+    for _ in range(args.reposts):
+        original = rng.choice(photos)
+        scale = rng.uniform(0.3, 0.8)
+        resized = original.resize((int(original.width * scale), int(original.height * scale)))
+        corpus.append(encode(resized, "JPEG", quality=rng.randint(60, 85)))
+
+    # Exact repeats: signatures and logos attached to many emails
+    corpus.extend(rng.choice(corpus[-args.logos - args.reposts:]) for _ in range(args.repeats))
+    rng.shuffle(corpus)
+    return corpus
+
+
+def model_pixels(data: bytes) -> int:
+    with Image.open(io.BytesIO(data)) as img:
+        return img.width * img.height
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark vision upload preprocessing and result caching")
+    parser.add_argument("--photos", type=int, default=20)
+    parser.add_argument("--screenshots", type=int, default=5)
+    parser.add_argument("--logos", type=int, default=5)
+    parser.add_argument("--reposts", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--max-dimension", type=int, default=1344)
+    parser.add_argument("--max-bytes", type=int, default=1024 * 1024)
+    parser.add_argument("--max-distance", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args)
+    print(f"corpus: {len(corpus)} images, {sum(len(d) for d in corpus) / 1e6:.1f} MB")
+
+    # Legacy: every operation base64-encodes and uploads the original
+    start = time.perf_counter()
+    legacy_bytes = 0
+    for data in corpus:
+        for _ in OPERATIONS:
+            legacy_bytes += len(base64.b64encode(data))
+    legacy_cpu = time.perf_counter() - start
+    legacy_pixels = sum(model_pixels(data) for data in corpus) * len(OPERATIONS)
+    legacy_calls = len(corpus) * len(OPERATIONS)
+
+    # Preprocessed: prepare once per image, consult the cache per operation
+    cache = VisionResultCache(max_entries=4096, max_distance=args.max_distance)
+    start = time.perf_counter()
+    prepared_images = [prepare_image(data, args.max_dimension, args.max_bytes) for data in corpus]
+    prepare_cpu = time.perf_counter() - start
+
+    new_bytes = new_pixels = new_calls = 0
+    for prepared in prepared_images:
+        encoded_bytes = len(prepared.b64)
+        for operation, exact in OPERATIONS:
+            if cache.get(operation, prepared, exact) is not None:
+                continue
+            new_calls += 1
+            new_bytes += encoded_bytes
+            new_pixels += prepared.info["width"] * prepared.info["height"]
+            cache.put(operation, prepared, {"description": "..."})
+
+    print(f"{'path':<14} {'uploaded MB':>12} {'Mpixels':>9} {'model calls':>12} {'prep CPU s':>11}")
+    print(f"{'legacy':<14} {legacy_bytes / 1e6:>12.1f} {legacy_pixels / 1e6:>9.0f} {legacy_calls:>12} {legacy_cpu:>11.2f}")
+    print(f"{'preprocessed':<14} {new_bytes / 1e6:>12.1f} {new_pixels / 1e6:>9.0f} {new_calls:>12} {prepare_cpu:>11.2f}")
+    print(f"upload reduction: {legacy_bytes / max(new_bytes, 1):.1f}x, "
+          f"model pixel reduction: {legacy_pixels / max(new_pixels, 1):.1f}x, cache: {cache.get_stats()}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Checks for the vision result cache's near-duplicate matching.
+
+Different images must never share a result: flat colours and sparse text on
+a plain background hash alike (the difference hash only sees grayscale
+gradients), so they may only match identical content. A re-encoded and
+resized repost of a photo must still be found.
+
+Runs under pytest or directly:
+    python scripts/test_vision_result_cache.py
+"""
+
+import io
+import os
+import random
+import sys
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from app.services.vision_preprocessing import VisionResultCache, prepare_image
+
+MAX_DIMENSION = 1024
+MAX_BYTES = 10 * 1024 * 1024
+
+
+def encode(img: Image.Image, fmt: str = "PNG", quality: int = 92) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt, **({"quality": quality} if fmt == "JPEG" else {}))
+    return buffer.getvalue()
+
+
+def prepare(img: Image.Image, fmt: str = "PNG"):
+    return prepare_image(encode(img, fmt), MAX_DIMENSION, MAX_BYTES)
+
+
+def text_image(text: str) -> Image.Image:
+    img = Image.new("RGB", (800, 600), "white")
+    ImageDraw.Draw(img).text((40, 280), text, fill="black")
+    return img
+
+
+def test_solid_colours_do_not_share_results():
+    cache = VisionResultCache()
+    red = prepare(Image.new("RGB", (800, 600), "red"))
+    blue = prepare(Image.new("RGB", (800, 600), "blue"))
+
+    cache.put("analyze", red, {"description": "a solid red image"})
+
+    assert cache.get("analyze", blue) is None
+    assert cache.get("analyze", red) == {"description": "a solid red image"}
+
+    # Both stay cached side by side despite the identical hash
+    cache.put("analyze", blue, {"description": "a solid blue image"})
+    assert cache.get("analyze", red) == {"description": "a solid red image"}
+    assert cache.get("analyze", blue) == {"description": "a solid blue image"}
+
+
+def test_different_text_images_do_not_share_results():
+    cache = VisionResultCache()
+    invoice = prepare(text_image("Invoice 1234"))
+    greeting = prepare(text_image("Hello world, totally different"))
+
+    cache.put("analyze", invoice, {"description": "an invoice"})
+    cache.put("detect_objects", invoice, {"objects": ["invoice"]})
+
+    assert cache.get("analyze", greeting) is None
+    assert cache.get("detect_objects", greeting) is None
+
+
+def test_resized_repost_of_a_photo_matches():
+    rng = random.Random(7)
+    photo = Image.new("RGB", (400, 300), (90, 140, 200))
+    draw = ImageDraw.Draw(photo)
+    for _ in range(40):
+        x, y = rng.randint(0, 400), rng.randint(0, 300)
+        draw.ellipse(
+            [x, y, x + rng.randint(20, 150), y + rng.randint(20, 150)],
+            fill=tuple(rng.randint(0, 255) for _ in range(3))
+        )
+    photo = photo.filter(ImageFilter.GaussianBlur(3)).resize((1600, 1200), Image.Resampling.BICUBIC)
+    repost = photo.resize((1200, 900), Image.Resampling.BICUBIC)
+
+    cache = VisionResultCache()
+    cache.put("analyze", prepare(photo, "JPEG"), {"description": "a photo"})
+
+    assert cache.get("analyze", prepare(repost, "JPEG")) == {"description": "a photo"}
+    assert cache.get("analyze", prepare(repost, "JPEG"), exact=True) is None
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"ok  {name}")